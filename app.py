@@ -21,6 +21,7 @@ from app_pages import home, nuevo_proyecto, buscar_proyectos, evaluar_cartera, d
 
 # Importar gestor de base de datos
 from database.db_manager import get_db_manager
+from ui.sesion_proyectos import resumen_cartera, ultimo_proyecto
 
 # Importar estilos UI ejecutivos
 try:
@@ -60,10 +61,7 @@ def init_database():
 db = init_database()
 
 # Inicializar session state
-if 'proyectos' not in st.session_state:
-    # Cargar proyectos desde la base de datos
-    st.session_state.proyectos = db.obtener_todos_proyectos()
-
+# (los proyectos se cargan bajo demanda: ver ui.sesion_proyectos)
 if 'db_initialized' not in st.session_state:
     st.session_state.db_initialized = True
 
@@ -122,12 +120,12 @@ with st.sidebar:
         <h3 style="font-size: 2rem; font-weight: 700; margin: 0.25rem 0;
              background: linear-gradient(135deg, #0ea5e9 0%, #10b981 100%);
              -webkit-background-clip: text; -webkit-text-fill-color: transparent;">
-            {len(st.session_state.proyectos)}
+            {resumen_cartera()['total_proyectos']}
         </h3>
     """, unsafe_allow_html=True)
 
-    if len(st.session_state.proyectos) > 0:
-        ultimo = st.session_state.proyectos[-1]
+    ultimo = ultimo_proyecto()
+    if ultimo is not None:
         nombre_corto = ultimo.nombre[:22] + "..." if len(ultimo.nombre) > 22 else ultimo.nombre
         st.markdown(f'<p style="font-size: 0.7rem; color: #94a3b8; margin: 0.5rem 0 0 0;">Último: {nombre_corto}</p>', unsafe_allow_html=True)
 
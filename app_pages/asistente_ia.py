@@ -3,6 +3,7 @@ Página del Asistente IA para análisis inteligente de proyectos.
 """
 import streamlit as st
 from servicios.asistente_ia import AsistenteIA
+from ui.sesion_proyectos import proyectos_sesion
 
 
 def show():
@@ -53,7 +54,7 @@ def show():
     asistente = st.session_state.asistente_ia
 
     # Verificar que hay proyectos
-    if not st.session_state.proyectos:
+    if not proyectos_sesion():
         st.info("📭 No hay proyectos registrados. Crea algunos proyectos primero para usar el asistente.")
         return
 
@@ -68,7 +69,7 @@ def show():
         st.markdown("Haz preguntas sobre un proyecto y obtén respuestas inteligentes basadas en sus datos.")
 
         # Selector de proyecto
-        proyectos_dict = {p.nombre: p for p in st.session_state.proyectos}
+        proyectos_dict = {p.nombre: p for p in proyectos_sesion()}
         proyecto_nombre = st.selectbox(
             "Selecciona un proyecto:",
             list(proyectos_dict.keys()),
@@ -205,7 +206,7 @@ def show():
                 if analizar_con_scores and tipo_analisis == "Tendencias y Patrones" and resultados:
                     # Usar método especial para tendencias con streaming
                     for chunk in asistente.analizar_tendencias_cartera_stream(
-                        st.session_state.proyectos,
+                        proyectos_sesion(),
                         resultados
                     ):
                         respuesta_completa += chunk
@@ -214,7 +215,7 @@ def show():
                     # Consulta general de cartera con streaming
                     for chunk in asistente.consultar_cartera_stream(
                         pregunta_cartera,
-                        st.session_state.proyectos,
+                        proyectos_sesion(),
                         resultados
                     ):
                         respuesta_completa += chunk
@@ -227,7 +228,7 @@ def show():
 
         col_comp1, col_comp2 = st.columns(2)
 
-        proyectos_dict = {p.nombre: p for p in st.session_state.proyectos}
+        proyectos_dict = {p.nombre: p for p in proyectos_sesion()}
 
         with col_comp1:
             proyecto1_nombre = st.selectbox(
@@ -325,7 +326,7 @@ def show():
                 if mensaje_chat:
                     with st.spinner("🤖 Pensando..."):
                         # Construir contexto básico
-                        contexto = f"""Tienes acceso a información sobre {len(st.session_state.proyectos)} proyectos sociales.
+                        contexto = f"""Tienes acceso a información sobre {len(proyectos_sesion())} proyectos sociales.
 El usuario puede preguntarte sobre proyectos específicos, pedir análisis, o hacer consultas generales."""
 
                         respuesta = asistente.chat(mensaje_chat, contexto)
@@ -9,9 +9,23 @@ if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
 from models.proyecto import ProyectoSocial, AreaGeografica, EstadoProyecto
-from models.municipios_colombia import obtener_municipios, obtener_todos_departamentos
+from models.municipios_colombia import INDICE_MUNICIPIOS, obtener_municipios, obtener_todos_departamentos
 from servicios.recomendador import RecomendadorProyectos
-from database.db_manager import get_db_manager
+from database.db_manager import get_db_manager, normalizar_ods
+from ui.sesion_proyectos import invalidar_proyectos_sesion
+
+# Resúmenes por página del listado
+PROYECTOS_POR_PAGINA = 20
+
+# Opciones de "Ordenar por" → (orden de listar_proyectos, descendente)
+ORDENES_PAGINA = {
+    "Nombre": ('nombre', False),
+    "Presupuesto (mayor)": ('presupuesto', True),
+    "Presupuesto (menor)": ('presupuesto', False),
+    "Beneficiarios (más)": ('beneficiarios', True),
+    "Beneficiarios (menos)": ('beneficiarios', False),
+    "Modificación (reciente)": ('modificacion', True),
+}
 
 
 def formatear_numero(numero: float, decimales: int = 2) -> str:
@@ -29,17 +43,40 @@ def formatear_numero(numero: float, decimales: int = 2) -> str:
     return numero_formateado
 
 
-def filtrar_proyectos(proyectos, filtros):
+def filtros_bd(filtros):
+    """Traduce los filtros del formulario a los argumentos de buscar_proyectos / listar_proyectos."""
+    return {
+        'texto': filtros.get('busqueda') or None,
+        'organizacion': filtros.get('organizacion') if filtros.get('organizacion') != "Todas" else None,
+        'departamento': filtros.get('departamento') if filtros.get('departamento') != "Todos" else None,
+        'ods': filtros.get('ods') or None,
+        'area_geografica': filtros.get('area') if filtros.get('area') != "Todas" else None,
+        'estado': filtros.get('estado') if filtros.get('estado') != "Todos" else None,
+        'todos_los_ods': False,
+        'presupuesto_min': filtros.get('presupuesto_min'),
+        'presupuesto_max': filtros.get('presupuesto_max'),
+    }
+
+
+def filtrar_proyectos(proyectos, filtros, db=None):
     """
     Filtra proyectos según los criterios especificados.
 
+    Con `db` todos los filtros se resuelven con buscar_ids_proyectos
+    (índices de la base de datos).
+
     Args:
         proyectos: Lista de proyectos a filtrar
         filtros: Diccionario con los criterios de filtrado
+        db: Gestor de base de datos (opcional)
 
     Returns:
         Lista de proyectos filtrados
     """
+    if db is not None:
+        ids = set(db.buscar_ids_proyectos(**filtros_bd(filtros)))
+        return [p for p in proyectos if p.id in ids]
+
     resultado = proyectos.copy()
 
     # Filtro por búsqueda de texto
@@ -58,10 +95,11 @@ def filtrar_proyectos(proyectos, filtros):
     if filtros.get('departamento') and filtros['departamento'] != "Todos":
         resultado = [p for p in resultado if filtros['departamento'] in p.departamentos]
 
-    # Filtro por ODS
+    # Filtro por ODS (igualdad exacta: "ODS 1" no coincide con "ODS 11")
     if filtros.get('ods'):
+        buscados = {normalizar_ods(ods) for ods in filtros['ods']}
         resultado = [p for p in resultado if
-                    any(ods in p.ods_vinculados for ods in filtros['ods'])]
+                    buscados.intersection(normalizar_ods(ods) for ods in p.ods_vinculados)]
 
     # Filtro por área geográfica
     if filtros.get('area') and filtros['area'] != "Todas":
@@ -82,7 +120,7 @@ def filtrar_proyectos(proyectos, filtros):
 
 
 def mostrar_formulario_edicion(proyecto, idx):
-    """Muestra el formulario para editar un proyecto existente."""
+    """Muestra el formulario para editar un proyecto existente (idx: sufijo de las claves de widgets)."""
     st.markdown(f"### ✏️ Editando: {proyecto.nombre}")
     st.markdown("---")
 
@@ -113,10 +151,14 @@ def mostrar_formulario_edicion(proyecto, idx):
                 municipios_disponibles.extend(munis)
             municipios_disponibles = sorted(list(set(municipios_disponibles)))
 
+        # Nombre del catálogo para cada municipio guardado (sin importar tildes)
+        ubicaciones = [INDICE_MUNICIPIOS.ubicar(m, departamentos_edit) for m in st.session_state.edit_municipios]
+        municipios_guardados = list(dict.fromkeys(u.municipio for u in ubicaciones if u is not None))
+
         municipios_edit = st.multiselect(
             "Municipios",
             options=municipios_disponibles,
-            default=[m for m in st.session_state.edit_municipios if m in municipios_disponibles],
+            default=municipios_guardados,
             disabled=len(departamentos_edit) == 0,
             key=f"edit_muni_{idx}"
         )
@@ -306,8 +348,8 @@ def mostrar_formulario_edicion(proyecto, idx):
             # Guardar en base de datos
             db = get_db_manager()
             if db.actualizar_proyecto(proyecto):
-                # Recargar proyectos desde BD
-                st.session_state.proyectos = db.obtener_todos_proyectos()
+                # La cartera de la sesión (si estaba cargada) se relee de la BD
+                invalidar_proyectos_sesion()
                 st.success(f"✅ Proyecto '{nombre}' actualizado exitosamente!")
             else:
                 st.error(f"❌ Error al actualizar el proyecto en la base de datos.")
@@ -345,18 +387,21 @@ def show():
     st.markdown("<h1 class='main-header'>🔍 Buscar y Gestionar Proyectos</h1>", unsafe_allow_html=True)
     st.markdown("---")
 
+    db = get_db_manager()
+
     # Verificar que hay proyectos
-    if len(st.session_state.proyectos) == 0:
+    total_proyectos = db.contar_proyectos()
+    if total_proyectos == 0:
         st.info("📋 No hay proyectos registrados aún. Ve a 'Nuevo Proyecto' para crear uno.")
         return
 
-    # Si hay un proyecto en edición, mostrar solo el formulario de edición
+    # Si hay un proyecto en edición, cargarlo completo y mostrar solo el formulario
     if 'proyecto_en_edicion' in st.session_state:
-        idx = st.session_state.proyecto_en_edicion
-        if idx < len(st.session_state.proyectos):
-            proyecto = st.session_state.proyectos[idx]
-            mostrar_formulario_edicion(proyecto, idx)
+        proyecto = db.obtener_proyecto(st.session_state.proyecto_en_edicion)
+        if proyecto is not None:
+            mostrar_formulario_edicion(proyecto, proyecto.id)
             return
+        del st.session_state.proyecto_en_edicion
 
     # Panel de filtros
     st.markdown("### 🔎 Filtros de Búsqueda")
@@ -366,15 +411,14 @@ def show():
 
         with col1:
             busqueda = st.text_input(
-                "🔍 Buscar por nombre, ID u organización",
-                placeholder="Ej: Educación, PROY-001, Fundación..."
+                "🔍 Buscar por palabras, ID u organización",
+                placeholder="Ej: acueducto veredal, PROY-001, Fundación...",
+                help="Busca en nombre, organización, descripción y población objetivo (sin importar tildes)"
             )
 
-            # Obtener lista de organizaciones únicas
-            organizaciones = sorted(list(set(p.organizacion for p in st.session_state.proyectos)))
             organizacion_filtro = st.selectbox(
                 "🏢 Organización",
-                options=["Todas"] + organizaciones
+                options=["Todas"] + db.obtener_organizaciones()
             )
 
         with col2:
@@ -420,8 +464,8 @@ def show():
                 help="0 = sin límite"
             )
 
-    # Aplicar filtros
-    filtros = {
+    # Aplicar filtros (en la base de datos)
+    filtros = filtros_bd({
         'busqueda': busqueda,
         'organizacion': organizacion_filtro,
         'departamento': departamento_filtro,
@@ -430,15 +474,14 @@ def show():
         'estado': estado_filtro,
         'presupuesto_min': presupuesto_min if presupuesto_min > 0 else None,
         'presupuesto_max': presupuesto_max if presupuesto_max > 0 else None
-    }
-
-    proyectos_filtrados = filtrar_proyectos(st.session_state.proyectos, filtros)
+    })
+    total_encontrados = db.contar_proyectos(**filtros)
 
     # Mostrar resultados
     st.markdown("---")
-    st.markdown(f"### 📋 Resultados ({len(proyectos_filtrados)} proyectos encontrados)")
+    st.markdown(f"### 📋 Resultados ({total_encontrados} proyectos encontrados)")
 
-    if len(proyectos_filtrados) == 0:
+    if total_encontrados == 0:
         st.warning("No se encontraron proyectos con los filtros seleccionados.")
         return
 
@@ -446,68 +489,112 @@ def show():
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        st.markdown(f"**Total encontrados:** {len(proyectos_filtrados)} de {len(st.session_state.proyectos)} proyectos")
+        st.markdown(f"**Total encontrados:** {total_encontrados} de {total_proyectos} proyectos")
 
     with col2:
         ordenar_por = st.selectbox(
             "Ordenar por:",
-            options=["Nombre", "Presupuesto (mayor)", "Presupuesto (menor)", "Beneficiarios (más)", "Beneficiarios (menos)"]
+            options=(["Relevancia"] if busqueda else []) + list(ORDENES_PAGINA)
+        )
+
+    # Cursores de las páginas visitadas; se reinician al cambiar filtros u orden
+    clave_consulta = repr((sorted(filtros.items()), ordenar_por))
+    if st.session_state.get('busqueda_clave') != clave_consulta:
+        st.session_state.busqueda_clave = clave_consulta
+        st.session_state.busqueda_cursores = [None]
+    cursores = st.session_state.busqueda_cursores
+
+    fragmentos = {}
+    if ordenar_por == "Relevancia":
+        # Mejores coincidencias por BM25, con fragmento resaltado
+        filtros_sin_texto = dict(filtros, texto=None)
+        coincidencias = db.buscar_texto(busqueda, limite=PROYECTOS_POR_PAGINA, **filtros_sin_texto)
+        fragmentos = {c.proyecto_id: c.fragmento for c in coincidencias}
+        resumenes = db.obtener_resumenes([c.proyecto_id for c in coincidencias])
+        cursor_siguiente = None
+        if total_encontrados > len(resumenes):
+            st.caption(f"Mostrando las {len(resumenes)} coincidencias más relevantes; "
+                       "elige otro orden para recorrer todos los resultados.")
+    else:
+        orden, descendente = ORDENES_PAGINA[ordenar_por]
+        pagina = db.listar_proyectos(
+            limite=PROYECTOS_POR_PAGINA, despues_de=cursores[-1],
+            orden=orden, descendente=descendente, **filtros
         )
+        resumenes = pagina.resumenes
+        cursor_siguiente = pagina.cursor_siguiente
+
+    # Mostrar resúmenes de la página (el proyecto completo se carga al editar)
+    for resumen in resumenes:
+        with st.expander(f"**{resumen.nombre}** - {resumen.organizacion} (ID: {resumen.id})"):
+            if resumen.id in fragmentos:
+                st.markdown(f"🔎 …{fragmentos[resumen.id]}…")
 
-    # Ordenar proyectos
-    if ordenar_por == "Presupuesto (mayor)":
-        proyectos_filtrados.sort(key=lambda p: p.presupuesto_total, reverse=True)
-    elif ordenar_por == "Presupuesto (menor)":
-        proyectos_filtrados.sort(key=lambda p: p.presupuesto_total)
-    elif ordenar_por == "Beneficiarios (más)":
-        proyectos_filtrados.sort(key=lambda p: p.beneficiarios_totales, reverse=True)
-    elif ordenar_por == "Beneficiarios (menos)":
-        proyectos_filtrados.sort(key=lambda p: p.beneficiarios_totales)
-    else:  # Nombre
-        proyectos_filtrados.sort(key=lambda p: p.nombre)
-
-    # Mostrar proyectos
-    for proyecto in proyectos_filtrados:
-        # Encontrar el índice real en la lista de proyectos
-        idx = st.session_state.proyectos.index(proyecto)
-
-        with st.expander(f"**{proyecto.nombre}** - {proyecto.organizacion} (ID: {proyecto.id})"):
             col1, col2, col3 = st.columns(3)
 
             with col1:
-                st.markdown(f"**💰 Presupuesto:** ${formatear_numero(proyecto.presupuesto_total, 0)}")
-                st.markdown(f"**👥 Beneficiarios Totales:** {formatear_numero(proyecto.beneficiarios_totales, 0)}")
-                st.markdown(f"**📉 Costo/Beneficiario:** ${formatear_numero(proyecto.presupuesto_por_beneficiario)}")
+                st.markdown(f"**💰 Presupuesto:** ${formatear_numero(resumen.presupuesto_total, 0)}")
+                st.markdown(f"**👥 Beneficiarios Totales:** {formatear_numero(resumen.beneficiarios_totales, 0)}")
+                st.markdown(f"**📉 Costo/Beneficiario:** ${formatear_numero(resumen.presupuesto_por_beneficiario)}")
 
             with col2:
                 st.markdown(f"""
-                **Duración:** {formatear_numero(proyecto.duracion_años, 1)} años
-                **Área:** {proyecto.area_geografica.value}
-                **Estado:** {proyecto.estado.value}
+                **Duración:** {formatear_numero(resumen.duracion_años, 1)} años
+                **Área:** {resumen.area_geografica}
+                **Estado:** {resumen.estado}
                 """)
 
             with col3:
                 st.markdown(f"""
-                **Departamentos:** {', '.join(proyecto.departamentos)}
-                **ODS:** {', '.join(proyecto.ods_vinculados[:3])}{'...' if len(proyecto.ods_vinculados) > 3 else ''}
+                **Departamentos:** {', '.join(resumen.departamentos)}
+                **ODS:** {', '.join(resumen.ods_vinculados[:3])}{'...' if len(resumen.ods_vinculados) > 3 else ''}
                 """)
 
             st.markdown("**Descripción:**")
-            st.markdown(proyecto.descripcion[:200] + "..." if len(proyecto.descripcion) > 200 else proyecto.descripcion)
+            st.markdown(resumen.descripcion + "..." if len(resumen.descripcion) >= 200 else resumen.descripcion)
 
             # Botones de acción
             st.markdown("---")
             col_edit, col_delete, col_space = st.columns([1, 1, 2])
 
             with col_edit:
-                if st.button(f"✏️ Editar", key=f"edit_btn_{idx}", use_container_width=True):
-                    st.session_state.proyecto_en_edicion = idx
+                if st.button(f"✏️ Editar", key=f"edit_btn_{resumen.id}", use_container_width=True):
+                    proyecto = db.obtener_proyecto(resumen.id)
+                    st.session_state.proyecto_en_edicion = resumen.id
                     st.session_state.edit_departamentos = proyecto.departamentos.copy()
                     st.session_state.edit_municipios = proyecto.municipios.copy() if proyecto.municipios else []
                     st.rerun()
 
+            with col_space:
+                # Eliminar borra de la base de datos: exigir confirmación
+                confirmar = st.checkbox(
+                    "Confirmo eliminar este proyecto de la base de datos",
+                    key=f"confirmar_eliminar_{resumen.id}"
+                )
+
             with col_delete:
-                if st.button(f"🗑️ Eliminar", key=f"delete_btn_{idx}", type="secondary", use_container_width=True):
-                    proyecto_eliminado = st.session_state.proyectos.pop(idx)
-                    st.success(f"✅ Proyecto '{proyecto_eliminado.nombre}' eliminado")
+                if st.button(
+                    f"🗑️ Eliminar", key=f"delete_btn_{resumen.id}", type="secondary",
+                    use_container_width=True, disabled=not confirmar
+                ):
+                    db.eliminar_proyecto(resumen.id)
+                    invalidar_proyectos_sesion()
+                    st.success(f"✅ Proyecto '{resumen.nombre}' eliminado")
                     st.rerun()
+
+    # Navegación entre páginas (keyset: solo anterior / siguiente)
+    if len(cursores) > 1 or cursor_siguiente is not None:
+        col_anterior, col_pagina, col_siguiente = st.columns([1, 2, 1])
+
+        with col_anterior:
+            if len(cursores) > 1 and st.button("⬅️ Anterior", use_container_width=True):
+                cursores.pop()
+                st.rerun()
+
+        with col_pagina:
+            st.markdown(f"<p style='text-align: center;'>Página {len(cursores)}</p>", unsafe_allow_html=True)
+
+        with col_siguiente:
+            if cursor_siguiente is not None and st.button("Siguiente ➡️", use_container_width=True):
+                cursores.append(cursor_siguiente)
+                st.rerun()
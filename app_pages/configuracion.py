@@ -1,6 +1,9 @@
 """Página de configuración del sistema."""
 import streamlit as st
 
+from database.db_manager import get_db_manager
+from ui.sesion_proyectos import resumen_cartera, invalidar_proyectos_sesion
+
 
 def show():
     """Muestra la página de configuración."""
@@ -96,19 +99,21 @@ def show():
 
     col1, col2, col3 = st.columns(3)
 
+    resumen = resumen_cartera()
+
     with col1:
-        st.metric("Proyectos Registrados", len(st.session_state.proyectos))
+        st.metric("Proyectos Registrados", resumen['total_proyectos'])
 
     with col2:
-        if len(st.session_state.proyectos) > 0:
-            presupuesto_total = sum(p.presupuesto_total for p in st.session_state.proyectos)
+        if resumen['total_proyectos'] > 0:
+            presupuesto_total = resumen['presupuesto_total']
             st.metric("Presupuesto Total", f"${presupuesto_total / 1e6:.1f}M")
         else:
             st.metric("Presupuesto Total", "$0")
 
     with col3:
-        if len(st.session_state.proyectos) > 0:
-            beneficiarios_total = sum(p.beneficiarios_totales for p in st.session_state.proyectos)
+        if resumen['total_proyectos'] > 0:
+            beneficiarios_total = resumen['beneficiarios_totales']
             st.metric("Beneficiarios Totales", f"{beneficiarios_total:,}")
         else:
             st.metric("Beneficiarios Totales", "0")
@@ -152,10 +157,15 @@ def show():
     with st.expander("⚠️ Zona de Peligro"):
         st.warning("Las siguientes acciones son irreversibles")
 
-        if st.button("🗑️ Eliminar Todos los Proyectos", type="secondary"):
-            if st.session_state.proyectos:
-                st.session_state.proyectos = []
-                st.success("Todos los proyectos han sido eliminados")
+        confirmar = st.checkbox(
+            "Confirmo que deseo eliminar permanentemente todos los proyectos de la base de datos",
+            key="confirmar_eliminar_todos"
+        )
+        if st.button("🗑️ Eliminar Todos los Proyectos", type="secondary", disabled=not confirmar):
+            eliminados = get_db_manager().eliminar_todos_proyectos()
+            if eliminados:
+                invalidar_proyectos_sesion()
+                st.success(f"{eliminados} proyectos eliminados")
                 st.rerun()
             else:
                 st.info("No hay proyectos para eliminar")
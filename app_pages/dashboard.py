@@ -2,8 +2,6 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from collections import Counter
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -26,6 +24,12 @@ except ImportError:
     spec.loader.exec_module(exportador_cartera_module)
     ExportadorCartera = exportador_cartera_module.ExportadorCartera
 
+# Scoring Arquitectura C y frontera de Pareto
+from scoring.motor_arquitectura_c import MotorScoringArquitecturaC
+from scoring.analisis_pareto import FronteraPareto, objetivos_desde_lote
+from database.db_manager import get_db_manager, NIVEL_SIN_EVALUAR
+from ui.sesion_proyectos import proyectos_sesion
+
 # Importar componentes UI ejecutivos
 try:
     from ui.componentes import ComponentesUI
@@ -61,8 +65,214 @@ def formatear_numero(numero: float, decimales: int = 2) -> str:
     return numero_formateado
 
 
+# Grupos por dimensión y proyectos por métrica que muestran los gráficos
+LIMITE_GRUPOS = 10
+TOP_PROYECTOS = 15
+
+# Dimensiones agregadas en la consulta principal del dashboard
+DIMENSIONES_DASHBOARD = (
+    'area_geografica', 'departamento', 'ods', 'sector', 'estado', 'nivel_prioridad'
+)
+
+LAYOUT_OSCURO = dict(
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font=dict(color='#cbd5e1', family='Inter'),
+    title_font=dict(size=16, color='#f8fafc'),
+    xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
+    yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
+)
+
+ESCALA_VERDE_VIOLETA = [[0, '#10b981'], [0.5, '#06b6d4'], [1, '#8b5cf6']]
+
+
+@st.cache_resource
+def get_motor():
+    """Obtiene instancia del motor de scoring (cached)"""
+    return MotorScoringArquitecturaC()
+
+
+def nombre_corto(nombre: str) -> str:
+    """Recorta nombres largos para las etiquetas de los gráficos."""
+    return nombre[:30] + '...' if len(nombre) > 30 else nombre
+
+
+def guardar_scores_lote(lote, ids=None) -> int:
+    """
+    Guarda en la BD el score y nivel de prioridad de un ResultadoScoringLote.
+
+    Args:
+        lote: Resultado de calcular_scores_lote
+        ids: Si se indica, solo se guardan los proyectos de este conjunto
+    """
+    return get_db_manager().guardar_scores(
+        fila for fila in zip(lote.proyecto_ids, lote.score_total.tolist(), lote.nivel_prioridad)
+        if ids is None or fila[0] in ids
+    )
+
+
+def evaluar_proyectos_sin_score() -> int:
+    """Calcula y guarda el score de los proyectos nuevos o modificados."""
+    db = get_db_manager()
+    ids = db.ids_sin_score()
+    if not ids:
+        return 0
+    return guardar_scores_lote(get_motor().calcular_scores_lote(db.obtener_proyectos(ids)))
+
+
+def mostrar_frontera_pareto(proyectos):
+    """
+    Gráfico de la frontera de Pareto (SROI, riesgo, presupuesto, beneficiarios).
+
+    La frontera se guarda en session_state y solo se actualiza con los
+    proyectos agregados, editados o eliminados desde la última visita.
+    Los scores de los proyectos que aún no tenían uno guardado alimentan
+    la agregación por nivel de prioridad; los demás no se reescriben en
+    cada render.
+    """
+    lote = get_motor().calcular_scores_lote(proyectos)
+    sin_score = set(get_db_manager().ids_sin_score())
+    if sin_score:
+        guardar_scores_lote(lote, sin_score)
+    vectores = objetivos_desde_lote(proyectos, lote)
+
+    if 'frontera_pareto' not in st.session_state:
+        st.session_state.frontera_pareto = FronteraPareto()
+    frontera = st.session_state.frontera_pareto
+    frontera.sincronizar(vectores)
+
+    df_pareto = pd.DataFrame([
+        {
+            'Proyecto': nombre_corto(p.nombre),
+            'Presupuesto': p.presupuesto_total,
+            'Score SROI': float(lote.score_sroi[i]),
+            'Score Riesgos': float(lote.score_riesgos[i]),
+            'Beneficiarios': p.beneficiarios_totales,
+            'Frontera': 'No dominado' if frontera.en_frontera(p.id) else 'Dominado'
+        }
+        for i, p in enumerate(proyectos)
+    ])
+
+    fig_pareto = px.scatter(
+        df_pareto,
+        x='Presupuesto',
+        y='Score SROI',
+        size='Beneficiarios',
+        color='Frontera',
+        hover_name='Proyecto',
+        hover_data={'Score Riesgos': ':.1f', 'Beneficiarios': ':,', 'Frontera': False},
+        title='Proyectos no dominados: mayor SROI y menor riesgo, con menos presupuesto y más beneficiarios',
+        color_discrete_map={'No dominado': '#10b981', 'Dominado': '#64748b'},
+        size_max=40
+    )
+
+    fig_pareto.update_layout(
+        xaxis_title='Presupuesto (COP)',
+        yaxis_title='Score SROI (0-100)',
+        legend_title_text='',
+        **LAYOUT_OSCURO
+    )
+
+    st.plotly_chart(fig_pareto, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(
+            "Proyectos en la frontera",
+            f"{len(frontera.frontera)} de {len(proyectos)}",
+            help="Ningún otro proyecto es igual o mejor en SROI, riesgo, presupuesto y beneficiarios a la vez"
+        )
+    with col2:
+        st.metric(
+            "Proyectos dominados",
+            len(proyectos) - len(frontera.frontera),
+            help="Existe al menos un proyecto mejor en todos los objetivos"
+        )
+
+
+def df_grupos(grupos, etiqueta: str) -> pd.DataFrame:
+    """DataFrame de una lista de GrupoEstadistico (valor, proyectos, presupuesto)."""
+    return pd.DataFrame(
+        [
+            {etiqueta: g.valor, 'Proyectos': g.proyectos, 'Presupuesto': g.presupuesto_total}
+            for g in grupos
+        ],
+        columns=[etiqueta, 'Proyectos', 'Presupuesto']
+    )
+
+
+def df_metrica(metricas, columna: str) -> pd.DataFrame:
+    """
+    DataFrame de una lista de MetricaProyecto para barras horizontales.
+
+    Se invierte el orden para que el primero de la lista quede arriba.
+    """
+    return pd.DataFrame(
+        [{'Proyecto': nombre_corto(m.nombre), columna: m.valor} for m in reversed(metricas)],
+        columns=['Proyecto', columna]
+    )
+
+
+def grafico_barras_grupos(grupos, etiqueta: str, titulo: str):
+    """Barras con el número de proyectos por grupo."""
+    fig = px.bar(
+        df_grupos(grupos, etiqueta),
+        x=etiqueta,
+        y='Proyectos',
+        title=titulo,
+        color='Proyectos',
+        hover_data={'Presupuesto': ':,.0f'},
+        color_continuous_scale=ESCALA_VERDE_VIOLETA
+    )
+    fig.update_layout(showlegend=False, xaxis_tickangle=-45, **LAYOUT_OSCURO)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def grafico_metrica(metricas, columna: str, titulo: str, escala, **kwargs):
+    """Barras horizontales de proyectos ordenados por una métrica."""
+    fig = px.bar(
+        df_metrica(metricas, columna),
+        x=columna,
+        y='Proyecto',
+        orientation='h',
+        title=titulo,
+        color=columna,
+        color_continuous_scale=escala,
+        **kwargs
+    )
+    fig.update_layout(showlegend=False, **LAYOUT_OSCURO)
+    return fig
+
+
+def filas_resumen(proyectos):
+    """Filas de la tabla resumen exportable (proyectos completos)."""
+    return [
+        {
+            'ID': p.id,
+            'Nombre': p.nombre,
+            'Organización': p.organizacion,
+            'Presupuesto': f"${formatear_numero(p.presupuesto_total, 0)}",
+            'Beneficiarios': formatear_numero(p.beneficiarios_totales, 0),
+            'Duración (años)': formatear_numero(p.duracion_años, 1),
+            'Área': p.area_geografica.value,
+            'SROI': (lambda sroi_val: f"{formatear_numero(sroi_val, 1)}:1" if sroi_val > 0 else "N/A")(
+                float(p.indicadores_impacto.get('sroi', 0.0)) if p.indicadores_impacto.get('sroi', 0.0) else 0.0
+            ),
+            'Estado': p.estado.value
+        }
+        for p in proyectos
+    ]
+
+
 def show():
-    """Muestra el dashboard con visualizaciones - Diseño Ejecutivo."""
+    """
+    Muestra el dashboard con visualizaciones - Diseño Ejecutivo.
+
+    Las cifras salen de consultas agregadas (obtener_estadisticas con
+    GROUP BY por dimensión y metricas_proyectos con ORDER BY ... LIMIT);
+    la cartera completa solo se carga para la frontera de Pareto y las
+    exportaciones, cuando el usuario las pide.
+    """
 
     # Header ejecutivo
     if UI_DISPONIBLE:
@@ -76,8 +286,12 @@ def show():
                     unsafe_allow_html=True)
         st.markdown('<p style="text-align: center; color: #cbd5e1; margin-bottom: 2rem;">Análisis integral del portafolio de proyectos</p>', unsafe_allow_html=True)
 
+    db = get_db_manager()
+    estadisticas = db.obtener_estadisticas(agrupar_por=DIMENSIONES_DASHBOARD, limite_grupos=LIMITE_GRUPOS)
+    total_proyectos = estadisticas['total_proyectos']
+
     # Verificar que hay proyectos
-    if len(st.session_state.proyectos) == 0:
+    if total_proyectos == 0:
         st.markdown("""
         <div style="background: linear-gradient(145deg, #1e293b 0%, #0f172a 100%);
              border: 1px solid rgba(14, 165, 233, 0.2); border-radius: 1rem;
@@ -89,31 +303,18 @@ def show():
         """, unsafe_allow_html=True)
         return
 
-    proyectos = st.session_state.proyectos
-
-    # Calcular métricas
-    presupuesto_total = sum(p.presupuesto_total for p in proyectos)
-    beneficiarios_total = sum(p.beneficiarios_totales for p in proyectos)
-    costo_promedio = presupuesto_total / beneficiarios_total if beneficiarios_total > 0 else 0
-
-    # Calcular SROI promedio
-    sroi_total = 0
-    proyectos_con_sroi = 0
-    for p in proyectos:
-        sroi_valor = p.indicadores_impacto.get('sroi', 0.0)
-        try:
-            sroi_num = float(sroi_valor) if sroi_valor else 0.0
-            if sroi_num > 0:
-                sroi_total += sroi_num
-                proyectos_con_sroi += 1
-        except (ValueError, TypeError):
-            pass
-    sroi_promedio = sroi_total / proyectos_con_sroi if proyectos_con_sroi > 0 else 0
+    # Métricas calculadas en la base de datos
+    presupuesto_total = estadisticas['presupuesto_total']
+    beneficiarios_total = (
+        estadisticas['total_beneficiarios_directos'] + estadisticas['total_beneficiarios_indirectos']
+    )
+    costo_promedio = estadisticas['costo_por_beneficiario']
+    sroi_promedio = estadisticas['sroi_promedio']
 
     # KPIs ejecutivos
     if UI_DISPONIBLE:
         ComponentesUI.kpis_ejecutivos([
-            {'valor': len(proyectos), 'etiqueta': 'Proyectos en Cartera'},
+            {'valor': total_proyectos, 'etiqueta': 'Proyectos en Cartera'},
             {'valor': f"${formatear_numero(presupuesto_total / 1e6, 1)}M", 'etiqueta': 'Inversión Total'},
             {'valor': formatear_numero(beneficiarios_total, 0), 'etiqueta': 'Beneficiarios'},
             {'valor': f"${formatear_numero(costo_promedio, 0)}", 'etiqueta': 'Costo/Beneficiario'},
@@ -126,7 +327,7 @@ def show():
             st.markdown(f"""
             <div class="metric-card" style="text-align: center;">
                 <p style="font-size: 0.75rem; color: #94a3b8; margin: 0;">TOTAL PROYECTOS</p>
-                <h2 class="text-gradient-primary" style="margin: 0.5rem 0; font-size: 2rem;">{len(proyectos)}</h2>
+                <h2 class="text-gradient-primary" style="margin: 0.5rem 0; font-size: 2rem;">{total_proyectos}</h2>
             </div>
             """, unsafe_allow_html=True)
         with col2:
@@ -167,22 +368,14 @@ def show():
 
     with col1:
         # Distribución por área geográfica
-        areas = [p.area_geografica.value for p in proyectos]
-        contador_areas = Counter(areas)
-
-        df_areas = pd.DataFrame([
-            {'Área': area, 'Proyectos': count}
-            for area, count in contador_areas.items()
-        ])
-
         fig_areas = px.pie(
-            df_areas,
+            df_grupos(estadisticas['por_area_geografica'], 'Área'),
             values='Proyectos',
             names='Área',
             title='Proyectos por Área Geográfica',
             color_discrete_sequence=['#10b981', '#06b6d4', '#8b5cf6', '#f59e0b', '#ef4444']
         )
-        
+
         fig_areas.update_layout(
             plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)',
@@ -194,39 +387,39 @@ def show():
 
     with col2:
         # Distribución por departamentos
-        todos_deptos = []
-        for p in proyectos:
-            todos_deptos.extend(p.departamentos)
+        grafico_barras_grupos(
+            estadisticas['por_departamento'], 'Departamento', f'Top {LIMITE_GRUPOS} Departamentos'
+        )
 
-        contador_deptos = Counter(todos_deptos)
-        top_deptos = contador_deptos.most_common(10)
+    # ODS, sectores, estado y prioridad
+    st.markdown("---")
+    st.markdown('<h2 class="section-header">🧭 Distribución Temática</h2>', unsafe_allow_html=True)
 
-        df_deptos = pd.DataFrame([
-            {'Departamento': depto, 'Proyectos': count}
-            for depto, count in top_deptos
-        ])
+    col1, col2 = st.columns(2)
 
-        fig_deptos = px.bar(
-            df_deptos,
-            x='Departamento',
-            y='Proyectos',
-            title='Top 10 Departamentos',
-            color='Proyectos',
-            color_continuous_scale=[[0, '#10b981'], [0.5, '#06b6d4'], [1, '#8b5cf6']]
-        )
+    with col1:
+        grafico_barras_grupos(estadisticas['por_ods'], 'ODS', f'Top {LIMITE_GRUPOS} ODS Vinculados')
 
-        fig_deptos.update_layout(
-            showlegend=False, 
-            xaxis_tickangle=-45,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#cbd5e1', family='Inter'),
-            title_font=dict(size=16, color='#f8fafc'),
-            xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-            yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
-        )
+    with col2:
+        grafico_barras_grupos(estadisticas['por_sector'], 'Sector', f'Top {LIMITE_GRUPOS} Sectores')
+
+    col1, col2 = st.columns(2)
 
-        st.plotly_chart(fig_deptos, use_container_width=True)
+    with col1:
+        grafico_barras_grupos(estadisticas['por_estado'], 'Estado', 'Proyectos por Estado')
+
+    with col2:
+        grafico_barras_grupos(
+            estadisticas['por_nivel_prioridad'], 'Nivel de Prioridad', 'Proyectos por Nivel de Prioridad'
+        )
+        sin_score = sum(
+            g.proyectos for g in estadisticas['por_nivel_prioridad'] if g.valor == NIVEL_SIN_EVALUAR
+        )
+        if sin_score and st.button(f"🎯 Evaluar {sin_score} proyecto(s) sin score", use_container_width=True):
+            with st.spinner("Calculando scores..."):
+                evaluados = evaluar_proyectos_sin_score()
+            st.success(f"{evaluados} proyecto(s) evaluados")
+            st.rerun()
 
     # Presupuestos
     st.markdown("---")
@@ -236,81 +429,23 @@ def show():
     with col1:
         st.markdown('<h3 style="color: #f8fafc; margin-bottom: 1rem;">💰 Presupuesto por Proyecto</h3>', unsafe_allow_html=True)
 
-        df_presupuesto = pd.DataFrame([
-            {
-                'Proyecto': p.nombre[:30] + '...' if len(p.nombre) > 30 else p.nombre,
-                'Presupuesto': p.presupuesto_total
-            }
-            for p in proyectos
-        ])
-
-        df_presupuesto = df_presupuesto.sort_values('Presupuesto', ascending=True)
-
-        fig_presupuesto = px.bar(
-            df_presupuesto,
-            x='Presupuesto',
-            y='Proyecto',
-            orientation='h',
-            title='Presupuesto por Proyecto',
-            color='Presupuesto',
-            color_continuous_scale=[[0, '#10b981'], [0.5, '#06b6d4'], [1, '#8b5cf6']]
-        )
-
-        fig_presupuesto.update_layout(
-            showlegend=False,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#cbd5e1', family='Inter'),
-            title_font=dict(size=16, color='#f8fafc'),
-            xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-            yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
+        fig_presupuesto = grafico_metrica(
+            db.metricas_proyectos('presupuesto_total', limite=TOP_PROYECTOS),
+            'Presupuesto',
+            f'Top {TOP_PROYECTOS} Proyectos por Presupuesto',
+            ESCALA_VERDE_VIOLETA
         )
-
         st.plotly_chart(fig_presupuesto, use_container_width=True)
 
     with col2:
         st.markdown('<h3 style="color: #f8fafc; margin-bottom: 1rem;">👥 Beneficiarios por Proyecto</h3>', unsafe_allow_html=True)
 
-        df_beneficiarios = pd.DataFrame([
-            {
-                'Proyecto': p.nombre[:30] + '...' if len(p.nombre) > 30 else p.nombre,
-                'Directos': p.beneficiarios_directos,
-                'Indirectos': p.beneficiarios_indirectos
-            }
-            for p in proyectos
-        ])
-
-        fig_beneficiarios = go.Figure()
-
-        fig_beneficiarios.add_trace(go.Bar(
-            y=df_beneficiarios['Proyecto'],
-            x=df_beneficiarios['Directos'],
-            name='Directos',
-            orientation='h',
-            marker=dict(color='#10b981')
-        ))
-
-        fig_beneficiarios.add_trace(go.Bar(
-            y=df_beneficiarios['Proyecto'],
-            x=df_beneficiarios['Indirectos'],
-            name='Indirectos',
-            orientation='h',
-            marker=dict(color='#06b6d4')
-        ))
-
-        fig_beneficiarios.update_layout(
-            barmode='stack',
-            title='Beneficiarios Directos e Indirectos',
-            xaxis_title='Beneficiarios',
-            yaxis_title='Proyecto',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#cbd5e1', family='Inter'),
-            title_font=dict(size=16, color='#f8fafc'),
-            xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-            yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
+        fig_beneficiarios = grafico_metrica(
+            db.metricas_proyectos('beneficiarios_totales', limite=TOP_PROYECTOS),
+            'Beneficiarios',
+            f'Top {TOP_PROYECTOS} Proyectos por Beneficiarios (directos + indirectos)',
+            ESCALA_VERDE_VIOLETA
         )
-
         st.plotly_chart(fig_beneficiarios, use_container_width=True)
 
     # Duración y eficiencia
@@ -321,13 +456,8 @@ def show():
     with col1:
         st.markdown('<h3 style="color: #f8fafc; margin-bottom: 1rem;">⏱️ Duración de Proyectos</h3>', unsafe_allow_html=True)
 
-        df_duracion = pd.DataFrame([
-            {
-                'Proyecto': p.nombre[:30] + '...' if len(p.nombre) > 30 else p.nombre,
-                'Duración (años)': p.duracion_años
-            }
-            for p in proyectos
-        ])
+        df_duracion = df_metrica(db.metricas_proyectos('duracion_meses', limite=TOP_PROYECTOS), 'Duración (años)')
+        df_duracion['Duración (años)'] = df_duracion['Duración (años)'] / 12
 
         fig_duracion = px.scatter(
             df_duracion,
@@ -336,85 +466,36 @@ def show():
             size='Duración (años)',
             color='Duración (años)',
             color_continuous_scale=[[0, '#f59e0b'], [0.5, '#ef4444'], [1, '#8b5cf6']],
-            title='Duración de Proyectos'
-        )
-        
-        fig_duracion.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#cbd5e1', family='Inter'),
-            title_font=dict(size=16, color='#f8fafc'),
-            xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-            yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
+            title=f'Top {TOP_PROYECTOS} Proyectos más Largos'
         )
+        fig_duracion.update_layout(**LAYOUT_OSCURO)
 
         st.plotly_chart(fig_duracion, use_container_width=True)
 
     with col2:
         st.markdown('<h3 style="color: #f8fafc; margin-bottom: 1rem;">📊 Eficiencia: Costo/Beneficiario</h3>', unsafe_allow_html=True)
 
-        df_eficiencia = pd.DataFrame([
-            {
-                'Proyecto': p.nombre[:30] + '...' if len(p.nombre) > 30 else p.nombre,
-                'Costo/Beneficiario': p.presupuesto_por_beneficiario
-            }
-            for p in proyectos
-        ])
-
-        df_eficiencia = df_eficiencia.sort_values('Costo/Beneficiario')
-
-        fig_eficiencia = px.bar(
-            df_eficiencia,
-            x='Costo/Beneficiario',
-            y='Proyecto',
-            orientation='h',
-            title='Costo por Beneficiario (menor es mejor)',
-            color='Costo/Beneficiario',
-            color_continuous_scale=[[0, '#10b981'], [0.5, '#f59e0b'], [1, '#ef4444']]
+        fig_eficiencia = grafico_metrica(
+            db.metricas_proyectos('costo_por_beneficiario', limite=TOP_PROYECTOS, ascendente=True),
+            'Costo/Beneficiario',
+            f'Top {TOP_PROYECTOS} en Costo por Beneficiario (menor es mejor)',
+            [[0, '#10b981'], [0.5, '#f59e0b'], [1, '#ef4444']]
         )
-        
-        fig_eficiencia.update_layout(
-            showlegend=False,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#cbd5e1', family='Inter'),
-            title_font=dict(size=16, color='#f8fafc'),
-            xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-            yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
-        )
-
         st.plotly_chart(fig_eficiencia, use_container_width=True)
 
     # SROI por proyecto
     st.markdown("---")
     st.markdown('<h2 class="section-header">📈 Retorno Social de la Inversión (SROI)</h2>', unsafe_allow_html=True)
 
-    # Filtrar proyectos con SROI
-    proyectos_sroi = []
-    for p in proyectos:
-        sroi_valor = p.indicadores_impacto.get('sroi', 0.0)
-        try:
-            sroi_num = float(sroi_valor) if sroi_valor else 0.0
-            if sroi_num > 0:
-                proyectos_sroi.append({
-                    'Proyecto': p.nombre[:30] + '...' if len(p.nombre) > 30 else p.nombre,
-                    'SROI': sroi_num
-                })
-        except (ValueError, TypeError):
-            pass
-
-    if proyectos_sroi:
-        df_sroi = pd.DataFrame(proyectos_sroi)
-        df_sroi = df_sroi.sort_values('SROI', ascending=True)
-
-        fig_sroi = px.bar(
-            df_sroi,
-            x='SROI',
-            y='Proyecto',
-            orientation='h',
-            title='Retorno Social por Proyecto (mayor es mejor)',
-            color='SROI',
-            color_continuous_scale=[[0, '#10b981'], [0.5, '#06b6d4'], [1, '#8b5cf6']],
+    proyectos_con_sroi = estadisticas['proyectos_con_sroi']
+    if proyectos_con_sroi:
+        mayores_sroi = db.metricas_proyectos('sroi', limite=TOP_PROYECTOS)
+
+        fig_sroi = grafico_metrica(
+            mayores_sroi,
+            'SROI',
+            f'Top {TOP_PROYECTOS} en Retorno Social (mayor es mejor)',
+            ESCALA_VERDE_VIOLETA,
             text='SROI'
         )
 
@@ -425,14 +506,7 @@ def show():
 
         fig_sroi.update_layout(
             xaxis_title='SROI (retorno por cada peso invertido)',
-            yaxis_title='Proyecto',
-            showlegend=False,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#cbd5e1', family='Inter'),
-            title_font=dict(size=16, color='#f8fafc'),
-            xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
-            yaxis=dict(gridcolor='rgba(255,255,255,0.1)')
+            yaxis_title='Proyecto'
         )
 
         st.plotly_chart(fig_sroi, use_container_width=True)
@@ -441,55 +515,59 @@ def show():
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            sroi_max = max([p['SROI'] for p in proyectos_sroi])
-            proyecto_max = next(p for p in proyectos_sroi if p['SROI'] == sroi_max)
             st.metric(
                 "Mayor SROI",
-                f"{formatear_numero(sroi_max, 1)}:1",
-                help=f"Proyecto: {proyecto_max['Proyecto']}"
+                f"{formatear_numero(estadisticas['sroi_maximo'], 1)}:1",
+                help=f"Proyecto: {nombre_corto(mayores_sroi[0].nombre)}"
             )
 
         with col2:
-            sroi_min = min([p['SROI'] for p in proyectos_sroi])
-            proyecto_min = next(p for p in proyectos_sroi if p['SROI'] == sroi_min)
+            proyecto_min = db.metricas_proyectos('sroi', limite=1, ascendente=True)[0]
             st.metric(
                 "Menor SROI",
-                f"{formatear_numero(sroi_min, 1)}:1",
-                help=f"Proyecto: {proyecto_min['Proyecto']}"
+                f"{formatear_numero(estadisticas['sroi_minimo'], 1)}:1",
+                help=f"Proyecto: {nombre_corto(proyecto_min.nombre)}"
             )
 
         with col3:
-            sroi_acumulado = sum([p['SROI'] for p in proyectos_sroi])
+            sroi_acumulado = sroi_promedio * proyectos_con_sroi
             st.metric(
                 "SROI Acumulado Portfolio",
                 f"{formatear_numero(sroi_acumulado, 1)}:1",
-                help=f"Suma total del retorno social de {len(proyectos_sroi)} proyectos"
+                help=f"Suma total del retorno social de {proyectos_con_sroi} proyectos"
             )
     else:
         st.info("No hay proyectos con SROI documentado.")
 
+    # Frontera de Pareto (requiere la cartera completa y el motor de scoring)
+    st.markdown("---")
+    st.markdown('<h2 class="section-header">🎯 Frontera de Pareto</h2>', unsafe_allow_html=True)
+    if st.checkbox("Calcular frontera de Pareto", key="dashboard_pareto",
+                   help="Evalúa todos los proyectos con el motor de scoring"):
+        mostrar_frontera_pareto(proyectos_sesion())
+
     # Tabla resumen
     st.markdown("---")
-    st.markdown("### 📋 Tabla Resumen de Proyectos")
+    st.markdown("### 📋 Proyectos Modificados Recientemente")
 
-    df_resumen = pd.DataFrame([
+    resumenes = db.listar_proyectos(limite=TOP_PROYECTOS).resumenes
+    df_recientes = pd.DataFrame([
         {
-            'ID': p.id,
-            'Nombre': p.nombre,
-            'Organización': p.organizacion,
-            'Presupuesto': f"${formatear_numero(p.presupuesto_total, 0)}",
-            'Beneficiarios': formatear_numero(p.beneficiarios_totales, 0),
-            'Duración (años)': formatear_numero(p.duracion_años, 1),
-            'Área': p.area_geografica.value,
-            'SROI': (lambda sroi_val: f"{formatear_numero(sroi_val, 1)}:1" if sroi_val > 0 else "N/A")(
-                float(p.indicadores_impacto.get('sroi', 0.0)) if p.indicadores_impacto.get('sroi', 0.0) else 0.0
-            ),
-            'Estado': p.estado.value
+            'ID': r.id,
+            'Nombre': r.nombre,
+            'Organización': r.organizacion,
+            'Presupuesto': f"${formatear_numero(r.presupuesto_total, 0)}",
+            'Beneficiarios': formatear_numero(r.beneficiarios_totales, 0),
+            'Duración (años)': formatear_numero(r.duracion_años, 1),
+            'Área': r.area_geografica,
+            'Estado': r.estado
         }
-        for p in proyectos
+        for r in resumenes
     ])
 
-    st.dataframe(df_resumen, use_container_width=True, hide_index=True)
+    st.dataframe(df_recientes, use_container_width=True, hide_index=True)
+    if total_proyectos > len(resumenes):
+        st.caption(f"{len(resumenes)} de {total_proyectos} proyectos; la cartera completa está en Buscar Proyectos.")
 
     # Sección de Exportación Ejecutiva
     st.markdown("---")
@@ -498,6 +576,19 @@ def show():
     <p style="color: #94a3b8; margin-bottom: 1rem;">Genere reportes profesionales para presentación al comité de aprobación</p>
     """, unsafe_allow_html=True)
 
+    if st.checkbox("Preparar informes de la cartera completa", key="dashboard_exportar"):
+        mostrar_exportaciones(proyectos_sesion(), estadisticas)
+
+
+def mostrar_exportaciones(proyectos, estadisticas):
+    """Informes Word/Excel/PowerPoint y exportaciones básicas de la cartera."""
+    presupuesto_total = estadisticas['presupuesto_total']
+    beneficiarios_total = (
+        estadisticas['total_beneficiarios_directos'] + estadisticas['total_beneficiarios_indirectos']
+    )
+    costo_promedio = estadisticas['costo_por_beneficiario']
+    df_resumen = pd.DataFrame(filas_resumen(proyectos))
+
     # Preparar datos para exportador profesional
     def _preparar_datos_dashboard():
         """Prepara datos del dashboard para exportación profesional."""
@@ -20,6 +20,8 @@ from criterios import (
 )
 from estrategias import ScoringPonderado, ScoringUmbral
 from servicios import SistemaPriorizacionProyectos, ExportadorResultados, RecomendadorProyectos
+from servicios.sistema_priorizacion import MIN_PROYECTOS_PARALELO
+from ui.sesion_proyectos import proyectos_sesion
 
 # Importar exportador de cartera profesional
 try:
@@ -84,7 +86,7 @@ def show():
         st.markdown("<p style='text-align: center; color: #94a3b8;'>Motor de priorización Arquitectura C</p>", unsafe_allow_html=True)
 
     # Verificar que hay proyectos
-    if len(st.session_state.proyectos) == 0:
+    if len(proyectos_sesion()) == 0:
         st.markdown("""
         <div style="background: linear-gradient(145deg, #1e293b 0%, #0f172a 100%);
              border: 1px solid rgba(245, 158, 11, 0.3); border-radius: 1rem;
@@ -111,7 +113,7 @@ def show():
         # Selección de proyectos
         st.markdown("#### Selecciona proyectos a evaluar")
 
-        todos_proyectos = {f"{p.id} - {p.nombre}": p for p in st.session_state.proyectos}
+        todos_proyectos = {f"{p.id} - {p.nombre}": p for p in proyectos_sesion()}
 
         proyectos_seleccionados = st.multiselect(
             "Proyectos",
@@ -127,6 +129,13 @@ def show():
             options=["Scoring Ponderado", "Scoring con Umbrales"]
         )
 
+        evaluacion_paralela = st.checkbox(
+            "⚡ Evaluación paralela (multi-núcleo)",
+            value=len(todos_proyectos) >= MIN_PROYECTOS_PARALELO,
+            help="Reparte la cartera entre los núcleos del servidor. "
+                 "El ranking resultante es idéntico al de la evaluación en serie."
+        )
+
     # Configuración de criterios
     st.markdown("#### 🎯 Pesos de Criterios")
 
@@ -260,7 +269,7 @@ def show():
         proyectos_eval = [todos_proyectos[key] for key in proyectos_seleccionados]
 
         with st.spinner("Evaluando proyectos..."):
-            reporte = sistema.generar_reporte(proyectos_eval)
+            reporte = sistema.generar_reporte(proyectos_eval, paralelo=evaluacion_paralela)
 
         # Mostrar resultados
         st.markdown("---")
@@ -6,6 +6,7 @@ from datetime import datetime
 from typing import Optional
 from servicios.gestor_historial import GestorHistorial
 from models.historial import EstadoRecomendacion
+from ui.sesion_proyectos import proyectos_sesion
 
 
 def show():
@@ -22,7 +23,7 @@ def show():
     # Obtener proyectos con historial
     proyectos_con_historial = [
         (proyecto, gestor.obtener_historial(proyecto.id))
-        for proyecto in st.session_state.proyectos
+        for proyecto in proyectos_sesion()
         if gestor.obtener_historial(proyecto.id) is not None
     ]
 
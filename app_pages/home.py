@@ -2,6 +2,8 @@
 import streamlit as st
 from pathlib import Path
 
+from ui.sesion_proyectos import resumen_cartera
+
 
 def show():
     """Muestra la página de inicio."""
@@ -24,7 +26,8 @@ def show():
     # Métricas principales con diseño moderno
     col1, col2, col3 = st.columns(3)
     
-    num_proyectos = len(st.session_state.proyectos)
+    resumen = resumen_cartera()
+    num_proyectos = resumen['total_proyectos']
     
     with col1:
         st.markdown("""
@@ -37,7 +40,7 @@ def show():
     
     with col2:
         if num_proyectos > 0:
-            presupuesto_total = sum(p.presupuesto_total for p in st.session_state.proyectos)
+            presupuesto_total = resumen['presupuesto_total']
             st.markdown("""
             <div class="glass-card" style="text-align: center; padding: 2rem 1rem;">
                 <div style="font-size: 3rem; margin-bottom: 0.5rem;">💰</div>
@@ -56,7 +59,7 @@ def show():
     
     with col3:
         if num_proyectos > 0:
-            beneficiarios_total = sum(p.beneficiarios_totales for p in st.session_state.proyectos)
+            beneficiarios_total = resumen['beneficiarios_totales']
             st.markdown("""
             <div class="glass-card" style="text-align: center; padding: 2rem 1rem;">
                 <div style="font-size: 3rem; margin-bottom: 0.5rem;">👥</div>
@@ -18,7 +18,7 @@ if src_path not in sys.path:
 from models.proyecto import ProyectoSocial, AreaGeografica
 
 # Motor de scoring Arquitectura C
-from scoring.motor_arquitectura_c import calcular_score_proyecto
+from scoring.motor_arquitectura_c import MotorScoringArquitecturaC
 
 # Repositorio PDET
 from database.matriz_pdet_repository import MatrizPDETRepository
@@ -37,6 +37,12 @@ def get_pdet_repository():
     return MatrizPDETRepository()
 
 
+@st.cache_resource
+def get_motor():
+    """Obtiene instancia del motor de scoring (cached)"""
+    return MotorScoringArquitecturaC()
+
+
 @st.cache_resource
 def get_db():
     """Obtiene instancia del database manager (cached)"""
@@ -55,6 +61,7 @@ def limpiar_session_state():
         'criterios',
         'ultimo_resultado',
         'ultimo_proyecto',
+        'estado_scoring',
         'proyecto_guardado',
         'ultimo_id_guardado',
         # Campos del formulario
@@ -750,8 +757,11 @@ def seccion_revision_calculo(datos_basicos: Dict, criterios: Dict):
                 riesgo_regulatorio_impacto=criterios['riesgo_reg_imp']
             )
 
-            # Calcular score
-            resultado = calcular_score_proyecto(proyecto)
+            # Calcular score (solo criterios cuyos campos cambiaron)
+            resultado, st.session_state.estado_scoring = get_motor().calcular_score_incremental(
+                proyecto,
+                st.session_state.get('estado_scoring')
+            )
 
         # Guardar en session state
         st.session_state.ultimo_resultado = resultado
@@ -978,12 +988,9 @@ def mostrar_resultado(resultado, proyecto, datos_basicos):
 
                     # Verificar si el guardado fue exitoso
                     if guardado_exitoso:
-                        # Inicializar lista de proyectos si no existe
-                        if 'proyectos' not in st.session_state:
-                            st.session_state.proyectos = []
-
-                        # Agregar a session state si no está
-                        if proyecto_a_guardar not in st.session_state.proyectos:
+                        # Agregar a la cartera de la sesión solo si ya se cargó
+                        # (si no, se leerá de la BD cuando alguna página la pida)
+                        if 'proyectos' in st.session_state and proyecto_a_guardar not in st.session_state.proyectos:
                             st.session_state.proyectos.append(proyecto_a_guardar)
 
                         # Marcar como guardado para evitar duplicados
@@ -13,6 +13,13 @@ from scoring.motor_arquitectura_c import (
     MotorScoringArquitecturaC,
     calcular_score_proyecto
 )
+from scoring.cache_scores import get_cache_scores
+
+
+@st.cache_resource
+def get_motor():
+    """Obtiene instancia del motor de scoring con caché de resultados (cached)"""
+    return MotorScoringArquitecturaC(cache=get_cache_scores())
 
 
 def show():
@@ -93,7 +100,7 @@ def show():
 
         if st.button("🚀 Calcular Score - Proyecto Ideal", key="btn_ideal"):
             with st.spinner("Calculando score..."):
-                motor = MotorScoringArquitecturaC()
+                motor = get_motor()
                 resultado = motor.calcular_score(proyecto_ideal, detallado=True)
 
                 mostrar_resultado(resultado)
@@ -141,7 +148,7 @@ def show():
 
         if st.button("🚀 Calcular Score - Proyecto Promedio", key="btn_promedio"):
             with st.spinner("Calculando score..."):
-                motor = MotorScoringArquitecturaC()
+                motor = get_motor()
                 resultado = motor.calcular_score(proyecto_promedio, detallado=True)
 
                 mostrar_resultado(resultado)
@@ -192,7 +199,7 @@ def show():
 
         if st.button("🚀 Calcular Score - Proyecto Alto Riesgo", key="btn_riesgo"):
             with st.spinner("Calculando score..."):
-                motor = MotorScoringArquitecturaC()
+                motor = get_motor()
                 resultado = motor.calcular_score(proyecto_riesgo, detallado=True)
 
                 mostrar_resultado(resultado)
@@ -290,7 +297,7 @@ def show():
             )
 
             with st.spinner("Calculando score..."):
-                motor = MotorScoringArquitecturaC()
+                motor = get_motor()
                 resultado = motor.calcular_score(proyecto_custom, detallado=True)
 
                 mostrar_resultado(resultado)
@@ -4,6 +4,9 @@ Script de carga de matriz PDET/ZOMAC desde archivo Excel.
 Carga datos oficiales de priorización sectorial Obras por Impuestos
 para 362 municipios PDET/ZOMAC en Colombia.
 
+La carga es atómica (una transacción) y registra la versión de la matriz
+(hash de contenido); las versiones anteriores quedan como snapshots.
+
 Uso:
     python3 scripts/cargar_matriz_pdet.py
 """
@@ -73,7 +76,7 @@ def cargar_matriz_desde_excel(
     # Eliminar fila de headers duplicados si existe
     df = df[df['Departamento'] != 'Departamento']
 
-    # Convertir puntajes a enteros
+    # Convertir puntajes a enteros (valores vacíos → 0, rechazados al validar)
     columnas_puntajes = [
         'Educación', 'Salud', 'Alcantarillado', 'Vía', 'Energía',
         'Banda_Ancha', 'Riesgo_Amb', 'Infra_Rural', 'Cultura', 'Deporte'
@@ -82,35 +85,19 @@ def cargar_matriz_desde_excel(
     for col in columnas_puntajes:
         df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
 
+    # Eliminar filas sin datos
+    df = df.dropna(subset=['Departamento', 'Municipio'])
+
     # Limpiar nombres
     df['Departamento'] = df['Departamento'].str.upper().str.strip()
     df['Municipio'] = df['Municipio'].str.upper().str.strip()
 
-    # Eliminar filas sin datos
-    df = df.dropna(subset=['Departamento', 'Municipio'])
-
     print(f"   ✅ Datos limpios")
     print(f"   📊 Registros: {len(df)}")
     print(f"   🏛️  Departamentos únicos: {df['Departamento'].nunique()}")
     print(f"   🏘️  Municipios únicos: {df['Municipio'].nunique()}")
 
-    # 3. Verificar datos
-    print(f"\n🔍 Verificando calidad de datos...")
-
-    # Verificar rangos de puntajes
-    errores_rango = 0
-    for col in columnas_puntajes:
-        fuera_rango = df[(df[col] < 1) | (df[col] > 10)]
-        if len(fuera_rango) > 0:
-            errores_rango += len(fuera_rango)
-            print(f"   ⚠️  {len(fuera_rango)} valores fuera de rango 1-10 en {col}")
-
-    if errores_rango == 0:
-        print(f"   ✅ Todos los puntajes en rango 1-10")
-    else:
-        print(f"   ⚠️  Total errores de rango: {errores_rango}")
-
-    # 4. Conectar a base de datos
+    # 3. Conectar a base de datos
     print(f"\n💾 Conectando a base de datos...")
     try:
         repo = MatrizPDETRepository(db_path)
@@ -119,68 +106,39 @@ def cargar_matriz_desde_excel(
         print(f"   ❌ ERROR al conectar: {e}")
         return False
 
-    # 5. Limpiar tabla existente
-    print(f"\n🗑️  Limpiando datos anteriores...")
+    # 4. Validar y cargar en una sola transacción (reemplaza la matriz vigente)
+    print(f"\n📥 Validando y cargando datos...")
+    filas = df[['Departamento', 'Municipio'] + columnas_puntajes].itertuples(index=False, name=None)
     try:
-        repo.vaciar_tabla()
-        print(f"   ✅ Tabla limpiada")
-    except Exception as e:
-        print(f"   ⚠️  Error al limpiar: {e}")
-
-    # 6. Insertar datos
-    print(f"\n📥 Insertando datos...")
-    insertados = 0
-    errores = 0
-    duplicados = 0
-
-    conn = sqlite3.connect(db_path)
+        resultado = repo.cargar_matriz(filas, origen=str(excel_path))
+    except ValueError as e:
+        print(f"   ❌ ERROR de validación (no se modificó la base): {e}")
+        return False
+    except sqlite3.Error as e:
+        print(f"   ❌ ERROR al cargar (no se modificó la base): {e}")
+        return False
 
-    for idx, row in df.iterrows():
+    insertados = resultado.filas
+    if resultado.cambio:
+        print(f"\n✅ CARGA COMPLETADA")
+    else:
+        print(f"\n✅ La matriz ya estaba vigente (sin cambios)")
+    print(f"   🔖 Versión: {resultado.version}")
+    print(f"   ✔️  Registros: {insertados}")
+    if resultado.duplicados > 0:
+        print(f"   ⚠️  Duplicados ignorados: {resultado.duplicados}")
+    print(f"   🗂️  Versiones guardadas: {len(repo.get_versiones())}")
+    if resultado.version_anterior:
         try:
-            conn.execute("""
-                INSERT INTO matriz_pdet_zomac (
-                    departamento, municipio, educacion, salud, alcantarillado,
-                    via, energia, banda_ancha, riesgo_ambiental,
-                    infraestructura_rural, cultura, deporte
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                row['Departamento'],
-                row['Municipio'],
-                int(row['Educación']),
-                int(row['Salud']),
-                int(row['Alcantarillado']),
-                int(row['Vía']),
-                int(row['Energía']),
-                int(row['Banda_Ancha']),
-                int(row['Riesgo_Amb']),
-                int(row['Infra_Rural']),
-                int(row['Cultura']),
-                int(row['Deporte'])
-            ))
-            insertados += 1
-
-            # Mostrar progreso cada 50 registros
-            if insertados % 50 == 0:
-                print(f"   📌 Progreso: {insertados} registros...")
-
-        except sqlite3.IntegrityError:
-            # Municipio duplicado
-            duplicados += 1
-        except Exception as e:
-            errores += 1
-            print(f"   ⚠️  Error en {row['Municipio']}: {e}")
-
-    conn.commit()
-    conn.close()
-
-    print(f"\n✅ CARGA COMPLETADA")
-    print(f"   ✔️  Insertados: {insertados}")
-    if duplicados > 0:
-        print(f"   ⚠️  Duplicados ignorados: {duplicados}")
-    if errores > 0:
-        print(f"   ❌ Errores: {errores}")
-
-    # 7. Verificación final
+            diferencia = repo.comparar_versiones(resultado.version_anterior)
+        except ValueError:
+            diferencia = None  # La tabla anterior estaba vacía
+        if diferencia is not None:
+            print(f"   🔀 Cambios vs {resultado.version_anterior}: "
+                  f"{len(diferencia.cambios)} municipios modificados, "
+                  f"{len(diferencia.agregados)} agregados, {len(diferencia.eliminados)} eliminados")
+
+    # 5. Verificación final
     print(f"\n🔍 Verificación final...")
     total_db = repo.get_total_municipios()
     deptos_db = len(repo.get_departamentos())
@@ -188,13 +146,13 @@ def cargar_matriz_desde_excel(
     print(f"   📊 Registros en BD: {total_db}")
     print(f"   🏛️  Departamentos: {deptos_db}")
 
-    if total_db == insertados:
+    if total_db == insertados and repo.get_version() == resultado.version:
         print(f"   ✅ ÉXITO: Todos los registros verificados")
     else:
         print(f"   ⚠️  ADVERTENCIA: Discrepancia detectada")
         print(f"      Insertados: {insertados}, En BD: {total_db}")
 
-    # 8. Mostrar ejemplo
+    # 6. Mostrar ejemplo
     print(f"\n📝 Ejemplo de datos cargados:")
     print(f"   Buscando ABEJORRAL, Antioquia...")
 
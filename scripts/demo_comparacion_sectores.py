@@ -13,6 +13,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from models.proyecto import ProyectoSocial, AreaGeografica, EstadoProyecto
 from criterios.probabilidad_aprobacion_pdet import ProbabilidadAprobacionCriterio
+from database.matriz_pdet_repository import MatrizPDETRepository
+from database.matriz_sectores import columna_sector
 
 
 def crear_proyecto_base(sector: str) -> ProyectoSocial:
@@ -119,6 +121,26 @@ def main():
         if score_teorico == r['score']:
             print(f"    ✅ Coincide con score calculado: {r['score']:.1f}")
 
+    # Panorama nacional de los sectores comparados (una sola pasada sobre la matriz)
+    print("\n" + "=" * 100)
+    print("🗺️  PANORAMA SECTORIAL PDET/ZOMAC")
+    print("=" * 100)
+
+    repo = MatrizPDETRepository(db_path)
+    estadisticas = repo.get_estadisticas_sectores()
+    print(f"\n{'Sector':<20} {'Promedio':>10} {'Alta (≥7)':>12} {'Media':>8} {'Baja (≤3)':>12}")
+    print("-" * 70)
+    for sector, _, _ in proyectos:
+        e = estadisticas[columna_sector(sector)]
+        print(f"{sector:<20} {e['promedio']:>10.2f} {e['municipios_alta_prioridad']:>12} "
+              f"{e['municipios_media_prioridad']:>8} {e['municipios_baja_prioridad']:>12}")
+    print(f"\n   ({len(estadisticas)} sectores resumidos sobre {repo.get_total_municipios()} registros)")
+
+    pesos = {sector: 1.0 for sector, _, _ in proyectos}
+    print(f"\n🏆 Top 5 municipios para {', '.join(pesos)} (promedio ponderado):")
+    for departamento, municipio, puntaje in repo.get_top_municipios_sectores(pesos, n=5):
+        print(f"   {municipio:<30} {departamento:<20} {puntaje:>5.2f}/10")
+
     # Conclusiones
     print("\n" + "=" * 100)
     print("✅ CONCLUSIONES")
@@ -23,16 +23,23 @@ Historial:
 """
 from enum import Enum
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any, Tuple
 import sys
 from pathlib import Path
 
+import numpy as np
+
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from criterios.base import CriterioEvaluacion
 from models.proyecto import ProyectoSocial
 from database.matriz_pdet_repository import MatrizPDETRepository
+from models.matriz_pdet_zomac import RegistroMunicipioPDET
+
+
+# Registros precargados por clave (departamento, municipio) normalizada
+RegistrosMatriz = Dict[Tuple[str, str], RegistroMunicipioPDET]
 
 
 class NivelProbabilidad(Enum):
@@ -137,10 +144,18 @@ class ProbabilidadAprobacionCriterio(CriterioEvaluacion):
             print(f"   El criterio funcionará sin datos PDET (score neutro)")
             self.matriz_repo = None
 
-    def evaluar(self, proyecto: ProyectoSocial) -> float:
+    def evaluar(
+        self,
+        proyecto: ProyectoSocial,
+        registros: Optional[RegistrosMatriz] = None
+    ) -> float:
         """
         Evalúa probabilidad de aprobación usando metodología CONFIS.
 
+        Args:
+            proyecto: Proyecto a evaluar
+            registros: Municipios precargados (opcional, ver precargar_municipios)
+
         Returns:
             Score 0-100 basado en grupo + score CONFIS
         """
@@ -153,7 +168,7 @@ class ProbabilidadAprobacionCriterio(CriterioEvaluacion):
         score_grupo = GRUPOS_CONFIS.get(grupo, {"score": 25})["score"]
 
         score_territorial = self._obtener_score_territorial(proyecto)
-        score_sectorial = self._obtener_score_sectorial(proyecto)
+        score_sectorial = self._obtener_score_sectorial(proyecto, registros)
 
         # Score CONFIS combinado (rango 2-20 → normalizado 0-100)
         puntaje_confis = score_territorial + score_sectorial
@@ -171,6 +186,102 @@ class ProbabilidadAprobacionCriterio(CriterioEvaluacion):
 
         return min(max(score, 0), 100)
 
+    def extraer_componentes(
+        self,
+        proyecto: ProyectoSocial,
+        registros: Optional[RegistrosMatriz] = None
+    ) -> tuple:
+        """
+        Obtiene (score_grupo, score_territorial, score_sectorial) del proyecto.
+
+        Usado por el scoring por lotes: la resolución de grupo y de puntaje
+        sectorial es por proyecto, mientras que la combinación ponderada se
+        hace vectorizada en evaluar_vectorizado(). Con `registros`
+        (ver precargar_municipios) no consulta la matriz PDET.
+        Registra la misma metadata en el proyecto que evaluar().
+        """
+        grupo = self._determinar_grupo(proyecto)
+        score_grupo = GRUPOS_CONFIS.get(grupo, {"score": 25})["score"]
+
+        score_territorial = self._obtener_score_territorial(proyecto)
+        score_sectorial = self._obtener_score_sectorial(proyecto, registros)
+
+        proyecto.grupo_priorizacion_confis = grupo
+        proyecto.puntaje_confis_total = score_territorial + score_sectorial
+
+        return score_grupo, score_territorial, score_sectorial
+
+    def precargar_municipios(
+        self,
+        proyectos: Iterable[ProyectoSocial]
+    ) -> Optional[RegistrosMatriz]:
+        """
+        Resuelve en una sola consulta los municipios de toda una cartera.
+
+        Reúne los pares (departamento, municipio) candidatos de los
+        proyectos que todavía requieren puntaje sectorial y los busca con
+        MatrizPDETRepository.get_municipios_lote.
+
+        Returns:
+            Registros por clave normalizada, o None si no hay matriz
+            disponible (los métodos caen a la consulta por proyecto)
+        """
+        if self.matriz_repo is None or self.probabilidad_manual:
+            return None
+
+        pares = [
+            (departamento, municipio)
+            for proyecto in proyectos
+            if proyecto.puntaje_sectorial_max is None and proyecto.municipios and proyecto.sectores
+            for municipio in proyecto.municipios
+            for departamento in proyecto.departamentos
+        ]
+
+        try:
+            return self.matriz_repo.get_municipios_lote(pares)
+        except Exception as e:
+            print(f"⚠️  Advertencia: precarga de matriz PDET falló ({e}); se consultará por proyecto")
+            return None
+
+    def evaluar_lote(self, proyectos: List[ProyectoSocial]) -> List[float]:
+        """
+        Evalúa una cartera resolviendo la matriz PDET en una sola consulta.
+
+        Mismo resultado (y misma metadata en cada proyecto) que llamar
+        evaluar() proyecto por proyecto.
+        """
+        registros = self.precargar_municipios(proyectos)
+        return [self.evaluar(proyecto, registros) for proyecto in proyectos]
+
+    def evaluar_vectorizado(
+        self,
+        score_grupo: np.ndarray,
+        score_territorial: np.ndarray,
+        score_sectorial: np.ndarray
+    ) -> np.ndarray:
+        """
+        Combina componentes CONFIS de una cartera en una sola pasada.
+
+        Returns:
+            Arreglo de scores 0-100 (mismo cálculo que evaluar())
+        """
+        score_grupo = np.asarray(score_grupo, dtype=float)
+
+        if self.probabilidad_manual:
+            return np.full(score_grupo.shape, float(
+                self._probabilidad_a_score(self.probabilidad_manual)
+            ))
+
+        puntaje_confis = np.asarray(score_territorial, dtype=float) + np.asarray(score_sectorial, dtype=float)
+        score_confis_norm = (puntaje_confis / 20.0) * 100
+
+        score = (
+            score_grupo * self.PESO_GRUPO +
+            score_confis_norm * self.PESO_CONFIS
+        )
+
+        return np.minimum(np.maximum(score, 0), 100)
+
     def evaluar_detallado(self, proyecto: ProyectoSocial) -> ResultadoProbabilidadCONFIS:
         """
         Evaluación detallada con metadata completa.
@@ -351,13 +462,21 @@ class ProbabilidadAprobacionCriterio(CriterioEvaluacion):
         # Default neutro: 5.0 (punto medio de la escala)
         return 5.0
 
-    def _obtener_score_sectorial(self, proyecto: ProyectoSocial) -> float:
+    def _obtener_score_sectorial(
+        self,
+        proyecto: ProyectoSocial,
+        registros: Optional[RegistrosMatriz] = None
+    ) -> float:
         """
         Obtiene puntaje sectorial CONFIS (1-10).
 
         Usa la matriz PDET existente para obtener el puntaje de brecha
         del sector del proyecto en el municipio.
 
+        Args:
+            proyecto: Proyecto a evaluar
+            registros: Municipios precargados; si se dan, no se consulta la BD
+
         Returns:
             Puntaje sectorial 1-10 (5.0 si no disponible)
         """
@@ -376,12 +495,17 @@ class ProbabilidadAprobacionCriterio(CriterioEvaluacion):
 
         for municipio_nombre in proyecto.municipios:
             departamento = self._get_departamento_municipio(
-                municipio_nombre, proyecto.departamentos
+                municipio_nombre, proyecto.departamentos, registros
             )
             if not departamento:
                 continue
 
-            registro = self.matriz_repo.get_municipio(departamento, municipio_nombre)
+            if registros is not None:
+                registro = registros.get(
+                    MatrizPDETRepository.clave_normalizada(departamento, municipio_nombre)
+                )
+            else:
+                registro = self.matriz_repo.get_municipio(departamento, municipio_nombre)
             if not registro:
                 continue
 
@@ -405,18 +529,31 @@ class ProbabilidadAprobacionCriterio(CriterioEvaluacion):
     def _get_departamento_municipio(
         self,
         municipio: str,
-        departamentos: List[str]
+        departamentos: List[str],
+        registros: Optional[RegistrosMatriz] = None
     ) -> Optional[str]:
-        """Identifica departamento de un municipio."""
+        """
+        Identifica departamento de un municipio.
+
+        Con varios departamentos se usa el índice inverso del repositorio
+        (municipio → departamentos PDET/ZOMAC); si el municipio no es PDET
+        en ninguno se asume el primero del proyecto.
+        """
         if not departamentos:
             return None
 
         if len(departamentos) == 1:
             return departamentos[0]
 
-        for depto in departamentos:
-            if self.matriz_repo and self.matriz_repo.es_municipio_pdet(depto, municipio):
-                return depto
+        if registros is not None and not (self.matriz_repo and self.matriz_repo.indexado):
+            # Lote en modo SQL: resolver con los registros ya precargados
+            for depto in departamentos:
+                if MatrizPDETRepository.clave_normalizada(depto, municipio) in registros:
+                    return depto
+        elif self.matriz_repo:
+            ubicacion = self.matriz_repo.ubicar_municipio(municipio, departamentos)
+            if ubicacion is not None:
+                return ubicacion.departamento
 
         return departamentos[0]
 
@@ -18,6 +18,9 @@ Scoring permite identificar proyectos con perfil de riesgo favorable.
 
 from dataclasses import dataclass
 from typing import Dict, Any, List, Optional
+
+import numpy as np
+
 from src.models.proyecto import ProyectoSocial
 
 
@@ -94,9 +97,9 @@ class RiesgosCriterio:
         Raises:
             ValueError: Si faltan datos requeridos
         """
-        # Validar datos
-        validacion = proyecto.validar_riesgos()
-        if not validacion['valido']:
+        # Validar datos (los mensajes solo se construyen si hay error)
+        if not proyecto.riesgos_validos():
+            validacion = proyecto.validar_riesgos()
             raise ValueError(f"Datos riesgos inválidos: {validacion['mensaje']}")
 
         # Calcular componentes
@@ -309,6 +312,52 @@ class RiesgosCriterio:
         score = 100 - (nivel / 25 * 100)
         return max(min(score, 100), 0)
 
+    def nivel_a_score_inverso_vectorizado(self, niveles: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de _nivel_a_score_inverso.
+
+        Args:
+            niveles: Arreglo de niveles de riesgo (probabilidad × impacto)
+
+        Returns:
+            Arreglo de scores 0-100 (inverso: más riesgo = menos puntos)
+        """
+        niveles = np.asarray(niveles, dtype=float)
+        score = 100 - (niveles / 25 * 100)
+        return np.minimum(np.maximum(score, 0), 100)
+
+    def evaluar_vectorizado(
+        self,
+        probabilidades: np.ndarray,
+        impactos: np.ndarray
+    ) -> np.ndarray:
+        """
+        Evalúa riesgos de una cartera completa en una sola pasada.
+
+        Las columnas siguen el orden técnico, social, financiero y
+        regulatorio. Los datos deben estar previamente validados
+        (equivale a evaluar() sobre proyectos válidos).
+
+        Args:
+            probabilidades: Matriz n × 4 de probabilidades (1-5)
+            impactos: Matriz n × 4 de impactos (1-5)
+
+        Returns:
+            Arreglo de n scores 0-100 (inverso)
+        """
+        scores = self.nivel_a_score_inverso_vectorizado(
+            np.asarray(probabilidades) * np.asarray(impactos)
+        )
+        score_automaticos = 100.0  # Ver _calcular_factores_automaticos
+
+        return (
+            scores[:, 0] * self.PESO_TECNICO +
+            scores[:, 1] * self.PESO_SOCIAL +
+            scores[:, 2] * self.PESO_FINANCIERO +
+            scores[:, 3] * self.PESO_REGULATORIO +
+            score_automaticos * self.PESO_AUTOMATICOS
+        )
+
     def _calcular_riesgo_individual(self, probabilidad: Optional[int], impacto: Optional[int]) -> float:
         """Calcula score de un riesgo individual"""
         if probabilidad is None or impacto is None:
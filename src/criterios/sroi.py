@@ -24,6 +24,8 @@ import math
 import sys
 from pathlib import Path
 
+import numpy as np
+
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -196,6 +198,27 @@ class SROICriterio:
         # Aplicar techo y piso
         return min(max(score, 0.0), self.SCORE_TECHO)
 
+    def convertir_sroi_a_score_vectorizado(self, sroi: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de _convertir_sroi_a_score para una cartera.
+
+        Aplica exactamente la misma curva logarítmica, techo y gate de
+        rechazo (SROI < 1.0 → 0) elemento a elemento.
+
+        Args:
+            sroi: Arreglo de valores SROI
+
+        Returns:
+            Arreglo de scores 0-100
+        """
+        sroi = np.asarray(sroi, dtype=float)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = self.SCORE_BASE + self.SCORE_RANGO * np.log(sroi) / self.LOG_REFERENCIA
+
+        score = np.minimum(np.maximum(score, 0.0), self.SCORE_TECHO)
+        return np.where(sroi < 1.0, 0.0, score)
+
     def get_nivel_prioridad(self, score: float) -> str:
         """
         Determina nivel de prioridad basado en score SROI.
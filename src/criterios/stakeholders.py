@@ -21,6 +21,9 @@ Ajuste metodológico (Feb 2026):
 
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
+
+import numpy as np
+
 from src.models.proyecto import ProyectoSocial
 
 
@@ -138,9 +141,9 @@ class StakeholdersCriterio:
         Raises:
             ValueError: Si faltan datos requeridos
         """
-        # Validar datos
-        validacion = proyecto.validar_stakeholders()
-        if not validacion['valido']:
+        # Validar datos (los mensajes solo se construyen si hay error)
+        if not proyecto.stakeholders_validos():
+            validacion = proyecto.validar_stakeholders()
             raise ValueError(f"Datos stakeholders inválidos: {validacion['mensaje']}")
 
         # Calcular componentes
@@ -342,6 +345,71 @@ class StakeholdersCriterio:
 
         return min(score, 100)
 
+    def evaluar_vectorizado(
+        self,
+        pertinencia: np.ndarray,
+        relacionamiento: np.ndarray,
+        puntaje_territorial: np.ndarray,
+        num_municipios: np.ndarray,
+        tiene_pdet: np.ndarray,
+        num_departamentos: np.ndarray,
+        en_corredor: np.ndarray,
+        puntaje_stakeholders: np.ndarray
+    ) -> np.ndarray:
+        """
+        Evalúa stakeholders de una cartera completa en una sola pasada.
+
+        Replica evaluar() componente a componente sobre arreglos. Los datos
+        deben estar previamente validados (escalas 1-5).
+
+        Args:
+            pertinencia: Escala de pertinencia operacional (1-5)
+            relacionamiento: Escala de mejora del relacionamiento (1-5)
+            puntaje_territorial: Puntaje territorial CONFIS ya acotado 1-10
+            num_municipios: Número de municipios (1 si no hay)
+            tiene_pdet: Indicador de municipios PDET
+            num_departamentos: Número de departamentos (1 si no hay)
+            en_corredor: Indicador de corredor de transmisión
+            puntaje_stakeholders: Suma de PUNTAJES_STAKEHOLDERS, o -1 si
+                no se especificaron stakeholders
+
+        Returns:
+            Arreglo de scores 0-100
+        """
+        tabla_pertinencia = np.array(
+            [50.0] + [float(ESCALA_PERTINENCIA[i]) for i in range(1, 6)]
+        )
+        tabla_relacionamiento = np.array(
+            [50.0] + [float(ESCALA_RELACIONAMIENTO[i]) for i in range(1, 6)]
+        )
+        score_pertinencia = tabla_pertinencia[np.asarray(pertinencia, dtype=int)]
+        score_relacionamiento = tabla_relacionamiento[np.asarray(relacionamiento, dtype=int)]
+
+        # Alcance territorial (mismo orden de sumas que _calcular_alcance_territorial)
+        score_alcance = (
+            np.asarray(puntaje_territorial, dtype=float) * 3 +
+            np.minimum(np.asarray(num_municipios) * 10, 30) +
+            np.where(tiene_pdet, 15, 0) +
+            np.where(np.asarray(num_departamentos) > 1, 15, 0) +
+            np.where(en_corredor, 10, 0)
+        )
+        score_alcance = np.minimum(score_alcance, 100)
+
+        # Stakeholders involucrados
+        puntaje_stakeholders = np.asarray(puntaje_stakeholders, dtype=float)
+        score_tipo = np.where(
+            puntaje_stakeholders < 0,
+            50.0,
+            np.minimum((puntaje_stakeholders / PUNTAJE_MAXIMO_STAKEHOLDERS) * 100, 100)
+        )
+
+        return (
+            score_pertinencia * self.PESO_PERTINENCIA +
+            score_relacionamiento * self.PESO_RELACIONAMIENTO +
+            score_alcance * self.PESO_ALCANCE +
+            score_tipo * self.PESO_STAKEHOLDERS_TIPO
+        )
+
     def _determinar_nivel(self, score: float) -> str:
         """Determina nivel de prioridad basado en score"""
         if score >= 85:
@@ -1,4 +1,12 @@
 """Módulo de gestión de base de datos."""
-from database.db_manager import DatabaseManager, get_db_manager
+from database.db_manager import (
+    DatabaseManager, get_db_manager, ResultadoLote, ErrorFilaLote, ResultadoBusquedaTexto,
+    ResumenProyecto, PaginaProyectos, GrupoEstadistico, MetricaProyecto
+)
+from database.conexiones import GestorConexionesSQLite, get_gestor_conexiones, cerrar_conexiones
 
-__all__ = ['DatabaseManager', 'get_db_manager']
+__all__ = [
+    'DatabaseManager', 'get_db_manager', 'ResultadoLote', 'ErrorFilaLote', 'ResultadoBusquedaTexto',
+    'ResumenProyecto', 'PaginaProyectos', 'GrupoEstadistico', 'MetricaProyecto',
+    'GestorConexionesSQLite', 'get_gestor_conexiones', 'cerrar_conexiones'
+]
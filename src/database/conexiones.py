@@ -0,0 +1,161 @@
+"""
+Gestión de conexiones SQLite compartidas.
+
+Un GestorConexionesSQLite mantiene una conexión por hilo hacia un archivo
+SQLite, configurada en modo WAL y con caché de sentencias preparadas, de
+modo que las consultas repetidas no pagan ni la apertura de la conexión ni
+la compilación del SQL. Los repositorios que apuntan al mismo archivo
+(MatrizPDETRepository, DatabaseManager, HistorialIA) comparten el gestor a
+través de get_gestor_conexiones().
+"""
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterator, Set
+
+
+# Sentencias preparadas que conserva cada conexión (sqlite3 usa 128 por defecto)
+SENTENCIAS_EN_CACHE = 256
+
+# Espera máxima (segundos) ante un bloqueo de escritura de otro proceso
+TIEMPO_ESPERA_BLOQUEO = 30.0
+
+
+class _ConexionHilo:
+    """Conexión guardada en el threading.local de un hilo."""
+    __slots__ = ('conexion', 'generacion', '__weakref__')
+
+    def __init__(self, conexion: sqlite3.Connection, generacion: int):
+        self.conexion = conexion
+        self.generacion = generacion
+
+
+class GestorConexionesSQLite:
+    """
+    Una conexión por hilo hacia un archivo SQLite.
+
+    Las conexiones se crean al primer uso en cada hilo y se reutilizan en
+    las llamadas siguientes. Cuando el hilo termina, su threading.local se
+    libera y la conexión se cierra (Streamlit ejecuta cada rerun en un hilo
+    nuevo, así que no se acumulan). close() cierra las de todos los hilos;
+    la siguiente llamada a conexion() vuelve a abrir una nueva.
+    """
+
+    def __init__(self, db_path: str, wal: bool = True):
+        """
+        Args:
+            db_path: Ruta al archivo SQLite
+            wal: Si True, activa journal_mode=WAL (lectores no bloquean escritores)
+        """
+        self.db_path = str(db_path)
+        self.wal = wal
+        self._local = threading.local()
+        # Reentrante: un finalizador puede ejecutarse mientras el hilo lo tiene
+        self._lock = threading.RLock()
+        self._conexiones: Set[sqlite3.Connection] = set()
+        self._generacion = 0
+
+    @property
+    def conexiones_abiertas(self) -> int:
+        """Conexiones abiertas (una por hilo vivo que usó el gestor)."""
+        return len(self._conexiones)
+
+    def conexion(self) -> sqlite3.Connection:
+        """Conexión del hilo actual (la crea si no existe)."""
+        titular = getattr(self._local, 'titular', None)
+        if titular is not None and titular.generacion == self._generacion:
+            return titular.conexion
+
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=TIEMPO_ESPERA_BLOQUEO,
+            cached_statements=SENTENCIAS_EN_CACHE,
+            check_same_thread=False  # close() puede llamarse desde otro hilo
+        )
+        conn.row_factory = sqlite3.Row
+        if self.wal:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+
+        with self._lock:
+            self._conexiones.add(conn)
+            generacion = self._generacion
+        titular = _ConexionHilo(conn, generacion)
+        # Al liberarse el titular (fin del hilo o reemplazo) se cierra la conexión
+        weakref.finalize(titular, self._liberar, conn)
+        self._local.titular = titular
+        return conn
+
+    def _liberar(self, conn: sqlite3.Connection):
+        """Cierra una conexión y la quita del registro."""
+        with self._lock:
+            self._conexiones.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.ProgrammingError:
+            pass
+
+    @contextmanager
+    def transaccion(self) -> Iterator[sqlite3.Connection]:
+        """
+        Conexión del hilo dentro de una transacción.
+
+        Hace commit al salir sin errores y rollback si hay una excepción.
+        """
+        conn = self.conexion()
+        with conn:
+            yield conn
+
+    def close(self):
+        """Cierra las conexiones de todos los hilos."""
+        with self._lock:
+            for conn in self._conexiones:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass
+            self._conexiones = set()
+            # Las conexiones guardadas en otros hilos quedan obsoletas
+            self._generacion += 1
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"GestorConexionesSQLite(db_path='{self.db_path}', conexiones={len(self._conexiones)})"
+
+
+# Un gestor por archivo, compartido por los repositorios de la aplicación
+_gestores: Dict[str, GestorConexionesSQLite] = {}
+_gestores_lock = threading.Lock()
+
+
+def get_gestor_conexiones(db_path: str) -> GestorConexionesSQLite:
+    """
+    Obtiene el gestor compartido de un archivo SQLite.
+
+    Args:
+        db_path: Ruta al archivo (se normaliza a ruta absoluta)
+
+    Returns:
+        GestorConexionesSQLite único por archivo
+    """
+    clave = os.path.abspath(str(db_path))
+    with _gestores_lock:
+        gestor = _gestores.get(clave)
+        if gestor is None:
+            gestor = _gestores[clave] = GestorConexionesSQLite(clave)
+        return gestor
+
+
+def cerrar_conexiones():
+    """Cierra todas las conexiones de todos los gestores compartidos."""
+    with _gestores_lock:
+        for gestor in _gestores.values():
+            gestor.close()
@@ -4,8 +4,10 @@ Maneja la persistencia de proyectos usando SQLite.
 """
 import sqlite3
 import json
+import re
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Callable, Iterable, Iterator, List, Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime
 import sys
 
@@ -14,7 +16,463 @@ src_path = str(Path(__file__).parent.parent)
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
-from models.proyecto import ProyectoSocial, AreaGeografica, EstadoProyecto
+from models.proyecto import ProyectoSocial, AreaGeografica, EstadoProyecto, ESCALA_1_A_5
+from models.busqueda_municipios import normalizar_nombre
+from database.conexiones import GestorConexionesSQLite, get_gestor_conexiones
+
+
+# Columnas agregadas por Arquitectura C (mismas que scripts/migrar_bd_arquitectura_c.py)
+COLUMNAS_ARQUITECTURA_C = (
+    # Campos PDET/Probabilidad
+    ("sectores", "TEXT DEFAULT '[]'"),
+    ("puntajes_pdet", "TEXT DEFAULT '{}'"),
+    ("tiene_municipios_pdet", "INTEGER DEFAULT 0"),
+    ("puntaje_sectorial_max", "INTEGER DEFAULT 0"),
+    # Campos SROI adicionales
+    ("observaciones_sroi", "TEXT DEFAULT ''"),
+    ("nivel_confianza_sroi", "TEXT DEFAULT ''"),
+    ("fecha_calculo_sroi", "TEXT DEFAULT ''"),
+    ("metodologia_sroi", "TEXT DEFAULT ''"),
+    # Campos Stakeholders
+    ("pertinencia_operacional", "INTEGER DEFAULT 3"),
+    ("mejora_relacionamiento", "INTEGER DEFAULT 3"),
+    ("stakeholders_involucrados", "TEXT DEFAULT '[]'"),
+    ("en_corredor_transmision", "INTEGER DEFAULT 0"),
+    ("observaciones_stakeholders", "TEXT DEFAULT ''"),
+    # Campos Riesgos (4 tipos × 2 dimensiones)
+    ("riesgo_tecnico_probabilidad", "INTEGER DEFAULT 2"),
+    ("riesgo_tecnico_impacto", "INTEGER DEFAULT 2"),
+    ("riesgo_social_probabilidad", "INTEGER DEFAULT 2"),
+    ("riesgo_social_impacto", "INTEGER DEFAULT 2"),
+    ("riesgo_financiero_probabilidad", "INTEGER DEFAULT 2"),
+    ("riesgo_financiero_impacto", "INTEGER DEFAULT 3"),
+    ("riesgo_regulatorio_probabilidad", "INTEGER DEFAULT 2"),
+    ("riesgo_regulatorio_impacto", "INTEGER DEFAULT 2"),
+    # Campo adicional de duración
+    ("duracion_estimada_meses", "INTEGER DEFAULT 12"),
+)
+
+# Columnas de proyectos en el orden del INSERT (claves de _proyecto_to_dict)
+COLUMNAS_PROYECTO = (
+    'id', 'nombre', 'organizacion', 'descripcion',
+    'beneficiarios_directos', 'beneficiarios_indirectos',
+    'duracion_meses', 'presupuesto_total', 'ods_vinculados',
+    'area_geografica', 'poblacion_objetivo', 'departamentos',
+    'municipios', 'estado', 'indicadores_impacto',
+    'fecha_creacion', 'fecha_modificacion',
+) + tuple(columna for columna, _ in COLUMNAS_ARQUITECTURA_C)
+
+SQL_INSERTAR_PROYECTO = f"""
+    INSERT INTO proyectos ({', '.join(COLUMNAS_PROYECTO)})
+    VALUES ({', '.join('?' * len(COLUMNAS_PROYECTO))})
+"""
+
+# Upsert: en conflicto se actualiza todo salvo el ID y la fecha de creación
+SQL_UPSERT_PROYECTO = SQL_INSERTAR_PROYECTO + """
+    ON CONFLICT(id) DO UPDATE SET
+""" + ',\n'.join(
+    f"        {columna} = excluded.{columna}"
+    for columna in COLUMNAS_PROYECTO if columna not in ('id', 'fecha_creacion')
+)
+
+# IDs por consulta al buscar proyectos existentes de un lote
+TAMANO_BLOQUE_IDS = 500
+
+
+
+# ========== TABLAS DE RELACIÓN ==========
+
+def normalizar_ods(ods: str) -> str:
+    """
+    Clave de un ODS para comparación exacta.
+
+    'ODS 6', 'ods6' y 'ODS 6: Agua limpia' → 'ODS 6' (así 'ODS 1' no
+    coincide con 'ODS 11'); otros textos se normalizan como nombres.
+    """
+    texto = normalizar_nombre(str(ods))
+    coincidencia = re.match(r'ODS\s*(\d+)\b', texto)
+    return f"ODS {int(coincidencia.group(1))}" if coincidencia else texto
+
+
+# Tabla de relación → (campo de ProyectoSocial, columna, normalizador).
+# Cada tabla tiene (proyecto_id, <columna>, <columna>_norm) y un índice
+# por (<columna>_norm, proyecto_id) para los filtros de buscar_proyectos.
+RELACIONES_PROYECTO = {
+    'proyecto_departamento': ('departamentos', 'departamento', normalizar_nombre),
+    'proyecto_municipio': ('municipios', 'municipio', normalizar_nombre),
+    'proyecto_ods': ('ods_vinculados', 'ods', normalizar_ods),
+    'proyecto_sector': ('sectores', 'sector', normalizar_nombre),
+}
+
+
+def filas_relaciones(proyecto: ProyectoSocial) -> Dict[str, List[Tuple[str, str, str]]]:
+    """
+    Filas (proyecto_id, valor, valor_norm) de cada tabla de relación.
+
+    Los valores repetidos tras normalizar se guardan una sola vez.
+    """
+    resultado = {}
+    for tabla, (campo, _, normalizar) in RELACIONES_PROYECTO.items():
+        filas = {}
+        for valor in getattr(proyecto, campo, None) or []:
+            clave = normalizar(valor)
+            if clave:
+                filas.setdefault(clave, (proyecto.id, str(valor), clave))
+        resultado[tabla] = list(filas.values())
+    return resultado
+
+
+
+
+# ========== BÚSQUEDA DE TEXTO ==========
+
+# Columnas indexadas en proyectos_fts y su peso en BM25 (mismo orden)
+COLUMNAS_TEXTO = ('nombre', 'organizacion', 'descripcion', 'poblacion_objetivo')
+PESOS_BM25 = (10.0, 5.0, 2.0, 1.0)
+
+# unicode61 con remove_diacritics 2 ignora mayúsculas y tildes igual que
+# normalizar_texto / normalizar_nombre ('Educación' = 'EDUCACION')
+TOKENIZADOR_FTS = "unicode61 remove_diacritics 2"
+
+
+def terminos_busqueda(texto: str) -> List[str]:
+    """
+    Palabras normalizadas de una consulta de texto libre.
+
+    Descarta la puntuación, de modo que la entrada del usuario nunca
+    llega como sintaxis de FTS5 o tsquery.
+    """
+    return re.findall(r'\w+', normalizar_nombre(texto or ""))
+
+
+def consulta_fts(texto: str) -> Optional[str]:
+    """Consulta FTS5: todas las palabras, cada una como prefijo ('agua' → "AGUA"*)"""
+    terminos = terminos_busqueda(texto)
+    return " ".join(f'"{termino}"*' for termino in terminos) if terminos else None
+
+
+@dataclass
+class ResultadoBusquedaTexto:
+    """
+    Coincidencia de DatabaseManager.buscar_texto.
+
+    Atributos:
+        puntaje: Relevancia (mayor = más relevante)
+        fragmento: Extracto de la columna con mejor coincidencia, con los
+            términos encontrados entre las marcas pedidas
+    """
+    proyecto_id: str
+    nombre: str
+    organizacion: str
+    puntaje: float
+    fragmento: str
+
+
+
+
+# ========== LISTADO PAGINADO ==========
+
+# Columnas de ResumenProyecto (sin indicadores ni campos de Arquitectura C)
+COLUMNAS_RESUMEN = (
+    'id', 'nombre', 'organizacion', 'presupuesto_total',
+    'beneficiarios_directos', 'beneficiarios_indirectos', 'duracion_meses',
+    'area_geografica', 'estado', 'departamentos', 'ods_vinculados',
+    'fecha_modificacion',
+)
+
+# Caracteres de descripción incluidos en el resumen
+LARGO_DESCRIPCION_RESUMEN = 200
+
+
+@dataclass
+class ResumenProyecto:
+    """
+    Proyección liviana de un proyecto para listados.
+
+    Se arma directo de la fila, sin pasar por ProyectoSocial; el
+    proyecto completo se carga con obtener_proyecto cuando se necesita.
+    """
+    id: str
+    nombre: str
+    organizacion: str
+    presupuesto_total: float
+    beneficiarios_totales: int
+    duracion_meses: int
+    area_geografica: str
+    estado: str
+    departamentos: List[str]
+    ods_vinculados: List[str]
+    descripcion: str
+    fecha_modificacion: Any
+
+    @property
+    def presupuesto_por_beneficiario(self) -> float:
+        return self.presupuesto_total / self.beneficiarios_totales if self.beneficiarios_totales else 0.0
+
+    @property
+    def duracion_años(self) -> float:
+        return self.duracion_meses / 12
+
+    @classmethod
+    def desde_fila(cls, fila: Dict[str, Any]) -> 'ResumenProyecto':
+        """Construye el resumen desde una fila con COLUMNAS_RESUMEN y descripcion"""
+        return cls(
+            id=fila['id'],
+            nombre=fila['nombre'],
+            organizacion=fila['organizacion'],
+            presupuesto_total=float(fila['presupuesto_total']),
+            beneficiarios_totales=fila['beneficiarios_directos'] + fila['beneficiarios_indirectos'],
+            duracion_meses=fila['duracion_meses'],
+            area_geografica=fila['area_geografica'],
+            estado=fila['estado'],
+            departamentos=json.loads(fila['departamentos']),
+            ods_vinculados=json.loads(fila['ods_vinculados']),
+            descripcion=fila['descripcion'],
+            fecha_modificacion=fila['fecha_modificacion']
+        )
+
+
+@dataclass
+class PaginaProyectos:
+    """
+    Página de listar_proyectos en el orden pedido.
+
+    Atributos:
+        cursor_siguiente: (valor de la clave de orden, id) del último
+            resumen, para pedir la página siguiente; None si no hay más
+    """
+    resumenes: List[ResumenProyecto]
+    cursor_siguiente: Optional[Tuple[Any, str]] = None
+
+    @property
+    def hay_mas(self) -> bool:
+        return self.cursor_siguiente is not None
+
+
+# Órdenes de listar_proyectos: expresión de la clave (el ID desempata).
+# Cada una tiene un índice (clave, id) para paginar sin OFFSET.
+ORDENES_LISTADO = {
+    'modificacion': "fecha_modificacion",
+    'nombre': "nombre",
+    'presupuesto': "presupuesto_total",
+    'beneficiarios': "(beneficiarios_directos + beneficiarios_indirectos)",
+}
+
+
+def orden_listado(orden: str, descendente: bool) -> Tuple[str, str, str]:
+    """
+    Expresión de la clave, comparador del cursor y dirección de un orden.
+
+    Raises:
+        ValueError: Si el orden no está en ORDENES_LISTADO
+    """
+    if orden not in ORDENES_LISTADO:
+        raise ValueError(f"Orden '{orden}' no válido. Opciones: {', '.join(ORDENES_LISTADO)}")
+    return ORDENES_LISTADO[orden], ('<' if descendente else '>'), ('DESC' if descendente else 'ASC')
+
+
+# ========== AGREGACIONES ==========
+
+# Nivel de prioridad de los proyectos sin score guardado en proyecto_scores
+NIVEL_SIN_EVALUAR = 'SIN EVALUAR'
+
+# Dimensión → (FROM, expresión de la etiqueta, expresión de agrupación).
+# SQL común a SQLite y PostgreSQL; los proyectos se referencian como p.
+DIMENSIONES_ESTADISTICAS = {
+    'departamento': (
+        "proyecto_departamento r JOIN proyectos p ON p.id = r.proyecto_id",
+        "MIN(r.departamento)", "r.departamento_norm"
+    ),
+    'ods': ("proyecto_ods r JOIN proyectos p ON p.id = r.proyecto_id", "MIN(r.ods)", "r.ods_norm"),
+    'sector': ("proyecto_sector r JOIN proyectos p ON p.id = r.proyecto_id", "MIN(r.sector)", "r.sector_norm"),
+    'area_geografica': ("proyectos p", "p.area_geografica", "p.area_geografica"),
+    'estado': ("proyectos p", "p.estado", "p.estado"),
+    'nivel_prioridad': (
+        "proyectos p LEFT JOIN proyecto_scores s ON s.proyecto_id = p.id",
+        f"COALESCE(s.nivel_prioridad, '{NIVEL_SIN_EVALUAR}')",
+        f"COALESCE(s.nivel_prioridad, '{NIVEL_SIN_EVALUAR}')"
+    ),
+}
+
+# SROI declarado en indicadores_impacto (NULL si falta)
+SQL_SROI = "CAST(json_extract(indicadores_impacto, '$.sroi') AS REAL)"
+
+# Métrica por proyecto → expresión SQL (sroi se sustituye según el motor)
+METRICAS_PROYECTO = {
+    'presupuesto_total': "p.presupuesto_total",
+    'beneficiarios_totales': "p.beneficiarios_directos + p.beneficiarios_indirectos",
+    'costo_por_beneficiario': (
+        "p.presupuesto_total / NULLIF(p.beneficiarios_directos + p.beneficiarios_indirectos, 0)"
+    ),
+    'duracion_meses': "p.duracion_meses",
+    'sroi': "{sroi}",
+}
+
+
+@dataclass
+class GrupoEstadistico:
+    """Totales de los proyectos que comparten un valor de una dimensión"""
+    valor: str
+    proyectos: int
+    presupuesto_total: float
+    beneficiarios_totales: int
+
+    @property
+    def costo_por_beneficiario(self) -> float:
+        return self.presupuesto_total / self.beneficiarios_totales if self.beneficiarios_totales else 0.0
+
+
+@dataclass
+class MetricaProyecto:
+    """Valor de una métrica para un proyecto (ranking de metricas_proyectos)"""
+    proyecto_id: str
+    nombre: str
+    valor: float
+
+
+def hay_filtros(filtros: Dict[str, Any]) -> bool:
+    """True si algún filtro de buscar_proyectos restringe el resultado"""
+    return any(
+        valor not in (None, '', [], ()) for clave, valor in filtros.items() if clave != 'todos_los_ods'
+    )
+
+
+def filas_scores(scores: Iterable[Tuple[str, float, str]], fecha: Any) -> List[Tuple[str, float, str, Any]]:
+    """
+    Filas (proyecto_id, score_total, nivel_prioridad, fecha) para guardar_scores.
+
+    Un ID repetido se guarda una sola vez con su último score: PostgreSQL no
+    permite que un ON CONFLICT DO UPDATE toque la misma fila dos veces en
+    una sentencia, y así ambos gestores devuelven el mismo conteo.
+    """
+    filas = {proyecto_id: (proyecto_id, float(score), str(nivel), fecha) for proyecto_id, score, nivel in scores}
+    return list(filas.values())
+
+
+# Tablas cuyos índices secundarios se pueden reconstruir al final de un lote
+TABLAS_INDICES_LOTE = ('proyectos', 'historial_cambios') + tuple(RELACIONES_PROYECTO)
+
+
+# ========== CARGA POR LOTES ==========
+
+@dataclass
+class ErrorFilaLote:
+    """Fila de un lote que no se guardó"""
+    indice: int  # Posición en el lote (desde 0)
+    proyecto_id: Optional[str]
+    mensaje: str
+
+
+@dataclass
+class ResultadoLote:
+    """
+    Resultado de crear_proyectos_lote / upsert_proyectos_lote.
+
+    Atributos:
+        insertados / actualizados: IDs guardados, en el orden del lote
+        existentes: IDs omitidos por existir ya (solo crear_proyectos_lote)
+        errores: Filas rechazadas por validación
+    """
+    insertados: List[str] = field(default_factory=list)
+    actualizados: List[str] = field(default_factory=list)
+    existentes: List[str] = field(default_factory=list)
+    errores: List[ErrorFilaLote] = field(default_factory=list)
+
+    @property
+    def total_guardados(self) -> int:
+        return len(self.insertados) + len(self.actualizados)
+
+    @property
+    def exitoso(self) -> bool:
+        """True si no hubo filas rechazadas"""
+        return not self.errores
+
+
+def validar_proyecto(proyecto: Any) -> List[str]:
+    """
+    Valida un proyecto antes de guardarlo en un lote.
+
+    Revisa lo que el esquema exige (campos obligatorios, tipos de enums,
+    rangos) sin lanzar excepciones, para reportar todas las filas malas.
+
+    Returns:
+        Lista de mensajes de error (vacía si es válido)
+    """
+    if not isinstance(proyecto, ProyectoSocial):
+        return [f"Se esperaba ProyectoSocial, recibido {type(proyecto).__name__}"]
+
+    errores = []
+    for campo in ('id', 'nombre', 'organizacion', 'descripcion', 'poblacion_objetivo'):
+        valor = getattr(proyecto, campo)
+        if not isinstance(valor, str) or not valor.strip():
+            errores.append(f"{campo} es obligatorio")
+
+    for campo in ('beneficiarios_directos', 'beneficiarios_indirectos'):
+        valor = getattr(proyecto, campo)
+        if not isinstance(valor, int) or isinstance(valor, bool) or valor < 0:
+            errores.append(f"{campo} debe ser un entero >= 0")
+    if not isinstance(proyecto.duracion_meses, int) or proyecto.duracion_meses <= 0:
+        errores.append("duracion_meses debe ser un entero > 0")
+    if not isinstance(proyecto.presupuesto_total, (int, float)) or proyecto.presupuesto_total <= 0:
+        errores.append("presupuesto_total debe ser mayor a 0")
+
+    if not isinstance(proyecto.area_geografica, AreaGeografica):
+        errores.append(f"area_geografica inválida: {proyecto.area_geografica!r}")
+    if not isinstance(proyecto.estado, EstadoProyecto):
+        errores.append(f"estado inválido: {proyecto.estado!r}")
+
+    for campo in ('ods_vinculados', 'departamentos', 'municipios', 'sectores'):
+        if not isinstance(getattr(proyecto, campo), list):
+            errores.append(f"{campo} debe ser una lista")
+    if not isinstance(proyecto.indicadores_impacto, dict):
+        errores.append("indicadores_impacto debe ser un diccionario")
+
+    for campo in (
+        'pertinencia_operacional', 'mejora_relacionamiento',
+        'riesgo_tecnico_probabilidad', 'riesgo_tecnico_impacto',
+        'riesgo_social_probabilidad', 'riesgo_social_impacto',
+        'riesgo_financiero_probabilidad', 'riesgo_financiero_impacto',
+        'riesgo_regulatorio_probabilidad', 'riesgo_regulatorio_impacto',
+    ):
+        valor = getattr(proyecto, campo)
+        if valor is not None and valor not in ESCALA_1_A_5:
+            errores.append(f"{campo} debe estar entre 1 y 5")
+
+    return errores
+
+
+def preparar_lote(
+    proyectos: Iterable[ProyectoSocial],
+    resultado: ResultadoLote,
+    serializar: Callable[[ProyectoSocial], Any]
+) -> List[Tuple[ProyectoSocial, Any]]:
+    """
+    Valida y serializa las filas de un lote; registra los errores en `resultado`.
+
+    Común a DatabaseManager y PostgreSQLManager: rechaza filas inválidas,
+    IDs repetidos en el lote y filas que `serializar` no puede convertir.
+
+    Returns:
+        (proyecto, serializar(proyecto)) de las filas válidas, en orden
+    """
+    validos = []
+    vistos = set()
+    for indice, proyecto in enumerate(proyectos):
+        proyecto_id = getattr(proyecto, 'id', None)
+        errores = validar_proyecto(proyecto)
+        if not errores and proyecto_id in vistos:
+            errores = ["ID repetido en el lote"]
+        if not errores:
+            try:
+                serializado = serializar(proyecto)
+            except (TypeError, ValueError, AttributeError) as e:
+                errores = [f"No se pudo serializar: {e}"]
+        if errores:
+            resultado.errores.append(ErrorFilaLote(indice, proyecto_id, "; ".join(errores)))
+            continue
+        vistos.add(proyecto_id)
+        validos.append((proyecto, serializado))
+    return validos
 
 
 class DatabaseManager:
@@ -32,15 +490,13 @@ class DatabaseManager:
         db_file.parent.mkdir(parents=True, exist_ok=True)
 
         self.db_path = db_path
-        self.connection = None
+        # Conexiones compartidas con los demás repositorios del mismo archivo
+        self.conexiones: GestorConexionesSQLite = get_gestor_conexiones(db_path)
         self._initialize_database()
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Obtiene una conexión a la base de datos."""
-        if self.connection is None:
-            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.connection.row_factory = sqlite3.Row  # Para acceder por nombre de columna
-        return self.connection
+        """Obtiene la conexión del hilo actual (sqlite3.Row, modo WAL)."""
+        return self.conexiones.conexion()
 
     def _initialize_database(self):
         """Crea las tablas necesarias si no existen."""
@@ -83,8 +539,113 @@ class DatabaseManager:
             )
         """)
 
+        # Migración: bases creadas antes de las columnas de Arquitectura C
+        existentes = {fila[1] for fila in cursor.execute("PRAGMA table_info(proyectos)")}
+        for columna, tipo in COLUMNAS_ARQUITECTURA_C:
+            if columna not in existentes:
+                cursor.execute(f"ALTER TABLE proyectos ADD COLUMN {columna} {tipo}")
+
+        # Tablas de relación (departamentos, municipios, ODS, sectores)
+        tablas = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for tabla, (_, columna, _) in RELACIONES_PROYECTO.items():
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {tabla} (
+                    proyecto_id TEXT NOT NULL,
+                    {columna} TEXT NOT NULL,
+                    {columna}_norm TEXT NOT NULL,
+                    PRIMARY KEY (proyecto_id, {columna}_norm)
+                )
+            """)
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{tabla}_{columna}
+                ON {tabla}({columna}_norm, proyecto_id)
+            """)
+
+        # Último score calculado por proyecto (agregación por nivel de prioridad)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS proyecto_scores (
+                proyecto_id TEXT PRIMARY KEY,
+                score_total REAL NOT NULL,
+                nivel_prioridad TEXT NOT NULL,
+                fecha TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_proyecto_scores_nivel
+            ON proyecto_scores(nivel_prioridad)
+        """)
+
+        # Listado paginado por (clave de orden, id)
+        for nombre, expresion in ORDENES_LISTADO.items():
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_proyectos_{nombre}
+                ON proyectos({expresion}, id)
+            """)
+
+        # Índice de texto completo con contenido externo (la tabla proyectos);
+        # los triggers lo mantienen al día en altas, upserts y bajas.
+        columnas = ', '.join(COLUMNAS_TEXTO)
+        nuevos = ', '.join(f"new.{c}" for c in COLUMNAS_TEXTO)
+        viejos = ', '.join(f"old.{c}" for c in COLUMNAS_TEXTO)
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS proyectos_fts USING fts5(
+                {columnas}, content='proyectos', content_rowid='rowid',
+                tokenize='{TOKENIZADOR_FTS}'
+            )
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS proyectos_fts_insert AFTER INSERT ON proyectos BEGIN
+                INSERT INTO proyectos_fts (rowid, {columnas}) VALUES (new.rowid, {nuevos});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS proyectos_fts_delete AFTER DELETE ON proyectos BEGIN
+                INSERT INTO proyectos_fts (proyectos_fts, rowid, {columnas}) VALUES ('delete', old.rowid, {viejos});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS proyectos_fts_update AFTER UPDATE OF {columnas} ON proyectos BEGIN
+                INSERT INTO proyectos_fts (proyectos_fts, rowid, {columnas}) VALUES ('delete', old.rowid, {viejos});
+                INSERT INTO proyectos_fts (rowid, {columnas}) VALUES (new.rowid, {nuevos});
+            END
+        """)
+        if 'proyectos_fts' not in tablas:
+            cursor.execute("INSERT INTO proyectos_fts (proyectos_fts) VALUES ('rebuild')")
+
         conn.commit()
 
+        # Bases con proyectos anteriores a las tablas de relación
+        if not tablas.issuperset(RELACIONES_PROYECTO):
+            self.reconstruir_relaciones()
+
+    def _sincronizar_relaciones(self, conn: sqlite3.Connection, proyectos: List[ProyectoSocial]):
+        """Reescribe las filas de relación de los proyectos (dentro de la transacción del llamador)"""
+        ids = [(proyecto.id,) for proyecto in proyectos]
+        filas = [filas_relaciones(proyecto) for proyecto in proyectos]
+        for tabla, (_, columna, _) in RELACIONES_PROYECTO.items():
+            conn.executemany(f"DELETE FROM {tabla} WHERE proyecto_id = ?", ids)
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {tabla} (proyecto_id, {columna}, {columna}_norm) VALUES (?, ?, ?)",
+                [fila for por_tabla in filas for fila in por_tabla[tabla]]
+            )
+
+    def reconstruir_relaciones(self) -> int:
+        """
+        Vuelve a llenar las tablas de relación desde las columnas JSON.
+
+        Se ejecuta sola al abrir una base creada antes de estas tablas;
+        sirve también tras editar la tabla proyectos por fuera del gestor.
+
+        Returns:
+            Número de proyectos procesados
+        """
+        proyectos = list(self.iterar_proyectos())
+        with self.conexiones.transaccion() as conn:
+            for tabla in RELACIONES_PROYECTO:
+                conn.execute(f"DELETE FROM {tabla}")
+            self._sincronizar_relaciones(conn, proyectos)
+        return len(proyectos)
+
     def _proyecto_to_dict(self, proyecto: ProyectoSocial) -> Dict[str, Any]:
         """
         Convierte un objeto ProyectoSocial a diccionario para guardar en BD.
@@ -243,45 +804,8 @@ class DatabaseManager:
 
             # Insertar proyecto con todos los campos
             data = self._proyecto_to_dict(proyecto)
-            cursor.execute("""
-                INSERT INTO proyectos (
-                    id, nombre, organizacion, descripcion,
-                    beneficiarios_directos, beneficiarios_indirectos,
-                    duracion_meses, presupuesto_total, ods_vinculados,
-                    area_geografica, poblacion_objetivo, departamentos,
-                    municipios, estado, indicadores_impacto,
-                    fecha_creacion, fecha_modificacion,
-                    sectores, puntajes_pdet, tiene_municipios_pdet, puntaje_sectorial_max,
-                    observaciones_sroi, nivel_confianza_sroi, fecha_calculo_sroi, metodologia_sroi,
-                    pertinencia_operacional, mejora_relacionamiento, stakeholders_involucrados,
-                    en_corredor_transmision, observaciones_stakeholders,
-                    riesgo_tecnico_probabilidad, riesgo_tecnico_impacto,
-                    riesgo_social_probabilidad, riesgo_social_impacto,
-                    riesgo_financiero_probabilidad, riesgo_financiero_impacto,
-                    riesgo_regulatorio_probabilidad, riesgo_regulatorio_impacto,
-                    duracion_estimada_meses
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                          ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                          ?, ?, ?, ?, ?)
-            """, (
-                # Campos básicos
-                data['id'], data['nombre'], data['organizacion'], data['descripcion'],
-                data['beneficiarios_directos'], data['beneficiarios_indirectos'],
-                data['duracion_meses'], data['presupuesto_total'], data['ods_vinculados'],
-                data['area_geografica'], data['poblacion_objetivo'], data['departamentos'],
-                data['municipios'], data['estado'], data['indicadores_impacto'],
-                data['fecha_creacion'], data['fecha_modificacion'],
-                # Campos Arquitectura C
-                data['sectores'], data['puntajes_pdet'], data['tiene_municipios_pdet'], data['puntaje_sectorial_max'],
-                data['observaciones_sroi'], data['nivel_confianza_sroi'], data['fecha_calculo_sroi'], data['metodologia_sroi'],
-                data['pertinencia_operacional'], data['mejora_relacionamiento'], data['stakeholders_involucrados'],
-                data['en_corredor_transmision'], data['observaciones_stakeholders'],
-                data['riesgo_tecnico_probabilidad'], data['riesgo_tecnico_impacto'],
-                data['riesgo_social_probabilidad'], data['riesgo_social_impacto'],
-                data['riesgo_financiero_probabilidad'], data['riesgo_financiero_impacto'],
-                data['riesgo_regulatorio_probabilidad'], data['riesgo_regulatorio_impacto'],
-                data['duracion_estimada_meses']
-            ))
+            cursor.execute(SQL_INSERTAR_PROYECTO, tuple(data[columna] for columna in COLUMNAS_PROYECTO))
+            self._sincronizar_relaciones(conn, [proyecto])
 
             # Registrar en historial
             cursor.execute("""
@@ -293,8 +817,130 @@ class DatabaseManager:
             return True
 
         except sqlite3.IntegrityError:
+            conn.rollback()
             return False
 
+    def crear_proyectos_lote(
+        self,
+        proyectos: Iterable[ProyectoSocial],
+        diferir_indices: bool = False
+    ) -> ResultadoLote:
+        """
+        Crea muchos proyectos en una sola transacción.
+
+        Las filas inválidas (ver validar_proyecto) y los IDs repetidos en el
+        lote se reportan en `errores` sin abortar el resto; los IDs que ya
+        existen en la base se omiten y se listan en `existentes`. Las filas
+        válidas se insertan con executemany, junto con su historial.
+
+        Args:
+            proyectos: Proyectos a crear
+            diferir_indices: Si True, borra los índices secundarios antes de
+                insertar y los reconstruye al final (conviene en cargas
+                grandes sobre tablas con muchos índices)
+
+        Returns:
+            ResultadoLote con IDs insertados, existentes y errores por fila
+        """
+        return self._guardar_lote(proyectos, actualizar=False, diferir_indices=diferir_indices)
+
+    def upsert_proyectos_lote(
+        self,
+        proyectos: Iterable[ProyectoSocial],
+        diferir_indices: bool = False
+    ) -> ResultadoLote:
+        """
+        Crea o actualiza muchos proyectos en una sola transacción.
+
+        Igual que crear_proyectos_lote, pero los IDs existentes se
+        actualizan (se conserva su fecha de creación).
+
+        Returns:
+            ResultadoLote con IDs insertados, actualizados y errores por fila
+        """
+        return self._guardar_lote(proyectos, actualizar=True, diferir_indices=diferir_indices)
+
+    def _serializar_fila(self, proyecto: ProyectoSocial) -> Tuple[Dict[str, Any], str]:
+        """(datos de _proyecto_to_dict, JSON para el historial) de una fila del lote"""
+        data = self._proyecto_to_dict(proyecto)
+        return data, json.dumps(data)
+
+    @staticmethod
+    def _ids_existentes(conn: sqlite3.Connection, ids: List[str]) -> set:
+        """IDs de la lista que ya están en proyectos"""
+        existentes = set()
+        for inicio in range(0, len(ids), TAMANO_BLOQUE_IDS):
+            bloque = ids[inicio:inicio + TAMANO_BLOQUE_IDS]
+            existentes.update(
+                row[0] for row in conn.execute(
+                    f"SELECT id FROM proyectos WHERE id IN ({', '.join('?' * len(bloque))})", bloque
+                )
+            )
+        return existentes
+
+    @staticmethod
+    def _indices_secundarios(conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+        """(nombre, sql) de los índices creados explícitamente en las tablas del lote"""
+        return [
+            (row[0], row[1]) for row in conn.execute(f"""
+                SELECT name, sql FROM sqlite_master
+                WHERE type = 'index' AND sql IS NOT NULL
+                  AND tbl_name IN ({', '.join('?' * len(TABLAS_INDICES_LOTE))})
+            """, TABLAS_INDICES_LOTE)
+        ]
+
+    def _guardar_lote(
+        self,
+        proyectos: Iterable[ProyectoSocial],
+        actualizar: bool,
+        diferir_indices: bool
+    ) -> ResultadoLote:
+        """Implementación común de crear_proyectos_lote y upsert_proyectos_lote"""
+        resultado = ResultadoLote()
+        validos = preparar_lote(proyectos, resultado, self._serializar_fila)
+        if not validos:
+            return resultado
+
+        ahora = datetime.now().isoformat()
+        with self.conexiones.transaccion() as conn:
+            # Transacción explícita: incluye la lectura de IDs y el DDL de índices
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            existentes = self._ids_existentes(conn, [proyecto.id for proyecto, _ in validos])
+
+            filas = []
+            historial = []
+            for proyecto, (data, cambios) in validos:
+                if proyecto.id in existentes:
+                    if not actualizar:
+                        resultado.existentes.append(proyecto.id)
+                        continue
+                    resultado.actualizados.append(proyecto.id)
+                    accion = 'UPDATE'
+                else:
+                    resultado.insertados.append(proyecto.id)
+                    accion = 'CREATE'
+                filas.append(tuple(data[columna] for columna in COLUMNAS_PROYECTO))
+                historial.append((proyecto.id, accion, ahora, cambios))
+
+            indices = self._indices_secundarios(conn) if diferir_indices else []
+            for nombre, _ in indices:
+                conn.execute(f'DROP INDEX IF EXISTS "{nombre}"')
+
+            conn.executemany(SQL_UPSERT_PROYECTO if actualizar else SQL_INSERTAR_PROYECTO, filas)
+            guardados = set(resultado.insertados) | set(resultado.actualizados)
+            self._sincronizar_relaciones(conn, [proyecto for proyecto, _ in validos if proyecto.id in guardados])
+            conn.executemany("DELETE FROM proyecto_scores WHERE proyecto_id = ?", [(i,) for i in resultado.actualizados])
+            conn.executemany("""
+                INSERT INTO historial_cambios (proyecto_id, accion, fecha, cambios)
+                VALUES (?, ?, ?, ?)
+            """, historial)
+
+            for _, sql in indices:
+                conn.execute(sql)
+
+        return resultado
+
     def obtener_proyecto(self, proyecto_id: str) -> Optional[ProyectoSocial]:
         """
         Obtiene un proyecto por su ID.
@@ -315,6 +961,92 @@ class DatabaseManager:
             return self._dict_to_proyecto(dict(row))
         return None
 
+    def obtener_proyectos(self, ids: List[str]) -> List[ProyectoSocial]:
+        """
+        Carga proyectos completos por ID (p.ej. los de una página del listado).
+
+        Returns:
+            Proyectos encontrados, en el orden de `ids`
+        """
+        conn = self._get_connection()
+        por_id = {}
+        for inicio in range(0, len(ids), TAMANO_BLOQUE_IDS):
+            bloque = ids[inicio:inicio + TAMANO_BLOQUE_IDS]
+            for row in conn.execute(
+                f"SELECT * FROM proyectos WHERE id IN ({', '.join('?' * len(bloque))})", bloque
+            ):
+                por_id[row['id']] = self._dict_to_proyecto(dict(row))
+        return [por_id[proyecto_id] for proyecto_id in ids if proyecto_id in por_id]
+
+    def listar_proyectos(self,
+                         limite: int = 25,
+                         despues_de: Optional[Tuple[Any, str]] = None,
+                         orden: str = 'modificacion',
+                         descendente: bool = True,
+                         **filtros) -> PaginaProyectos:
+        """
+        Página de resúmenes ordenada por una clave de ORDENES_LISTADO.
+
+        Paginación por clave (keyset): cada página continúa desde el
+        (clave, id) de la anterior usando el índice idx_proyectos_<orden>,
+        sin OFFSET, así que su costo no crece con el número de página.
+
+        Args:
+            limite: Resúmenes por página
+            despues_de: cursor_siguiente de la página anterior (None = primera)
+            orden: 'modificacion', 'nombre', 'presupuesto' o 'beneficiarios'
+            descendente: Si True, de mayor a menor (más reciente primero)
+            **filtros: Los mismos de buscar_proyectos
+
+        Returns:
+            PaginaProyectos con los resúmenes y el cursor de la siguiente
+
+        Raises:
+            ValueError: Si el orden no es válido
+        """
+        expresion, comparador, direccion = orden_listado(orden, descendente)
+        conn = self._get_connection()
+        query, params = self._consulta_busqueda(
+            f"SELECT {', '.join(COLUMNAS_RESUMEN)}, substr(descripcion, 1, {LARGO_DESCRIPCION_RESUMEN}) AS descripcion, "
+            f"{expresion} AS clave_orden FROM proyectos", **filtros
+        )
+        if despues_de is not None:
+            query += f" AND ({expresion}, id) {comparador} (?, ?)"
+            params.extend(despues_de)
+        query += f" ORDER BY {expresion} {direccion}, id {direccion} LIMIT ?"
+        params.append(limite + 1)
+
+        filas = conn.execute(query, params).fetchall()
+        siguiente = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            siguiente = (filas[-1]['clave_orden'], filas[-1]['id'])
+        return PaginaProyectos([ResumenProyecto.desde_fila(row) for row in filas], siguiente)
+
+    def obtener_resumenes(self, ids: List[str]) -> List[ResumenProyecto]:
+        """Resúmenes de los proyectos indicados, en el orden de `ids`."""
+        conn = self._get_connection()
+        por_id = {}
+        for inicio in range(0, len(ids), TAMANO_BLOQUE_IDS):
+            bloque = ids[inicio:inicio + TAMANO_BLOQUE_IDS]
+            for row in conn.execute(f"""
+                SELECT {', '.join(COLUMNAS_RESUMEN)}, substr(descripcion, 1, {LARGO_DESCRIPCION_RESUMEN}) AS descripcion
+                FROM proyectos WHERE id IN ({', '.join('?' * len(bloque))})
+            """, bloque):
+                por_id[row['id']] = ResumenProyecto.desde_fila(row)
+        return [por_id[proyecto_id] for proyecto_id in ids if proyecto_id in por_id]
+
+    def contar_proyectos(self, **filtros) -> int:
+        """Número de proyectos que cumplen los filtros de buscar_proyectos."""
+        conn = self._get_connection()
+        query, params = self._consulta_busqueda("SELECT COUNT(*) FROM proyectos", **filtros)
+        return conn.execute(query, params).fetchone()[0]
+
+    def obtener_organizaciones(self) -> List[str]:
+        """Organizaciones distintas, en orden alfabético."""
+        conn = self._get_connection()
+        return [row[0] for row in conn.execute("SELECT DISTINCT organizacion FROM proyectos ORDER BY organizacion")]
+
     def obtener_todos_proyectos(self) -> List[ProyectoSocial]:
         """
         Obtiene todos los proyectos de la base de datos.
@@ -330,6 +1062,30 @@ class DatabaseManager:
 
         return [self._dict_to_proyecto(dict(row)) for row in rows]
 
+    def iterar_proyectos(self, tamano_lote: int = 500) -> Iterator[ProyectoSocial]:
+        """
+        Recorre todos los proyectos sin cargarlos todos en memoria.
+
+        Lee con fetchmany en lotes; pensado para el ranking en streaming
+        de carteras históricas grandes.
+
+        Args:
+            tamano_lote: Filas leídas por cada fetchmany
+
+        Yields:
+            Objetos ProyectoSocial en el mismo orden que obtener_todos_proyectos
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT * FROM proyectos ORDER BY fecha_creacion DESC")
+        while True:
+            rows = cursor.fetchmany(tamano_lote)
+            if not rows:
+                break
+            for row in rows:
+                yield self._dict_to_proyecto(dict(row))
+
     def actualizar_proyecto(self, proyecto: ProyectoSocial) -> bool:
         """
         Actualiza un proyecto existente.
@@ -398,6 +1154,10 @@ class DatabaseManager:
             VALUES (?, ?, ?, ?)
         """, (proyecto.id, 'UPDATE', datetime.now().isoformat(), json.dumps(data)))
 
+        self._sincronizar_relaciones(conn, [proyecto])
+        # El score guardado corresponde a los datos anteriores
+        cursor.execute("DELETE FROM proyecto_scores WHERE proyecto_id = ?", (proyecto.id,))
+
         conn.commit()
         return True
 
@@ -426,22 +1186,58 @@ class DatabaseManager:
             VALUES (?, ?, ?, ?)
         """, (proyecto_id, 'DELETE', datetime.now().isoformat(), json.dumps(dict(proyecto_data))))
 
-        # Eliminar proyecto
+        # Eliminar proyecto y sus filas de relación
         cursor.execute("DELETE FROM proyectos WHERE id = ?", (proyecto_id,))
+        for tabla in (*RELACIONES_PROYECTO, 'proyecto_scores'):
+            cursor.execute(f"DELETE FROM {tabla} WHERE proyecto_id = ?", (proyecto_id,))
 
         conn.commit()
         return True
 
+    def eliminar_todos_proyectos(self) -> int:
+        """
+        Elimina todos los proyectos en una sola transacción.
+
+        Registra un DELETE por proyecto en el historial, igual que
+        eliminar_proyecto. Si algo falla no se elimina ninguno.
+
+        Returns:
+            Número de proyectos eliminados
+        """
+        ahora = datetime.now().isoformat()
+        with self.conexiones.transaccion() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            filas = conn.execute("SELECT * FROM proyectos").fetchall()
+            conn.executemany("""
+                INSERT INTO historial_cambios (proyecto_id, accion, fecha, cambios)
+                VALUES (?, ?, ?, ?)
+            """, [(row['id'], 'DELETE', ahora, json.dumps(dict(row))) for row in filas])
+
+            conn.execute("DELETE FROM proyectos")
+            for tabla in (*RELACIONES_PROYECTO, 'proyecto_scores'):
+                conn.execute(f"DELETE FROM {tabla}")
+        return len(filas)
+
     def buscar_proyectos(self,
                          texto: Optional[str] = None,
                          organizacion: Optional[str] = None,
                          departamento: Optional[str] = None,
                          ods: Optional[List[str]] = None,
                          area_geografica: Optional[str] = None,
-                         estado: Optional[str] = None) -> List[ProyectoSocial]:
+                         estado: Optional[str] = None,
+                         municipio: Optional[str] = None,
+                         sector: Optional[str] = None,
+                         todos_los_ods: bool = True,
+                         presupuesto_min: Optional[float] = None,
+                         presupuesto_max: Optional[float] = None) -> List[ProyectoSocial]:
         """
         Busca proyectos según criterios específicos.
 
+        Departamento, municipio, ODS y sector se filtran por igualdad
+        normalizada (sin tildes ni mayúsculas) sobre las tablas de relación
+        indexadas, por lo que "ODS 1" no coincide con "ODS 11".
+
         Args:
             texto: Texto a buscar en nombre, ID u organización
             organizacion: Nombre de la organización
@@ -449,6 +1245,10 @@ class DatabaseManager:
             ods: Lista de ODS
             area_geografica: Área geográfica
             estado: Estado del proyecto
+            municipio: Municipio específico
+            sector: Sector específico
+            todos_los_ods: Si True exige todos los ODS; si False, alguno
+            presupuesto_min / presupuesto_max: Rango de presupuesto (inclusive)
 
         Returns:
             Lista de proyectos que coinciden con los criterios
@@ -456,26 +1256,67 @@ class DatabaseManager:
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        query = "SELECT * FROM proyectos WHERE 1=1"
-        params = []
+        query, params = self._consulta_busqueda(
+            "SELECT * FROM proyectos", texto, organizacion, departamento, ods,
+            area_geografica, estado, municipio, sector, todos_los_ods,
+            presupuesto_min, presupuesto_max
+        )
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+        return [self._dict_to_proyecto(dict(row)) for row in rows]
 
+    @staticmethod
+    def _consulta_busqueda(base: str,
+                           texto: Optional[str] = None,
+                           organizacion: Optional[str] = None,
+                           departamento: Optional[str] = None,
+                           ods: Optional[List[str]] = None,
+                           area_geografica: Optional[str] = None,
+                           estado: Optional[str] = None,
+                           municipio: Optional[str] = None,
+                           sector: Optional[str] = None,
+                           todos_los_ods: bool = True,
+                           presupuesto_min: Optional[float] = None,
+                           presupuesto_max: Optional[float] = None) -> Tuple[str, List[Any]]:
+        """Arma el WHERE de buscar_proyectos sobre la consulta `base`"""
+        query = base + " WHERE 1=1"
+        params: List[Any] = []
+
+        # Palabras (por prefijo) en nombre, organización, descripción o
+        # población objetivo vía proyectos_fts; el ID se sigue buscando por subcadena
         if texto:
-            query += " AND (nombre LIKE ? OR id LIKE ? OR organizacion LIKE ?)"
-            pattern = f"%{texto}%"
-            params.extend([pattern, pattern, pattern])
+            coincidencia = consulta_fts(texto)
+            query += " AND (id LIKE ?"
+            params.append(f"%{texto}%")
+            if coincidencia:
+                query += " OR rowid IN (SELECT rowid FROM proyectos_fts WHERE proyectos_fts MATCH ?)"
+                params.append(coincidencia)
+            query += ")"
 
         if organizacion:
             query += " AND organizacion = ?"
             params.append(organizacion)
 
-        if departamento:
-            query += " AND departamentos LIKE ?"
-            params.append(f"%{departamento}%")
+        # Semi-joins sobre los índices (valor_norm, proyecto_id)
+        for tabla, valor in (
+            ('proyecto_departamento', departamento),
+            ('proyecto_municipio', municipio),
+            ('proyecto_sector', sector),
+        ):
+            if valor:
+                _, columna, normalizar = RELACIONES_PROYECTO[tabla]
+                query += f" AND id IN (SELECT proyecto_id FROM {tabla} WHERE {columna}_norm = ?)"
+                params.append(normalizar(valor))
 
         if ods:
-            for ods_item in ods:
-                query += " AND ods_vinculados LIKE ?"
-                params.append(f"%{ods_item}%")
+            claves = sorted({normalizar_ods(o) for o in ods})
+            query += f" AND id IN (SELECT proyecto_id FROM proyecto_ods WHERE ods_norm IN ({', '.join('?' * len(claves))})"
+            params.extend(claves)
+            if todos_los_ods:
+                query += " GROUP BY proyecto_id HAVING COUNT(*) = ?"
+                params.append(len(claves))
+            query += ")"
 
         if area_geografica:
             query += " AND area_geografica = ?"
@@ -485,48 +1326,254 @@ class DatabaseManager:
             query += " AND estado = ?"
             params.append(estado)
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        if presupuesto_min is not None:
+            query += " AND presupuesto_total >= ?"
+            params.append(presupuesto_min)
 
-        return [self._dict_to_proyecto(dict(row)) for row in rows]
+        if presupuesto_max is not None:
+            query += " AND presupuesto_total <= ?"
+            params.append(presupuesto_max)
 
-    def obtener_estadisticas(self) -> Dict[str, Any]:
+        return query, params
+
+    def buscar_ids_proyectos(self, **filtros) -> List[str]:
+        """IDs de los proyectos que cumplen los filtros de buscar_proyectos (sin deserializar filas)."""
+        conn = self._get_connection()
+        query, params = self._consulta_busqueda("SELECT id FROM proyectos", **filtros)
+        return [row[0] for row in conn.execute(query, params)]
+
+    def buscar_texto(self,
+                     texto: str,
+                     limite: int = 50,
+                     marcas: Tuple[str, str] = ('**', '**'),
+                     palabras_fragmento: int = 16,
+                     **filtros) -> List[ResultadoBusquedaTexto]:
+        """
+        Búsqueda de texto completo ordenada por relevancia (BM25).
+
+        Todas las palabras de `texto` deben aparecer (como prefijo) en
+        nombre, organización, descripción o población objetivo, sin
+        importar tildes ni mayúsculas. Una coincidencia en el nombre pesa
+        más que en la organización, y esta más que en la descripción.
+
+        Args:
+            texto: Palabras a buscar
+            limite: Máximo de resultados
+            marcas: Texto antes y después de cada término en el fragmento
+            palabras_fragmento: Largo aproximado del fragmento, en palabras
+            **filtros: Filtros adicionales de buscar_proyectos (sin texto)
+
+        Returns:
+            Resultados de mayor a menor relevancia
+        """
+        coincidencia = consulta_fts(texto)
+        if not coincidencia:
+            return []
+
+        conn = self._get_connection()
+        pesos = ', '.join(str(peso) for peso in PESOS_BM25)
+        filtro, params_filtro = self._consulta_busqueda("SELECT id FROM proyectos", **filtros)
+        rows = conn.execute(f"""
+            SELECT p.id, p.nombre, p.organizacion,
+                   bm25(proyectos_fts, {pesos}) AS rango,
+                   snippet(proyectos_fts, -1, ?, ?, '…', ?) AS fragmento
+            FROM proyectos_fts
+            JOIN proyectos p ON p.rowid = proyectos_fts.rowid
+            WHERE proyectos_fts MATCH ? AND p.id IN ({filtro})
+            ORDER BY rango
+            LIMIT ?
+        """, (marcas[0], marcas[1], palabras_fragmento, coincidencia, *params_filtro, limite)).fetchall()
+
+        # bm25() es menor cuanto más relevante; se invierte el signo
+        return [
+            ResultadoBusquedaTexto(row[0], row[1], row[2], -row[3], row[4])
+            for row in rows
+        ]
+
+    def obtener_estadisticas(self,
+                             agrupar_por: Sequence[str] = (),
+                             limite_grupos: Optional[int] = None,
+                             **filtros) -> Dict[str, Any]:
         """
         Obtiene estadísticas generales de los proyectos.
 
+        Todo se calcula en SQL (SUM/AVG/GROUP BY); no se cargan proyectos.
+
+        Args:
+            agrupar_por: Dimensiones de DIMENSIONES_ESTADISTICAS a desglosar;
+                cada una agrega la clave 'por_<dimension>' al resultado
+            limite_grupos: Máximo de grupos por dimensión (los de más proyectos)
+            **filtros: Filtros de buscar_proyectos aplicados a todo
+
         Returns:
             Diccionario con estadísticas
         """
         conn = self._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("""
+        sroi_positivo = f"CASE WHEN {SQL_SROI} > 0 THEN {SQL_SROI} END"
+        query, params = self._consulta_busqueda(f"""
             SELECT
                 COUNT(*) as total_proyectos,
                 SUM(beneficiarios_directos) as total_beneficiarios_directos,
                 SUM(beneficiarios_indirectos) as total_beneficiarios_indirectos,
                 SUM(presupuesto_total) as presupuesto_total,
                 AVG(presupuesto_total) as presupuesto_promedio,
-                COUNT(DISTINCT organizacion) as total_organizaciones
+                COUNT(DISTINCT organizacion) as total_organizaciones,
+                AVG({sroi_positivo}) as sroi_promedio,
+                MAX({sroi_positivo}) as sroi_maximo,
+                MIN({sroi_positivo}) as sroi_minimo,
+                COUNT({sroi_positivo}) as proyectos_con_sroi
             FROM proyectos
-        """)
+        """, **filtros)
+        cursor.execute(query, params)
 
         row = cursor.fetchone()
 
-        return {
+        beneficiarios = (row['total_beneficiarios_directos'] or 0) + (row['total_beneficiarios_indirectos'] or 0)
+        estadisticas = {
             'total_proyectos': row['total_proyectos'] or 0,
             'total_beneficiarios_directos': row['total_beneficiarios_directos'] or 0,
             'total_beneficiarios_indirectos': row['total_beneficiarios_indirectos'] or 0,
             'presupuesto_total': row['presupuesto_total'] or 0,
             'presupuesto_promedio': row['presupuesto_promedio'] or 0,
-            'total_organizaciones': row['total_organizaciones'] or 0
+            'total_organizaciones': row['total_organizaciones'] or 0,
+            'costo_por_beneficiario': (row['presupuesto_total'] or 0) / beneficiarios if beneficiarios else 0,
+            'sroi_promedio': row['sroi_promedio'] or 0,
+            'sroi_maximo': row['sroi_maximo'] or 0,
+            'sroi_minimo': row['sroi_minimo'] or 0,
+            'proyectos_con_sroi': row['proyectos_con_sroi'] or 0
         }
 
+        for dimension in agrupar_por:
+            estadisticas[f'por_{dimension}'] = self.agrupar_proyectos(dimension, limite_grupos, **filtros)
+
+        return estadisticas
+
+    def agrupar_proyectos(self,
+                          dimension: str,
+                          limite: Optional[int] = None,
+                          **filtros) -> List[GrupoEstadistico]:
+        """
+        Conteo, presupuesto y beneficiarios por valor de una dimensión (GROUP BY).
+
+        En departamento, ODS y sector un proyecto cuenta en cada uno de sus
+        valores (agrupando por el valor normalizado de las tablas de relación).
+
+        Args:
+            dimension: Clave de DIMENSIONES_ESTADISTICAS
+            limite: Máximo de grupos (None = todos)
+            **filtros: Filtros de buscar_proyectos
+
+        Returns:
+            Grupos de mayor a menor número de proyectos
+        """
+        if dimension not in DIMENSIONES_ESTADISTICAS:
+            raise ValueError(
+                f"Dimensión '{dimension}' no válida. Opciones: {', '.join(DIMENSIONES_ESTADISTICAS)}"
+            )
+        origen, etiqueta, grupo = DIMENSIONES_ESTADISTICAS[dimension]
+
+        query = f"""
+            SELECT {etiqueta} AS valor,
+                   COUNT(*) AS proyectos,
+                   COALESCE(SUM(p.presupuesto_total), 0) AS presupuesto_total,
+                   COALESCE(SUM(p.beneficiarios_directos + p.beneficiarios_indirectos), 0) AS beneficiarios_totales
+            FROM {origen}
+        """
+        params: List[Any] = []
+        if hay_filtros(filtros):
+            filtro, params = self._consulta_busqueda("SELECT id FROM proyectos", **filtros)
+            query += f" WHERE p.id IN ({filtro})"
+        query += f" GROUP BY {grupo} ORDER BY proyectos DESC, valor"
+        if limite is not None:
+            query += " LIMIT ?"
+            params.append(limite)
+
+        conn = self._get_connection()
+        return [
+            GrupoEstadistico(row[0], row[1], float(row[2]), int(row[3]))
+            for row in conn.execute(query, params)
+        ]
+
+    def metricas_proyectos(self,
+                           metrica: str,
+                           limite: Optional[int] = 10,
+                           ascendente: bool = False,
+                           **filtros) -> List[MetricaProyecto]:
+        """
+        Proyectos ordenados por una métrica (ORDER BY ... LIMIT en SQL).
+
+        Los proyectos sin valor (SROI no declarado o no positivo, costo sin
+        beneficiarios) se omiten.
+
+        Args:
+            metrica: Clave de METRICAS_PROYECTO
+            limite: Máximo de proyectos (None = todos)
+            ascendente: True = menores primero
+            **filtros: Filtros de buscar_proyectos
+
+        Returns:
+            Lista de MetricaProyecto
+        """
+        if metrica not in METRICAS_PROYECTO:
+            raise ValueError(f"Métrica '{metrica}' no válida. Opciones: {', '.join(METRICAS_PROYECTO)}")
+        expresion = METRICAS_PROYECTO[metrica].format(sroi=SQL_SROI)
+
+        query = f"SELECT p.id, p.nombre, {expresion} AS valor FROM proyectos p WHERE {expresion} IS NOT NULL"
+        params: List[Any] = []
+        if metrica == 'sroi':
+            query += f" AND {expresion} > 0"
+        if hay_filtros(filtros):
+            filtro, params = self._consulta_busqueda("SELECT id FROM proyectos", **filtros)
+            query += f" AND p.id IN ({filtro})"
+        query += f" ORDER BY valor {'ASC' if ascendente else 'DESC'}, p.id"
+        if limite is not None:
+            query += " LIMIT ?"
+            params.append(limite)
+
+        conn = self._get_connection()
+        return [MetricaProyecto(row[0], row[1], float(row[2])) for row in conn.execute(query, params)]
+
+    def guardar_scores(self, scores: Iterable[Tuple[str, float, str]]) -> int:
+        """
+        Guarda el último score calculado de cada proyecto.
+
+        Alimenta la agregación por nivel de prioridad; se descarta cuando
+        el proyecto se actualiza o elimina.
+
+        Args:
+            scores: Tuplas (proyecto_id, score_total, nivel_prioridad), p.ej.
+                zip(lote.proyecto_ids, lote.score_total, lote.nivel_prioridad)
+
+        Returns:
+            Número de scores guardados (se omiten IDs que no existen)
+        """
+        # El ID va dos veces: en la fila y en el filtro de proyectos existentes
+        filas = [(*fila, fila[0]) for fila in filas_scores(scores, datetime.now().isoformat())]
+        with self.conexiones.transaccion() as conn:
+            cursor = conn.executemany("""
+                INSERT INTO proyecto_scores (proyecto_id, score_total, nivel_prioridad, fecha)
+                SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM proyectos WHERE id = ?)
+                ON CONFLICT(proyecto_id) DO UPDATE SET
+                    score_total = excluded.score_total,
+                    nivel_prioridad = excluded.nivel_prioridad,
+                    fecha = excluded.fecha
+            """, filas)
+            return cursor.rowcount
+
+    def ids_sin_score(self) -> List[str]:
+        """IDs de los proyectos sin score guardado (nuevos o modificados)."""
+        conn = self._get_connection()
+        return [row[0] for row in conn.execute("""
+            SELECT p.id FROM proyectos p
+            LEFT JOIN proyecto_scores s ON s.proyecto_id = p.id
+            WHERE s.proyecto_id IS NULL
+        """)]
+
     def cerrar_conexion(self):
-        """Cierra la conexión a la base de datos."""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """Cierra las conexiones a la base de datos (de todos los hilos)."""
+        self.conexiones.close()
 
     def crear_backup(self, backup_path: str) -> bool:
         """
@@ -564,6 +1611,7 @@ class DatabaseManager:
                 self.cerrar_conexion()
                 shutil.copy2(backup_path, self.db_path)
                 self._get_connection()  # Reconectar
+                self._initialize_database()  # Migra backups anteriores al esquema actual
                 return True
             return False
         except Exception as e:
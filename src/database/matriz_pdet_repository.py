@@ -4,9 +4,12 @@ Repositorio para acceso a matriz de priorización sectorial PDET/ZOMAC.
 Proporciona interfaz para consultar datos oficiales de Obras por Impuestos
 sobre priorización sectorial en 362 municipios PDET/ZOMAC.
 """
+import hashlib
 import sqlite3
-import unicodedata
-from typing import Optional, List, Tuple, Dict
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Iterable, List, Sequence, Tuple, Dict
 from pathlib import Path
 import sys
 
@@ -14,6 +17,100 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from models.matriz_pdet_zomac import RegistroMunicipioPDET
+from models.busqueda_municipios import (
+    IndiceInversoMunicipios,
+    IndiceTrigramas,
+    ResultadoBusquedaMunicipio,
+    UbicacionMunicipio,
+    normalizar_nombre as _normalizar_texto
+)
+from database.conexiones import GestorConexionesSQLite, get_gestor_conexiones
+from database.matriz_sectores import COLUMNAS_SECTORES, PERCENTILES, MatrizSectores, columna_sector
+
+
+# Pares (departamento, municipio) por consulta en get_municipios_lote
+# (2 parámetros por par, bajo el límite de variables de SQLite)
+TAMANO_BLOQUE_CONSULTA = 400
+
+# Consultas de get_municipios_por_puntaje_sector en modo SQL, una por columna.
+# Se arman solo con COLUMNAS_SECTORES: el nombre recibido se traduce con
+# columna_sector y nunca se interpola en el SQL.
+CONSULTAS_PUNTAJE_SECTOR = {
+    columna: f"""
+        SELECT * FROM matriz_pdet_zomac
+        WHERE {columna} >= ?
+        ORDER BY {columna} DESC, id
+    """
+    for columna in COLUMNAS_SECTORES
+}
+
+# Columnas numéricas de matriz_pdet_estadisticas, con la clave de cada una
+# en los dicts de get_estadisticas_sector
+CAMPOS_ESTADISTICAS = (
+    ('total', 'INTEGER'),
+    ('promedio', 'REAL'),
+    ('maximo', 'INTEGER'),
+    ('minimo', 'INTEGER'),
+    ('municipios_alta_prioridad', 'INTEGER'),
+    ('municipios_media_prioridad', 'INTEGER'),
+    ('municipios_baja_prioridad', 'INTEGER'),
+) + tuple((f'percentil_{p}', 'REAL') for p in PERCENTILES)
+
+# Nombre legible de cada columna (get_puntajes_sectores)
+NOMBRES_SECTORES = {
+    'educacion': 'Educación',
+    'salud': 'Salud',
+    'alcantarillado': 'Alcantarillado',
+    'via': 'Infraestructura Vial',
+    'energia': 'Energía',
+    'banda_ancha': 'Banda Ancha',
+    'riesgo_ambiental': 'Riesgo Ambiental',
+    'infraestructura_rural': 'Infraestructura Rural',
+    'cultura': 'Cultura',
+    'deporte': 'Deporte'
+}
+
+
+@dataclass
+class ResultadoCargaMatriz:
+    """Resultado de MatrizPDETRepository.cargar_matriz"""
+    version: str
+    filas: int
+    duplicados: int = 0
+    cambio: bool = True  # False si la versión ya estaba vigente
+    version_anterior: Optional[str] = None  # Versión reemplazada (si hubo cambio)
+
+
+@dataclass
+class DiferenciaMatriz:
+    """
+    Cambios entre dos versiones de la matriz (ver comparar_versiones).
+
+    Las claves son pares (departamento, municipio) normalizados.
+
+    Atributos:
+        agregados / eliminados: Municipios que entran o salen de la matriz
+        cambios: Municipio → columnas de sector cuyo puntaje cambió
+    """
+    version_anterior: str
+    version_nueva: str
+    agregados: List[Tuple[str, str]] = field(default_factory=list)
+    eliminados: List[Tuple[str, str]] = field(default_factory=list)
+    cambios: Dict[Tuple[str, str], Tuple[str, ...]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.agregados) + len(self.eliminados) + len(self.cambios)
+
+    @property
+    def vacia(self) -> bool:
+        return len(self) == 0
+
+    def columnas_afectadas(self) -> Dict[Tuple[str, str], Tuple[str, ...]]:
+        """Municipio → columnas que cambiaron (todas si entró o salió)"""
+        afectadas = dict(self.cambios)
+        for clave in self.agregados + self.eliminados:
+            afectadas[clave] = COLUMNAS_SECTORES
+        return afectadas
 
 
 class MatrizPDETRepository:
@@ -22,18 +119,61 @@ class MatrizPDETRepository:
 
     Almacena y consulta datos de 362 municipios con puntajes
     de priorización sectorial (1-10) para 10 sectores.
+
+    En modo indexado (por defecto) la matriz se carga una sola vez en un
+    diccionario por (departamento, municipio) normalizados, y las consultas
+    por municipio o departamento no hacen I/O. El índice se recarga cuando
+    cambia la tabla: unos triggers llevan un contador de cambios que solo
+    se consulta si PRAGMA data_version indica escrituras de otra conexión
+    o si la conexión compartida del hilo modificó filas (total_changes).
+
+    Las conexiones vienen del gestor compartido del archivo (una por hilo,
+    en modo WAL y con sentencias preparadas en caché).
     """
 
-    def __init__(self, db_path: str = "data/proyectos.db"):
+    def __init__(self, db_path: str = "data/proyectos.db", indexado: bool = True):
         """
         Inicializa repositorio.
 
         Args:
             db_path: Ruta a base de datos SQLite
+            indexado: Si True, resuelve las consultas desde el índice en memoria
         """
         self.db_path = db_path
+        self.indexado = indexado
+        self.conexiones: GestorConexionesSQLite = get_gestor_conexiones(db_path)
+        self._reiniciar_indice()
         self._inicializar_tabla()
 
+    def _reiniciar_indice(self):
+        """Estado del índice en memoria (se carga en la primera consulta)"""
+        self._lock = threading.RLock()
+        self._contador_cambios: Optional[int] = None
+        # (conexión, data_version, total_changes) con que se validó el índice
+        self._marca_indice: Optional[Tuple[sqlite3.Connection, int, int]] = None
+        self._indice: Optional[Dict[Tuple[str, str], RegistroMunicipioPDET]] = None
+        self._municipios_departamento: Dict[str, List[str]] = {}
+        self._departamentos: List[str] = []
+        self._total_filas = 0
+        self._version_indice: Optional[str] = None
+        self._filas: List[RegistroMunicipioPDET] = []
+        self._matriz: Optional[MatrizSectores] = None
+        self._indice_busqueda: Optional[IndiceTrigramas] = None
+        self._indice_inverso = IndiceInversoMunicipios(self.normalizar_texto)
+        self._estadisticas: Optional[Dict[str, Dict[str, dict]]] = None
+        self._version_estadisticas: Optional[str] = None
+        self._version_sql: Optional[Tuple[int, str]] = None
+
+    def __getstate__(self):
+        """Permite enviar el repositorio a otros procesos (sin conexión ni índice)"""
+        return {'db_path': self.db_path, 'indexado': self.indexado}
+
+    def __setstate__(self, estado):
+        self.db_path = estado['db_path']
+        self.indexado = estado['indexado']
+        self.conexiones = get_gestor_conexiones(self.db_path)
+        self._reiniciar_indice()
+
     @staticmethod
     def normalizar_texto(texto: str) -> str:
         """
@@ -46,31 +186,16 @@ class MatrizPDETRepository:
         'Agustín Codazzi' → 'AGUSTIN CODAZZI'
         'BOGOTÁ D.C.' → 'BOGOTA D.C.'
         """
-        if not texto:
-            return ""
+        return _normalizar_texto(texto)
 
-        # Convertir a mayúsculas
-        texto = texto.upper()
-
-        # Eliminar acentos/tildes
-        # NFD = Canonical Decomposition
-        # Separa caracteres base de diacríticos (é → e + ´)
-        texto_nfd = unicodedata.normalize('NFD', texto)
-
-        # Mantener solo caracteres base (no diacríticos)
-        texto_sin_acentos = ''.join(
-            char for char in texto_nfd
-            if unicodedata.category(char) != 'Mn'  # Mn = Nonspacing Mark (diacríticos)
-        )
-
-        # Normalizar espacios
-        texto_normalizado = ' '.join(texto_sin_acentos.split())
-
-        return texto_normalizado
+    @classmethod
+    def clave_normalizada(cls, departamento: str, municipio: str) -> Tuple[str, str]:
+        """Clave (departamento, municipio) normalizada usada por índices y lotes"""
+        return cls.normalizar_texto(departamento), cls.normalizar_texto(municipio)
 
     def _inicializar_tabla(self):
         """Crea tabla matriz_pdet_zomac si no existe"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conexiones.transaccion() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS matriz_pdet_zomac (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -86,11 +211,16 @@ class MatrizPDETRepository:
                     infraestructura_rural INTEGER NOT NULL,
                     cultura INTEGER NOT NULL,
                     deporte INTEGER NOT NULL,
+                    departamento_norm TEXT,
+                    municipio_norm TEXT,
                     fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     UNIQUE(departamento, municipio)
                 )
             """)
 
+            # Migración: bases creadas antes de las columnas normalizadas
+            self._migrar_claves_normalizadas(conn)
+
             # Crear índices para búsquedas rápidas
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_departamento
@@ -104,8 +234,198 @@ class MatrizPDETRepository:
                 CREATE INDEX IF NOT EXISTS idx_depto_mun
                 ON matriz_pdet_zomac(departamento, municipio)
             """)
+            # Búsquedas normalizadas (sin acentos): igualdad sobre el índice
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_depto_mun_norm
+                ON matriz_pdet_zomac(departamento_norm, municipio_norm)
+            """)
+            # Índice inverso municipio → departamentos (modo SQL)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_municipio_norm
+                ON matriz_pdet_zomac(municipio_norm)
+            """)
+
+            # Contador de cambios: invalida el índice en memoria
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS matriz_pdet_cambios (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    contador INTEGER NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO matriz_pdet_cambios (id, contador) VALUES (1, 0)")
+            for evento in ('INSERT', 'UPDATE', 'DELETE'):
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_matriz_pdet_{evento.lower()}
+                    AFTER {evento} ON matriz_pdet_zomac
+                    BEGIN
+                        UPDATE matriz_pdet_cambios SET contador = contador + 1 WHERE id = 1;
+                    END
+                """)
+
+            # Versiones cargadas (hash de contenido) y sus copias completas
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS matriz_pdet_versiones (
+                    version TEXT PRIMARY KEY,
+                    fecha_carga TIMESTAMP NOT NULL,
+                    origen TEXT,
+                    total_filas INTEGER NOT NULL,
+                    contador INTEGER,
+                    vigente INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS matriz_pdet_snapshots (
+                    version TEXT NOT NULL,
+                    orden INTEGER NOT NULL,
+                    departamento TEXT NOT NULL,
+                    municipio TEXT NOT NULL,
+                    {', '.join(f'{columna} INTEGER NOT NULL' for columna in COLUMNAS_SECTORES)},
+                    PRIMARY KEY (version, orden)
+                )
+            """)
+
+            # Estadísticas materializadas por versión: departamento_norm = ''
+            # para el total nacional, un registro por (departamento, sector)
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS matriz_pdet_estadisticas (
+                    version TEXT NOT NULL,
+                    departamento_norm TEXT NOT NULL,
+                    departamento TEXT,
+                    sector TEXT NOT NULL,
+                    {', '.join(f'{campo} {tipo} NOT NULL' for campo, tipo in CAMPOS_ESTADISTICAS)},
+                    PRIMARY KEY (version, departamento_norm, sector)
+                )
+            """)
+
+    def _migrar_claves_normalizadas(self, conn: sqlite3.Connection):
+        """
+        Agrega y completa departamento_norm/municipio_norm.
+
+        Crea las columnas si la tabla es anterior a ellas y calcula la clave
+        normalizada de las filas que no la tengan (p. ej. insertadas por
+        versiones previas del script de carga).
+        """
+        columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(matriz_pdet_zomac)")}
+        for columna in ('departamento_norm', 'municipio_norm'):
+            if columna not in columnas:
+                conn.execute(f"ALTER TABLE matriz_pdet_zomac ADD COLUMN {columna} TEXT")
+
+        pendientes = conn.execute("""
+            SELECT id, departamento, municipio FROM matriz_pdet_zomac
+            WHERE departamento_norm IS NULL OR municipio_norm IS NULL
+        """).fetchall()
+        if pendientes:
+            conn.executemany(
+                "UPDATE matriz_pdet_zomac SET departamento_norm = ?, municipio_norm = ? WHERE id = ?",
+                [
+                    (self.normalizar_texto(departamento), self.normalizar_texto(municipio), id_fila)
+                    for id_fila, departamento, municipio in pendientes
+                ]
+            )
+
+    # ========== ÍNDICE EN MEMORIA ==========
 
-            conn.commit()
+    @staticmethod
+    def _fila_a_registro(row) -> RegistroMunicipioPDET:
+        """Convierte una fila (sqlite3.Row) en RegistroMunicipioPDET"""
+        return RegistroMunicipioPDET(
+            departamento=row['departamento'],
+            municipio=row['municipio'],
+            educacion=row['educacion'],
+            salud=row['salud'],
+            alcantarillado=row['alcantarillado'],
+            via=row['via'],
+            energia=row['energia'],
+            banda_ancha=row['banda_ancha'],
+            riesgo_ambiental=row['riesgo_ambiental'],
+            infraestructura_rural=row['infraestructura_rural'],
+            cultura=row['cultura'],
+            deporte=row['deporte']
+        )
+
+    def _asegurar_indice(self) -> Dict[Tuple[str, str], RegistroMunicipioPDET]:
+        """
+        Devuelve el índice vigente, recargándolo si la tabla cambió.
+
+        PRAGMA data_version solo cambia cuando otra conexión escribe en la
+        base, y total_changes cuenta las filas modificadas por la conexión
+        del hilo (que comparten los demás repositorios del archivo). Si
+        ninguno cambió no hay nada que releer; si cambió, se compara el
+        contador de cambios de la matriz para no recargar por escrituras
+        en otras tablas.
+        """
+        with self._lock:
+            conn = self.conexiones.conexion()
+            marca = (conn, conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+            if self._indice is not None and marca == self._marca_indice:
+                return self._indice
+
+            contador = conn.execute(
+                "SELECT contador FROM matriz_pdet_cambios WHERE id = 1"
+            ).fetchone()[0]
+            if self._indice is None or contador != self._contador_cambios:
+                self._cargar_indice(conn)
+                self._contador_cambios = contador
+            self._marca_indice = marca
+            return self._indice
+
+    def _cargar_indice(self, conn: sqlite3.Connection):
+        """Lee la tabla completa y arma los diccionarios normalizados"""
+        filas = conn.execute("SELECT * FROM matriz_pdet_zomac ORDER BY id").fetchall()
+
+        indice: Dict[Tuple[str, str], RegistroMunicipioPDET] = {}
+        municipios_departamento: Dict[str, set] = {}
+        registros: List[RegistroMunicipioPDET] = []
+        inverso = IndiceInversoMunicipios(self.normalizar_texto)
+        for row in filas:
+            departamento_norm = self.normalizar_texto(row['departamento'])
+            municipio_norm = self.normalizar_texto(row['municipio'])
+            inverso.agregar(row['departamento'], row['municipio'], True, fila_sector=len(registros))
+            registros.append(self._fila_a_registro(row))
+            # Ante duplicados normalizados gana la primera fila (como LIMIT 1)
+            indice.setdefault((departamento_norm, municipio_norm), registros[-1])
+            municipios_departamento.setdefault(departamento_norm, set()).add(row['municipio'])
+
+        self._indice = indice
+        self._filas = registros
+        self._indice_inverso = inverso
+        self._matriz = None  # Se arma al primer uso de get_matriz_sectores
+        self._indice_busqueda = None  # Ídem con buscar_municipios
+        self._municipios_departamento = {
+            depto: sorted(municipios) for depto, municipios in municipios_departamento.items()
+        }
+        self._departamentos = sorted({row['departamento'] for row in filas})
+        self._total_filas = len(filas)
+        self._version_indice = self._version_registrada(conn) or self._hash_filas(
+            (row['departamento'], row['municipio']) + tuple(row[c] for c in COLUMNAS_SECTORES)
+            for row in filas
+        )
+
+    @staticmethod
+    def _hash_filas(filas) -> str:
+        """Hash del contenido con el mismo formato que get_version en SQL"""
+        contenido = '|'.join(
+            ';'.join(str(valor) for valor in fila)
+            for fila in sorted(filas, key=lambda f: (f[0], f[1]))
+        )
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+
+    def refrescar(self):
+        """Fuerza la recarga del índice en la próxima consulta"""
+        with self._lock:
+            self._indice = None
+
+    def close(self):
+        """
+        Descarta el índice en memoria.
+
+        Las conexiones son del gestor compartido del archivo (también las
+        usan DatabaseManager e HistorialIA) y no se cierran aquí; para eso
+        está cerrar_conexiones().
+        """
+        with self._lock:
+            self._indice = None
+            self._marca_indice = None
 
     def get_municipio(self, departamento: str, municipio: str) -> Optional[RegistroMunicipioPDET]:
         """
@@ -118,33 +438,73 @@ class MatrizPDETRepository:
         Returns:
             RegistroMunicipioPDET si existe, None si no está en PDET/ZOMAC
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM matriz_pdet_zomac
-                WHERE UPPER(departamento) = UPPER(?)
-                AND UPPER(municipio) = UPPER(?)
-            """, (departamento, municipio))
-
-            row = cursor.fetchone()
-            if not row:
-                return None
-
-            return RegistroMunicipioPDET(
-                departamento=row['departamento'],
-                municipio=row['municipio'],
-                educacion=row['educacion'],
-                salud=row['salud'],
-                alcantarillado=row['alcantarillado'],
-                via=row['via'],
-                energia=row['energia'],
-                banda_ancha=row['banda_ancha'],
-                riesgo_ambiental=row['riesgo_ambiental'],
-                infraestructura_rural=row['infraestructura_rural'],
-                cultura=row['cultura'],
-                deporte=row['deporte']
+        if self.indexado:
+            return self._asegurar_indice().get(
+                (self.normalizar_texto(departamento), self.normalizar_texto(municipio))
             )
 
+        conn = self.conexiones.conexion()
+        cursor = conn.execute("""
+            SELECT * FROM matriz_pdet_zomac
+            WHERE departamento_norm = ? AND municipio_norm = ?
+            ORDER BY id
+            LIMIT 1
+        """, (self.normalizar_texto(departamento), self.normalizar_texto(municipio)))
+
+        row = cursor.fetchone()
+        if not row:
+            return None
+
+        return self._fila_a_registro(row)
+
+    def get_municipios_lote(
+        self,
+        pares: Iterable[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], RegistroMunicipioPDET]:
+        """
+        Resuelve muchos pares (departamento, municipio) de una vez.
+
+        Pensado para el scoring de carteras: en modo indexado no hace I/O;
+        en modo SQL usa una sola conexión y una consulta por bloque de
+        TAMANO_BLOQUE_CONSULTA pares sobre idx_depto_mun_norm.
+
+        Args:
+            pares: Pares (departamento, municipio) en cualquier formato
+
+        Returns:
+            Dict clave_normalizada → registro, solo para los pares encontrados
+        """
+        claves = list(dict.fromkeys(
+            self.clave_normalizada(departamento, municipio)
+            for departamento, municipio in pares
+        ))
+        if not claves:
+            return {}
+
+        if self.indexado:
+            indice = self._asegurar_indice()
+            return {clave: indice[clave] for clave in claves if clave in indice}
+
+        registros: Dict[Tuple[str, str], RegistroMunicipioPDET] = {}
+        conn = self.conexiones.conexion()
+        for inicio in range(0, len(claves), TAMANO_BLOQUE_CONSULTA):
+            bloque = claves[inicio:inicio + TAMANO_BLOQUE_CONSULTA]
+            marcadores = ", ".join("(?, ?)" for _ in bloque)
+            cursor = conn.execute(f"""
+                SELECT * FROM matriz_pdet_zomac
+                WHERE (departamento_norm, municipio_norm) IN (VALUES {marcadores})
+                ORDER BY id
+            """, [valor for clave in bloque for valor in clave])
+
+            for row in cursor.fetchall():
+                # Ante duplicados gana la primera fila, igual que get_municipio
+                registros.setdefault(
+                    (row['departamento_norm'], row['municipio_norm']),
+                    self._fila_a_registro(row)
+                )
+
+        return registros
+
     def get_municipios_por_puntaje_sector(
         self,
         sector: str,
@@ -160,45 +520,18 @@ class MatrizPDETRepository:
         Returns:
             Lista de registros ordenados por puntaje descendente
         """
-        # Normalizar nombre columna
-        sector_col = sector.lower().replace(' ', '_').replace('í', 'i').replace('ó', 'o')
+        # Validar y normalizar nombre de columna
+        sector_col = columna_sector(sector)
 
-        # Validar que sea columna válida
-        sectores_validos = [
-            'educacion', 'salud', 'alcantarillado', 'via', 'energia',
-            'banda_ancha', 'riesgo_ambiental', 'infraestructura_rural',
-            'cultura', 'deporte'
-        ]
+        if self.indexado:
+            with self._lock:
+                matriz = self.get_matriz_sectores()
+                return [self._filas[i] for i in matriz.filas_con_puntaje(sector_col, puntaje_minimo)]
 
-        if sector_col not in sectores_validos:
-            raise ValueError(f"Sector inválido: {sector}. Válidos: {sectores_validos}")
+        conn = self.conexiones.conexion()
+        cursor = conn.execute(CONSULTAS_PUNTAJE_SECTOR[sector_col], (puntaje_minimo,))
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            query = f"""
-                SELECT * FROM matriz_pdet_zomac
-                WHERE {sector_col} >= ?
-                ORDER BY {sector_col} DESC
-            """
-            cursor = conn.execute(query, (puntaje_minimo,))
-
-            return [
-                RegistroMunicipioPDET(
-                    departamento=row['departamento'],
-                    municipio=row['municipio'],
-                    educacion=row['educacion'],
-                    salud=row['salud'],
-                    alcantarillado=row['alcantarillado'],
-                    via=row['via'],
-                    energia=row['energia'],
-                    banda_ancha=row['banda_ancha'],
-                    riesgo_ambiental=row['riesgo_ambiental'],
-                    infraestructura_rural=row['infraestructura_rural'],
-                    cultura=row['cultura'],
-                    deporte=row['deporte']
-                )
-                for row in cursor.fetchall()
-            ]
+        return [self._fila_a_registro(row) for row in cursor.fetchall()]
 
     def es_municipio_pdet(self, municipio: str, departamento: str) -> bool:
         """
@@ -217,33 +550,87 @@ class MatrizPDETRepository:
         municipio_norm = self.normalizar_texto(municipio)
         departamento_norm = self.normalizar_texto(departamento)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if self.indexado:
+            return (departamento_norm, municipio_norm) in self._asegurar_indice()
+
+        conn = self.conexiones.conexion()
 
-        # Query con normalización en BD (todos los diacríticos)
+        # Igualdad sobre claves normalizadas (idx_depto_mun_norm)
         query = """
         SELECT COUNT(*)
         FROM matriz_pdet_zomac
-        WHERE REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
-                REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
-                  UPPER(municipio),
-                  'Á', 'A'), 'É', 'E'), 'Í', 'I'), 'Ó', 'O'), 'Ú', 'U'), 'Ñ', 'N'), 'Ü', 'U'),
-                'á', 'a'), 'é', 'e'), 'í', 'i'), 'ó', 'o'), 'ú', 'u'), 'ñ', 'n'), 'ü', 'u'
-        ) = ?
-        AND REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
-                REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
-                  UPPER(departamento),
-                  'Á', 'A'), 'É', 'E'), 'Í', 'I'), 'Ó', 'O'), 'Ú', 'U'), 'Ñ', 'N'), 'Ü', 'U'),
-                'á', 'a'), 'é', 'e'), 'í', 'i'), 'ó', 'o'), 'ú', 'u'), 'ñ', 'n'), 'ü', 'u'
-        ) = ?
-        """
-
-        cursor.execute(query, (municipio_norm, departamento_norm))
-        count = cursor.fetchone()[0]
-        conn.close()
+        WHERE departamento_norm = ? AND municipio_norm = ?
+        """
+
+        count = conn.execute(query, (departamento_norm, municipio_norm)).fetchone()[0]
 
         return count > 0
 
+    def get_departamentos_municipio(self, municipio: str) -> List[str]:
+        """
+        Departamentos PDET/ZOMAC donde existe un municipio con ese nombre.
+
+        Args:
+            municipio: Nombre del municipio (búsqueda normalizada)
+
+        Returns:
+            Nombres de departamento en el orden de la tabla
+        """
+        return [ubicacion.departamento for ubicacion in self._ubicaciones(municipio)]
+
+    def ubicar_municipio(self, municipio: str, departamentos: List[str]) -> Optional[UbicacionMunicipio]:
+        """
+        Ubica un municipio en el primero de `departamentos` donde es PDET/ZOMAC.
+
+        En modo indexado es una búsqueda en el índice inverso (municipio →
+        departamentos), sin consultar cada par. `fila_sector` indica la fila
+        del municipio en get_matriz_sectores().
+
+        Args:
+            municipio: Nombre del municipio
+            departamentos: Departamentos candidatos (p. ej. los del proyecto)
+
+        Returns:
+            UbicacionMunicipio, o None si no es PDET/ZOMAC en ninguno
+        """
+        if self.indexado:
+            with self._lock:
+                self._asegurar_indice()
+                return self._indice_inverso.ubicar(municipio, departamentos)
+
+        candidatos = {
+            self.normalizar_texto(ubicacion.departamento): ubicacion
+            for ubicacion in self._ubicaciones(municipio)
+        }
+        for departamento in departamentos:
+            ubicacion = candidatos.get(self.normalizar_texto(departamento))
+            if ubicacion is not None:
+                return ubicacion
+        return None
+
+    def _ubicaciones(self, municipio: str) -> List[UbicacionMunicipio]:
+        """Entradas del índice inverso para un municipio"""
+        if self.indexado:
+            with self._lock:
+                self._asegurar_indice()
+                return self._indice_inverso.ubicaciones(municipio)
+
+        conn = self.conexiones.conexion()
+        cursor = conn.execute("""
+            SELECT departamento, municipio, departamento_norm
+            FROM matriz_pdet_zomac
+            WHERE municipio_norm = ?
+            ORDER BY id
+        """, (self.normalizar_texto(municipio),))
+
+        ubicaciones: Dict[str, UbicacionMunicipio] = {}
+        for row in cursor.fetchall():
+            ubicaciones.setdefault(
+                row['departamento_norm'],
+                UbicacionMunicipio(row['departamento'], row['municipio'], True)
+            )
+        return list(ubicaciones.values())
+
     def get_puntajes_sectores(self, municipio: str, departamento: str) -> Dict[str, int]:
         """
         Obtiene los puntajes sectoriales para un municipio PDET.
@@ -261,54 +648,40 @@ class MatrizPDETRepository:
         municipio_norm = self.normalizar_texto(municipio)
         departamento_norm = self.normalizar_texto(departamento)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if self.indexado:
+            registro = self._asegurar_indice().get((departamento_norm, municipio_norm))
+            if registro is None:
+                return {}
+            return {
+                NOMBRES_SECTORES[columna]: getattr(registro, columna)
+                for columna in COLUMNAS_SECTORES
+            }
+
+        conn = self.conexiones.conexion()
 
-        # Query con normalización (todos los diacríticos)
+        # Igualdad sobre claves normalizadas (idx_depto_mun_norm)
         query = """
         SELECT
             educacion, salud, alcantarillado, via, energia,
             banda_ancha, riesgo_ambiental, infraestructura_rural,
             cultura, deporte
         FROM matriz_pdet_zomac
-        WHERE REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
-                REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
-                  UPPER(municipio),
-                  'Á', 'A'), 'É', 'E'), 'Í', 'I'), 'Ó', 'O'), 'Ú', 'U'), 'Ñ', 'N'), 'Ü', 'U'),
-                'á', 'a'), 'é', 'e'), 'í', 'i'), 'ó', 'o'), 'ú', 'u'), 'ñ', 'n'), 'ü', 'u'
-        ) = ?
-        AND REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
-                REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
-                  UPPER(departamento),
-                  'Á', 'A'), 'É', 'E'), 'Í', 'I'), 'Ó', 'O'), 'Ú', 'U'), 'Ñ', 'N'), 'Ü', 'U'),
-                'á', 'a'), 'é', 'e'), 'í', 'i'), 'ó', 'o'), 'ú', 'u'), 'ñ', 'n'), 'ü', 'u'
-        ) = ?
+        WHERE departamento_norm = ? AND municipio_norm = ?
+        ORDER BY id
         LIMIT 1
         """
 
-        cursor.execute(query, (municipio_norm, departamento_norm))
-        resultado = cursor.fetchone()
-        conn.close()
+        resultado = conn.execute(query, (departamento_norm, municipio_norm)).fetchone()
 
         if not resultado:
             return {}
 
         # Mapear a nombres de sectores
-        sectores = {
-            'Educación': resultado[0],
-            'Salud': resultado[1],
-            'Alcantarillado': resultado[2],
-            'Infraestructura Vial': resultado[3],
-            'Energía': resultado[4],
-            'Banda Ancha': resultado[5],
-            'Riesgo Ambiental': resultado[6],
-            'Infraestructura Rural': resultado[7],
-            'Cultura': resultado[8],
-            'Deporte': resultado[9]
+        return {
+            NOMBRES_SECTORES[columna]: puntaje
+            for columna, puntaje in zip(COLUMNAS_SECTORES, resultado)
         }
 
-        return sectores
-
     def get_departamentos(self) -> List[str]:
         """
         Lista todos los departamentos PDET/ZOMAC.
@@ -316,13 +689,17 @@ class MatrizPDETRepository:
         Returns:
             Lista de nombres de departamentos ordenados alfabéticamente
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT DISTINCT departamento
-                FROM matriz_pdet_zomac
-                ORDER BY departamento
-            """)
-            return [row[0] for row in cursor.fetchall()]
+        if self.indexado:
+            self._asegurar_indice()
+            return list(self._departamentos)
+
+        conn = self.conexiones.conexion()
+        cursor = conn.execute("""
+            SELECT DISTINCT departamento
+            FROM matriz_pdet_zomac
+            ORDER BY departamento
+        """)
+        return [row[0] for row in cursor.fetchall()]
 
     def get_municipios_por_departamento(self, departamento: str) -> List[str]:
         """
@@ -339,27 +716,21 @@ class MatrizPDETRepository:
         # Normalizar entrada
         departamento_norm = self.normalizar_texto(departamento)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if self.indexado:
+            self._asegurar_indice()
+            return list(self._municipios_departamento.get(departamento_norm, []))
+
+        conn = self.conexiones.conexion()
 
-        # Query con normalización (todos los diacríticos)
+        # Igualdad sobre el prefijo de idx_depto_mun_norm
         query = """
         SELECT DISTINCT municipio
         FROM matriz_pdet_zomac
-        WHERE REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
-                REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(
-                  UPPER(departamento),
-                  'Á', 'A'), 'É', 'E'), 'Í', 'I'), 'Ó', 'O'), 'Ú', 'U'), 'Ñ', 'N'), 'Ü', 'U'),
-                'á', 'a'), 'é', 'e'), 'í', 'i'), 'ó', 'o'), 'ú', 'u'), 'ñ', 'n'), 'ü', 'u'
-        ) = ?
+        WHERE departamento_norm = ?
         ORDER BY municipio
         """
 
-        cursor.execute(query, (departamento_norm,))
-        municipios = [row[0] for row in cursor.fetchall()]
-        conn.close()
-
-        return municipios
+        return [row[0] for row in conn.execute(query, (departamento_norm,)).fetchall()]
 
     def get_total_municipios(self) -> int:
         """
@@ -368,51 +739,540 @@ class MatrizPDETRepository:
         Returns:
             Número total de municipios en la matriz
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM matriz_pdet_zomac")
-            return cursor.fetchone()[0]
+        if self.indexado:
+            with self._lock:
+                self._asegurar_indice()
+                return self._total_filas
+
+        conn = self.conexiones.conexion()
+        cursor = conn.execute("SELECT COUNT(*) FROM matriz_pdet_zomac")
+        return cursor.fetchone()[0]
+
+    def get_version(self) -> str:
+        """
+        Obtiene un sello de versión del contenido de la matriz.
+
+        Es un hash de todas las filas (nombres y puntajes), por lo que cambia
+        con cualquier recarga o edición de la tabla. Permite a cachés de
+        scoring invalidarse cuando cambian los datos PDET/ZOMAC.
+
+        Si la tabla no cambió desde la última carga con cargar_matriz, se
+        lee el hash registrado en matriz_pdet_versiones sin recorrer filas.
+
+        Returns:
+            Hash hexadecimal de 16 caracteres
+        """
+        if self.indexado:
+            with self._lock:
+                self._asegurar_indice()
+                return self._version_indice
+
+        conn = self.conexiones.conexion()
+        version = self._version_registrada(conn)
+        if version is not None:
+            return version
+
+        # Tabla sin versión registrada: el hash se recalcula solo si el
+        # contador de cambios avanzó desde el último cálculo
+        contador = conn.execute(
+            "SELECT contador FROM matriz_pdet_cambios WHERE id = 1"
+        ).fetchone()[0]
+        if self._version_sql is not None and self._version_sql[0] == contador:
+            return self._version_sql[1]
+
+        cursor = conn.execute("""
+            SELECT group_concat(fila, '|') FROM (
+                SELECT departamento || ';' || municipio || ';' ||
+                       educacion || ';' || salud || ';' || alcantarillado || ';' ||
+                       via || ';' || energia || ';' || banda_ancha || ';' ||
+                       riesgo_ambiental || ';' || infraestructura_rural || ';' ||
+                       cultura || ';' || deporte AS fila
+                FROM matriz_pdet_zomac
+                ORDER BY departamento, municipio
+            )
+        """)
+        contenido = cursor.fetchone()[0] or ""
+
+        version = hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+        self._version_sql = (contador, version)
+        return version
+
+    # ========== CARGA MASIVA Y VERSIONES ==========
+
+    @staticmethod
+    def _version_registrada(conn: sqlite3.Connection) -> Optional[str]:
+        """Versión vigente si la tabla no cambió desde la última carga"""
+        row = conn.execute("""
+            SELECT v.version
+            FROM matriz_pdet_versiones v
+            JOIN matriz_pdet_cambios c ON c.id = 1 AND c.contador = v.contador
+            WHERE v.vigente = 1
+        """).fetchone()
+        return row[0] if row else None
+
+    @classmethod
+    def validar_filas(cls, filas: Iterable[Sequence]) -> Tuple[List[Tuple], int]:
+        """
+        Valida y limpia filas (departamento, municipio, 10 puntajes).
+
+        Los nombres se pasan a mayúsculas sin espacios sobrantes y los
+        puntajes a enteros. Las filas repetidas (mismo departamento y
+        municipio) se descartan conservando la primera.
+
+        Returns:
+            (filas limpias, número de duplicados descartados)
+
+        Raises:
+            ValueError: Con la lista de filas inválidas (campos faltantes,
+                puntajes no numéricos o fuera de 1-10)
+        """
+        limpias: List[Tuple] = []
+        vistos = set()
+        duplicados = 0
+        errores: List[str] = []
+
+        for numero, fila in enumerate(filas, start=1):
+            fila = tuple(fila)
+            if len(fila) != 2 + len(COLUMNAS_SECTORES):
+                errores.append(f"Fila {numero}: se esperaban {2 + len(COLUMNAS_SECTORES)} columnas, hay {len(fila)}")
+                continue
+
+            departamento = str(fila[0] or '').upper().strip()
+            municipio = str(fila[1] or '').upper().strip()
+            if not departamento or not municipio:
+                errores.append(f"Fila {numero}: departamento y municipio son obligatorios")
+                continue
+
+            try:
+                puntajes = tuple(int(valor) for valor in fila[2:])
+            except (TypeError, ValueError):
+                errores.append(f"Fila {numero} ({municipio}): puntajes no numéricos")
+                continue
+            fuera_rango = [
+                columna for columna, puntaje in zip(COLUMNAS_SECTORES, puntajes)
+                if not 1 <= puntaje <= 10
+            ]
+            if fuera_rango:
+                errores.append(f"Fila {numero} ({municipio}): puntajes fuera de 1-10 en {', '.join(fuera_rango)}")
+                continue
+
+            if (departamento, municipio) in vistos:
+                duplicados += 1
+                continue
+            vistos.add((departamento, municipio))
+            limpias.append((departamento, municipio) + puntajes)
+
+        if errores:
+            raise ValueError(f"Matriz inválida ({len(errores)} errores): " + "; ".join(errores[:20]))
+        if not limpias:
+            raise ValueError("La matriz no tiene filas")
+
+        return limpias, duplicados
+
+    def cargar_matriz(self, filas: Iterable[Sequence], origen: Optional[str] = None) -> ResultadoCargaMatriz:
+        """
+        Reemplaza la matriz completa en una sola transacción.
 
-    def get_estadisticas_sector(self, sector: str) -> dict:
+        Valida las filas, calcula su versión (mismo hash que get_version),
+        inserta con executemany y guarda una copia de la versión en
+        matriz_pdet_snapshots. Si la tabla ya tiene ese contenido no se
+        reescriben filas (solo se registra la versión si faltaba). Ante
+        cualquier error la tabla queda como estaba.
+
+        Args:
+            filas: Filas (departamento, municipio, 10 puntajes 1-10)
+            origen: Descripción de la fuente (p. ej. ruta del Excel)
+
+        Returns:
+            ResultadoCargaMatriz con la versión cargada
+        """
+        limpias, duplicados = self.validar_filas(filas)
+        version = self._hash_filas(limpias)
+
+        with self._lock:
+            conn = self.conexiones.conexion()
+            if self._version_registrada(conn) == version:
+                return ResultadoCargaMatriz(version, len(limpias), duplicados, cambio=False)
+
+            # Mismo contenido aún sin registrar: solo se registra la versión
+            anterior = self.get_version()
+            cambio = anterior != version
+
+            with self.conexiones.transaccion() as conn:
+                if cambio:
+                    # Conservar la versión saliente para comparar_versiones
+                    self._guardar_snapshot(conn, anterior, [
+                        tuple(row) for row in conn.execute(f"""
+                            SELECT departamento, municipio, {', '.join(COLUMNAS_SECTORES)}
+                            FROM matriz_pdet_zomac ORDER BY id
+                        """)
+                    ])
+                    conn.execute("DELETE FROM matriz_pdet_zomac")
+                    conn.executemany(f"""
+                        INSERT INTO matriz_pdet_zomac (
+                            departamento, municipio, {', '.join(COLUMNAS_SECTORES)},
+                            departamento_norm, municipio_norm
+                        ) VALUES ({', '.join('?' * (len(COLUMNAS_SECTORES) + 4))})
+                    """, [
+                        fila + (self.normalizar_texto(fila[0]), self.normalizar_texto(fila[1]))
+                        for fila in limpias
+                    ])
+                self._registrar_version(conn, version, limpias, origen)
+
+            self.refrescar()
+            self._estadisticas_vigentes()
+
+        return ResultadoCargaMatriz(
+            version, len(limpias), duplicados, cambio=cambio,
+            version_anterior=anterior if cambio else None
+        )
+
+    @staticmethod
+    def _guardar_snapshot(conn: sqlite3.Connection, version: str, filas: List[Tuple]):
+        """Copia las filas de una versión a matriz_pdet_snapshots (si faltaban)"""
+        if not filas or conn.execute(
+            "SELECT 1 FROM matriz_pdet_snapshots WHERE version = ? LIMIT 1", (version,)
+        ).fetchone():
+            return
+        conn.executemany(f"""
+            INSERT INTO matriz_pdet_snapshots (
+                version, orden, departamento, municipio, {', '.join(COLUMNAS_SECTORES)}
+            ) VALUES ({', '.join('?' * (len(COLUMNAS_SECTORES) + 4))})
+        """, [(version, orden) + fila for orden, fila in enumerate(filas)])
+
+    @classmethod
+    def _registrar_version(cls, conn: sqlite3.Connection, version: str, filas: List[Tuple], origen: Optional[str]):
+        """Guarda el snapshot de la versión y la marca como vigente"""
+        cls._guardar_snapshot(conn, version, filas)
+
+        # Contador de cambios tras la carga: get_version confía en la versión
+        # registrada mientras nadie más modifique la tabla
+        contador = conn.execute(
+            "SELECT contador FROM matriz_pdet_cambios WHERE id = 1"
+        ).fetchone()[0]
+        conn.execute("UPDATE matriz_pdet_versiones SET vigente = 0 WHERE vigente = 1")
+        conn.execute("""
+            INSERT INTO matriz_pdet_versiones
+                (version, fecha_carga, origen, total_filas, contador, vigente)
+            VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT(version) DO UPDATE SET
+                fecha_carga = excluded.fecha_carga,
+                origen = excluded.origen,
+                contador = excluded.contador,
+                vigente = 1
+        """, (version, datetime.now().isoformat(), origen, len(filas), contador))
+
+    def get_versiones(self) -> List[Dict]:
+        """
+        Versiones cargadas, de la más reciente a la más antigua.
+
+        Returns:
+            Lista de dicts (version, fecha_carga, origen, total_filas, vigente)
+        """
+        conn = self.conexiones.conexion()
+        cursor = conn.execute("""
+            SELECT version, fecha_carga, origen, total_filas, vigente
+            FROM matriz_pdet_versiones
+            ORDER BY fecha_carga DESC
+        """)
+        return [
+            {**dict(row), 'vigente': bool(row['vigente'])}
+            for row in cursor.fetchall()
+        ]
+
+    def get_snapshot(self, version: str) -> List[RegistroMunicipioPDET]:
+        """
+        Registros de una versión guardada, en el orden en que se cargó.
+
+        Raises:
+            ValueError: Si la versión no existe
+        """
+        conn = self.conexiones.conexion()
+        filas = conn.execute(
+            "SELECT * FROM matriz_pdet_snapshots WHERE version = ? ORDER BY orden", (version,)
+        ).fetchall()
+        if not filas:
+            raise ValueError(f"Versión de matriz no encontrada: {version}")
+        return [self._fila_a_registro(row) for row in filas]
+
+    def restaurar_version(self, version: str) -> ResultadoCargaMatriz:
+        """Vuelve a cargar como vigente una versión guardada."""
+        return self.cargar_matriz(
+            [
+                (r.departamento, r.municipio) + tuple(getattr(r, c) for c in COLUMNAS_SECTORES)
+                for r in self.get_snapshot(version)
+            ],
+            origen=f"restaurada:{version}"
+        )
+
+    def comparar_versiones(self, version_anterior: str, version_nueva: Optional[str] = None) -> DiferenciaMatriz:
+        """
+        Municipios y sectores que cambiaron entre dos versiones.
+
+        Args:
+            version_anterior: Versión guardada (ver get_versiones)
+            version_nueva: Otra versión guardada (None = contenido vigente)
+
+        Returns:
+            DiferenciaMatriz con municipios agregados, eliminados y
+            columnas de sector modificadas
+
+        Raises:
+            ValueError: Si alguna versión no existe
+        """
+        anteriores = self.get_snapshot(version_anterior)
+        if version_nueva is None:
+            version_nueva = self.get_version()
+            if self.indexado:
+                with self._lock:
+                    self._asegurar_indice()
+                    nuevos = list(self._filas)
+            else:
+                conn = self.conexiones.conexion()
+                nuevos = [
+                    self._fila_a_registro(row)
+                    for row in conn.execute("SELECT * FROM matriz_pdet_zomac ORDER BY id")
+                ]
+        else:
+            nuevos = self.get_snapshot(version_nueva)
+
+        return self.comparar_registros(anteriores, nuevos, version_anterior, version_nueva)
+
+    @classmethod
+    def comparar_registros(
+        cls,
+        anteriores: Iterable[RegistroMunicipioPDET],
+        nuevos: Iterable[RegistroMunicipioPDET],
+        version_anterior: str = "",
+        version_nueva: str = ""
+    ) -> DiferenciaMatriz:
+        """
+        Compara dos listas de registros por (departamento, municipio) normalizados.
+
+        Ante duplicados normalizados cuenta el primero, igual que get_municipio.
+        """
+        def por_clave(registros):
+            resultado: Dict[Tuple[str, str], RegistroMunicipioPDET] = {}
+            for registro in registros:
+                resultado.setdefault(cls.clave_normalizada(registro.departamento, registro.municipio), registro)
+            return resultado
+
+        previos = por_clave(anteriores)
+        actuales = por_clave(nuevos)
+
+        diferencia = DiferenciaMatriz(version_anterior, version_nueva)
+        for clave, registro in actuales.items():
+            previo = previos.get(clave)
+            if previo is None:
+                diferencia.agregados.append(clave)
+                continue
+            columnas = tuple(
+                columna for columna in COLUMNAS_SECTORES
+                if getattr(previo, columna) != getattr(registro, columna)
+            )
+            if columnas:
+                diferencia.cambios[clave] = columnas
+        diferencia.eliminados = [clave for clave in previos if clave not in actuales]
+
+        return diferencia
+
+    # ========== ESTADÍSTICAS MATERIALIZADAS ==========
+
+    def get_estadisticas_sector(self, sector: str, departamento: Optional[str] = None) -> dict:
         """
         Obtiene estadísticas de un sector.
 
+        Se sirven desde las estadísticas materializadas de la versión
+        vigente (ver _estadisticas_vigentes), sin consultar la tabla base.
+
         Args:
             sector: Nombre del sector
+            departamento: Limitar a un departamento (None = todos)
 
         Returns:
-            Diccionario con estadísticas (promedio, max, min, etc.)
-        """
-        # Normalizar nombre columna
-        sector_col = sector.lower().replace(' ', '_').replace('í', 'i').replace('ó', 'o')
-
-        with sqlite3.connect(self.db_path) as conn:
-            query = f"""
-                SELECT
-                    AVG({sector_col}) as promedio,
-                    MAX({sector_col}) as maximo,
-                    MIN({sector_col}) as minimo,
-                    COUNT(CASE WHEN {sector_col} >= 7 THEN 1 END) as alta_prioridad,
-                    COUNT(CASE WHEN {sector_col} BETWEEN 4 AND 6 THEN 1 END) as media_prioridad,
-                    COUNT(CASE WHEN {sector_col} <= 3 THEN 1 END) as baja_prioridad
-                FROM matriz_pdet_zomac
-            """
-            cursor = conn.execute(query)
-            row = cursor.fetchone()
+            Diccionario con estadísticas (promedio, max, min, bandas de
+            prioridad y percentiles)
 
-            return {
-                'sector': sector,
-                'promedio': round(row[0], 2),
-                'maximo': row[1],
-                'minimo': row[2],
-                'municipios_alta_prioridad': row[3],
-                'municipios_media_prioridad': row[4],
-                'municipios_baja_prioridad': row[5]
-            }
+        Raises:
+            ValueError: Si el sector o el departamento no existen, o la
+                matriz está vacía
+        """
+        columna = columna_sector(sector)
+        por_sector = self.get_estadisticas_sectores(departamento)
+        if columna not in por_sector:
+            raise ValueError("La matriz PDET/ZOMAC no tiene municipios")
+        estadisticas = dict(por_sector[columna])
+        estadisticas['sector'] = sector
+        return estadisticas
+
+    def get_estadisticas_sectores(self, departamento: Optional[str] = None) -> Dict[str, dict]:
+        """
+        Estadísticas de los 10 sectores.
+
+        Args:
+            departamento: Limitar a un departamento (None = todos)
+
+        Returns:
+            {columna_sector: dict con el formato de get_estadisticas_sector}
+
+        Raises:
+            ValueError: Si el departamento no está en la matriz
+        """
+        estadisticas = self._estadisticas_vigentes()
+        clave = self.normalizar_texto(departamento) if departamento else ''
+        if clave not in estadisticas:
+            if not departamento:
+                return {}
+            raise ValueError(f"Departamento sin municipios en la matriz: {departamento}")
+        return {columna: dict(valores) for columna, valores in estadisticas[clave].items()}
+
+    def get_estadisticas_departamentos(self, sector: str) -> Dict[str, dict]:
+        """
+        Estadísticas de un sector en cada departamento.
+
+        Returns:
+            {departamento: dict con el formato de get_estadisticas_sector}
+        """
+        columna = columna_sector(sector)
+        return {
+            por_sector[columna]['departamento']: {**por_sector[columna], 'sector': sector}
+            for clave, por_sector in sorted(self._estadisticas_vigentes().items())
+            if clave
+        }
+
+    def _estadisticas_vigentes(self) -> Dict[str, Dict[str, dict]]:
+        """
+        Estadísticas de la versión vigente: {departamento_norm: {columna: dict}}.
+
+        Se calculan una vez por versión desde la matriz NumPy y se guardan
+        en matriz_pdet_estadisticas; otras instancias las leen de ahí. En
+        memoria se conservan mientras no cambie la versión.
+        """
+        version = self.get_version()
+        with self._lock:
+            if self._estadisticas is not None and self._version_estadisticas == version:
+                return self._estadisticas
+
+            conn = self.conexiones.conexion()
+            filas = conn.execute(
+                "SELECT * FROM matriz_pdet_estadisticas WHERE version = ?", (version,)
+            ).fetchall()
+            if filas:
+                estadisticas: Dict[str, Dict[str, dict]] = {}
+                for row in filas:
+                    valores = {'sector': row['sector']}
+                    if row['departamento_norm']:
+                        valores['departamento'] = row['departamento']
+                    valores.update((campo, row[campo]) for campo, _ in CAMPOS_ESTADISTICAS)
+                    estadisticas.setdefault(row['departamento_norm'], {})[row['sector']] = valores
+            else:
+                estadisticas = self._materializar_estadisticas(version)
+
+            self._estadisticas = estadisticas
+            self._version_estadisticas = version
+            return estadisticas
+
+    def _materializar_estadisticas(self, version: str) -> Dict[str, Dict[str, dict]]:
+        """Calcula las estadísticas de la versión y reemplaza las guardadas de esa versión"""
+        matriz = self.get_matriz_sectores()
+        estadisticas = matriz.estadisticas_departamentos()
+        nacional = matriz.estadisticas_sectores()
+        if nacional:
+            estadisticas[''] = nacional
+
+        campos = [campo for campo, _ in CAMPOS_ESTADISTICAS]
+        with self.conexiones.transaccion() as conn:
+            conn.execute("DELETE FROM matriz_pdet_estadisticas WHERE version = ?", (version,))
+            conn.executemany(f"""
+                INSERT INTO matriz_pdet_estadisticas (
+                    version, departamento_norm, departamento, sector, {', '.join(campos)}
+                ) VALUES ({', '.join('?' * (len(campos) + 4))})
+            """, [
+                (version, clave, valores.get('departamento'), columna) + tuple(valores[c] for c in campos)
+                for clave, por_sector in estadisticas.items()
+                for columna, valores in por_sector.items()
+            ])
+        return estadisticas
+
+    # ========== MATRIZ SECTORIAL (NUMPY) ==========
+
+    def get_matriz_sectores(self, directorio_cache: Optional[str] = None) -> MatrizSectores:
+        """
+        Puntajes sectoriales como matriz NumPy (filas × 10 sectores).
+
+        En modo indexado la matriz se arma desde el índice en memoria (sus
+        filas coinciden con las del índice) y se conserva mientras la tabla
+        no cambie. En modo SQL, con `directorio_cache` se abre la matriz
+        guardada para la versión vigente con memoria mapeada, en lugar de
+        leer la tabla. En ambos modos se guarda en caché si aún no existe.
+
+        Args:
+            directorio_cache: Directorio para el archivo .npy (opcional)
+
+        Returns:
+            MatrizSectores de la versión vigente
+        """
+        if self.indexado:
+            with self._lock:
+                self._asegurar_indice()
+                if self._matriz is None:
+                    self._matriz = MatrizSectores.desde_filas(
+                        (
+                            (r.departamento, r.municipio) + tuple(getattr(r, c) for c in COLUMNAS_SECTORES)
+                            for r in self._filas
+                        ),
+                        self.normalizar_texto,
+                        self._version_indice
+                    )
+                if directorio_cache and not MatrizSectores.existe_cache(directorio_cache, self._matriz.version):
+                    self._matriz.guardar(directorio_cache)
+                return self._matriz
+
+        version = self.get_version()
+        if directorio_cache:
+            matriz = MatrizSectores.cargar(directorio_cache, version)
+            if matriz is not None:
+                return matriz
+
+        conn = self.conexiones.conexion()
+        filas = conn.execute(f"""
+            SELECT departamento, municipio, {', '.join(COLUMNAS_SECTORES)}
+            FROM matriz_pdet_zomac
+            ORDER BY id
+        """).fetchall()
+        matriz = MatrizSectores.desde_filas(filas, self.normalizar_texto, version)
+        if directorio_cache:
+            matriz.guardar(directorio_cache)
+        return matriz
+
+    def get_top_municipios_sectores(
+        self,
+        pesos: Dict[str, float],
+        n: int = 10,
+        departamento: Optional[str] = None
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Municipios con mayor prioridad ponderada en un conjunto de sectores.
+
+        Args:
+            pesos: {sector: peso}, ej. {'educacion': 2, 'salud': 1}
+            n: Número de municipios a retornar
+            departamento: Limitar a un departamento (búsqueda normalizada)
+
+        Returns:
+            Lista de (departamento, municipio, puntaje ponderado 1-10)
+        """
+        return self.get_matriz_sectores().top_municipios(
+            pesos, n=n, departamento=departamento, normalizar=self.normalizar_texto
+        )
 
     def buscar_municipios(self, texto: str, limite: int = 10) -> List[Tuple[str, str]]:
         """
         Busca municipios por nombre parcial.
 
+        La búsqueda es aproximada (trigramas): ignora tildes, tolera errores
+        de digitación y ordena por similitud (ver buscar_municipios_similares).
+
         Args:
             texto: Texto a buscar en nombre de municipio
             limite: Número máximo de resultados
@@ -420,16 +1280,44 @@ class MatrizPDETRepository:
         Returns:
             Lista de tuplas (departamento, municipio)
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT departamento, municipio
-                FROM matriz_pdet_zomac
-                WHERE UPPER(municipio) LIKE UPPER(?)
-                ORDER BY municipio
-                LIMIT ?
-            """, (f"%{texto}%", limite))
+        return [
+            (resultado.departamento, resultado.municipio)
+            for resultado in self.buscar_municipios_similares(texto, limite)
+        ]
 
-            return [(row[0], row[1]) for row in cursor.fetchall()]
+    def buscar_municipios_similares(
+        self,
+        texto: str,
+        limite: int = 10,
+        departamento: Optional[str] = None
+    ) -> List[ResultadoBusquedaMunicipio]:
+        """
+        Búsqueda aproximada de municipios PDET/ZOMAC ordenada por similitud.
+
+        Args:
+            texto: Nombre de municipio y/o departamento (ej. 'agustin codazi')
+            limite: Número máximo de resultados
+            departamento: Restringir a un departamento (opcional)
+
+        Returns:
+            Lista de ResultadoBusquedaMunicipio de mayor a menor similitud
+        """
+        if not self.indexado:
+            # Sin índice en memoria: índice temporal sobre la tabla vigente
+            conn = self.conexiones.conexion()
+            indice = IndiceTrigramas(self.normalizar_texto)
+            for row in conn.execute("SELECT departamento, municipio FROM matriz_pdet_zomac ORDER BY id"):
+                indice.agregar(row['departamento'], row['municipio'])
+            return indice.buscar(texto, limite, departamento=departamento)
+
+        with self._lock:
+            self._asegurar_indice()
+            if self._indice_busqueda is None:
+                indice = IndiceTrigramas(self.normalizar_texto)
+                for registro in self._filas:
+                    indice.agregar(registro.departamento, registro.municipio)
+                self._indice_busqueda = indice
+            return self._indice_busqueda.buscar(texto, limite, departamento=departamento)
 
     def vaciar_tabla(self):
         """
@@ -438,9 +1326,8 @@ class MatrizPDETRepository:
 
         ⚠️ PRECAUCIÓN: Operación destructiva.
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self.conexiones.transaccion() as conn:
             conn.execute("DELETE FROM matriz_pdet_zomac")
-            conn.commit()
 
     def __str__(self) -> str:
         """Representación legible del repositorio"""
@@ -0,0 +1,383 @@
+"""
+Matriz numérica de puntajes sectoriales PDET/ZOMAC.
+
+Representa los puntajes 1-10 de la tabla matriz_pdet_zomac como un arreglo
+NumPy (filas × 10 sectores) con mapas de fila por (departamento, municipio)
+normalizados y de columna por sector. Las estadísticas por sector, los
+filtros por puntaje y los rankings ponderados se resuelven con reducciones
+vectorizadas en lugar de una consulta SQL por sector.
+
+La matriz puede guardarse en un archivo .npy (más un .json con las claves)
+y abrirse luego con memoria mapeada, sin volver a leer la base.
+"""
+import json
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Columnas de puntaje sectorial en el orden de la tabla
+COLUMNAS_SECTORES = (
+    'educacion', 'salud', 'alcantarillado', 'via', 'energia',
+    'banda_ancha', 'riesgo_ambiental', 'infraestructura_rural',
+    'cultura', 'deporte'
+)
+
+# Mismos nombres que RegistroMunicipioPDET.get_sectores_ordenados
+NOMBRES_REGISTRO = (
+    'Educación', 'Salud', 'Alcantarillado', 'Vía', 'Energía',
+    'Banda Ancha', 'Riesgo Ambiental', 'Infraestructura Rural',
+    'Cultura', 'Deporte'
+)
+
+# Variantes de nombre aceptadas además del nombre de columna
+ALIAS_SECTORES = {
+    'vias': 'via',
+    'infraestructura_vial': 'via',
+    'conectividad': 'banda_ancha',
+    'infra_rural': 'infraestructura_rural',
+    'deportes': 'deporte',
+}
+
+# Bandas de get_estadisticas_sector
+UMBRAL_ALTA_PRIORIDAD = 7
+UMBRAL_BAJA_PRIORIDAD = 3
+
+# Percentiles incluidos en las estadísticas (interpolación lineal)
+PERCENTILES = (25, 50, 75, 90)
+
+
+def columna_sector(sector: str) -> str:
+    """
+    Traduce un nombre de sector a su columna en la matriz.
+
+    Acepta el nombre de columna ('banda_ancha'), el nombre legible
+    ('Banda Ancha', 'Educación') y variantes comunes ('Vías', 'Conectividad').
+
+    Raises:
+        ValueError: Si el sector no corresponde a ninguna columna
+    """
+    texto = unicodedata.normalize('NFD', str(sector).strip().lower())
+    texto = ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
+    columna = '_'.join(texto.split())
+    columna = ALIAS_SECTORES.get(columna, columna)
+
+    if columna not in COLUMNAS_SECTORES:
+        raise ValueError(f"Sector inválido: {sector}. Válidos: {list(COLUMNAS_SECTORES)}")
+    return columna
+
+
+class MatrizSectores:
+    """
+    Puntajes sectoriales como matriz NumPy con índices de fila y columna.
+
+    Atributos:
+        puntajes: Arreglo (filas × 10) de enteros, en el orden de la tabla
+        departamentos / municipios: Nombres originales por fila
+        claves: (departamento, municipio) normalizados por fila
+        fila_por_clave: Primera fila de cada clave (igual que get_municipio)
+        columna_por_sector: Índice de columna por nombre de columna
+        version: Sello de versión de la matriz de origen
+    """
+
+    def __init__(
+        self,
+        puntajes: np.ndarray,
+        departamentos: Sequence[str],
+        municipios: Sequence[str],
+        claves: Sequence[Tuple[str, str]],
+        version: Optional[str] = None
+    ):
+        puntajes = np.asanyarray(puntajes)
+        if puntajes.ndim != 2 or puntajes.shape[1] != len(COLUMNAS_SECTORES):
+            raise ValueError(
+                f"Se esperaba una matriz (n, {len(COLUMNAS_SECTORES)}), recibido: {puntajes.shape}"
+            )
+        if not (len(departamentos) == len(municipios) == len(claves) == puntajes.shape[0]):
+            raise ValueError("Nombres y claves deben tener una entrada por fila")
+
+        self.puntajes = puntajes
+        self.departamentos = list(departamentos)
+        self.municipios = list(municipios)
+        self.claves = [tuple(clave) for clave in claves]
+        self.version = version
+
+        self.columna_por_sector: Dict[str, int] = {
+            columna: j for j, columna in enumerate(COLUMNAS_SECTORES)
+        }
+        self.fila_por_clave: Dict[Tuple[str, str], int] = {}
+        for i, clave in enumerate(self.claves):
+            self.fila_por_clave.setdefault(clave, i)
+
+        # Filas únicas por clave (para rankings sin municipios repetidos)
+        self.filas_unicas = np.zeros(len(self.claves), dtype=bool)
+        self.filas_unicas[list(self.fila_por_clave.values())] = True
+
+    @classmethod
+    def desde_filas(
+        cls,
+        filas: Iterable[Tuple],
+        normalizar,
+        version: Optional[str] = None
+    ) -> 'MatrizSectores':
+        """
+        Construye la matriz desde tuplas (departamento, municipio, 10 puntajes).
+
+        Args:
+            filas: Filas en el orden de la tabla
+            normalizar: Función de normalización de nombres (normalizar_texto)
+            version: Sello de versión de la matriz
+        """
+        filas = list(filas)
+        puntajes = np.array(
+            [fila[2:] for fila in filas], dtype=np.int8
+        ).reshape(len(filas), len(COLUMNAS_SECTORES))
+        return cls(
+            puntajes,
+            departamentos=[fila[0] for fila in filas],
+            municipios=[fila[1] for fila in filas],
+            claves=[(normalizar(fila[0]), normalizar(fila[1])) for fila in filas],
+            version=version
+        )
+
+    def __len__(self) -> int:
+        return self.puntajes.shape[0]
+
+    # ========== CACHÉ EN DISCO ==========
+
+    @staticmethod
+    def _rutas_cache(directorio: str, version: str) -> Tuple[Path, Path]:
+        base = Path(directorio) / f"matriz_sectores_{version}"
+        return base.with_suffix('.npy'), base.with_suffix('.json')
+
+    @classmethod
+    def existe_cache(cls, directorio: str, version: str) -> bool:
+        """Indica si hay una matriz guardada para esa versión."""
+        return all(ruta.exists() for ruta in cls._rutas_cache(directorio, version))
+
+    def guardar(self, directorio: str) -> Path:
+        """
+        Guarda la matriz (.npy) y sus claves (.json) para esta versión.
+
+        Returns:
+            Ruta del archivo .npy
+        """
+        if not self.version:
+            raise ValueError("La matriz necesita una versión para guardarse en caché")
+
+        ruta_npy, ruta_json = self._rutas_cache(directorio, self.version)
+        ruta_npy.parent.mkdir(parents=True, exist_ok=True)
+        np.save(ruta_npy, np.ascontiguousarray(self.puntajes))
+        ruta_json.write_text(json.dumps({
+            'version': self.version,
+            'departamentos': self.departamentos,
+            'municipios': self.municipios,
+            'claves': self.claves,
+        }, ensure_ascii=False), encoding='utf-8')
+        return ruta_npy
+
+    @classmethod
+    def cargar(cls, directorio: str, version: str, mmap: bool = True) -> Optional['MatrizSectores']:
+        """
+        Abre la matriz guardada para una versión.
+
+        Args:
+            directorio: Directorio de caché
+            version: Versión buscada
+            mmap: Si True, los puntajes se mapean en memoria (solo lectura)
+
+        Returns:
+            MatrizSectores, o None si no hay caché para esa versión
+        """
+        if not cls.existe_cache(directorio, version):
+            return None
+
+        ruta_npy, ruta_json = cls._rutas_cache(directorio, version)
+        meta = json.loads(ruta_json.read_text(encoding='utf-8'))
+        puntajes = np.load(ruta_npy, mmap_mode='r' if mmap else None)
+        return cls(
+            puntajes,
+            departamentos=meta['departamentos'],
+            municipios=meta['municipios'],
+            claves=meta['claves'],
+            version=meta['version']
+        )
+
+    # ========== CONSULTAS VECTORIZADAS ==========
+
+    def columna(self, sector: str) -> np.ndarray:
+        """Puntajes de un sector para todas las filas."""
+        return self.puntajes[:, self.columna_por_sector[columna_sector(sector)]]
+
+    @staticmethod
+    def _resumir(puntajes: np.ndarray) -> Dict[str, dict]:
+        """Estadísticas por columna de un bloque de filas (no vacío)"""
+        total = puntajes.shape[0]
+        promedios = puntajes.mean(axis=0)
+        maximos = puntajes.max(axis=0)
+        minimos = puntajes.min(axis=0)
+        altas = (puntajes >= UMBRAL_ALTA_PRIORIDAD).sum(axis=0)
+        bajas = (puntajes <= UMBRAL_BAJA_PRIORIDAD).sum(axis=0)
+        medias = total - altas - bajas
+        percentiles = np.percentile(puntajes, PERCENTILES, axis=0)
+
+        return {
+            columna: {
+                'sector': columna,
+                'total': total,
+                'promedio': round(float(promedios[j]), 2),
+                'maximo': int(maximos[j]),
+                'minimo': int(minimos[j]),
+                'municipios_alta_prioridad': int(altas[j]),
+                'municipios_media_prioridad': int(medias[j]),
+                'municipios_baja_prioridad': int(bajas[j]),
+                **{
+                    f'percentil_{p}': round(float(percentiles[k, j]), 2)
+                    for k, p in enumerate(PERCENTILES)
+                }
+            }
+            for j, columna in enumerate(COLUMNAS_SECTORES)
+        }
+
+    def estadisticas_sectores(self) -> Dict[str, dict]:
+        """
+        Estadísticas de los 10 sectores en una sola pasada.
+
+        Returns:
+            {columna: dict con el formato de get_estadisticas_sector}
+        """
+        if not len(self):
+            return {}
+        return self._resumir(self.puntajes)
+
+    def estadisticas_departamentos(self) -> Dict[str, Dict[str, dict]]:
+        """
+        Estadísticas de los 10 sectores por departamento.
+
+        Returns:
+            {departamento normalizado: {columna: dict de estadísticas con
+            la clave adicional 'departamento' (nombre original)}}
+        """
+        filas_departamento: Dict[str, List[int]] = {}
+        for i, (departamento_norm, _) in enumerate(self.claves):
+            filas_departamento.setdefault(departamento_norm, []).append(i)
+
+        resultado = {}
+        for departamento_norm, filas in filas_departamento.items():
+            nombre = self.departamentos[filas[0]]
+            resultado[departamento_norm] = {
+                columna: {**estadisticas, 'departamento': nombre}
+                for columna, estadisticas in self._resumir(self.puntajes[filas]).items()
+            }
+        return resultado
+
+    def estadisticas_sector(self, sector: str) -> dict:
+        """Estadísticas de un sector (mismo formato que get_estadisticas_sector)."""
+        estadisticas = dict(self.estadisticas_sectores()[columna_sector(sector)])
+        estadisticas['sector'] = sector
+        return estadisticas
+
+    def filas_con_puntaje(self, sector: str, puntaje_minimo: int = 7) -> np.ndarray:
+        """
+        Filas con puntaje ≥ mínimo en un sector, de mayor a menor puntaje.
+
+        Ante empates se conserva el orden de la tabla.
+        """
+        valores = self.columna(sector)
+        filas = np.flatnonzero(valores >= puntaje_minimo)
+        return filas[np.argsort(-valores[filas].astype(np.int16), kind='stable')]
+
+    def sectores_prioritarios(self, fila: int, umbral: int = 7) -> List[Tuple[str, int]]:
+        """
+        Sectores con puntaje ≥ umbral de una fila, de mayor a menor.
+
+        Mismo resultado que RegistroMunicipioPDET.get_sectores_prioritarios.
+        """
+        valores = self.puntajes[fila]
+        orden = np.argsort(-valores.astype(np.int16), kind='stable')
+        return [
+            (NOMBRES_REGISTRO[j], int(valores[j]))
+            for j in orden if valores[j] >= umbral
+        ]
+
+    def sectores_prioritarios_todos(self, umbral: int = 7) -> Dict[Tuple[str, str], List[Tuple[str, int]]]:
+        """
+        Sectores prioritarios de todos los municipios con un solo argsort.
+
+        Returns:
+            {(departamento, municipio) normalizados: [(sector, puntaje), ...]}
+        """
+        if not len(self):
+            return {}
+
+        orden = np.argsort(-self.puntajes.astype(np.int16), axis=1, kind='stable')
+        ordenados = np.take_along_axis(self.puntajes, orden, axis=1)
+        cuantos = (ordenados >= umbral).sum(axis=1)
+
+        return {
+            clave: [
+                (NOMBRES_REGISTRO[j], int(puntaje))
+                for j, puntaje in zip(orden[i, :cuantos[i]], ordenados[i, :cuantos[i]])
+            ]
+            for clave, i in self.fila_por_clave.items()
+        }
+
+    def top_municipios(
+        self,
+        pesos: Dict[str, float],
+        n: int = 10,
+        departamento: Optional[str] = None,
+        normalizar=None
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Municipios con mayor puntaje ponderado en un conjunto de sectores.
+
+        El puntaje de cada municipio es el promedio de sus puntajes en los
+        sectores dados, ponderado por los pesos (escala 1-10).
+
+        Args:
+            pesos: {sector: peso} con pesos ≥ 0 y suma > 0
+            n: Número de municipios a retornar
+            departamento: Limitar a un departamento (nombre normalizado,
+                o cualquier nombre si se pasa `normalizar`)
+            normalizar: Función de normalización para `departamento`
+
+        Returns:
+            Lista de (departamento, municipio, puntaje) de mayor a menor
+        """
+        if not pesos:
+            raise ValueError("Debe indicar al menos un sector con peso")
+        if n < 1:
+            raise ValueError(f"n debe ser >= 1, recibido: {n}")
+
+        vector = np.zeros(len(COLUMNAS_SECTORES))
+        for sector, peso in pesos.items():
+            if peso < 0:
+                raise ValueError(f"Peso negativo para {sector}: {peso}")
+            vector[self.columna_por_sector[columna_sector(sector)]] += peso
+        if vector.sum() <= 0:
+            raise ValueError("La suma de pesos debe ser mayor que 0")
+
+        puntajes = self.puntajes @ (vector / vector.sum())
+
+        candidatas = self.filas_unicas.copy()
+        if departamento is not None:
+            depto_norm = normalizar(departamento) if normalizar else departamento
+            candidatas &= np.array([clave[0] == depto_norm for clave in self.claves], dtype=bool)
+
+        filas = np.flatnonzero(candidatas)
+        if len(filas) > n:
+            # Preselección O(filas) antes de ordenar solo los candidatos del top
+            corte = np.partition(puntajes[filas], len(filas) - n)[len(filas) - n]
+            filas = filas[puntajes[filas] >= corte]
+        filas = filas[np.argsort(-puntajes[filas], kind='stable')][:n]
+
+        return [
+            (self.departamentos[i], self.municipios[i], round(float(puntajes[i]), 4))
+            for i in filas
+        ]
+
+    def __repr__(self) -> str:
+        return f"MatrizSectores({len(self)} filas, version='{self.version}')"
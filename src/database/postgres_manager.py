@@ -3,7 +3,7 @@ Gestor de Base de Datos PostgreSQL para Streamlit Cloud.
 Compatible con la interfaz del DatabaseManager SQLite.
 """
 import json
-from typing import List, Optional, Dict, Any
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime
 import sys
 from pathlib import Path
@@ -14,15 +14,59 @@ if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
 from models.proyecto import ProyectoSocial, AreaGeografica, EstadoProyecto
+from database.db_manager import (
+    ResultadoLote, preparar_lote,
+    RELACIONES_PROYECTO, filas_relaciones, normalizar_ods,
+    COLUMNAS_TEXTO, ResultadoBusquedaTexto, terminos_busqueda,
+    COLUMNAS_RESUMEN, LARGO_DESCRIPCION_RESUMEN, ResumenProyecto, PaginaProyectos,
+    ORDENES_LISTADO, orden_listado,
+    TAMANO_BLOQUE_IDS,
+    DIMENSIONES_ESTADISTICAS, METRICAS_PROYECTO, GrupoEstadistico, MetricaProyecto, hay_filtros,
+    filas_scores
+)
 
 try:
     import psycopg2
-    from psycopg2.extras import RealDictCursor
+    from psycopg2.extras import RealDictCursor, execute_values
     POSTGRES_AVAILABLE = True
 except ImportError:
     POSTGRES_AVAILABLE = False
 
 
+# Columnas de proyectos en el orden del INSERT (claves de _proyecto_to_dict)
+COLUMNAS_PROYECTO = (
+    'id', 'nombre', 'organizacion', 'descripcion',
+    'beneficiarios_directos', 'beneficiarios_indirectos',
+    'duracion_meses', 'presupuesto_total', 'ods_vinculados',
+    'area_geografica', 'poblacion_objetivo', 'departamentos',
+    'municipios', 'estado', 'indicadores_impacto',
+    'fecha_creacion', 'fecha_modificacion',
+)
+
+# Filas por sentencia en execute_values
+TAMANO_PAGINA_LOTE = 500
+
+# Configuración de búsqueda sin tildes ni mayúsculas (unaccent + simple),
+# equivalente al tokenizador de proyectos_fts en SQLite
+CONFIG_BUSQUEDA = 'es_sin_tildes'
+
+# Peso de tsvector por columna de COLUMNAS_TEXTO (A = más relevante)
+PESOS_TSVECTOR = ('A', 'B', 'C', 'D')
+
+
+# SROI declarado en indicadores_impacto (NULL si falta o no es numérico)
+SQL_SROI = (
+    "(CASE WHEN (indicadores_impacto::json->>'sroi') ~ '^\\s*[-+]?[0-9]*\\.?[0-9]+([eE][-+]?[0-9]+)?\\s*$' "
+    "THEN (indicadores_impacto::json->>'sroi')::float END)"
+)
+
+
+def consulta_tsquery(texto: str) -> Optional[str]:
+    """tsquery con todas las palabras como prefijo ('agua' → 'AGUA:*')"""
+    terminos = terminos_busqueda(texto)
+    return " & ".join(f"{termino}:*" for termino in terminos) if terminos else None
+
+
 class PostgreSQLManager:
     """Gestor de base de datos PostgreSQL para producción."""
 
@@ -87,8 +131,100 @@ class PostgreSQLManager:
             )
         """)
 
+        # Tablas de relación (departamentos, municipios, ODS, sectores)
+        cursor.execute("SELECT to_regclass('proyecto_ods') IS NULL")
+        sin_relaciones = cursor.fetchone()[0]
+        for tabla, (_, columna, _) in RELACIONES_PROYECTO.items():
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {tabla} (
+                    proyecto_id TEXT NOT NULL REFERENCES proyectos(id) ON DELETE CASCADE,
+                    {columna} TEXT NOT NULL,
+                    {columna}_norm TEXT NOT NULL,
+                    PRIMARY KEY (proyecto_id, {columna}_norm)
+                )
+            """)
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{tabla}_{columna}
+                ON {tabla}({columna}_norm, proyecto_id)
+            """)
+
+        # Búsqueda de texto completo: columna tsvector generada + índice GIN
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        cursor.execute("SELECT 1 FROM pg_ts_config WHERE cfgname = %s", (CONFIG_BUSQUEDA,))
+        if not cursor.fetchone():
+            cursor.execute(f"CREATE TEXT SEARCH CONFIGURATION {CONFIG_BUSQUEDA} (COPY = simple)")
+            cursor.execute(f"""
+                ALTER TEXT SEARCH CONFIGURATION {CONFIG_BUSQUEDA}
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple
+            """)
+        documento = " || ".join(
+            f"setweight(to_tsvector('{CONFIG_BUSQUEDA}', coalesce({columna}, '')), '{peso}')"
+            for columna, peso in zip(COLUMNAS_TEXTO, PESOS_TSVECTOR)
+        )
+        cursor.execute(f"""
+            ALTER TABLE proyectos ADD COLUMN IF NOT EXISTS busqueda tsvector
+            GENERATED ALWAYS AS ({documento}) STORED
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_proyectos_busqueda ON proyectos USING GIN (busqueda)")
+
+        # Último score calculado por proyecto (agregación por nivel de prioridad)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS proyecto_scores (
+                proyecto_id TEXT PRIMARY KEY REFERENCES proyectos(id) ON DELETE CASCADE,
+                score_total REAL NOT NULL,
+                nivel_prioridad TEXT NOT NULL,
+                fecha TIMESTAMP NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_proyecto_scores_nivel
+            ON proyecto_scores(nivel_prioridad)
+        """)
+
+        # Listado paginado por (clave de orden, id)
+        for nombre, expresion in ORDENES_LISTADO.items():
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_proyectos_{nombre}
+                ON proyectos({expresion}, id)
+            """)
+
         conn.commit()
 
+        # Bases con proyectos anteriores a las tablas de relación
+        if sin_relaciones:
+            self.reconstruir_relaciones()
+
+    def _sincronizar_relaciones(self, cursor, proyectos: List[ProyectoSocial]):
+        """Reescribe las filas de relación de los proyectos (sin commit)"""
+        ids = [proyecto.id for proyecto in proyectos]
+        filas = [filas_relaciones(proyecto) for proyecto in proyectos]
+        for tabla, (_, columna, _) in RELACIONES_PROYECTO.items():
+            cursor.execute(f"DELETE FROM {tabla} WHERE proyecto_id = ANY(%s)", (ids,))
+            execute_values(
+                cursor,
+                f"""
+                    INSERT INTO {tabla} (proyecto_id, {columna}, {columna}_norm) VALUES %s
+                    ON CONFLICT DO NOTHING
+                """,
+                [fila for por_tabla in filas for fila in por_tabla[tabla]],
+                page_size=TAMANO_PAGINA_LOTE
+            )
+
+    def reconstruir_relaciones(self) -> int:
+        """Vuelve a llenar las tablas de relación desde las columnas JSON."""
+        proyectos = list(self.iterar_proyectos())
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            for tabla in RELACIONES_PROYECTO:
+                cursor.execute(f"DELETE FROM {tabla}")
+            self._sincronizar_relaciones(cursor, proyectos)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(proyectos)
+
     def _proyecto_to_dict(self, proyecto: ProyectoSocial) -> Dict[str, Any]:
         """Convierte un objeto ProyectoSocial a diccionario para guardar en BD."""
         return {
@@ -173,6 +309,8 @@ class PostgreSQLManager:
                 VALUES (%s, %s, %s, %s)
             """, (proyecto.id, 'CREATE', datetime.now(), json.dumps(data, default=str)))
 
+            self._sincronizar_relaciones(cursor, [proyecto])
+
             conn.commit()
             return True
 
@@ -181,6 +319,111 @@ class PostgreSQLManager:
             print(f"Error al crear proyecto: {e}")
             return False
 
+    def crear_proyectos_lote(
+        self,
+        proyectos: Iterable[ProyectoSocial],
+        diferir_indices: bool = False
+    ) -> ResultadoLote:
+        """
+        Crea muchos proyectos en una sola transacción (misma API que SQLite).
+
+        Inserta con execute_values (un INSERT de varias filas por página);
+        los IDs existentes se omiten con ON CONFLICT DO NOTHING.
+        """
+        return self._guardar_lote(proyectos, actualizar=False, diferir_indices=diferir_indices)
+
+    def upsert_proyectos_lote(
+        self,
+        proyectos: Iterable[ProyectoSocial],
+        diferir_indices: bool = False
+    ) -> ResultadoLote:
+        """Crea o actualiza muchos proyectos en una sola transacción."""
+        return self._guardar_lote(proyectos, actualizar=True, diferir_indices=diferir_indices)
+
+    def _guardar_lote(
+        self,
+        proyectos: Iterable[ProyectoSocial],
+        actualizar: bool,
+        diferir_indices: bool
+    ) -> ResultadoLote:
+        """Implementación común de crear_proyectos_lote y upsert_proyectos_lote"""
+        resultado = ResultadoLote()
+        filas_validas = preparar_lote(proyectos, resultado, self._proyecto_to_dict)
+        validos = [data for _, data in filas_validas]
+        objetos: Dict[str, ProyectoSocial] = {proyecto.id: proyecto for proyecto, _ in filas_validas}
+        if not validos:
+            return resultado
+
+        if actualizar:
+            conflicto = "ON CONFLICT (id) DO UPDATE SET " + ", ".join(
+                f"{columna} = EXCLUDED.{columna}"
+                for columna in COLUMNAS_PROYECTO if columna not in ('id', 'fecha_creacion')
+            )
+        else:
+            conflicto = "ON CONFLICT (id) DO NOTHING"
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            indices = []
+            if diferir_indices:
+                cursor.execute("""
+                    SELECT i.indexname, i.indexdef
+                    FROM pg_indexes i
+                    LEFT JOIN pg_constraint c ON c.conname = i.indexname
+                    WHERE i.tablename = ANY(%s)
+                      AND i.schemaname = current_schema()
+                      AND c.conname IS NULL
+                """, (['proyectos', 'historial_cambios', *RELACIONES_PROYECTO],))
+                indices = cursor.fetchall()
+                for nombre, _ in indices:
+                    cursor.execute(f'DROP INDEX IF EXISTS "{nombre}"')
+
+            # xmax = 0 solo en filas recién insertadas (no en las actualizadas)
+            filas = execute_values(
+                cursor,
+                f"""
+                    INSERT INTO proyectos ({', '.join(COLUMNAS_PROYECTO)}) VALUES %s
+                    {conflicto}
+                    RETURNING id, (xmax = 0) AS insertado
+                """,
+                [tuple(data[columna] for columna in COLUMNAS_PROYECTO) for data in validos],
+                page_size=TAMANO_PAGINA_LOTE,
+                fetch=True
+            )
+            guardados = {proyecto_id: insertado for proyecto_id, insertado in filas}
+
+            ahora = datetime.now()
+            historial = []
+            for data in validos:
+                if data['id'] not in guardados:
+                    resultado.existentes.append(data['id'])
+                    continue
+                insertado = guardados[data['id']]
+                (resultado.insertados if insertado else resultado.actualizados).append(data['id'])
+                historial.append((
+                    data['id'], 'CREATE' if insertado else 'UPDATE', ahora,
+                    json.dumps(data, default=str)
+                ))
+            self._sincronizar_relaciones(cursor, [objetos[proyecto_id] for proyecto_id in guardados])
+            cursor.execute("DELETE FROM proyecto_scores WHERE proyecto_id = ANY(%s)", (resultado.actualizados,))
+            execute_values(
+                cursor,
+                "INSERT INTO historial_cambios (proyecto_id, accion, fecha, cambios) VALUES %s",
+                historial,
+                page_size=TAMANO_PAGINA_LOTE
+            )
+
+            for _, definicion in indices:
+                cursor.execute(definicion)
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        return resultado
+
     def obtener_proyecto(self, proyecto_id: str) -> Optional[ProyectoSocial]:
         """Obtiene un proyecto por su ID."""
         conn = self._get_connection()
@@ -193,6 +436,74 @@ class PostgreSQLManager:
             return self._dict_to_proyecto(dict(row))
         return None
 
+    def obtener_proyectos(self, ids: List[str]) -> List[ProyectoSocial]:
+        """Carga proyectos completos por ID, en el orden de `ids`."""
+        conn = self._get_connection()
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        por_id = {}
+        for inicio in range(0, len(ids), TAMANO_BLOQUE_IDS):
+            cursor.execute("SELECT * FROM proyectos WHERE id = ANY(%s)", (ids[inicio:inicio + TAMANO_BLOQUE_IDS],))
+            for row in cursor.fetchall():
+                por_id[row['id']] = self._dict_to_proyecto(dict(row))
+        return [por_id[proyecto_id] for proyecto_id in ids if proyecto_id in por_id]
+
+    def listar_proyectos(self,
+                         limite: int = 25,
+                         despues_de: Optional[Tuple[Any, str]] = None,
+                         orden: str = 'modificacion',
+                         descendente: bool = True,
+                         **filtros) -> PaginaProyectos:
+        """Página de resúmenes ordenada por (clave, id) (keyset, misma API que SQLite)."""
+        expresion, comparador, direccion = orden_listado(orden, descendente)
+        conn = self._get_connection()
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        query, params = self._consulta_busqueda(
+            f"SELECT {', '.join(COLUMNAS_RESUMEN)}, left(descripcion, {LARGO_DESCRIPCION_RESUMEN}) AS descripcion, "
+            f"{expresion} AS clave_orden FROM proyectos", **filtros
+        )
+        if despues_de is not None:
+            query += f" AND ({expresion}, id) {comparador} (%s, %s)"
+            params.extend(despues_de)
+        query += f" ORDER BY {expresion} {direccion}, id {direccion} LIMIT %s"
+        params.append(limite + 1)
+        cursor.execute(query, params)
+
+        filas = cursor.fetchall()
+        siguiente = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            siguiente = (filas[-1]['clave_orden'], filas[-1]['id'])
+        return PaginaProyectos([ResumenProyecto.desde_fila(row) for row in filas], siguiente)
+
+    def obtener_resumenes(self, ids: List[str]) -> List[ResumenProyecto]:
+        """Resúmenes de los proyectos indicados, en el orden de `ids`."""
+        conn = self._get_connection()
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        por_id = {}
+        for inicio in range(0, len(ids), TAMANO_BLOQUE_IDS):
+            cursor.execute(f"""
+                SELECT {', '.join(COLUMNAS_RESUMEN)}, left(descripcion, {LARGO_DESCRIPCION_RESUMEN}) AS descripcion
+                FROM proyectos WHERE id = ANY(%s)
+            """, (ids[inicio:inicio + TAMANO_BLOQUE_IDS],))
+            for row in cursor.fetchall():
+                por_id[row['id']] = ResumenProyecto.desde_fila(row)
+        return [por_id[proyecto_id] for proyecto_id in ids if proyecto_id in por_id]
+
+    def contar_proyectos(self, **filtros) -> int:
+        """Número de proyectos que cumplen los filtros de buscar_proyectos."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        query, params = self._consulta_busqueda("SELECT COUNT(*) FROM proyectos", **filtros)
+        cursor.execute(query, params)
+        return cursor.fetchone()[0]
+
+    def obtener_organizaciones(self) -> List[str]:
+        """Organizaciones distintas, en orden alfabético."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT organizacion FROM proyectos ORDER BY organizacion")
+        return [row[0] for row in cursor.fetchall()]
+
     def obtener_todos_proyectos(self) -> List[ProyectoSocial]:
         """Obtiene todos los proyectos de la base de datos."""
         conn = self._get_connection()
@@ -203,6 +514,17 @@ class PostgreSQLManager:
 
         return [self._dict_to_proyecto(dict(row)) for row in rows]
 
+    def iterar_proyectos(self, tamano_lote: int = 500) -> Iterator[ProyectoSocial]:
+        """Recorre todos los proyectos con un cursor de servidor (memoria acotada)."""
+        conn = self._get_connection()
+
+        # Cursor con nombre → PostgreSQL entrega las filas por lotes
+        with conn.cursor(name="iterar_proyectos", cursor_factory=RealDictCursor) as cursor:
+            cursor.itersize = tamano_lote
+            cursor.execute("SELECT * FROM proyectos ORDER BY fecha_creacion DESC")
+            for row in cursor:
+                yield self._dict_to_proyecto(dict(row))
+
     def actualizar_proyecto(self, proyecto: ProyectoSocial) -> bool:
         """Actualiza un proyecto existente."""
         conn = self._get_connection()
@@ -242,6 +564,10 @@ class PostgreSQLManager:
                 VALUES (%s, %s, %s, %s)
             """, (proyecto.id, 'UPDATE', datetime.now(), json.dumps(data, default=str)))
 
+            self._sincronizar_relaciones(cursor, [proyecto])
+            # El score guardado corresponde a los datos anteriores
+            cursor.execute("DELETE FROM proyecto_scores WHERE proyecto_id = %s", (proyecto.id,))
+
             conn.commit()
             return True
 
@@ -268,7 +594,7 @@ class PostgreSQLManager:
                 VALUES (%s, %s, %s, %s)
             """, (proyecto_id, 'DELETE', datetime.now(), json.dumps(dict(proyecto_data), default=str)))
 
-            # Eliminar proyecto
+            # Eliminar proyecto (las filas de relación se borran en cascada)
             cursor.execute("DELETE FROM proyectos WHERE id = %s", (proyecto_id,))
 
             conn.commit()
@@ -279,37 +605,105 @@ class PostgreSQLManager:
             print(f"Error al eliminar proyecto: {e}")
             return False
 
+    def eliminar_todos_proyectos(self) -> int:
+        """Elimina todos los proyectos en una sola transacción (misma API que SQLite)."""
+        conn = self._get_connection()
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        ahora = datetime.now()
+        try:
+            cursor.execute("SELECT * FROM proyectos FOR UPDATE")
+            filas = cursor.fetchall()
+            execute_values(
+                cursor,
+                "INSERT INTO historial_cambios (proyecto_id, accion, fecha, cambios) VALUES %s",
+                [(row['id'], 'DELETE', ahora, json.dumps(dict(row), default=str)) for row in filas],
+                page_size=TAMANO_PAGINA_LOTE
+            )
+            # Las filas de relación y los scores se borran en cascada
+            cursor.execute("DELETE FROM proyectos")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(filas)
+
     def buscar_proyectos(self,
                          texto: Optional[str] = None,
                          organizacion: Optional[str] = None,
                          departamento: Optional[str] = None,
                          ods: Optional[List[str]] = None,
                          area_geografica: Optional[str] = None,
-                         estado: Optional[str] = None) -> List[ProyectoSocial]:
-        """Busca proyectos según criterios específicos."""
+                         estado: Optional[str] = None,
+                         municipio: Optional[str] = None,
+                         sector: Optional[str] = None,
+                         todos_los_ods: bool = True,
+                         presupuesto_min: Optional[float] = None,
+                         presupuesto_max: Optional[float] = None) -> List[ProyectoSocial]:
+        """Busca proyectos según criterios específicos (mismos filtros que SQLite)."""
         conn = self._get_connection()
         cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-        query = "SELECT * FROM proyectos WHERE 1=1"
-        params = []
+        query, params = self._consulta_busqueda(
+            "SELECT * FROM proyectos", texto, organizacion, departamento, ods,
+            area_geografica, estado, municipio, sector, todos_los_ods,
+            presupuesto_min, presupuesto_max
+        )
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+        return [self._dict_to_proyecto(dict(row)) for row in rows]
 
+    @staticmethod
+    def _consulta_busqueda(base: str,
+                           texto: Optional[str] = None,
+                           organizacion: Optional[str] = None,
+                           departamento: Optional[str] = None,
+                           ods: Optional[List[str]] = None,
+                           area_geografica: Optional[str] = None,
+                           estado: Optional[str] = None,
+                           municipio: Optional[str] = None,
+                           sector: Optional[str] = None,
+                           todos_los_ods: bool = True,
+                           presupuesto_min: Optional[float] = None,
+                           presupuesto_max: Optional[float] = None) -> Tuple[str, List[Any]]:
+        """Arma el WHERE de buscar_proyectos sobre la consulta `base`"""
+        query = base + " WHERE 1=1"
+        params: List[Any] = []
+
+        # Palabras (por prefijo) sobre la columna busqueda (índice GIN);
+        # el ID se sigue buscando por subcadena
         if texto:
-            query += " AND (nombre ILIKE %s OR id ILIKE %s OR organizacion ILIKE %s)"
-            pattern = f"%{texto}%"
-            params.extend([pattern, pattern, pattern])
+            coincidencia = consulta_tsquery(texto)
+            query += " AND (id ILIKE %s"
+            params.append(f"%{texto}%")
+            if coincidencia:
+                query += f" OR busqueda @@ to_tsquery('{CONFIG_BUSQUEDA}', %s)"
+                params.append(coincidencia)
+            query += ")"
 
         if organizacion:
             query += " AND organizacion = %s"
             params.append(organizacion)
 
-        if departamento:
-            query += " AND departamentos ILIKE %s"
-            params.append(f"%{departamento}%")
+        # Semi-joins sobre los índices (valor_norm, proyecto_id)
+        for tabla, valor in (
+            ('proyecto_departamento', departamento),
+            ('proyecto_municipio', municipio),
+            ('proyecto_sector', sector),
+        ):
+            if valor:
+                _, columna, normalizar = RELACIONES_PROYECTO[tabla]
+                query += f" AND id IN (SELECT proyecto_id FROM {tabla} WHERE {columna}_norm = %s)"
+                params.append(normalizar(valor))
 
         if ods:
-            for ods_item in ods:
-                query += " AND ods_vinculados ILIKE %s"
-                params.append(f"%{ods_item}%")
+            claves = sorted({normalizar_ods(o) for o in ods})
+            query += " AND id IN (SELECT proyecto_id FROM proyecto_ods WHERE ods_norm = ANY(%s)"
+            params.append(claves)
+            if todos_los_ods:
+                query += " GROUP BY proyecto_id HAVING COUNT(*) = %s"
+                params.append(len(claves))
+            query += ")"
 
         if area_geografica:
             query += " AND area_geografica = %s"
@@ -319,38 +713,213 @@ class PostgreSQLManager:
             query += " AND estado = %s"
             params.append(estado)
 
+        if presupuesto_min is not None:
+            query += " AND presupuesto_total >= %s"
+            params.append(presupuesto_min)
+
+        if presupuesto_max is not None:
+            query += " AND presupuesto_total <= %s"
+            params.append(presupuesto_max)
+
+        return query, params
+
+    def buscar_ids_proyectos(self, **filtros) -> List[str]:
+        """IDs de los proyectos que cumplen los filtros de buscar_proyectos."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        query, params = self._consulta_busqueda("SELECT id FROM proyectos", **filtros)
         cursor.execute(query, params)
-        rows = cursor.fetchall()
+        return [row[0] for row in cursor.fetchall()]
+
+    def buscar_texto(self,
+                     texto: str,
+                     limite: int = 50,
+                     marcas: Tuple[str, str] = ('**', '**'),
+                     palabras_fragmento: int = 16,
+                     **filtros) -> List[ResultadoBusquedaTexto]:
+        """
+        Búsqueda de texto completo ordenada por relevancia (misma API que SQLite).
 
-        return [self._dict_to_proyecto(dict(row)) for row in rows]
+        PostgreSQL no trae BM25: se ordena por ts_rank_cd sobre el tsvector
+        ponderado (nombre A, organización B, descripción C, población D).
+        El fragmento sale de la descripción.
+        """
+        coincidencia = consulta_tsquery(texto)
+        if not coincidencia:
+            return []
 
-    def obtener_estadisticas(self) -> Dict[str, Any]:
-        """Obtiene estadísticas generales de los proyectos."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        opciones = (
+            f"StartSel={marcas[0]}, StopSel={marcas[1]}, "
+            f"MaxWords={palabras_fragmento}, MinWords={max(1, palabras_fragmento // 2)}"
+        )
+        filtro, params_filtro = self._consulta_busqueda("SELECT id FROM proyectos", **filtros)
+        cursor.execute(f"""
+            SELECT id, nombre, organizacion,
+                   ts_rank_cd(busqueda, consulta) AS rango,
+                   ts_headline('{CONFIG_BUSQUEDA}', descripcion, consulta, %s) AS fragmento
+            FROM proyectos, to_tsquery('{CONFIG_BUSQUEDA}', %s) AS consulta
+            WHERE busqueda @@ consulta AND id IN ({filtro})
+            ORDER BY rango DESC
+            LIMIT %s
+        """, (opciones, coincidencia, *params_filtro, limite))
+
+        return [
+            ResultadoBusquedaTexto(row[0], row[1], row[2], float(row[3]), row[4])
+            for row in cursor.fetchall()
+        ]
+
+    def obtener_estadisticas(self,
+                             agrupar_por: Sequence[str] = (),
+                             limite_grupos: Optional[int] = None,
+                             **filtros) -> Dict[str, Any]:
+        """Obtiene estadísticas generales de los proyectos (misma API que SQLite)."""
         conn = self._get_connection()
         cursor = conn.cursor(cursor_factory=RealDictCursor)
 
-        cursor.execute("""
+        sroi_positivo = f"CASE WHEN {SQL_SROI} > 0 THEN {SQL_SROI} END"
+        query, params = self._consulta_busqueda(f"""
             SELECT
                 COUNT(*) as total_proyectos,
                 SUM(beneficiarios_directos) as total_beneficiarios_directos,
                 SUM(beneficiarios_indirectos) as total_beneficiarios_indirectos,
                 SUM(presupuesto_total) as presupuesto_total,
                 AVG(presupuesto_total) as presupuesto_promedio,
-                COUNT(DISTINCT organizacion) as total_organizaciones
+                COUNT(DISTINCT organizacion) as total_organizaciones,
+                AVG({sroi_positivo}) as sroi_promedio,
+                MAX({sroi_positivo}) as sroi_maximo,
+                MIN({sroi_positivo}) as sroi_minimo,
+                COUNT({sroi_positivo}) as proyectos_con_sroi
             FROM proyectos
-        """)
+        """, **filtros)
+        cursor.execute(query, params)
 
         row = cursor.fetchone()
 
-        return {
+        presupuesto_total = float(row['presupuesto_total']) if row['presupuesto_total'] else 0
+        beneficiarios = (row['total_beneficiarios_directos'] or 0) + (row['total_beneficiarios_indirectos'] or 0)
+        estadisticas = {
             'total_proyectos': row['total_proyectos'] or 0,
             'total_beneficiarios_directos': row['total_beneficiarios_directos'] or 0,
             'total_beneficiarios_indirectos': row['total_beneficiarios_indirectos'] or 0,
-            'presupuesto_total': float(row['presupuesto_total']) if row['presupuesto_total'] else 0,
+            'presupuesto_total': presupuesto_total,
             'presupuesto_promedio': float(row['presupuesto_promedio']) if row['presupuesto_promedio'] else 0,
-            'total_organizaciones': row['total_organizaciones'] or 0
+            'total_organizaciones': row['total_organizaciones'] or 0,
+            'costo_por_beneficiario': presupuesto_total / beneficiarios if beneficiarios else 0,
+            'sroi_promedio': float(row['sroi_promedio']) if row['sroi_promedio'] else 0,
+            'sroi_maximo': float(row['sroi_maximo']) if row['sroi_maximo'] else 0,
+            'sroi_minimo': float(row['sroi_minimo']) if row['sroi_minimo'] else 0,
+            'proyectos_con_sroi': row['proyectos_con_sroi'] or 0
         }
 
+        for dimension in agrupar_por:
+            estadisticas[f'por_{dimension}'] = self.agrupar_proyectos(dimension, limite_grupos, **filtros)
+
+        return estadisticas
+
+    def agrupar_proyectos(self,
+                          dimension: str,
+                          limite: Optional[int] = None,
+                          **filtros) -> List[GrupoEstadistico]:
+        """Conteo, presupuesto y beneficiarios por valor de una dimensión (GROUP BY)."""
+        if dimension not in DIMENSIONES_ESTADISTICAS:
+            raise ValueError(
+                f"Dimensión '{dimension}' no válida. Opciones: {', '.join(DIMENSIONES_ESTADISTICAS)}"
+            )
+        origen, etiqueta, grupo = DIMENSIONES_ESTADISTICAS[dimension]
+
+        query = f"""
+            SELECT {etiqueta} AS valor,
+                   COUNT(*) AS proyectos,
+                   COALESCE(SUM(p.presupuesto_total), 0) AS presupuesto_total,
+                   COALESCE(SUM(p.beneficiarios_directos + p.beneficiarios_indirectos), 0) AS beneficiarios_totales
+            FROM {origen}
+        """
+        params: List[Any] = []
+        if hay_filtros(filtros):
+            filtro, params = self._consulta_busqueda("SELECT id FROM proyectos", **filtros)
+            query += f" WHERE p.id IN ({filtro})"
+        query += f" GROUP BY {grupo} ORDER BY proyectos DESC, valor"
+        if limite is not None:
+            query += " LIMIT %s"
+            params.append(limite)
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return [
+            GrupoEstadistico(row[0], row[1], float(row[2]), int(row[3]))
+            for row in cursor.fetchall()
+        ]
+
+    def metricas_proyectos(self,
+                           metrica: str,
+                           limite: Optional[int] = 10,
+                           ascendente: bool = False,
+                           **filtros) -> List[MetricaProyecto]:
+        """Proyectos ordenados por una métrica (ORDER BY ... LIMIT en SQL)."""
+        if metrica not in METRICAS_PROYECTO:
+            raise ValueError(f"Métrica '{metrica}' no válida. Opciones: {', '.join(METRICAS_PROYECTO)}")
+        expresion = METRICAS_PROYECTO[metrica].format(sroi=SQL_SROI)
+
+        query = f"SELECT p.id, p.nombre, {expresion} AS valor FROM proyectos p WHERE {expresion} IS NOT NULL"
+        params: List[Any] = []
+        if metrica == 'sroi':
+            query += f" AND {expresion} > 0"
+        if hay_filtros(filtros):
+            filtro, params = self._consulta_busqueda("SELECT id FROM proyectos", **filtros)
+            query += f" AND p.id IN ({filtro})"
+        query += f" ORDER BY valor {'ASC' if ascendente else 'DESC'}, p.id"
+        if limite is not None:
+            query += " LIMIT %s"
+            params.append(limite)
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return [MetricaProyecto(row[0], row[1], float(row[2])) for row in cursor.fetchall()]
+
+    def guardar_scores(self, scores: Iterable[Tuple[str, float, str]]) -> int:
+        """Guarda el último score calculado de cada proyecto (misma API que SQLite)."""
+        filas = filas_scores(scores, datetime.now())
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            guardados = execute_values(
+                cursor,
+                """
+                    INSERT INTO proyecto_scores (proyecto_id, score_total, nivel_prioridad, fecha)
+                    SELECT v.proyecto_id, v.score_total, v.nivel_prioridad, v.fecha
+                    FROM (VALUES %s) AS v (proyecto_id, score_total, nivel_prioridad, fecha)
+                    JOIN proyectos p ON p.id = v.proyecto_id
+                    ON CONFLICT (proyecto_id) DO UPDATE SET
+                        score_total = EXCLUDED.score_total,
+                        nivel_prioridad = EXCLUDED.nivel_prioridad,
+                        fecha = EXCLUDED.fecha
+                    RETURNING proyecto_id
+                """,
+                filas,
+                page_size=TAMANO_PAGINA_LOTE,
+                fetch=True
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(guardados)
+
+    def ids_sin_score(self) -> List[str]:
+        """IDs de los proyectos sin score guardado (nuevos o modificados)."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT p.id FROM proyectos p
+            LEFT JOIN proyecto_scores s ON s.proyecto_id = p.id
+            WHERE s.proyecto_id IS NULL
+        """)
+        return [row[0] for row in cursor.fetchall()]
+
     def cerrar_conexion(self):
         """Cierra la conexión a la base de datos."""
         if self.connection and not self.connection.closed:
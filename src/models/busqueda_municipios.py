@@ -0,0 +1,281 @@
+"""
+Búsqueda aproximada de municipios por trigramas.
+
+Indexa nombres normalizados (mayúsculas, sin tildes) de municipios y sus
+departamentos en listas invertidas de trigramas, al estilo de pg_trgm.
+Una consulta suma los trigramas compartidos con cada candidato y ordena
+por similitud, por lo que tolera tildes faltantes y errores de digitación
+('Agustin Codazi' → AGUSTÍN CODAZZI) sin recorrer todo el catálogo.
+
+También define el índice inverso municipio → departamentos, usado para
+saber a qué departamento de un proyecto pertenece cada municipio.
+"""
+import heapq
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+
+# Cobertura mínima de los trigramas de la consulta para aceptar un candidato
+UMBRAL_SIMILITUD = 0.4
+
+
+@lru_cache(maxsize=4096)
+def normalizar_nombre(texto: str) -> str:
+    """
+    Normaliza un nombre geográfico para comparación:
+    - Convierte a mayúsculas
+    - Elimina acentos/tildes
+    - Elimina espacios extra
+
+    Ejemplos:
+    'Agustín Codazzi' → 'AGUSTIN CODAZZI'
+    'BOGOTÁ D.C.' → 'BOGOTA D.C.'
+    """
+    if not texto:
+        return ""
+
+    # Convertir a mayúsculas
+    texto = texto.upper()
+
+    # Eliminar acentos/tildes
+    # NFD = Canonical Decomposition
+    # Separa caracteres base de diacríticos (é → e + ´)
+    texto_nfd = unicodedata.normalize('NFD', texto)
+
+    # Mantener solo caracteres base (no diacríticos)
+    texto_sin_acentos = ''.join(
+        char for char in texto_nfd
+        if unicodedata.category(char) != 'Mn'  # Mn = Nonspacing Mark (diacríticos)
+    )
+
+    # Normalizar espacios
+    return ' '.join(texto_sin_acentos.split())
+
+
+def trigramas(texto_normalizado: str) -> FrozenSet[str]:
+    """
+    Trigramas de un texto ya normalizado.
+
+    Cada palabra se rellena con dos espacios al inicio y uno al final
+    (igual que pg_trgm), de modo que los prefijos pesan más.
+    """
+    resultado = set()
+    for palabra in texto_normalizado.split():
+        relleno = f"  {palabra} "
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return frozenset(resultado)
+
+
+@dataclass(frozen=True)
+class ResultadoBusquedaMunicipio:
+    """Municipio encontrado y su similitud (0-1) con la consulta"""
+    departamento: str
+    municipio: str
+    similitud: float
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido de trigramas sobre pares (departamento, municipio).
+
+    Uso:
+        indice = IndiceTrigramas()
+        indice.agregar("CESAR", "AGUSTÍN CODAZZI")
+        indice.buscar("agustin codazi")
+    """
+
+    def __init__(self, normalizar: Callable[[str], str] = normalizar_nombre):
+        """
+        Args:
+            normalizar: Función de normalización de nombres
+        """
+        self.normalizar = normalizar
+        self._entradas: List[Tuple[str, str]] = []
+        self._claves: List[Tuple[str, str]] = []
+        self._trigramas_municipio: List[FrozenSet[str]] = []
+        self._posiciones: Dict[Tuple[str, str], int] = {}
+        self._invertido: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def agregar(self, departamento: str, municipio: str) -> bool:
+        """
+        Indexa un municipio (los duplicados normalizados se ignoran).
+
+        Returns:
+            True si se agregó una entrada nueva
+        """
+        clave = (self.normalizar(departamento), self.normalizar(municipio))
+        if clave in self._posiciones:
+            return False
+
+        posicion = len(self._entradas)
+        self._posiciones[clave] = posicion
+        self._entradas.append((departamento, municipio))
+        self._claves.append(clave)
+
+        trigramas_municipio = trigramas(clave[1])
+        todos = trigramas_municipio | trigramas(clave[0])
+        self._trigramas_municipio.append(trigramas_municipio)
+        for trigrama in todos:
+            self._invertido.setdefault(trigrama, []).append(posicion)
+        return True
+
+    def buscar(
+        self,
+        texto: str,
+        limite: int = 10,
+        departamento: Optional[str] = None,
+        umbral: float = UMBRAL_SIMILITUD
+    ) -> List[ResultadoBusquedaMunicipio]:
+        """
+        Busca municipios parecidos al texto.
+
+        La similitud es la fracción de trigramas de la consulta presentes
+        en el municipio o su departamento. Ante igual similitud se prefieren
+        los municipios cuyo nombre contiene el texto y luego los de mayor
+        similitud de Jaccard con el nombre del municipio.
+
+        Args:
+            texto: Texto libre (acepta tildes faltantes y errores menores)
+            limite: Número máximo de resultados
+            departamento: Restringir a un departamento (opcional)
+            umbral: Similitud mínima (0-1)
+
+        Returns:
+            Lista de ResultadoBusquedaMunicipio de mayor a menor similitud
+        """
+        consulta = self.normalizar(texto)
+        trigramas_consulta = trigramas(consulta)
+        if not trigramas_consulta or limite < 1:
+            return []
+
+        depto_norm = self.normalizar(departamento) if departamento else None
+
+        compartidos: Dict[int, int] = {}
+        for trigrama in trigramas_consulta:
+            for posicion in self._invertido.get(trigrama, ()):
+                compartidos[posicion] = compartidos.get(posicion, 0) + 1
+
+        total = len(trigramas_consulta)
+        minimo = umbral * total
+        candidatos = []
+        for posicion, cantidad in compartidos.items():
+            if cantidad < minimo:
+                continue
+            clave = self._claves[posicion]
+            if depto_norm is not None and clave[0] != depto_norm:
+                continue
+            comunes = len(trigramas_consulta & self._trigramas_municipio[posicion])
+            jaccard = comunes / (total + len(self._trigramas_municipio[posicion]) - comunes)
+            candidatos.append((cantidad / total, consulta in clave[1], jaccard, -posicion))
+
+        return [
+            ResultadoBusquedaMunicipio(
+                departamento=self._entradas[-orden][0],
+                municipio=self._entradas[-orden][1],
+                similitud=round(similitud, 4)
+            )
+            for similitud, _, _, orden in heapq.nlargest(limite, candidatos)
+        ]
+
+
+# ========== ÍNDICE INVERSO MUNICIPIO → DEPARTAMENTOS ==========
+
+@dataclass(frozen=True)
+class UbicacionMunicipio:
+    """
+    Un departamento candidato para un nombre de municipio.
+
+    Atributos:
+        departamento / municipio: Nombres originales
+        es_pdet_zomac: Si el par está en la matriz PDET/ZOMAC
+        fila_sector: Fila del municipio en la matriz sectorial (o None)
+    """
+    departamento: str
+    municipio: str
+    es_pdet_zomac: bool = False
+    fila_sector: Optional[int] = None
+
+
+class IndiceInversoMunicipios:
+    """
+    Municipio normalizado → departamentos donde existe ese nombre.
+
+    Permite resolver a qué departamento de un proyecto pertenece cada
+    municipio con búsquedas en diccionario, en lugar de consultar cada
+    par (departamento, municipio).
+    """
+
+    def __init__(self, normalizar: Callable[[str], str] = normalizar_nombre):
+        """
+        Args:
+            normalizar: Función de normalización de nombres
+        """
+        self.normalizar = normalizar
+        self._por_municipio: Dict[str, Dict[str, UbicacionMunicipio]] = {}
+
+    def __len__(self) -> int:
+        return len(self._por_municipio)
+
+    def __contains__(self, municipio: str) -> bool:
+        return self.normalizar(municipio) in self._por_municipio
+
+    def agregar(
+        self,
+        departamento: str,
+        municipio: str,
+        es_pdet_zomac: bool = False,
+        fila_sector: Optional[int] = None
+    ) -> bool:
+        """
+        Registra un par (departamento, municipio).
+
+        Ante duplicados normalizados se conserva el primero.
+
+        Returns:
+            True si el par era nuevo
+        """
+        departamentos = self._por_municipio.setdefault(self.normalizar(municipio), {})
+        depto_norm = self.normalizar(departamento)
+        if depto_norm in departamentos:
+            return False
+        departamentos[depto_norm] = UbicacionMunicipio(
+            departamento=departamento,
+            municipio=municipio,
+            es_pdet_zomac=es_pdet_zomac,
+            fila_sector=fila_sector
+        )
+        return True
+
+    def ubicaciones(self, municipio: str) -> List[UbicacionMunicipio]:
+        """Departamentos candidatos de un municipio, en orden de registro."""
+        return list(self._por_municipio.get(self.normalizar(municipio), {}).values())
+
+    def departamentos(self, municipio: str) -> List[str]:
+        """Nombres de los departamentos donde existe el municipio."""
+        return [ubicacion.departamento for ubicacion in self.ubicaciones(municipio)]
+
+    def ubicar(self, municipio: str, departamentos: List[str]) -> Optional[UbicacionMunicipio]:
+        """
+        Ubicación del municipio en el primero de `departamentos` que lo contiene.
+
+        Args:
+            municipio: Nombre del municipio
+            departamentos: Departamentos candidatos (p. ej. los del proyecto)
+
+        Returns:
+            UbicacionMunicipio, o None si no está en ninguno
+        """
+        candidatos = self._por_municipio.get(self.normalizar(municipio))
+        if not candidatos:
+            return None
+
+        for departamento in departamentos:
+            ubicacion = candidatos.get(self.normalizar(departamento))
+            if ubicacion is not None:
+                return ubicacion
+        return None
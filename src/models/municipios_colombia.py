@@ -1,6 +1,9 @@
 """
 Municipios de Colombia organizados por departamento.
 """
+from typing import Optional
+
+from .busqueda_municipios import IndiceInversoMunicipios, IndiceTrigramas
 
 MUNICIPIOS_POR_DEPARTAMENTO = {
     "Amazonas": ["Leticia", "Puerto Nariño"],
@@ -260,6 +263,19 @@ MUNICIPIOS_POR_DEPARTAMENTO = {
 }
 
 
+def _construir_indice_inverso() -> IndiceInversoMunicipios:
+    """Índice municipio → departamentos del catálogo (una vez, al importar)"""
+    indice = IndiceInversoMunicipios()
+    for nombre_departamento, municipios in MUNICIPIOS_POR_DEPARTAMENTO.items():
+        for municipio in municipios:
+            indice.agregar(nombre_departamento, municipio)
+    return indice
+
+
+INDICE_MUNICIPIOS = _construir_indice_inverso()
+_indice_busqueda = None
+
+
 def obtener_municipios(departamento: str) -> list:
     """
     Obtiene la lista de municipios para un departamento dado.
@@ -281,3 +297,59 @@ def obtener_todos_departamentos() -> list:
         Lista ordenada de departamentos
     """
     return sorted(MUNICIPIOS_POR_DEPARTAMENTO.keys())
+
+
+def obtener_departamentos_municipio(municipio: str) -> list:
+    """
+    Departamentos donde existe un municipio con ese nombre.
+
+    Búsqueda normalizada (sin tildes) en el índice inverso del catálogo.
+
+    Args:
+        municipio: Nombre del municipio
+
+    Returns:
+        Lista de departamentos (varios si el nombre se repite, p. ej. 'Nariño')
+    """
+    return INDICE_MUNICIPIOS.departamentos(municipio)
+
+
+def ubicar_municipio(municipio: str, departamentos: list) -> Optional[str]:
+    """
+    Departamento, entre los dados, al que pertenece el municipio.
+
+    Args:
+        municipio: Nombre del municipio
+        departamentos: Departamentos candidatos (p. ej. los del proyecto)
+
+    Returns:
+        Nombre del departamento en el catálogo, o None si no está en ninguno
+    """
+    ubicacion = INDICE_MUNICIPIOS.ubicar(municipio, departamentos)
+    return ubicacion.departamento if ubicacion else None
+
+
+def buscar_municipios(texto: str, limite: int = 10, departamento: str = None) -> list:
+    """
+    Búsqueda aproximada de municipios en todo el catálogo.
+
+    Ignora tildes y tolera errores de digitación ('Agustin Codazi').
+    El índice de trigramas se construye en la primera llamada.
+
+    Args:
+        texto: Nombre de municipio y/o departamento
+        limite: Número máximo de resultados
+        departamento: Restringir a un departamento (opcional)
+
+    Returns:
+        Lista de ResultadoBusquedaMunicipio ordenada por similitud
+    """
+    global _indice_busqueda
+    if _indice_busqueda is None:
+        indice = IndiceTrigramas()
+        for nombre_departamento, municipios in MUNICIPIOS_POR_DEPARTAMENTO.items():
+            for municipio in municipios:
+                indice.agregar(nombre_departamento, municipio)
+        _indice_busqueda = indice
+
+    return _indice_busqueda.buscar(texto, limite, departamento=departamento)
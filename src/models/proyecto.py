@@ -25,6 +25,21 @@ class EstadoProyecto(Enum):
     RECHAZADO = "rechazado"
 
 
+# Valores válidos de las escalas 1-5 (probabilidad/impacto de riesgos,
+# pertinencia y relacionamiento)
+ESCALA_1_A_5 = (1, 2, 3, 4, 5)
+
+# Campos que los criterios calculan y registran en el proyecto al evaluarlo.
+# Deben propagarse cuando la evaluación ocurre sobre una copia (p. ej. en
+# otro proceso) para que el proyecto original quede igual que en serie.
+CAMPOS_CALCULADOS = (
+    'grupo_priorizacion_confis',
+    'puntaje_confis_total',
+    'puntaje_sectorial_max',
+    'tiene_municipios_pdet',
+)
+
+
 @dataclass
 class ProyectoSocial:
     """
@@ -335,3 +350,26 @@ class ProyectoSocial:
             'advertencias': advertencias,
             'mensaje': errores[0] if errores else "Validación exitosa"
         }
+
+    def riesgos_validos(self) -> bool:
+        """
+        Equivale a validar_riesgos()['valido'] sin construir mensajes.
+
+        Ruta rápida del scoring: los textos solo se generan si falla.
+        """
+        return all(
+            valor in ESCALA_1_A_5
+            for valor in (
+                self.riesgo_tecnico_probabilidad, self.riesgo_tecnico_impacto,
+                self.riesgo_social_probabilidad, self.riesgo_social_impacto,
+                self.riesgo_financiero_probabilidad, self.riesgo_financiero_impacto,
+                self.riesgo_regulatorio_probabilidad, self.riesgo_regulatorio_impacto,
+            )
+        )
+
+    def stakeholders_validos(self) -> bool:
+        """Equivale a validar_stakeholders()['valido'] sin construir mensajes."""
+        return (
+            self.pertinencia_operacional in ESCALA_1_A_5 and
+            self.mejora_relacionamiento in ESCALA_1_A_5
+        )
@@ -0,0 +1,400 @@
+"""
+Análisis multiobjetivo - Frontera de Pareto (skyline)
+
+Calcula el conjunto de proyectos no dominados sobre varios objetivos a la
+vez. Objetivos por defecto:
+- score_sroi (maximizar)
+- score_riesgos (maximizar, score inverso: mayor = menos riesgo)
+- presupuesto_total (minimizar)
+- beneficiarios totales (maximizar)
+
+Un proyecto domina a otro si es igual o mejor en todos los objetivos y
+estrictamente mejor en al menos uno.
+
+Algoritmos (puntos orientados a maximizar, duplicados agrupados):
+- 2 objetivos: barrido ordenado, O(n log n)
+- 3 objetivos: barrido con escalera ordenada (bisect), O(n log n)
+- 4+ objetivos: Sort-Filter-Skyline; orden por suma de rangos, que
+  garantiza que ningún punto es dominado por uno posterior, y filtro
+  vectorizado contra la frontera parcial, O(n log n + n·h)
+  (h = tamaño de la frontera)
+
+FronteraPareto mantiene la frontera con actualizaciones incrementales al
+agregar, editar o eliminar un proyecto.
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.models.proyecto import ProyectoSocial
+from src.scoring.motor_arquitectura_c import ResultadoScoring, ResultadoScoringLote
+
+
+# (objetivo, maximizar)
+OBJETIVOS_PARETO: Tuple[Tuple[str, bool], ...] = (
+    ('score_sroi', True),
+    ('score_riesgos', True),
+    ('presupuesto_total', False),
+    ('beneficiarios', True),
+)
+
+
+def extraer_objetivos(
+    proyecto: ProyectoSocial,
+    resultado: ResultadoScoring,
+    objetivos: Sequence[Tuple[str, bool]] = OBJETIVOS_PARETO
+) -> np.ndarray:
+    """
+    Vector de objetivos de un proyecto orientado a maximizar.
+
+    Busca cada objetivo en el ResultadoScoring y luego en el proyecto;
+    'beneficiarios' corresponde a beneficiarios_totales. Los objetivos a
+    minimizar se niegan.
+
+    Returns:
+        Arreglo de len(objetivos) valores
+    """
+    valores = []
+    for nombre, maximizar in objetivos:
+        if nombre == 'beneficiarios':
+            valor = proyecto.beneficiarios_totales
+        elif hasattr(resultado, nombre):
+            valor = getattr(resultado, nombre)
+        else:
+            valor = getattr(proyecto, nombre)
+        valor = float(valor or 0)
+        valores.append(valor if maximizar else -valor)
+    return np.array(valores)
+
+
+def objetivos_desde_lote(
+    proyectos: Sequence[ProyectoSocial],
+    lote: ResultadoScoringLote,
+    objetivos: Sequence[Tuple[str, bool]] = OBJETIVOS_PARETO
+) -> Dict[str, np.ndarray]:
+    """
+    Vectores de objetivos de una cartera evaluada con calcular_scores_lote.
+
+    Returns:
+        Diccionario proyecto_id → vector orientado a maximizar
+    """
+    vectores = {}
+    for i, proyecto in enumerate(proyectos):
+        valores = []
+        for nombre, maximizar in objetivos:
+            if nombre == 'beneficiarios':
+                valor = proyecto.beneficiarios_totales
+            elif hasattr(lote, nombre):
+                valor = getattr(lote, nombre)[i]
+            else:
+                valor = getattr(proyecto, nombre)
+            valor = float(valor or 0)
+            valores.append(valor if maximizar else -valor)
+        vectores[proyecto.id] = np.array(valores)
+    return vectores
+
+
+def domina(a: np.ndarray, b: np.ndarray) -> bool:
+    """True si a domina a b (ambos orientados a maximizar)"""
+    return bool(np.all(a >= b) and np.any(a > b))
+
+
+def skyline(puntos: np.ndarray) -> np.ndarray:
+    """
+    Índices de los puntos no dominados (orientados a maximizar).
+
+    Args:
+        puntos: Matriz n × d
+
+    Returns:
+        Índices ordenados de los puntos en la frontera
+    """
+    puntos = np.asarray(puntos, dtype=float)
+    if puntos.ndim != 2:
+        raise ValueError("Se esperaba una matriz n × d")
+    if len(puntos) == 0:
+        return np.array([], dtype=int)
+
+    # Puntos idénticos no se dominan entre sí: se resuelve sobre únicos
+    unicos, grupo = np.unique(puntos, axis=0, return_inverse=True)
+    grupo = grupo.ravel()
+    d = unicos.shape[1]
+
+    if d == 1:
+        en_frontera = unicos[:, 0] == unicos[:, 0].max()
+    elif d == 2:
+        en_frontera = _skyline_2d(unicos)
+    elif d == 3:
+        en_frontera = _skyline_3d(unicos)
+    else:
+        en_frontera = _skyline_sfs(unicos)
+
+    return np.flatnonzero(en_frontera[grupo])
+
+
+def _skyline_2d(puntos: np.ndarray) -> np.ndarray:
+    """Barrido por x descendente: no dominado si supera el mejor y previo"""
+    orden = np.lexsort((-puntos[:, 1], -puntos[:, 0]))
+    en_frontera = np.zeros(len(puntos), dtype=bool)
+    mejor_y = -np.inf
+    for i in orden:
+        if puntos[i, 1] > mejor_y:
+            en_frontera[i] = True
+            mejor_y = puntos[i, 1]
+    return en_frontera
+
+
+def _skyline_3d(puntos: np.ndarray) -> np.ndarray:
+    """
+    Barrido por x descendente con escalera (y, z) de los puntos previos.
+
+    La escalera guarda los puntos no dominados en (y, z), con y creciente
+    y z decreciente; el mayor z entre los y' ≥ y es el primero a la
+    derecha de y.
+    """
+    orden = np.lexsort((-puntos[:, 2], -puntos[:, 1], -puntos[:, 0]))
+    en_frontera = np.zeros(len(puntos), dtype=bool)
+    escalera_y: List[float] = []
+    escalera_z: List[float] = []
+
+    for i in orden:
+        y, z = puntos[i, 1], puntos[i, 2]
+        k = bisect_left(escalera_y, y)
+        if k < len(escalera_y) and escalera_z[k] >= z:
+            continue  # Dominado por un punto previo
+
+        en_frontera[i] = True
+
+        # Quitar de la escalera los puntos que (y, z) domina: el de igual y
+        # (si existe) y los de su izquierda con z menor o igual
+        fin = k + 1 if k < len(escalera_y) and escalera_y[k] == y else k
+        inicio = k
+        while inicio > 0 and escalera_z[inicio - 1] <= z:
+            inicio -= 1
+        escalera_y[inicio:fin] = [y]
+        escalera_z[inicio:fin] = [z]
+
+    return en_frontera
+
+
+def _skyline_sfs(puntos: np.ndarray) -> np.ndarray:
+    """Sort-Filter-Skyline con orden por suma de rangos densos"""
+    n, d = puntos.shape
+    rangos = np.zeros(n, dtype=np.int64)
+    for j in range(d):
+        rangos += np.unique(puntos[:, j], return_inverse=True)[1].ravel()
+    orden = np.argsort(-rangos, kind='stable')
+
+    en_frontera = np.zeros(n, dtype=bool)
+    ventana = np.empty((n, d))
+    h = 0
+    for i in orden:
+        p = puntos[i]
+        if h and np.any(np.all(ventana[:h] >= p, axis=1)):
+            continue
+        en_frontera[i] = True
+        ventana[h] = p
+        h += 1
+    return en_frontera
+
+
+class FronteraPareto:
+    """
+    Frontera de Pareto de una cartera con actualizaciones incrementales.
+
+    Guarda el vector de objetivos de cada proyecto y el conjunto no
+    dominado. Agregar o editar un proyecto solo lo compara con la
+    frontera actual; eliminar (o empeorar) un proyecto de la frontera
+    solo reevalúa los proyectos que este dominaba.
+    """
+
+    def __init__(self, objetivos: Sequence[Tuple[str, bool]] = OBJETIVOS_PARETO):
+        """
+        Inicializa una frontera vacía.
+
+        Args:
+            objetivos: Tuplas (nombre, maximizar)
+        """
+        self.objetivos = tuple(objetivos)
+        self._vectores: Dict[str, np.ndarray] = {}
+        self._frontera: Dict[str, None] = {}  # Conjunto ordenado por inserción
+
+    @classmethod
+    def desde_resultados(
+        cls,
+        proyectos: Sequence[ProyectoSocial],
+        resultados: Sequence[ResultadoScoring],
+        objetivos: Sequence[Tuple[str, bool]] = OBJETIVOS_PARETO
+    ) -> "FronteraPareto":
+        """
+        Construye la frontera de una cartera con el algoritmo por lotes.
+
+        Args:
+            proyectos: Proyectos de la cartera
+            resultados: ResultadoScoring de cada proyecto (mismo orden)
+            objetivos: Tuplas (nombre, maximizar)
+
+        Returns:
+            FronteraPareto
+        """
+        frontera = cls(objetivos)
+        frontera.cargar({
+            proyecto.id: extraer_objetivos(proyecto, resultado, frontera.objetivos)
+            for proyecto, resultado in zip(proyectos, resultados)
+        })
+        return frontera
+
+    def cargar(self, vectores: Dict[str, np.ndarray]):
+        """Reemplaza todos los puntos y recalcula la frontera por lotes"""
+        self._vectores = {pid: np.asarray(v, dtype=float) for pid, v in vectores.items()}
+        ids = list(self._vectores)
+        if not ids:
+            self._frontera = {}
+            return
+        indices = skyline(np.vstack([self._vectores[pid] for pid in ids]))
+        self._frontera = dict.fromkeys(ids[i] for i in indices)
+
+    # ========== CONSULTAS ==========
+
+    @property
+    def frontera(self) -> List[str]:
+        """IDs de proyectos no dominados"""
+        return list(self._frontera)
+
+    def en_frontera(self, proyecto_id: str) -> bool:
+        return proyecto_id in self._frontera
+
+    def vector(self, proyecto_id: str) -> np.ndarray:
+        """Objetivos del proyecto en sus unidades originales"""
+        signos = np.array([1.0 if maximizar else -1.0 for _, maximizar in self.objetivos])
+        return self._vectores[proyecto_id] * signos
+
+    def dominado_por(self, proyecto_id: str) -> List[str]:
+        """Proyectos de la frontera que dominan a un proyecto"""
+        v = self._vectores[proyecto_id]
+        return [pid for pid in self._frontera if domina(self._vectores[pid], v)]
+
+    def __len__(self) -> int:
+        return len(self._vectores)
+
+    def __contains__(self, proyecto_id: str) -> bool:
+        return proyecto_id in self._vectores
+
+    # ========== ACTUALIZACIONES INCREMENTALES ==========
+
+    def agregar(self, proyecto_id: str, vector: np.ndarray) -> bool:
+        """
+        Agrega o reemplaza un proyecto.
+
+        Args:
+            proyecto_id: ID del proyecto
+            vector: Objetivos orientados a maximizar (ver extraer_objetivos)
+
+        Returns:
+            True si el proyecto queda en la frontera
+        """
+        vector = np.asarray(vector, dtype=float)
+        if proyecto_id in self._vectores:
+            if np.array_equal(self._vectores[proyecto_id], vector):
+                return proyecto_id in self._frontera
+            self.eliminar(proyecto_id)
+
+        self._vectores[proyecto_id] = vector
+
+        if any(domina(self._vectores[pid], vector) for pid in self._frontera):
+            return False
+
+        for pid in [pid for pid in self._frontera if domina(vector, self._vectores[pid])]:
+            del self._frontera[pid]
+        self._frontera[proyecto_id] = None
+        return True
+
+    def agregar_proyecto(self, proyecto: ProyectoSocial, resultado: ResultadoScoring) -> bool:
+        """Agrega o reemplaza un proyecto a partir de su ResultadoScoring"""
+        return self.agregar(proyecto.id, extraer_objetivos(proyecto, resultado, self.objetivos))
+
+    def eliminar(self, proyecto_id: str):
+        """
+        Elimina un proyecto.
+
+        Si estaba en la frontera, los proyectos que solo él dominaba
+        pasan a la frontera.
+        """
+        vector = self._vectores.pop(proyecto_id, None)
+        if vector is None or proyecto_id not in self._frontera:
+            return
+        del self._frontera[proyecto_id]
+
+        candidatos = [
+            pid for pid, v in self._vectores.items()
+            if pid not in self._frontera and domina(vector, v)
+        ]
+        if not candidatos:
+            return
+
+        # Un candidato entra si no lo domina la frontera restante ni otro candidato
+        matriz = np.vstack([self._vectores[pid] for pid in candidatos])
+        for i in skyline(matriz):
+            pid = candidatos[i]
+            v = self._vectores[pid]
+            if not any(domina(self._vectores[f], v) for f in self._frontera):
+                self._frontera[pid] = None
+
+    def sincronizar(self, vectores: Dict[str, np.ndarray]) -> Dict[str, List[str]]:
+        """
+        Aplica solo los cambios respecto al estado actual.
+
+        Args:
+            vectores: Vector de objetivos vigente de cada proyecto
+
+        Returns:
+            Diccionario con IDs agregados, actualizados y eliminados
+        """
+        eliminados = [pid for pid in self._vectores if pid not in vectores]
+        for pid in eliminados:
+            self.eliminar(pid)
+
+        agregados, actualizados = [], []
+        for pid, vector in vectores.items():
+            vector = np.asarray(vector, dtype=float)
+            if pid not in self._vectores:
+                agregados.append(pid)
+            elif not np.array_equal(self._vectores[pid], vector):
+                actualizados.append(pid)
+            else:
+                continue
+            self.agregar(pid, vector)
+
+        return {'agregados': agregados, 'actualizados': actualizados, 'eliminados': eliminados}
+
+
+def frontera_pareto(
+    proyectos: Sequence[ProyectoSocial],
+    resultados: Sequence[ResultadoScoring],
+    objetivos: Optional[Sequence[Tuple[str, bool]]] = None
+) -> List[str]:
+    """
+    IDs de los proyectos no dominados de una cartera.
+
+    Args:
+        proyectos: Proyectos de la cartera
+        resultados: ResultadoScoring de cada proyecto (mismo orden)
+        objetivos: Tuplas (nombre, maximizar); por defecto OBJETIVOS_PARETO
+
+    Returns:
+        IDs en el orden de la cartera
+    """
+    objetivos = objetivos or OBJETIVOS_PARETO
+    if not proyectos:
+        return []
+    puntos = np.vstack([
+        extraer_objetivos(p, r, objetivos) for p, r in zip(proyectos, resultados)
+    ])
+    return [proyectos[i].id for i in skyline(puntos)]
@@ -0,0 +1,241 @@
+"""
+Caché de resultados de scoring - Arquitectura C
+
+Evita recalcular (y re-consultar la matriz PDET) cuando el mismo proyecto
+se evalúa varias veces, p. ej. al navegar entre Evaluar Cartera, Dashboard
+y Test Motor.
+
+Dos niveles:
+- Memoria: LRU acotado (más reciente al final)
+- SQLite (opcional): persiste entre sesiones y procesos
+
+Las claves las calcula el motor con un hash estable de los campos que leen
+los criterios, los pesos y la versión de la matriz PDET/ZOMAC. Un cambio en
+cualquiera de ellos produce una clave nueva, por lo que las entradas viejas
+nunca se sirven; purgar() las elimina cuando cambia la versión de la matriz.
+"""
+
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Agregar src al path (src/database se importa igual que en los criterios)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.conexiones import get_gestor_conexiones
+
+
+class CacheScores:
+    """
+    Caché LRU de resultados de scoring con nivel SQLite opcional.
+
+    Almacena valores arbitrarios (el motor guarda tuplas
+    (ResultadoScoring, campos calculados)) bajo claves de texto.
+    """
+
+    def __init__(self, max_entradas: int = 1024, db_path: Optional[str] = None):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_entradas: Máximo de entradas en memoria
+            db_path: Ruta a SQLite para el segundo nivel (None = solo memoria)
+        """
+        if max_entradas < 1:
+            raise ValueError("max_entradas debe ser al menos 1")
+
+        self.max_entradas = max_entradas
+        self.db_path = db_path
+        self.conexiones = None
+
+        # clave → (version_matriz, valor)
+        self._memoria: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Contadores
+        self.hits_memoria = 0
+        self.hits_sqlite = 0
+        self.misses = 0
+
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            # Conexión compartida por hilo: la consulta no paga la apertura
+            self.conexiones = get_gestor_conexiones(db_path)
+            self._inicializar_tabla()
+
+    def _inicializar_tabla(self):
+        """Crea tabla cache_scores si no existe"""
+        with self.conexiones.transaccion() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_scores (
+                    clave TEXT PRIMARY KEY,
+                    version_matriz TEXT NOT NULL,
+                    valor BLOB NOT NULL,
+                    fecha TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cache_scores_version
+                ON cache_scores(version_matriz)
+            """)
+
+    @property
+    def hits(self) -> int:
+        """Total de aciertos (memoria + SQLite)"""
+        return self.hits_memoria + self.hits_sqlite
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        """
+        Busca un valor en memoria y, si no está, en SQLite.
+
+        Args:
+            clave: Clave calculada por el motor
+
+        Returns:
+            Valor almacenado, o None si no existe
+        """
+        with self._lock:
+            entrada = self._memoria.get(clave)
+            if entrada is not None:
+                self._memoria.move_to_end(clave)
+                self.hits_memoria += 1
+                return entrada[1]
+
+        if self.conexiones:
+            row = self.conexiones.conexion().execute(
+                "SELECT version_matriz, valor FROM cache_scores WHERE clave = ?",
+                (clave,)
+            ).fetchone()
+
+            if row:
+                try:
+                    valor = pickle.loads(row[1])
+                except Exception:
+                    valor = None
+
+                if valor is not None:
+                    with self._lock:
+                        self._guardar_en_memoria(clave, row[0], valor)
+                        self.hits_sqlite += 1
+                    return valor
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def guardar(self, clave: str, valor: Any, version_matriz: str = ""):
+        """
+        Guarda un valor en memoria y, si está habilitado, en SQLite.
+
+        Args:
+            clave: Clave calculada por el motor
+            valor: Valor a almacenar (debe ser serializable con pickle)
+            version_matriz: Versión de la matriz PDET usada en el cálculo
+        """
+        with self._lock:
+            self._guardar_en_memoria(clave, version_matriz, valor)
+
+        if self.conexiones:
+            with self.conexiones.transaccion() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO cache_scores (clave, version_matriz, valor, fecha)
+                    VALUES (?, ?, ?, ?)
+                """, (clave, version_matriz, pickle.dumps(valor), datetime.now().isoformat()))
+
+    def _guardar_en_memoria(self, clave: str, version_matriz: str, valor: Any):
+        """Inserta en el LRU desalojando la entrada menos reciente si está lleno"""
+        self._memoria[clave] = (version_matriz, valor)
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_entradas:
+            self._memoria.popitem(last=False)
+
+    def purgar(self, version_vigente: str) -> int:
+        """
+        Elimina entradas calculadas con otra versión de la matriz PDET.
+
+        Args:
+            version_vigente: Versión actual de la matriz
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        with self._lock:
+            obsoletas = [
+                clave for clave, (version, _) in self._memoria.items()
+                if version != version_vigente
+            ]
+            for clave in obsoletas:
+                del self._memoria[clave]
+        eliminadas = len(obsoletas)
+
+        if self.conexiones:
+            with self.conexiones.transaccion() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM cache_scores WHERE version_matriz != ?",
+                    (version_vigente,)
+                )
+                eliminadas += cursor.rowcount
+
+        return eliminadas
+
+    def limpiar(self):
+        """Vacía ambos niveles y reinicia los contadores"""
+        with self._lock:
+            self._memoria.clear()
+            self.hits_memoria = 0
+            self.hits_sqlite = 0
+            self.misses = 0
+
+        if self.conexiones:
+            with self.conexiones.transaccion() as conn:
+                conn.execute("DELETE FROM cache_scores")
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de uso de la caché.
+
+        Returns:
+            Diccionario con hits, misses, tasa de acierto y tamaño
+        """
+        consultas = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'hits_memoria': self.hits_memoria,
+            'hits_sqlite': self.hits_sqlite,
+            'misses': self.misses,
+            'tasa_acierto': self.hits / consultas if consultas else 0.0,
+            'entradas_memoria': len(self._memoria),
+            'max_entradas': self.max_entradas,
+            'sqlite': self.db_path is not None
+        }
+
+    def __len__(self) -> int:
+        return len(self._memoria)
+
+    def __repr__(self) -> str:
+        return f"CacheScores(max_entradas={self.max_entradas}, db_path={self.db_path!r})"
+
+
+# Singleton global para la aplicación
+_cache_scores_instance = None
+
+
+def get_cache_scores(db_path: Optional[str] = "data/cache_scores.db", max_entradas: int = 1024) -> CacheScores:
+    """
+    Obtiene la caché de scores compartida por las páginas de la aplicación.
+
+    Args:
+        db_path: Ruta SQLite del segundo nivel (None = solo memoria)
+        max_entradas: Máximo de entradas en memoria
+
+    Returns:
+        Instancia global de CacheScores
+    """
+    global _cache_scores_instance
+    if _cache_scores_instance is None:
+        _cache_scores_instance = CacheScores(max_entradas=max_entradas, db_path=db_path)
+    return _cache_scores_instance
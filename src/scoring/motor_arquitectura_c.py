@@ -14,20 +14,106 @@ Cambios vs sistema anterior:
 - Datos oficiales PDET/ZOMAC integrados
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 from datetime import datetime
+import copy
+import hashlib
+import json
 import sys
 from pathlib import Path
 
+import numpy as np
+
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.models.proyecto import ProyectoSocial
+from src.models.proyecto import ProyectoSocial, CAMPOS_CALCULADOS
 from src.criterios.sroi import SROICriterio, ResultadoSROI
 from src.criterios.probabilidad_aprobacion_pdet import ProbabilidadAprobacionCriterio
 from src.criterios.stakeholders import StakeholdersCriterio
 from src.criterios.riesgos import RiesgosCriterio
+from src.criterios.stakeholders import PUNTAJES_STAKEHOLDERS
+from src.scoring.cache_scores import CacheScores
+from src.scoring.ranking_streaming import EstadisticasStreaming, RankingTopK
+
+
+# Orden de evaluación de los criterios en calcular_score
+CRITERIOS = ('sroi', 'stakeholders', 'probabilidad', 'riesgos')
+
+# Grafo campo → criterio: campos de ProyectoSocial que lee cada criterio
+DEPENDENCIAS_CRITERIOS: Dict[str, Tuple[str, ...]] = {
+    'sroi': ('indicadores_impacto', 'observaciones_sroi'),
+    'stakeholders': (
+        'pertinencia_operacional', 'mejora_relacionamiento', 'stakeholders_involucrados',
+        'puntaje_territorial_confis', 'municipios', 'departamentos',
+        'tiene_municipios_pdet', 'en_corredor_transmision',
+    ),
+    'probabilidad': (
+        'grupo_priorizacion_confis', 'tipo_municipio', 'tiene_municipios_pdet',
+        'es_patr_pdet', 'contribuyente_paga_estructuracion',
+        'puntaje_territorial_confis', 'puntaje_sectorial_max',
+        'municipios', 'departamentos', 'sectores',
+    ),
+    'riesgos': (
+        'riesgo_tecnico_probabilidad', 'riesgo_tecnico_impacto',
+        'riesgo_social_probabilidad', 'riesgo_social_impacto',
+        'riesgo_financiero_probabilidad', 'riesgo_financiero_impacto',
+        'riesgo_regulatorio_probabilidad', 'riesgo_regulatorio_impacto',
+    ),
+}
+
+# Campos que cada criterio escribe en el proyecto al evaluarlo
+CAMPOS_ESCRITOS: Dict[str, Tuple[str, ...]] = {
+    'probabilidad': CAMPOS_CALCULADOS,
+}
+
+# Campos que definen la clave de caché: gate de elegibilidad más las
+# dependencias de los criterios. El SROI se toma aparte de
+# indicadores_impacto['sroi'].
+CAMPOS_SCORING = tuple(dict.fromkeys(
+    ('tipo_municipio', 'tiene_municipios_pdet') + tuple(
+        campo
+        for nombre in CRITERIOS
+        for campo in DEPENDENCIAS_CRITERIOS[nombre]
+        if campo != 'indicadores_impacto'
+    )
+))
+
+
+def criterios_afectados(campos) -> List[str]:
+    """
+    Criterios que deben recalcularse cuando cambian ciertos campos.
+
+    Args:
+        campos: Nombres de campos de ProyectoSocial modificados
+
+    Returns:
+        Criterios afectados en orden de evaluación
+    """
+    campos = set(campos)
+    return [
+        nombre for nombre in CRITERIOS
+        if campos.intersection(DEPENDENCIAS_CRITERIOS[nombre])
+    ]
+
+# Etiqueta de cada criterio en las alertas de error
+ETIQUETAS_CRITERIOS: Dict[str, str] = {
+    'sroi': "SROI",
+    'stakeholders': "Stakeholders",
+    'probabilidad': "Probabilidad",
+    'riesgos': "Riesgos",
+}
+
+# Versión usada en la clave de caché cuando no hay matriz PDET disponible
+VERSION_SIN_MATRIZ = "sin-matriz"
+
+
+# Niveles de prioridad indexados por código (ver determinar_niveles_prioridad)
+NIVELES_PRIORIDAD = np.array(
+    ["BAJA", "MEDIA", "ALTA", "MUY ALTA", "RECHAZADO", "NO ELEGIBLE"],
+    dtype=object
+)
 
 
 @dataclass
@@ -64,6 +150,184 @@ class ResultadoScoring:
     resultado_sroi_detallado: Optional[ResultadoSROI] = None
 
 
+@dataclass(slots=True)
+class ResultadoScoringRapido:
+    """
+    Resultado solo numérico de calcular_score_rapido.
+
+    No contiene alertas ni recomendaciones: los textos se generan bajo
+    demanda con MotorScoringArquitecturaC.completar_resultado, a partir de
+    los scores y de los errores de cada criterio.
+    """
+
+    proyecto_id: str
+    score_total: float
+    score_sroi: float
+    score_stakeholders: float
+    score_probabilidad: float
+    score_riesgos: float
+    contribucion_sroi: float
+    contribucion_stakeholders: float
+    contribucion_probabilidad: float
+    contribucion_riesgos: float
+    nivel_prioridad: str
+
+    # Criterio → mensaje de la excepción (solo criterios con datos inválidos)
+    errores: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ResultadoCriterio:
+    """Resultado parcial de un criterio dentro del motor"""
+
+    score: float  # 0-100
+    alertas: List[str] = field(default_factory=list)
+    recomendaciones: List[str] = field(default_factory=list)
+    detalle: Optional[ResultadoSROI] = None  # Solo SROI en modo detallado
+
+
+@dataclass
+class EstadoScoring:
+    """
+    Estado de calcular_score_incremental entre llamadas.
+
+    Guarda, por criterio, la copia de los campos que leyó, su resultado
+    parcial y los campos que escribió en el proyecto.
+    """
+
+    detallado: bool = True
+    entradas: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    resultados: Dict[str, ResultadoCriterio] = field(default_factory=dict)
+    calculados: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    # Criterios recalculados en la última llamada
+    recalculados: Tuple[str, ...] = ()
+
+
+@dataclass
+class ResultadoScoringLote:
+    """
+    Resultado columnar del scoring de una cartera.
+
+    Cada campo es un arreglo con una posición por proyecto, en el mismo
+    orden de la cartera recibida. No incluye alertas ni recomendaciones.
+    """
+
+    proyecto_ids: List[str]
+
+    # Score final y scores por criterio (0-100)
+    score_total: np.ndarray
+    score_sroi: np.ndarray
+    score_stakeholders: np.ndarray
+    score_probabilidad: np.ndarray
+    score_riesgos: np.ndarray
+
+    # Contribuciones al score final
+    contribucion_sroi: np.ndarray
+    contribucion_stakeholders: np.ndarray
+    contribucion_probabilidad: np.ndarray
+    contribucion_riesgos: np.ndarray
+
+    # Nivel de prioridad y gate de elegibilidad
+    nivel_prioridad: np.ndarray  # dtype object
+    elegible: np.ndarray  # bool
+
+    # Entradas extraídas (NaN / 0 donde no aplican)
+    sroi: np.ndarray  # Valor SROI usado por el criterio
+    riesgos_probabilidad: np.ndarray  # n × 4 (técnico, social, financiero, regulatorio)
+    riesgos_impacto: np.ndarray  # n × 4
+
+    # Metadata
+    fecha_calculo: datetime = field(default_factory=datetime.now)
+    version_arquitectura: str = "C"
+
+    def __len__(self) -> int:
+        return len(self.proyecto_ids)
+
+    def matriz_scores(self) -> np.ndarray:
+        """Matriz n × 4 de scores por criterio (SROI, Stakeholders, Probabilidad, Riesgos)"""
+        return np.column_stack([
+            self.score_sroi,
+            self.score_stakeholders,
+            self.score_probabilidad,
+            self.score_riesgos
+        ])
+
+    def indices_ranking(self) -> np.ndarray:
+        """Índices de proyectos ordenados por score total (mayor a menor, estable)"""
+        return np.argsort(-self.score_total, kind='stable')
+
+    def a_diccionarios(self) -> List[Dict[str, Any]]:
+        """Convierte el resultado columnar a una lista de registros por proyecto"""
+        return [
+            {
+                'proyecto_id': proyecto_id,
+                'score_total': float(self.score_total[i]),
+                'score_sroi': float(self.score_sroi[i]),
+                'score_stakeholders': float(self.score_stakeholders[i]),
+                'score_probabilidad': float(self.score_probabilidad[i]),
+                'score_riesgos': float(self.score_riesgos[i]),
+                'nivel_prioridad': self.nivel_prioridad[i],
+            }
+            for i, proyecto_id in enumerate(self.proyecto_ids)
+        ]
+
+
+def codigos_niveles_prioridad(
+    score_total: np.ndarray,
+    score_sroi: np.ndarray,
+    elegible: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Códigos de nivel de prioridad (índices de NIVELES_PRIORIDAD).
+
+    Acepta arreglos de cualquier forma (p. ej. n proyectos × m escenarios).
+
+    Args:
+        score_total: Scores totales 0-100
+        score_sroi: Scores SROI 0-100 (0 = rechazado)
+        elegible: Máscara de elegibilidad PDET/ZOMAC (opcional)
+
+    Returns:
+        Arreglo int8 de códigos
+    """
+    score_total = np.asarray(score_total, dtype=float)
+    score_sroi = np.broadcast_to(np.asarray(score_sroi, dtype=float), score_total.shape)
+
+    codigos = np.select(
+        [score_sroi == 0, score_total >= 85, score_total >= 70, score_total >= 50],
+        [4, 3, 2, 1],
+        default=0
+    ).astype(np.int8)
+
+    if elegible is not None:
+        elegible = np.broadcast_to(np.asarray(elegible, dtype=bool), score_total.shape)
+        codigos = np.where(elegible, codigos, np.int8(5))
+
+    return codigos
+
+
+def determinar_niveles_prioridad(
+    score_total: np.ndarray,
+    score_sroi: np.ndarray,
+    elegible: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Versión vectorizada de MotorScoringArquitecturaC._determinar_nivel_prioridad.
+
+    Acepta arreglos de cualquier forma (p. ej. n proyectos × m escenarios).
+
+    Args:
+        score_total: Scores totales 0-100
+        score_sroi: Scores SROI 0-100 (0 = rechazado)
+        elegible: Máscara de elegibilidad PDET/ZOMAC (opcional)
+
+    Returns:
+        Arreglo de niveles de prioridad (dtype object)
+    """
+    return NIVELES_PRIORIDAD[codigos_niveles_prioridad(score_total, score_sroi, elegible)]
+
+
 class MotorScoringArquitecturaC:
     """
     Motor de scoring para Arquitectura C
@@ -85,12 +349,13 @@ class MotorScoringArquitecturaC:
     PESO_PROBABILIDAD = 0.20
     PESO_RIESGOS = 0.15
 
-    def __init__(self, db_path: str = "data/proyectos.db"):
+    def __init__(self, db_path: str = "data/proyectos.db", cache: Optional[CacheScores] = None):
         """
         Inicializa el motor de scoring.
 
         Args:
             db_path: Ruta a la base de datos con matriz PDET
+            cache: Caché de resultados (opcional, ver CacheScores)
         """
         # Criterios implementados
         self.criterio_sroi = SROICriterio(peso=self.PESO_SROI)
@@ -101,6 +366,9 @@ class MotorScoringArquitecturaC:
         self.criterio_stakeholders = StakeholdersCriterio(peso=self.PESO_STAKEHOLDERS)
         self.criterio_riesgos = RiesgosCriterio(peso=self.PESO_RIESGOS)
 
+        self.cache = cache
+        self._version_matriz_purgada = None
+
     def calcular_score(
         self,
         proyecto: ProyectoSocial,
@@ -109,6 +377,9 @@ class MotorScoringArquitecturaC:
         """
         Calcula score final del proyecto usando Arquitectura C
 
+        Si el motor tiene caché, reutiliza el resultado de un proyecto con
+        los mismos datos de entrada, pesos y versión de matriz PDET.
+
         Args:
             proyecto: Proyecto a evaluar
             detallado: Si True, incluye metadata detallada
@@ -119,90 +390,337 @@ class MotorScoringArquitecturaC:
         Raises:
             ValueError: Si proyecto no tiene datos mínimos requeridos
         """
+        if self.cache is None:
+            return self._calcular_score(proyecto, detallado)
 
-        alertas = []
-        recomendaciones = []
+        version_matriz = self._version_matriz()
+        if version_matriz != self._version_matriz_purgada:
+            self.cache.purgar(version_matriz)
+            self._version_matriz_purgada = version_matriz
+
+        clave = self.clave_cache(proyecto, detallado, version_matriz)
+        entrada = self.cache.obtener(clave)
+
+        if entrada is not None:
+            resultado, calculados = entrada
+            # Los criterios completan campos del proyecto; replicarlos
+            for campo, valor in calculados.items():
+                setattr(proyecto, campo, valor)
+            return self._copiar_resultado(resultado)
+
+        resultado = self._calcular_score(proyecto, detallado)
+        calculados = {campo: getattr(proyecto, campo) for campo in CAMPOS_CALCULADOS}
+        self.cache.guardar(clave, (self._copiar_resultado(resultado), calculados), version_matriz)
+
+        return resultado
+
+    def clave_cache(
+        self,
+        proyecto: ProyectoSocial,
+        detallado: bool = True,
+        version_matriz: Optional[str] = None
+    ) -> str:
+        """
+        Calcula la clave de caché de un proyecto.
+
+        Hash SHA-256 de los campos que leen los criterios, los pesos,
+        la versión de la arquitectura y la versión de la matriz PDET/ZOMAC.
+
+        Args:
+            proyecto: Proyecto a evaluar
+            detallado: Modo de cálculo (cambia alertas y metadata)
+            version_matriz: Versión de la matriz (None = consultar repositorio)
+
+        Returns:
+            Clave hexadecimal
+        """
+        if version_matriz is None:
+            version_matriz = self._version_matriz()
+
+        datos = {
+            'campos': {campo: getattr(proyecto, campo) for campo in CAMPOS_SCORING},
+            'sroi': ['sroi' in proyecto.indicadores_impacto, proyecto.indicadores_impacto.get('sroi')],
+            'pesos': [self.PESO_SROI, self.PESO_STAKEHOLDERS, self.PESO_PROBABILIDAD, self.PESO_RIESGOS],
+            'probabilidad_manual': self.criterio_probabilidad.probabilidad_manual,
+            'version': self.VERSION,
+            'matriz': version_matriz,
+            'detallado': detallado
+        }
+        serializado = json.dumps(datos, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+    def _version_matriz(self) -> str:
+        """Versión de la matriz PDET/ZOMAC usada por el criterio de probabilidad"""
+        repo = self.criterio_probabilidad.matriz_repo
+        if repo is None:
+            return VERSION_SIN_MATRIZ
+        try:
+            return repo.get_version()
+        except Exception:
+            return VERSION_SIN_MATRIZ
+
+    @staticmethod
+    def _copiar_resultado(resultado: ResultadoScoring) -> ResultadoScoring:
+        """Copia con listas propias para que el llamador no altere la caché"""
+        return replace(
+            resultado,
+            alertas=list(resultado.alertas),
+            recomendaciones=list(resultado.recomendaciones)
+        )
+
+    def _calcular_score(
+        self,
+        proyecto: ProyectoSocial,
+        detallado: bool = True
+    ) -> ResultadoScoring:
+        """Cálculo de calcular_score sin pasar por la caché"""
+
+        # Sin detalle, los textos se derivan del resultado numérico
+        if not detallado:
+            return self.completar_resultado(self.calcular_score_rapido(proyecto))
 
         # ========== GATE DE ELEGIBILIDAD PDET/ZOMAC (Ajuste CONFIS Feb 2026) ==========
         if not proyecto.es_elegible_oxi:
-            alertas.append(
-                "🚫 PROYECTO NO ELEGIBLE - Obras por Impuestos solo aplica "
-                "para municipios PDET y/o ZOMAC"
+            return self._resultado_no_elegible()
+
+        # Orden fijo: Probabilidad puede completar campos que lee Stakeholders
+        parciales = {
+            nombre: self._evaluar_criterio(nombre, proyecto, detallado)
+            for nombre in CRITERIOS
+        }
+
+        return self._combinar_parciales(parciales)
+
+    def calcular_score_rapido(self, proyecto: ProyectoSocial) -> ResultadoScoringRapido:
+        """
+        Calcula solo los números del score, sin alertas ni recomendaciones.
+
+        Ruta rápida para rankings masivos y barridos: no formatea ningún
+        texto salvo el mensaje de error de un criterio con datos inválidos.
+        Los números son los mismos de calcular_score(proyecto, detallado=False);
+        completar_resultado genera los textos cuando se van a mostrar.
+
+        Args:
+            proyecto: Proyecto a evaluar
+
+        Returns:
+            ResultadoScoringRapido
+        """
+        if not proyecto.es_elegible_oxi:
+            return ResultadoScoringRapido(
+                proyecto_id=proyecto.id,
+                score_total=0, score_sroi=0, score_stakeholders=0,
+                score_probabilidad=0, score_riesgos=0,
+                contribucion_sroi=0, contribucion_stakeholders=0,
+                contribucion_probabilidad=0, contribucion_riesgos=0,
+                nivel_prioridad="NO ELEGIBLE"
             )
-            return ResultadoScoring(
-                score_total=0,
-                score_sroi=0,
-                score_stakeholders=0,
-                score_probabilidad=0,
-                score_riesgos=0,
-                contribucion_sroi=0,
-                contribucion_stakeholders=0,
-                contribucion_probabilidad=0,
-                contribucion_riesgos=0,
-                nivel_prioridad="NO ELEGIBLE",
-                fecha_calculo=datetime.now(),
-                version_arquitectura=self.VERSION,
-                alertas=alertas,
-                recomendaciones=[
-                    "📋 Verificar que el municipio esté en la lista PDET/ZOMAC",
-                    "📋 Consultar Anexo 2 CONFIS para municipios elegibles"
-                ]
+
+        scores = {}
+        errores = {}
+        for nombre in CRITERIOS:
+            scores[nombre], error = self._score_criterio(nombre, proyecto)
+            if error is not None:
+                errores[nombre] = error
+
+        return self._combinar_scores(proyecto.id, scores, errores)
+
+    def completar_resultado(self, rapido: ResultadoScoringRapido) -> ResultadoScoring:
+        """
+        Genera el ResultadoScoring con textos a partir de un resultado rápido.
+
+        Produce las mismas alertas y recomendaciones que
+        calcular_score(proyecto, detallado=False).
+
+        Args:
+            rapido: Resultado de calcular_score_rapido
+
+        Returns:
+            ResultadoScoring completo
+        """
+        if rapido.nivel_prioridad == "NO ELEGIBLE":
+            return self._resultado_no_elegible()
+
+        parciales = {
+            nombre: self._resultado_criterio(
+                nombre,
+                getattr(rapido, f"score_{nombre}"),
+                rapido.errores.get(nombre)
             )
+            for nombre in CRITERIOS
+        }
+        return self._construir_resultado(rapido, parciales)
 
-        # ========== CRITERIO 1: SROI (40%) ==========
-        try:
-            if detallado:
+    def calcular_score_incremental(
+        self,
+        proyecto: ProyectoSocial,
+        estado: Optional[EstadoScoring] = None,
+        detallado: bool = True
+    ) -> Tuple[ResultadoScoring, Optional[EstadoScoring]]:
+        """
+        Recalcula solo los criterios cuyos campos de entrada cambiaron.
+
+        Pensado para edición en vivo de un proyecto: cada criterio guarda
+        una copia de los campos que leyó (ver DEPENDENCIAS_CRITERIOS) y su
+        resultado parcial; en la siguiente llamada se reutilizan los
+        criterios cuyas entradas son iguales, evitando p. ej. las consultas
+        a la matriz PDET cuando solo cambió un riesgo.
+
+        El resultado es el mismo que calcular_score(proyecto, detallado).
+        El estado no registra la versión de la matriz PDET: si la matriz se
+        recarga, descartar el estado.
+
+        Args:
+            proyecto: Proyecto a evaluar (puede ser un objeto nuevo por edición)
+            estado: Estado devuelto por la llamada anterior (None = desde cero)
+            detallado: Si True, incluye metadata detallada
+
+        Returns:
+            Tupla (ResultadoScoring, estado para la siguiente llamada)
+        """
+        if not proyecto.es_elegible_oxi:
+            return self._resultado_no_elegible(), estado
+
+        if estado is None or estado.detallado != detallado:
+            estado = EstadoScoring(detallado=detallado)
+
+        recalculados = []
+        for nombre in CRITERIOS:
+            entradas = self._entradas_criterio(nombre, proyecto)
+
+            if nombre in estado.resultados and estado.entradas[nombre] == entradas:
+                # Reaplicar los campos que el criterio escribe en el proyecto
+                for campo, valor in estado.calculados.get(nombre, {}).items():
+                    setattr(proyecto, campo, valor)
+                continue
+
+            estado.resultados[nombre] = self._evaluar_criterio(nombre, proyecto, detallado)
+            estado.entradas[nombre] = entradas
+            estado.calculados[nombre] = {
+                campo: copy.deepcopy(getattr(proyecto, campo))
+                for campo in CAMPOS_ESCRITOS.get(nombre, ())
+            }
+            recalculados.append(nombre)
+
+        estado.recalculados = tuple(recalculados)
+
+        return self._combinar_parciales(estado.resultados), estado
+
+    @staticmethod
+    def _entradas_criterio(nombre: str, proyecto: ProyectoSocial) -> Dict[str, Any]:
+        """Copia de los campos del proyecto que lee un criterio"""
+        return {
+            campo: copy.deepcopy(getattr(proyecto, campo))
+            for campo in DEPENDENCIAS_CRITERIOS[nombre]
+        }
+
+    def _evaluar_criterio(
+        self,
+        nombre: str,
+        proyecto: ProyectoSocial,
+        detallado: bool
+    ) -> ResultadoCriterio:
+        """
+        Evalúa un criterio capturando errores como alertas.
+
+        Args:
+            nombre: Criterio ('sroi', 'stakeholders', 'probabilidad', 'riesgos')
+            proyecto: Proyecto a evaluar
+            detallado: Si True, SROI incluye alertas y metadata detallada
+
+        Returns:
+            ResultadoCriterio con score, alertas y recomendaciones propias
+        """
+        # SROI detallado: alertas y metadata propias del criterio
+        if nombre == 'sroi' and detallado:
+            try:
                 resultado_sroi = self.criterio_sroi.evaluar_detallado(proyecto)
-                score_sroi = resultado_sroi.score
-                alertas.extend(resultado_sroi.alertas)
-            else:
-                score_sroi = self.criterio_sroi.evaluar(proyecto)
-                resultado_sroi = None
+            except ValueError as e:
+                return self._resultado_criterio(nombre, 0, str(e))
+            return ResultadoCriterio(
+                score=resultado_sroi.score,
+                alertas=list(resultado_sroi.alertas),
+                detalle=resultado_sroi
+            )
 
-            contribucion_sroi = score_sroi * self.PESO_SROI
+        score, error = self._score_criterio(nombre, proyecto)
+        return self._resultado_criterio(nombre, score, error)
+
+    def _score_criterio(self, nombre: str, proyecto: ProyectoSocial) -> Tuple[float, Optional[str]]:
+        """
+        Score de un criterio sin generar textos.
 
-        except ValueError as e:
-            alertas.append(f"⚠️  Error SROI: {e}")
-            score_sroi = 0
-            contribucion_sroi = 0
-            resultado_sroi = None
+        Returns:
+            (score, mensaje de error o None); score 0 si los datos son inválidos
+        """
+        # ========== CRITERIO 1: SROI (40%) ==========
+        if nombre == 'sroi':
+            try:
+                return self.criterio_sroi.evaluar(proyecto), None
+            except ValueError as e:
+                return 0, str(e)
 
         # ========== CRITERIO 2: STAKEHOLDERS (25%) ==========
-        try:
-            score_stakeholders = self.criterio_stakeholders.evaluar(proyecto)
-            contribucion_stakeholders = score_stakeholders * self.PESO_STAKEHOLDERS
-        except ValueError as e:
-            alertas.append(f"⚠️  Error Stakeholders: {e}")
-            score_stakeholders = 0
-            contribucion_stakeholders = 0
+        if nombre == 'stakeholders':
+            try:
+                return self.criterio_stakeholders.evaluar(proyecto), None
+            except ValueError as e:
+                return 0, str(e)
 
         # ========== CRITERIO 3: PROBABILIDAD APROBACIÓN (20%) ==========
-        try:
-            score_probabilidad = self.criterio_probabilidad.evaluar(proyecto)
-            contribucion_probabilidad = score_probabilidad * self.PESO_PROBABILIDAD
+        if nombre == 'probabilidad':
+            try:
+                return self.criterio_probabilidad.evaluar(proyecto), None
+            except Exception as e:
+                return 0, str(e)
+
+        # ========== CRITERIO 4: RIESGOS (15%) ==========
+        if nombre == 'riesgos':
+            try:
+                return self.criterio_riesgos.evaluar(proyecto), None
+            except ValueError as e:
+                return 0, str(e)
 
-            # Alertas específicas CONFIS
-            if score_probabilidad >= 80:
+        raise ValueError(f"Criterio desconocido: {nombre}")
+
+    @staticmethod
+    def _resultado_criterio(nombre: str, score: float, error: Optional[str]) -> ResultadoCriterio:
+        """Textos de un criterio a partir de su score y su error"""
+        if error is not None:
+            return ResultadoCriterio(
+                score=score,
+                alertas=[f"⚠️  Error {ETIQUETAS_CRITERIOS[nombre]}: {error}"]
+            )
+
+        # Alertas específicas CONFIS
+        recomendaciones = []
+        if nombre == 'probabilidad':
+            if score >= 80:
                 recomendaciones.append(
                     "💡 Alta prioridad CONFIS - Proyecto con excelente probabilidad de aprobación"
                 )
-            elif score_probabilidad >= 60:
+            elif score >= 60:
                 recomendaciones.append(
                     "ℹ️  Prioridad media CONFIS - Probabilidad aceptable de aprobación"
                 )
-        except Exception as e:
-            alertas.append(f"⚠️  Error Probabilidad: {e}")
-            score_probabilidad = 0
-            contribucion_probabilidad = 0
+        return ResultadoCriterio(score=score, recomendaciones=recomendaciones)
 
-        # ========== CRITERIO 4: RIESGOS (15%) ==========
-        try:
-            score_riesgos = self.criterio_riesgos.evaluar(proyecto)
-            contribucion_riesgos = score_riesgos * self.PESO_RIESGOS
-        except ValueError as e:
-            alertas.append(f"⚠️  Error Riesgos: {e}")
-            score_riesgos = 0
-            contribucion_riesgos = 0
+    def _combinar_scores(
+        self,
+        proyecto_id: str,
+        scores: Dict[str, float],
+        errores: Optional[Dict[str, str]] = None
+    ) -> ResultadoScoringRapido:
+        """Aplica pesos, acota el total y determina el nivel de prioridad"""
+        score_sroi = scores['sroi']
+        score_stakeholders = scores['stakeholders']
+        score_probabilidad = scores['probabilidad']
+        score_riesgos = scores['riesgos']
+
+        contribucion_sroi = score_sroi * self.PESO_SROI
+        contribucion_stakeholders = score_stakeholders * self.PESO_STAKEHOLDERS
+        contribucion_probabilidad = score_probabilidad * self.PESO_PROBABILIDAD
+        contribucion_riesgos = score_riesgos * self.PESO_RIESGOS
 
         # ========== SCORE TOTAL ==========
         score_total = (
@@ -215,23 +733,269 @@ class MotorScoringArquitecturaC:
         # Asegurar rango 0-100
         score_total = min(max(score_total, 0), 100)
 
-        # ========== NIVEL DE PRIORIDAD ==========
-        nivel_prioridad = self._determinar_nivel_prioridad(
-            score_total,
-            score_sroi
+        return ResultadoScoringRapido(
+            proyecto_id=proyecto_id,
+            score_total=score_total,
+            score_sroi=score_sroi,
+            score_stakeholders=score_stakeholders,
+            score_probabilidad=score_probabilidad,
+            score_riesgos=score_riesgos,
+            contribucion_sroi=contribucion_sroi,
+            contribucion_stakeholders=contribucion_stakeholders,
+            contribucion_probabilidad=contribucion_probabilidad,
+            contribucion_riesgos=contribucion_riesgos,
+            nivel_prioridad=self._determinar_nivel_prioridad(score_total, score_sroi),
+            errores=errores or {}
         )
 
+    def _combinar_parciales(self, parciales: Dict[str, ResultadoCriterio]) -> ResultadoScoring:
+        """
+        Combina los resultados parciales de los cuatro criterios.
+
+        Args:
+            parciales: Resultado de cada criterio indexado por nombre
+
+        Returns:
+            ResultadoScoring con score total, nivel, alertas y recomendaciones
+        """
+        rapido = self._combinar_scores(
+            proyecto_id="",
+            scores={nombre: parciales[nombre].score for nombre in CRITERIOS}
+        )
+        return self._construir_resultado(rapido, parciales)
+
+    def _construir_resultado(
+        self,
+        rapido: ResultadoScoringRapido,
+        parciales: Dict[str, ResultadoCriterio]
+    ) -> ResultadoScoring:
+        """Arma el ResultadoScoring con los números y los textos de cada criterio"""
+        alertas = []
+        recomendaciones = []
+        for nombre in CRITERIOS:
+            alertas.extend(parciales[nombre].alertas)
+            recomendaciones.extend(parciales[nombre].recomendaciones)
+
         # ========== RECOMENDACIONES ADICIONALES ==========
-        if score_sroi == 0:
+        if rapido.score_sroi == 0:
             alertas.insert(0, "🚫 PROYECTO RECHAZADO - SROI < 1.0 destruye valor social")
 
-        if score_total >= 80:
+        if rapido.score_total >= 80:
             recomendaciones.append("✅ Proyecto de alta prioridad - Recomendar aprobación")
-        elif score_total < 50:
+        elif rapido.score_total < 50:
             recomendaciones.append("⚠️  Proyecto de baja prioridad - Revisar viabilidad")
 
         # ========== CONSTRUIR RESULTADO ==========
         return ResultadoScoring(
+            score_total=rapido.score_total,
+            score_sroi=rapido.score_sroi,
+            score_stakeholders=rapido.score_stakeholders,
+            score_probabilidad=rapido.score_probabilidad,
+            score_riesgos=rapido.score_riesgos,
+            contribucion_sroi=rapido.contribucion_sroi,
+            contribucion_stakeholders=rapido.contribucion_stakeholders,
+            contribucion_probabilidad=rapido.contribucion_probabilidad,
+            contribucion_riesgos=rapido.contribucion_riesgos,
+            nivel_prioridad=rapido.nivel_prioridad,
+            fecha_calculo=datetime.now(),
+            version_arquitectura=self.VERSION,
+            alertas=alertas,
+            recomendaciones=recomendaciones,
+            resultado_sroi_detallado=parciales['sroi'].detalle
+        )
+
+    def _resultado_no_elegible(self) -> ResultadoScoring:
+        """Resultado para proyectos fuera de municipios PDET/ZOMAC"""
+        return ResultadoScoring(
+            score_total=0,
+            score_sroi=0,
+            score_stakeholders=0,
+            score_probabilidad=0,
+            score_riesgos=0,
+            contribucion_sroi=0,
+            contribucion_stakeholders=0,
+            contribucion_probabilidad=0,
+            contribucion_riesgos=0,
+            nivel_prioridad="NO ELEGIBLE",
+            fecha_calculo=datetime.now(),
+            version_arquitectura=self.VERSION,
+            alertas=[
+                "🚫 PROYECTO NO ELEGIBLE - Obras por Impuestos solo aplica "
+                "para municipios PDET y/o ZOMAC"
+            ],
+            recomendaciones=[
+                "📋 Verificar que el municipio esté en la lista PDET/ZOMAC",
+                "📋 Consultar Anexo 2 CONFIS para municipios elegibles"
+            ]
+        )
+
+    def calcular_scores_lote(self, proyectos: List[ProyectoSocial]) -> ResultadoScoringLote:
+        """
+        Calcula scores de una cartera completa en una pasada vectorizada.
+
+        Extrae las entradas de los cuatro criterios a arreglos NumPy y
+        calcula scores, contribuciones, score total y nivel de prioridad
+        sin generar alertas ni un ResultadoScoring por proyecto.
+
+        Produce los mismos números que calcular_score(proyecto,
+        detallado=False): mismo gate de elegibilidad, mismos valores por
+        defecto y score 0 en criterios con datos inválidos.
+
+        Args:
+            proyectos: Cartera de proyectos a evaluar
+
+        Returns:
+            ResultadoScoringLote con un arreglo por campo
+        """
+        n = len(proyectos)
+
+        elegible = np.zeros(n, dtype=bool)
+
+        sroi = np.full(n, np.nan)
+        sroi_valido = np.zeros(n, dtype=bool)
+
+        pertinencia = np.zeros(n, dtype=int)
+        relacionamiento = np.zeros(n, dtype=int)
+        puntaje_territorial = np.full(n, 5.0)
+        num_municipios = np.ones(n, dtype=int)
+        tiene_pdet = np.zeros(n, dtype=bool)
+        num_departamentos = np.ones(n, dtype=int)
+        en_corredor = np.zeros(n, dtype=bool)
+        puntaje_stakeholders = np.full(n, -1.0)
+        stakeholders_valido = np.zeros(n, dtype=bool)
+
+        score_grupo = np.zeros(n)
+        score_territorial = np.zeros(n)
+        score_sectorial = np.zeros(n)
+        probabilidad_valida = np.zeros(n, dtype=bool)
+
+        riesgos_probabilidad = np.zeros((n, 4), dtype=int)
+        riesgos_impacto = np.zeros((n, 4), dtype=int)
+        riesgos_valido = np.zeros(n, dtype=bool)
+
+        escala_valida = (1, 2, 3, 4, 5)
+        probabilidad_manual = self.criterio_probabilidad.probabilidad_manual
+
+        # Municipios de toda la cartera en una sola consulta a la matriz PDET
+        registros_matriz = self.criterio_probabilidad.precargar_municipios(
+            p for p in proyectos if p.es_elegible_oxi
+        )
+
+        # ========== EXTRACCIÓN DE ENTRADAS ==========
+        for i, proyecto in enumerate(proyectos):
+            if not proyecto.es_elegible_oxi:
+                continue
+            elegible[i] = True
+
+            # SROI (mismas reglas que SROICriterio.evaluar)
+            valor_sroi = proyecto.indicadores_impacto.get('sroi')
+            if valor_sroi is None:
+                valor_sroi = 1.5
+            if isinstance(valor_sroi, (int, float)) and valor_sroi >= 0:
+                sroi[i] = valor_sroi
+                sroi_valido[i] = True
+
+            # Stakeholders: se calcula antes que Probabilidad, igual que en
+            # calcular_score (Probabilidad puede marcar tiene_municipios_pdet)
+            if (proyecto.pertinencia_operacional in escala_valida and
+                    proyecto.mejora_relacionamiento in escala_valida):
+                stakeholders_valido[i] = True
+                pertinencia[i] = proyecto.pertinencia_operacional
+                relacionamiento[i] = proyecto.mejora_relacionamiento
+                if proyecto.puntaje_territorial_confis is not None:
+                    puntaje_territorial[i] = max(min(proyecto.puntaje_territorial_confis, 10.0), 1.0)
+                if proyecto.municipios:
+                    num_municipios[i] = len(proyecto.municipios)
+                tiene_pdet[i] = bool(proyecto.tiene_municipios_pdet)
+                if proyecto.departamentos:
+                    num_departamentos[i] = len(proyecto.departamentos)
+                en_corredor[i] = bool(proyecto.en_corredor_transmision)
+                if proyecto.stakeholders_involucrados:
+                    puntaje_stakeholders[i] = sum(
+                        PUNTAJES_STAKEHOLDERS.get(s, 0)
+                        for s in proyecto.stakeholders_involucrados
+                    )
+
+            # Probabilidad (grupo y puntaje sectorial se resuelven por proyecto)
+            if probabilidad_manual:
+                probabilidad_valida[i] = True
+            else:
+                try:
+                    (score_grupo[i],
+                     score_territorial[i],
+                     score_sectorial[i]) = self.criterio_probabilidad.extraer_componentes(
+                        proyecto, registros_matriz
+                    )
+                    probabilidad_valida[i] = True
+                except Exception:
+                    pass
+
+            # Riesgos (mismas reglas que ProyectoSocial.validar_riesgos)
+            pares = [
+                (proyecto.riesgo_tecnico_probabilidad, proyecto.riesgo_tecnico_impacto),
+                (proyecto.riesgo_social_probabilidad, proyecto.riesgo_social_impacto),
+                (proyecto.riesgo_financiero_probabilidad, proyecto.riesgo_financiero_impacto),
+                (proyecto.riesgo_regulatorio_probabilidad, proyecto.riesgo_regulatorio_impacto),
+            ]
+            if all(p in escala_valida and im in escala_valida for p, im in pares):
+                riesgos_valido[i] = True
+                riesgos_probabilidad[i] = [p for p, _ in pares]
+                riesgos_impacto[i] = [im for _, im in pares]
+
+        # ========== CÁLCULO VECTORIZADO ==========
+        score_sroi = np.where(
+            sroi_valido,
+            self.criterio_sroi.convertir_sroi_a_score_vectorizado(np.where(sroi_valido, sroi, 1.0)),
+            0.0
+        )
+
+        score_stakeholders = np.where(
+            stakeholders_valido,
+            self.criterio_stakeholders.evaluar_vectorizado(
+                pertinencia, relacionamiento, puntaje_territorial, num_municipios,
+                tiene_pdet, num_departamentos, en_corredor, puntaje_stakeholders
+            ),
+            0.0
+        )
+
+        score_probabilidad = np.where(
+            probabilidad_valida,
+            self.criterio_probabilidad.evaluar_vectorizado(
+                score_grupo, score_territorial, score_sectorial
+            ),
+            0.0
+        )
+
+        score_riesgos = np.where(
+            riesgos_valido,
+            self.criterio_riesgos.evaluar_vectorizado(
+                np.where(riesgos_valido[:, None], riesgos_probabilidad, 1),
+                np.where(riesgos_valido[:, None], riesgos_impacto, 1)
+            ),
+            0.0
+        )
+
+        # Gate de elegibilidad: todo en cero
+        score_sroi = np.where(elegible, score_sroi, 0.0)
+        score_stakeholders = np.where(elegible, score_stakeholders, 0.0)
+        score_probabilidad = np.where(elegible, score_probabilidad, 0.0)
+        score_riesgos = np.where(elegible, score_riesgos, 0.0)
+
+        contribucion_sroi = score_sroi * self.PESO_SROI
+        contribucion_stakeholders = score_stakeholders * self.PESO_STAKEHOLDERS
+        contribucion_probabilidad = score_probabilidad * self.PESO_PROBABILIDAD
+        contribucion_riesgos = score_riesgos * self.PESO_RIESGOS
+
+        score_total = (
+            contribucion_sroi +
+            contribucion_stakeholders +
+            contribucion_probabilidad +
+            contribucion_riesgos
+        )
+        score_total = np.minimum(np.maximum(score_total, 0), 100)
+
+        return ResultadoScoringLote(
+            proyecto_ids=[p.id for p in proyectos],
             score_total=score_total,
             score_sroi=score_sroi,
             score_stakeholders=score_stakeholders,
@@ -241,14 +1005,74 @@ class MotorScoringArquitecturaC:
             contribucion_stakeholders=contribucion_stakeholders,
             contribucion_probabilidad=contribucion_probabilidad,
             contribucion_riesgos=contribucion_riesgos,
-            nivel_prioridad=nivel_prioridad,
+            nivel_prioridad=determinar_niveles_prioridad(score_total, score_sroi, elegible),
+            elegible=elegible,
+            sroi=sroi,
+            riesgos_probabilidad=riesgos_probabilidad,
+            riesgos_impacto=riesgos_impacto,
             fecha_calculo=datetime.now(),
-            version_arquitectura=self.VERSION,
-            alertas=alertas,
-            recomendaciones=recomendaciones,
-            resultado_sroi_detallado=resultado_sroi
+            version_arquitectura=self.VERSION
         )
 
+    def calcular_top_k(
+        self,
+        proyectos: Iterable[ProyectoSocial],
+        k: int = 10,
+        tamano_bloque: int = 1000,
+        detallado: bool = True
+    ) -> Tuple[List[Tuple[ProyectoSocial, ResultadoScoring]], EstadisticasStreaming]:
+        """
+        Ranking top-K en streaming sobre un pool arbitrariamente grande.
+
+        Consume el iterable por bloques (p.ej. DatabaseManager.iterar_proyectos),
+        puntúa cada bloque con calcular_scores_lote y conserva solo los K
+        mejores en un heap. Al final calcula el ResultadoScoring completo
+        únicamente para los K ganadores, con los campos que completan los
+        criterios (CAMPOS_CALCULADOS) restaurados a su valor de entrada: así
+        el resultado tiene el mismo score usado en el ranking. La memoria
+        queda acotada a O(K + tamano_bloque).
+
+        Args:
+            proyectos: Iterable o generador de proyectos (se consume una vez)
+            k: Número de proyectos a conservar
+            tamano_bloque: Proyectos puntuados por pasada vectorizada
+            detallado: Si True, el resultado final incluye alertas y detalle
+
+        Returns:
+            (lista de (proyecto, resultado) de mayor a menor score,
+             estadísticas del pool completo)
+        """
+        if tamano_bloque < 1:
+            raise ValueError(f"tamano_bloque debe ser >= 1, recibido: {tamano_bloque}")
+
+        ranking = RankingTopK(k)
+        bloque: List[ProyectoSocial] = []
+
+        def procesar(bloque: List[ProyectoSocial]):
+            # Los criterios escriben en el proyecto; guardar las entradas
+            entradas = [
+                {campo: copy.deepcopy(getattr(proyecto, campo)) for campo in CAMPOS_CALCULADOS}
+                for proyecto in bloque
+            ]
+            lote = self.calcular_scores_lote(bloque)
+            for proyecto, campos, score in zip(bloque, entradas, lote.score_total.tolist()):
+                ranking.agregar((proyecto, campos), score)
+
+        for proyecto in proyectos:
+            bloque.append(proyecto)
+            if len(bloque) >= tamano_bloque:
+                procesar(bloque)
+                bloque = []
+        if bloque:
+            procesar(bloque)
+
+        mejores = []
+        for proyecto, campos in ranking.resultados():
+            for campo, valor in campos.items():
+                setattr(proyecto, campo, valor)
+            mejores.append((proyecto, self.calcular_score(proyecto, detallado=detallado)))
+        return mejores, ranking.estadisticas
+
     def _determinar_nivel_prioridad(
         self,
         score_total: float,
@@ -347,16 +1171,21 @@ class MotorScoringArquitecturaC:
 
 
 # Función helper para uso rápido
-def calcular_score_proyecto(proyecto: ProyectoSocial, db_path: str = "data/proyectos.db") -> ResultadoScoring:
+def calcular_score_proyecto(
+    proyecto: ProyectoSocial,
+    db_path: str = "data/proyectos.db",
+    cache: Optional[CacheScores] = None
+) -> ResultadoScoring:
     """
     Helper function para calcular score de un proyecto
 
     Args:
         proyecto: Proyecto a evaluar
         db_path: Ruta a base de datos con matriz PDET
+        cache: Caché de resultados (opcional)
 
     Returns:
         ResultadoScoring completo
     """
-    motor = MotorScoringArquitecturaC(db_path=db_path)
+    motor = MotorScoringArquitecturaC(db_path=db_path, cache=cache)
     return motor.calcular_score(proyecto, detallado=True)
@@ -0,0 +1,365 @@
+"""
+Optimizador de cartera con restricción presupuestal - Arquitectura C
+
+Selecciona el subconjunto de proyectos que maximiza la suma de scores
+(ResultadoScoring.score_total) sujeto a:
+- Cupo CONFIS: suma de presupuesto_total ≤ presupuesto disponible
+- Topes por departamento
+- Proyectos de inclusión obligatoria
+
+Métodos:
+- Exacto: branch-and-bound sobre mochila 0/1 (cota de relajación
+  fraccional del presupuesto), con límite de tiempo
+- Greedy: por densidad score/presupuesto y por score, el mejor de ambos.
+  Se usa en carteras grandes y como solución inicial del exacto.
+
+Un proyecto en varios departamentos consume su presupuesto completo en el
+tope de cada uno (criterio conservador).
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import sys
+import time
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.models.proyecto import ProyectoSocial
+from src.scoring.motor_arquitectura_c import MotorScoringArquitecturaC, ResultadoScoring
+
+
+# Niveles que nunca se seleccionan salvo que sean obligatorios
+NIVELES_EXCLUIDOS = ("NO ELEGIBLE", "RECHAZADO")
+
+# Tolerancia para comparar sumas de scores
+EPSILON = 1e-9
+
+
+class _TiempoAgotado(Exception):
+    """Interrumpe el branch-and-bound al agotar el límite de tiempo"""
+
+
+@dataclass
+class RestriccionesCartera:
+    """Restricciones de la selección de cartera"""
+
+    presupuesto_disponible: float  # Cupo CONFIS (COP)
+    topes_departamento: Dict[str, float] = field(default_factory=dict)  # Depto → tope (COP)
+    obligatorios: List[str] = field(default_factory=list)  # IDs de proyectos
+    excluir_no_priorizables: bool = True  # Excluye NO ELEGIBLE y RECHAZADO
+
+    def topes_normalizados(self) -> Dict[str, float]:
+        """Topes indexados por nombre de departamento normalizado"""
+        return {
+            _normalizar_departamento(depto): valor
+            for depto, valor in self.topes_departamento.items()
+        }
+
+
+@dataclass
+class ResultadoOptimizacion:
+    """Resultado de la optimización de cartera"""
+
+    seleccionados: List[str]  # IDs ordenados por score (mayor a menor)
+    score_cartera: float  # Suma de score_total de los seleccionados
+    presupuesto_usado: float
+    presupuesto_disponible: float
+    uso_departamentos: Dict[str, float]  # Depto → presupuesto comprometido
+
+    metodo: str  # "exacto" o "greedy"
+    optimo: bool  # True si el exacto terminó dentro del límite de tiempo
+    tiempo_segundos: float
+    nodos_explorados: int = 0
+
+    no_seleccionados: List[str] = field(default_factory=list)
+    excluidos: Dict[str, str] = field(default_factory=dict)  # ID → motivo
+    fecha_calculo: datetime = field(default_factory=datetime.now)
+
+    @property
+    def presupuesto_restante(self) -> float:
+        return self.presupuesto_disponible - self.presupuesto_usado
+
+    def __len__(self) -> int:
+        return len(self.seleccionados)
+
+
+def _normalizar_departamento(departamento: str) -> str:
+    return departamento.strip().upper()
+
+
+class OptimizadorCartera:
+    """
+    Optimizador de selección de proyectos bajo cupo presupuestal.
+
+    Consume ResultadoScoring del motor Arquitectura C (uno por proyecto).
+    """
+
+    def __init__(self, limite_tiempo: float = 2.0, max_proyectos_exacto: int = 150):
+        """
+        Inicializa el optimizador.
+
+        Args:
+            limite_tiempo: Segundos máximos para el método exacto
+            max_proyectos_exacto: Por encima de este número de candidatos
+                se usa solo el método greedy
+        """
+        self.limite_tiempo = limite_tiempo
+        self.max_proyectos_exacto = max_proyectos_exacto
+
+    def optimizar(
+        self,
+        proyectos: Sequence[ProyectoSocial],
+        resultados: Sequence[ResultadoScoring],
+        restricciones: RestriccionesCartera,
+        metodo: str = "auto"
+    ) -> ResultadoOptimizacion:
+        """
+        Selecciona la cartera de mayor score total dentro del presupuesto.
+
+        Args:
+            proyectos: Proyectos candidatos
+            resultados: ResultadoScoring de cada proyecto (mismo orden)
+            restricciones: Cupo, topes por departamento y obligatorios
+            metodo: "auto", "exacto" o "greedy"
+
+        Returns:
+            ResultadoOptimizacion
+
+        Raises:
+            ValueError: Si los obligatorios no caben o los datos no coinciden
+        """
+        inicio = time.perf_counter()
+
+        if len(proyectos) != len(resultados):
+            raise ValueError("Debe haber un ResultadoScoring por proyecto")
+        if metodo not in ("auto", "exacto", "greedy"):
+            raise ValueError(f"Método desconocido: {metodo}")
+
+        topes = restricciones.topes_normalizados()
+        obligatorios = set(restricciones.obligatorios)
+
+        ids_conocidos = {p.id for p in proyectos}
+        faltantes = obligatorios - ids_conocidos
+        if faltantes:
+            raise ValueError(f"Proyectos obligatorios no encontrados: {', '.join(sorted(faltantes))}")
+
+        # ========== OBLIGATORIOS ==========
+        capacidad = restricciones.presupuesto_disponible
+        uso = {depto: 0.0 for depto in topes}
+        seleccion_fija = []
+
+        for i, proyecto in enumerate(proyectos):
+            if proyecto.id not in obligatorios:
+                continue
+            capacidad -= proyecto.presupuesto_total
+            for depto in self._departamentos_con_tope(proyecto, topes):
+                uso[depto] += proyecto.presupuesto_total
+            seleccion_fija.append(i)
+
+        if capacidad < -EPSILON:
+            raise ValueError("Los proyectos obligatorios superan el presupuesto disponible")
+        for depto, valor in uso.items():
+            if valor > topes[depto] + EPSILON:
+                raise ValueError(f"Los proyectos obligatorios superan el tope de {depto}")
+
+        # ========== CANDIDATOS ==========
+        excluidos = {}
+        candidatos = []
+        for i, (proyecto, resultado) in enumerate(zip(proyectos, resultados)):
+            if proyecto.id in obligatorios:
+                continue
+            if restricciones.excluir_no_priorizables and resultado.nivel_prioridad in NIVELES_EXCLUIDOS:
+                excluidos[proyecto.id] = resultado.nivel_prioridad
+            elif resultado.score_total <= 0:
+                excluidos[proyecto.id] = "Score 0"
+            elif proyecto.presupuesto_total > capacidad + EPSILON:
+                excluidos[proyecto.id] = "Presupuesto mayor al cupo disponible"
+            else:
+                candidatos.append(i)
+
+        valores = [float(resultados[i].score_total) for i in candidatos]
+        costos = [max(float(proyectos[i].presupuesto_total), 0.0) for i in candidatos]
+        deptos = [self._departamentos_con_tope(proyectos[i], topes) for i in candidatos]
+
+        # ========== SOLUCIÓN ==========
+        elegidos, nodos, optimo = self._greedy(valores, costos, deptos, capacidad, uso, topes), 0, False
+        metodo_usado = "greedy"
+
+        usar_exacto = metodo == "exacto" or (
+            metodo == "auto" and len(candidatos) <= self.max_proyectos_exacto
+        )
+        if usar_exacto:
+            elegidos, nodos, optimo = self._branch_and_bound(
+                valores, costos, deptos, capacidad, uso, topes, elegidos, inicio
+            )
+            metodo_usado = "exacto"
+
+        # ========== RESULTADO ==========
+        indices = seleccion_fija + [candidatos[j] for j in elegidos]
+        indices.sort(key=lambda i: (-resultados[i].score_total, i))
+        seleccionados = {proyectos[i].id for i in indices}
+
+        uso_final = {}
+        for i in indices:
+            for depto in {_normalizar_departamento(d) for d in proyectos[i].departamentos}:
+                uso_final[depto] = uso_final.get(depto, 0.0) + proyectos[i].presupuesto_total
+
+        return ResultadoOptimizacion(
+            seleccionados=[proyectos[i].id for i in indices],
+            score_cartera=sum(float(resultados[i].score_total) for i in indices),
+            presupuesto_usado=sum(proyectos[i].presupuesto_total for i in indices),
+            presupuesto_disponible=restricciones.presupuesto_disponible,
+            uso_departamentos=uso_final,
+            metodo=metodo_usado,
+            optimo=optimo,
+            tiempo_segundos=time.perf_counter() - inicio,
+            nodos_explorados=nodos,
+            no_seleccionados=[p.id for p in proyectos if p.id not in seleccionados],
+            excluidos=excluidos,
+            fecha_calculo=datetime.now()
+        )
+
+    def optimizar_proyectos(
+        self,
+        proyectos: Sequence[ProyectoSocial],
+        restricciones: RestriccionesCartera,
+        motor: Optional[MotorScoringArquitecturaC] = None,
+        metodo: str = "auto"
+    ) -> ResultadoOptimizacion:
+        """
+        Calcula scores con el motor y optimiza la cartera.
+
+        Args:
+            proyectos: Proyectos candidatos
+            restricciones: Cupo, topes por departamento y obligatorios
+            motor: Motor de scoring (por defecto uno nuevo)
+            metodo: "auto", "exacto" o "greedy"
+
+        Returns:
+            ResultadoOptimizacion
+        """
+        motor = motor or MotorScoringArquitecturaC()
+        resultados = [motor.calcular_score_rapido(p) for p in proyectos]
+        return self.optimizar(proyectos, resultados, restricciones, metodo)
+
+    @staticmethod
+    def _departamentos_con_tope(proyecto: ProyectoSocial, topes: Dict[str, float]) -> List[str]:
+        """Departamentos del proyecto que tienen tope definido"""
+        return sorted({
+            _normalizar_departamento(d) for d in proyecto.departamentos
+        }.intersection(topes))
+
+    @staticmethod
+    def _cabe(j, costos, deptos, capacidad, uso, topes) -> bool:
+        """Verifica si el candidato j cabe en el cupo y en los topes"""
+        if costos[j] > capacidad + EPSILON:
+            return False
+        return all(uso[d] + costos[j] <= topes[d] + EPSILON for d in deptos[j])
+
+    def _greedy(self, valores, costos, deptos, capacidad, uso, topes) -> List[int]:
+        """
+        Greedy por densidad (score / presupuesto) y por score; retorna el mejor.
+
+        Returns:
+            Índices de candidatos seleccionados
+        """
+        def densidad(j):
+            return valores[j] / costos[j] if costos[j] > 0 else float('inf')
+
+        mejor, mejor_valor = [], -1.0
+        for clave in (densidad, lambda j: valores[j]):
+            cap = capacidad
+            uso_local = dict(uso)
+            elegidos = []
+            for j in sorted(range(len(valores)), key=lambda j: (-clave(j), j)):
+                if self._cabe(j, costos, deptos, cap, uso_local, topes):
+                    elegidos.append(j)
+                    cap -= costos[j]
+                    for d in deptos[j]:
+                        uso_local[d] += costos[j]
+            valor = sum(valores[j] for j in elegidos)
+            if valor > mejor_valor + EPSILON:
+                mejor, mejor_valor = elegidos, valor
+
+        return mejor
+
+    def _branch_and_bound(self, valores, costos, deptos, capacidad, uso, topes, incumbente, inicio):
+        """
+        Branch-and-bound de mochila 0/1 con topes por departamento.
+
+        Explora en profundidad (incluir primero) con los candidatos
+        ordenados por densidad. La cota es la relajación fraccional del
+        cupo presupuestal ignorando topes, por lo que es válida.
+
+        Returns:
+            Tupla (índices seleccionados, nodos explorados, óptimo probado)
+        """
+        orden = sorted(
+            range(len(valores)),
+            key=lambda j: (-(valores[j] / costos[j] if costos[j] > 0 else float('inf')), j)
+        )
+        v = [valores[j] for j in orden]
+        c = [costos[j] for j in orden]
+        dp = [deptos[j] for j in orden]
+        n = len(orden)
+
+        posicion = {j: k for k, j in enumerate(orden)}
+        mejor = {
+            'valor': sum(valores[j] for j in incumbente),
+            'seleccion': sorted(posicion[j] for j in incumbente)
+        }
+        seleccion = []
+        uso_local = dict(uso)
+        nodos = 0
+        limite = inicio + self.limite_tiempo
+
+        def cota(k, cap, valor):
+            cap = max(cap, 0.0)
+            for m in range(k, n):
+                if c[m] <= cap:
+                    cap -= c[m]
+                    valor += v[m]
+                else:
+                    return valor + v[m] * cap / c[m]
+            return valor
+
+        def explorar(k, cap, valor):
+            nonlocal nodos
+            nodos += 1
+            if nodos % 1024 == 0 and time.perf_counter() > limite:
+                raise _TiempoAgotado()
+
+            if valor > mejor['valor'] + EPSILON:
+                mejor['valor'] = valor
+                mejor['seleccion'] = list(seleccion)
+
+            if k == n or cota(k, cap, valor) <= mejor['valor'] + EPSILON:
+                return
+
+            # Rama 1: incluir k
+            if c[k] <= cap + EPSILON and all(uso_local[d] + c[k] <= topes[d] + EPSILON for d in dp[k]):
+                seleccion.append(k)
+                for d in dp[k]:
+                    uso_local[d] += c[k]
+                explorar(k + 1, cap - c[k], valor + v[k])
+                for d in dp[k]:
+                    uso_local[d] -= c[k]
+                seleccion.pop()
+
+            # Rama 2: excluir k
+            explorar(k + 1, cap, valor)
+
+        optimo = True
+        limite_recursion = sys.getrecursionlimit()
+        try:
+            sys.setrecursionlimit(max(limite_recursion, n + 100))
+            explorar(0, capacidad, 0.0)
+        except _TiempoAgotado:
+            optimo = False
+        finally:
+            sys.setrecursionlimit(limite_recursion)
+
+        return [orden[k] for k in mejor['seleccion']], nodos, optimo
@@ -0,0 +1,183 @@
+"""
+Ranking en streaming (top-K) para carteras muy grandes.
+
+Consume un iterable de proyectos (por ejemplo el generador de
+DatabaseManager.iterar_proyectos) y conserva solo los K mejores resultados
+en un min-heap, junto con estadísticas acumuladas (Welford) del total.
+La memoria queda acotada a O(K) sin importar el tamaño del pool.
+
+El orden del top-K es idéntico al de ordenar la lista completa con
+sort estable descendente: ante empates de score gana el que llegó antes.
+"""
+import heapq
+import itertools
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# ========== UMBRALES DE BANDAS ==========
+
+# Mismas bandas que SistemaPriorizacionProyectos.generar_reporte
+UMBRAL_ALTA_PRIORIDAD = 80.0
+UMBRAL_MEDIA_PRIORIDAD = 60.0
+
+
+# ========== ESTADÍSTICAS ACUMULADAS ==========
+
+@dataclass
+class EstadisticasStreaming:
+    """
+    Resumen estadístico acumulado en una sola pasada.
+
+    Media y varianza con el algoritmo de Welford (estable numéricamente);
+    los conteos por banda usan los mismos umbrales del reporte de cartera.
+    """
+    total: int = 0
+    media: float = 0.0
+    m2: float = 0.0
+    minimo: float = math.inf
+    maximo: float = -math.inf
+    alta_prioridad: int = 0
+    media_prioridad: int = 0
+    baja_prioridad: int = 0
+
+    def agregar(self, score: float):
+        """Incorpora un score al resumen."""
+        self.total += 1
+        delta = score - self.media
+        self.media += delta / self.total
+        self.m2 += delta * (score - self.media)
+
+        if score < self.minimo:
+            self.minimo = score
+        if score > self.maximo:
+            self.maximo = score
+
+        if score >= UMBRAL_ALTA_PRIORIDAD:
+            self.alta_prioridad += 1
+        elif score >= UMBRAL_MEDIA_PRIORIDAD:
+            self.media_prioridad += 1
+        else:
+            self.baja_prioridad += 1
+
+    @property
+    def varianza(self) -> float:
+        """Varianza poblacional (igual que generar_reporte)."""
+        return self.m2 / self.total if self.total else 0.0
+
+    @property
+    def desviacion_estandar(self) -> float:
+        return math.sqrt(self.varianza)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Mismo formato que 'estadisticas' en generar_reporte."""
+        if not self.total:
+            return {}
+        return {
+            'score_maximo': self.maximo,
+            'score_minimo': self.minimo,
+            'score_promedio': self.media,
+            'desviacion_estandar': self.desviacion_estandar,
+            'proyectos_alta_prioridad': self.alta_prioridad,
+            'proyectos_media_prioridad': self.media_prioridad,
+            'proyectos_baja_prioridad': self.baja_prioridad
+        }
+
+
+# ========== TOP-K ==========
+
+class RankingTopK:
+    """
+    Acumulador de los K mejores elementos por score.
+
+    Uso:
+        ranking = RankingTopK(k=50)
+        for proyecto in proyectos:
+            ranking.agregar(evaluar(proyecto), score)
+        mejores = ranking.resultados()
+    """
+
+    def __init__(self, k: int):
+        """
+        Args:
+            k: Número de elementos a conservar (>= 1)
+        """
+        if k < 1:
+            raise ValueError(f"k debe ser >= 1, recibido: {k}")
+
+        self.k = k
+        # Entradas (score, -secuencia, elemento): la raíz es el peor del top-K
+        # y, ante empates, el que llegó más tarde.
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._secuencia = itertools.count()
+        self.estadisticas = EstadisticasStreaming()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def umbral(self) -> Optional[float]:
+        """Score mínimo para entrar al top-K (None mientras no esté lleno)."""
+        return self._heap[0][0] if len(self._heap) >= self.k else None
+
+    def agregar(self, elemento: Any, score: float) -> bool:
+        """
+        Ofrece un elemento al ranking.
+
+        Returns:
+            True si quedó dentro del top-K actual
+        """
+        score = float(score)
+        self.estadisticas.agregar(score)
+        entrada = (score, -next(self._secuencia), elemento)
+
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entrada)
+            return True
+
+        # Solo entra si supera estrictamente a la raíz (el más reciente
+        # siempre pierde los empates → mismo orden que un sort estable)
+        if entrada[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entrada)
+            return True
+        return False
+
+    def resultados(self) -> List[Any]:
+        """Elementos del top-K ordenados de mayor a menor score."""
+        return [
+            elemento
+            for _, _, elemento in sorted(self._heap, key=lambda e: e[:2], reverse=True)
+        ]
+
+    def resultados_con_score(self) -> List[Tuple[Any, float]]:
+        """Pares (elemento, score) ordenados de mayor a menor."""
+        return [
+            (elemento, score)
+            for score, _, elemento in sorted(self._heap, key=lambda e: e[:2], reverse=True)
+        ]
+
+
+def top_k_streaming(
+    elementos: Iterable[Any],
+    k: int,
+    puntuar: Callable[[Any], Any],
+    score: Callable[[Any], float] = lambda resultado: resultado
+) -> Tuple[List[Any], EstadisticasStreaming]:
+    """
+    Evalúa un iterable en una pasada y conserva los K mejores resultados.
+
+    Args:
+        elementos: Iterable o generador de entrada (se consume una vez)
+        k: Tamaño del ranking
+        puntuar: Función elemento → resultado
+        score: Función resultado → score numérico
+
+    Returns:
+        (top-K de resultados ordenados, estadísticas del total)
+    """
+    ranking = RankingTopK(k)
+    for elemento in elementos:
+        resultado = puntuar(elemento)
+        ranking.agregar(resultado, score(resultado))
+    return ranking.resultados(), ranking.estadisticas
@@ -0,0 +1,226 @@
+"""
+Re-evaluación dirigida de la cartera al cambiar la matriz PDET/ZOMAC.
+
+Al cargar una nueva matriz CONFIS solo cambia el puntaje de probabilidad
+de los proyectos ubicados en municipios cuyos puntajes se modificaron, y
+solo si el proyecto es de un sector afectado. En lugar de recalcular la
+cartera completa:
+
+1. MatrizPDETRepository.comparar_versiones obtiene la DiferenciaMatriz
+   (municipios agregados, eliminados y columnas de sector modificadas).
+2. IndiceProyectosMunicipio (municipio → proyectos, sobre
+   ProyectoSocial.municipios y sectores) selecciona los proyectos afectados.
+3. Solo esos proyectos se recalculan con el motor y se reporta cómo se
+   movió el ranking.
+
+El costo es proporcional al tamaño del cambio, no al de la cartera.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar src al path (src/database se importa igual que en los criterios)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.proyecto import ProyectoSocial
+from src.models.busqueda_municipios import normalizar_nombre
+from database.matriz_sectores import columna_sector
+from database.matriz_pdet_repository import DiferenciaMatriz
+
+
+# ========== ÍNDICE MUNICIPIO → PROYECTOS ==========
+
+class IndiceProyectosMunicipio:
+    """
+    Municipio normalizado → posiciones de los proyectos que lo incluyen.
+
+    Por proyecto guarda sus departamentos normalizados y las columnas de
+    la matriz que corresponden a sus sectores. Un sector que no se puede
+    traducir a columna se trata como afectado por cualquier cambio, para
+    no dejar de recalcular un proyecto por un nombre de sector atípico.
+    """
+
+    def __init__(self, proyectos: Sequence[ProyectoSocial]):
+        """
+        Args:
+            proyectos: Cartera, en el orden del ranking base
+        """
+        self.proyectos = list(proyectos)
+        self._por_municipio: Dict[str, List[int]] = {}
+        self._departamentos: List[FrozenSet[str]] = []
+        self._columnas: List[Optional[FrozenSet[str]]] = []
+
+        for posicion, proyecto in enumerate(self.proyectos):
+            self._departamentos.append(frozenset(normalizar_nombre(d) for d in proyecto.departamentos))
+            self._columnas.append(self._columnas_proyecto(proyecto))
+            for municipio in {normalizar_nombre(m) for m in proyecto.municipios}:
+                self._por_municipio.setdefault(municipio, []).append(posicion)
+
+    def __len__(self) -> int:
+        return len(self._por_municipio)
+
+    @staticmethod
+    def _columnas_proyecto(proyecto: ProyectoSocial) -> Optional[FrozenSet[str]]:
+        """Columnas de sector del proyecto (None = alguno no reconocido)"""
+        columnas = set()
+        for sector in proyecto.sectores:
+            try:
+                columnas.add(columna_sector(sector))
+            except ValueError:
+                return None
+        return frozenset(columnas)
+
+    def proyectos_municipio(self, municipio: str) -> List[ProyectoSocial]:
+        """Proyectos que incluyen el municipio."""
+        return [self.proyectos[p] for p in self._por_municipio.get(normalizar_nombre(municipio), ())]
+
+    def afectados(self, diferencia: DiferenciaMatriz) -> List[int]:
+        """
+        Posiciones de los proyectos cuyo puntaje sectorial puede cambiar.
+
+        Un proyecto es afectado si incluye un municipio modificado, el
+        departamento del municipio está entre los del proyecto y alguno
+        de sus sectores cambió (entrar o salir de la matriz cambia todos).
+
+        Returns:
+            Posiciones en la cartera, en orden ascendente
+        """
+        afectados: Set[int] = set()
+        for (departamento, municipio), columnas in diferencia.columnas_afectadas().items():
+            for posicion in self._por_municipio.get(municipio, ()):
+                if departamento not in self._departamentos[posicion]:
+                    continue
+                sectores = self._columnas[posicion]
+                if sectores is None or sectores.intersection(columnas):
+                    afectados.add(posicion)
+        return sorted(afectados)
+
+
+# ========== REPORTE DE CAMBIOS ==========
+
+@dataclass
+class CambioRanking:
+    """Movimiento de un proyecto en el ranking (posiciones desde 1)"""
+    proyecto_id: str
+    score_anterior: Optional[float]
+    score_nuevo: float
+    posicion_anterior: Optional[int]
+    posicion_nueva: int
+
+    @property
+    def delta_score(self) -> float:
+        return self.score_nuevo - (self.score_anterior or 0.0)
+
+    @property
+    def delta_posicion(self) -> int:
+        """Puestos ganados (positivo = sube en el ranking)"""
+        if self.posicion_anterior is None:
+            return 0
+        return self.posicion_anterior - self.posicion_nueva
+
+
+@dataclass
+class ReporteReevaluacion:
+    """
+    Resultado de reevaluar_por_cambio_matriz.
+
+    Atributos:
+        diferencia: Cambios de la matriz que originaron la re-evaluación
+        reevaluados: IDs de los proyectos recalculados
+        scores: Score total vigente por proyecto (recalculados y previos)
+        ranking: IDs ordenados de mayor a menor score
+        cambios: Proyectos cuyo score o posición cambió, por posición nueva
+    """
+    diferencia: DiferenciaMatriz
+    reevaluados: List[str]
+    scores: Dict[str, float]
+    ranking: List[str]
+    cambios: List[CambioRanking] = field(default_factory=list)
+
+    @property
+    def fraccion_reevaluada(self) -> float:
+        """Fracción de la cartera que se recalculó (0-1)"""
+        return len(self.reevaluados) / len(self.scores) if self.scores else 0.0
+
+
+def _posiciones(ids: List[str], scores: Dict[str, float]) -> Dict[str, int]:
+    """Posición 1..n de cada ID, por score descendente y orden estable"""
+    orden = np.argsort(-np.array([scores[i] for i in ids], dtype=float), kind='stable')
+    return {ids[indice]: posicion for posicion, indice in enumerate(orden, start=1)}
+
+
+# ========== RE-EVALUACIÓN ==========
+
+def reevaluar_por_cambio_matriz(
+    motor,
+    proyectos: Sequence[ProyectoSocial],
+    scores_anteriores: Dict[str, float],
+    diferencia: DiferenciaMatriz,
+    indice: Optional[IndiceProyectosMunicipio] = None
+) -> ReporteReevaluacion:
+    """
+    Recalcula solo los proyectos afectados por un cambio de matriz.
+
+    A los proyectos afectados se les descarta el puntaje sectorial que el
+    criterio de probabilidad dejó memorizado (puntaje_sectorial_max) para
+    que lo vuelva a leer de la matriz vigente. Los proyectos sin score
+    anterior también se calculan. Los scores son los de
+    calcular_scores_lote (iguales a calcular_score con detallado=False).
+
+    Args:
+        motor: MotorScoringArquitecturaC cuyo repositorio ya tiene la matriz nueva
+        proyectos: Cartera completa
+        scores_anteriores: ID de proyecto → score total con la matriz anterior
+        diferencia: Resultado de MatrizPDETRepository.comparar_versiones
+        indice: Índice de la cartera (se construye si no se da)
+
+    Returns:
+        ReporteReevaluacion con scores vigentes y movimientos del ranking
+    """
+    if indice is None:
+        indice = IndiceProyectosMunicipio(proyectos)
+
+    posiciones = set(indice.afectados(diferencia))
+    posiciones.update(
+        p for p, proyecto in enumerate(proyectos) if proyecto.id not in scores_anteriores
+    )
+    afectados = [proyectos[p] for p in sorted(posiciones)]
+
+    for proyecto in afectados:
+        proyecto.puntaje_sectorial_max = None
+
+    scores = {proyecto.id: scores_anteriores.get(proyecto.id) for proyecto in proyectos}
+    if afectados:
+        lote = motor.calcular_scores_lote(afectados)
+        scores.update(zip(lote.proyecto_ids, lote.score_total.tolist()))
+
+    ids = [proyecto.id for proyecto in proyectos]
+    posiciones_nuevas = _posiciones(ids, scores)
+    previos = [i for i in ids if i in scores_anteriores]
+    posiciones_previas = _posiciones(previos, scores_anteriores)
+
+    cambios = [
+        CambioRanking(
+            proyecto_id=proyecto_id,
+            score_anterior=scores_anteriores.get(proyecto_id),
+            score_nuevo=scores[proyecto_id],
+            posicion_anterior=posiciones_previas.get(proyecto_id),
+            posicion_nueva=posicion
+        )
+        for proyecto_id, posicion in posiciones_nuevas.items()
+        if posiciones_previas.get(proyecto_id) != posicion
+        or scores_anteriores.get(proyecto_id) != scores[proyecto_id]
+    ]
+    cambios.sort(key=lambda c: c.posicion_nueva)
+
+    return ReporteReevaluacion(
+        diferencia=diferencia,
+        reevaluados=[proyecto.id for proyecto in afectados],
+        scores=scores,
+        ranking=sorted(ids, key=posiciones_nuevas.get),
+        cambios=cambios
+    )
@@ -0,0 +1,296 @@
+"""
+Análisis de sensibilidad de pesos - Arquitectura C
+
+Responde preguntas del comité como "¿qué pasa con el ranking si SROI pesa
+35% en lugar de 40%?" sin recalcular los criterios: la matriz de scores por
+criterio (n proyectos × 4) se obtiene una sola vez y cada combinación de
+pesos se evalúa como columna de una multiplicación de matrices.
+
+    scores (n × m) = matriz_scores (n × 4) @ pesos.T (4 × m)
+"""
+
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Dict, List, Optional, Any, Sequence
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.models.proyecto import ProyectoSocial
+from src.scoring.motor_arquitectura_c import (
+    MotorScoringArquitecturaC,
+    ResultadoScoringLote,
+    NIVELES_PRIORIDAD,
+    codigos_niveles_prioridad
+)
+
+
+# Orden de columnas de la matriz de scores y de los vectores de pesos
+CRITERIOS_PESOS = ('sroi', 'stakeholders', 'probabilidad', 'riesgos')
+
+PESOS_ARQUITECTURA_C = np.array([
+    MotorScoringArquitecturaC.PESO_SROI,
+    MotorScoringArquitecturaC.PESO_STAKEHOLDERS,
+    MotorScoringArquitecturaC.PESO_PROBABILIDAD,
+    MotorScoringArquitecturaC.PESO_RIESGOS,
+])
+
+
+@dataclass
+class ResultadoSensibilidad:
+    """
+    Resultado de evaluar m vectores de pesos sobre n proyectos.
+
+    Los arreglos por escenario tienen forma m × n (fila = vector de pesos,
+    columna = proyecto en el orden de la cartera).
+    """
+
+    proyecto_ids: List[str]
+    pesos: np.ndarray  # m × 4
+
+    scores: np.ndarray  # m × n
+    rankings: np.ndarray  # m × n, índices de proyectos de mayor a menor score
+    posiciones: np.ndarray  # m × n, posición 1..n de cada proyecto
+    cambios_posicion: np.ndarray  # m × n, positivo = sube respecto a la base
+    codigos_nivel: np.ndarray  # m × n, índices de NIVELES_PRIORIDAD
+    cambios_nivel: np.ndarray  # m × n bool
+
+    # Escenario base (pesos Arquitectura C)
+    pesos_base: np.ndarray = field(default_factory=lambda: PESOS_ARQUITECTURA_C.copy())
+    scores_base: Optional[np.ndarray] = None
+    posiciones_base: Optional[np.ndarray] = None
+    codigos_nivel_base: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.pesos)
+
+    @property
+    def niveles(self) -> np.ndarray:
+        """Niveles de prioridad m × n (dtype object)"""
+        return NIVELES_PRIORIDAD[self.codigos_nivel]
+
+    def max_cambio_posicion(self) -> np.ndarray:
+        """Mayor desplazamiento absoluto en el ranking por escenario"""
+        return np.abs(self.cambios_posicion).max(axis=1, initial=0)
+
+    def num_cambios_nivel(self) -> np.ndarray:
+        """Número de proyectos que cambian de nivel por escenario"""
+        return self.cambios_nivel.sum(axis=1)
+
+    def top_ids(self, escenario: int, k: int = 10) -> List[str]:
+        """IDs de los k primeros proyectos en un escenario"""
+        return [self.proyecto_ids[i] for i in self.rankings[escenario, :k]]
+
+    def resumen_escenario(self, escenario: int) -> Dict[str, Any]:
+        """
+        Resume los cambios de un escenario respecto a la base.
+
+        Args:
+            escenario: Índice del vector de pesos
+
+        Returns:
+            Diccionario con pesos, cambios de posición y de nivel por proyecto
+        """
+        cambios = []
+        for i in np.flatnonzero((self.cambios_posicion[escenario] != 0) | self.cambios_nivel[escenario]):
+            cambios.append({
+                'proyecto_id': self.proyecto_ids[i],
+                'posicion_base': int(self.posiciones_base[i]),
+                'posicion': int(self.posiciones[escenario, i]),
+                'cambio_posicion': int(self.cambios_posicion[escenario, i]),
+                'nivel_base': NIVELES_PRIORIDAD[self.codigos_nivel_base[i]],
+                'nivel': NIVELES_PRIORIDAD[self.codigos_nivel[escenario, i]],
+                'score_base': float(self.scores_base[i]),
+                'score': float(self.scores[escenario, i]),
+            })
+        cambios.sort(key=lambda c: c['posicion'])
+
+        return {
+            'pesos': dict(zip(CRITERIOS_PESOS, self.pesos[escenario].tolist())),
+            'max_cambio_posicion': int(self.max_cambio_posicion()[escenario]),
+            'num_cambios_nivel': int(self.num_cambios_nivel()[escenario]),
+            'cambios': cambios
+        }
+
+
+class AnalizadorSensibilidadPesos:
+    """
+    Barrido de pesos sobre una cartera ya evaluada.
+
+    Se construye con la matriz de scores por criterio (ver
+    ResultadoScoringLote.matriz_scores) y evalúa cualquier número de
+    vectores de pesos con una sola multiplicación de matrices.
+    """
+
+    def __init__(self, lote: ResultadoScoringLote):
+        """
+        Inicializa el analizador.
+
+        Args:
+            lote: Resultado de MotorScoringArquitecturaC.calcular_scores_lote
+        """
+        self.proyecto_ids = list(lote.proyecto_ids)
+        self.matriz = lote.matriz_scores()
+        self.score_sroi = np.asarray(lote.score_sroi, dtype=float)
+        self.elegible = np.asarray(lote.elegible, dtype=bool)
+
+    @classmethod
+    def desde_proyectos(
+        cls,
+        proyectos: List[ProyectoSocial],
+        motor: Optional[MotorScoringArquitecturaC] = None
+    ) -> "AnalizadorSensibilidadPesos":
+        """
+        Evalúa la cartera una vez y construye el analizador.
+
+        Args:
+            proyectos: Cartera de proyectos
+            motor: Motor a usar (por defecto uno nuevo)
+
+        Returns:
+            AnalizadorSensibilidadPesos
+        """
+        motor = motor or MotorScoringArquitecturaC()
+        return cls(motor.calcular_scores_lote(proyectos))
+
+    def evaluar(self, pesos: Sequence[Sequence[float]], normalizar: bool = False) -> ResultadoSensibilidad:
+        """
+        Evalúa m vectores de pesos.
+
+        Args:
+            pesos: Arreglo m × 4 (SROI, Stakeholders, Probabilidad, Riesgos)
+                o un solo vector de 4 pesos
+            normalizar: Si True, escala cada vector para que sume 1
+
+        Returns:
+            ResultadoSensibilidad con rankings, cambios de posición y de nivel
+
+        Raises:
+            ValueError: Si los pesos no tienen 4 columnas o son negativos
+        """
+        pesos = np.atleast_2d(np.asarray(pesos, dtype=float))
+        if pesos.shape[1] != len(CRITERIOS_PESOS):
+            raise ValueError(f"Se esperaban {len(CRITERIOS_PESOS)} pesos por vector, hay {pesos.shape[1]}")
+        if (pesos < 0).any():
+            raise ValueError("Los pesos no pueden ser negativos")
+
+        if normalizar:
+            sumas = pesos.sum(axis=1, keepdims=True)
+            if (sumas == 0).any():
+                raise ValueError("Un vector de pesos suma 0 y no se puede normalizar")
+            pesos = pesos / sumas
+
+        n = len(self.proyecto_ids)
+
+        # Base y escenarios en la misma multiplicación (mismos redondeos)
+        todos = np.vstack([PESOS_ARQUITECTURA_C, pesos])
+        scores = np.clip(todos @ self.matriz.T, 0, 100)  # (m + 1) × n
+
+        rankings = np.argsort(-scores, axis=1, kind='stable')
+        posiciones = np.empty_like(rankings)
+        np.put_along_axis(posiciones, rankings, np.arange(1, n + 1), axis=1)
+
+        codigos = codigos_niveles_prioridad(scores, self.score_sroi, self.elegible)
+
+        return ResultadoSensibilidad(
+            proyecto_ids=self.proyecto_ids,
+            pesos=pesos,
+            scores=scores[1:],
+            rankings=rankings[1:],
+            posiciones=posiciones[1:],
+            cambios_posicion=posiciones[0] - posiciones[1:],
+            codigos_nivel=codigos[1:],
+            cambios_nivel=codigos[1:] != codigos[0],
+            pesos_base=PESOS_ARQUITECTURA_C.copy(),
+            scores_base=scores[0],
+            posiciones_base=posiciones[0],
+            codigos_nivel_base=codigos[0]
+        )
+
+    def variar_peso(self, criterio: str, valores: Sequence[float]) -> ResultadoSensibilidad:
+        """
+        Varía el peso de un criterio y reparte el resto proporcionalmente.
+
+        Ejemplo: variar_peso('sroi', [0.35]) → SROI 35% y los otros tres
+        criterios escalados para sumar 65%, manteniendo sus proporciones.
+
+        Args:
+            criterio: 'sroi', 'stakeholders', 'probabilidad' o 'riesgos'
+            valores: Pesos a probar para el criterio (0-1)
+
+        Returns:
+            ResultadoSensibilidad con un escenario por valor
+        """
+        return self.evaluar(generar_pesos_variacion(criterio, valores))
+
+    def barrido_rejilla(self, paso: float = 0.05, minimo: float = 0.0) -> ResultadoSensibilidad:
+        """
+        Evalúa todas las combinaciones de pesos de una rejilla que suman 1.
+
+        Args:
+            paso: Separación de la rejilla (0.05 → 1,771 combinaciones)
+            minimo: Peso mínimo por criterio
+
+        Returns:
+            ResultadoSensibilidad con un escenario por combinación
+        """
+        return self.evaluar(generar_rejilla_pesos(paso, minimo))
+
+
+def generar_pesos_variacion(criterio: str, valores: Sequence[float]) -> np.ndarray:
+    """
+    Vectores de pesos con un criterio fijado y el resto proporcional a Arquitectura C.
+
+    Args:
+        criterio: Criterio a variar
+        valores: Pesos a probar (0-1)
+
+    Returns:
+        Arreglo m × 4
+
+    Raises:
+        ValueError: Si el criterio no existe o un valor está fuera de 0-1
+    """
+    if criterio not in CRITERIOS_PESOS:
+        raise ValueError(f"Criterio desconocido: {criterio}. Opciones: {', '.join(CRITERIOS_PESOS)}")
+
+    valores = np.asarray(valores, dtype=float)
+    if ((valores < 0) | (valores > 1)).any():
+        raise ValueError("Los pesos deben estar entre 0 y 1")
+
+    j = CRITERIOS_PESOS.index(criterio)
+    resto = np.delete(PESOS_ARQUITECTURA_C, j)
+    resto = resto / resto.sum()
+
+    pesos = np.empty((len(valores), len(CRITERIOS_PESOS)))
+    pesos[:, j] = valores
+    pesos[:, np.arange(len(CRITERIOS_PESOS)) != j] = np.outer(1 - valores, resto)
+    return pesos
+
+
+def generar_rejilla_pesos(paso: float = 0.05, minimo: float = 0.0) -> np.ndarray:
+    """
+    Todas las combinaciones de 4 pesos múltiplos de `paso` que suman 1.
+
+    Args:
+        paso: Separación de la rejilla (debe dividir 1)
+        minimo: Peso mínimo por criterio
+
+    Returns:
+        Arreglo m × 4
+    """
+    divisiones = int(round(1 / paso))
+    if divisiones <= 0 or not np.isclose(divisiones * paso, 1.0):
+        raise ValueError("El paso debe dividir 1 (p. ej. 0.05, 0.1)")
+
+    pasos_minimos = int(np.ceil(minimo * divisiones - 1e-9))
+    combinaciones = [
+        (a, b, c, divisiones - a - b - c)
+        for a, b, c in product(range(pasos_minimos, divisiones + 1), repeat=3)
+        if divisiones - a - b - c >= pasos_minimos
+    ]
+    return np.array(combinaciones, dtype=float).reshape(-1, len(CRITERIOS_PESOS)) / divisiones
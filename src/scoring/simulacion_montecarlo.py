@@ -0,0 +1,300 @@
+"""
+Simulación Monte Carlo de incertidumbre - Arquitectura C
+
+El SROI y las calificaciones de riesgo (probabilidad × impacto) son
+estimaciones, pero el motor entrega un score puntual. Este módulo muestrea
+esas entradas por proyecto y calcula la distribución del score total, del
+nivel de prioridad y de la posición en el ranking.
+
+Modelo de incertidumbre:
+- SROI: lognormal con mediana en el valor reportado; la dispersión depende
+  de nivel_confianza_sroi (Alta / Media / Baja)
+- Riesgos: cada calificación 1-5 se desplaza ±1 con probabilidad
+  prob_ajuste_riesgo por lado (acotada a 1-5)
+- Stakeholders y Probabilidad CONFIS: fijos (datos categóricos/oficiales)
+
+Las curvas son las del motor: SROICriterio.convertir_sroi_a_score_vectorizado
+y RiesgosCriterio.evaluar_vectorizado.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Sequence
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.models.proyecto import ProyectoSocial
+from src.scoring.motor_arquitectura_c import (
+    MotorScoringArquitecturaC,
+    ResultadoScoringLote,
+    NIVELES_PRIORIDAD,
+    codigos_niveles_prioridad
+)
+
+
+# Desviación estándar de ln(SROI) según nivel de confianza del cálculo
+DISPERSION_SROI = {
+    "Alta": 0.10,
+    "Media": 0.25,
+    "Baja": 0.40,
+}
+DISPERSION_SROI_DEFAULT = 0.25  # Sin nivel de confianza registrado
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass
+class ResultadoMonteCarlo:
+    """
+    Distribuciones de score, nivel y posición por proyecto.
+
+    Los arreglos por proyecto siguen el orden de la cartera.
+    """
+
+    proyecto_ids: List[str]
+    num_simulaciones: int
+
+    score_puntual: np.ndarray  # n, score del motor sin incertidumbre
+    media: np.ndarray  # n
+    desviacion: np.ndarray  # n
+    percentiles: Dict[int, np.ndarray]  # percentil → n
+
+    prob_niveles: np.ndarray  # n × 6, columnas según NIVELES_PRIORIDAD
+    prob_posiciones: np.ndarray  # n × n, [i, k] = P(proyecto i en posición k + 1)
+
+    scores: Optional[np.ndarray] = None  # d × n (solo si se conservan las muestras)
+    fecha_calculo: datetime = field(default_factory=datetime.now)
+
+    def __len__(self) -> int:
+        return len(self.proyecto_ids)
+
+    def prob_nivel(self, nivel: str) -> np.ndarray:
+        """Probabilidad de cada proyecto de quedar en un nivel de prioridad"""
+        return self.prob_niveles[:, list(NIVELES_PRIORIDAD).index(nivel)]
+
+    def prob_top_k(self, k: int) -> np.ndarray:
+        """Probabilidad de cada proyecto de quedar entre los k primeros"""
+        return self.prob_posiciones[:, :k].sum(axis=1)
+
+    def nivel_mas_probable(self) -> np.ndarray:
+        """Nivel de prioridad más frecuente por proyecto (dtype object)"""
+        return NIVELES_PRIORIDAD[self.prob_niveles.argmax(axis=1)]
+
+    def intervalo(self, confianza: float = 0.90) -> tuple:
+        """
+        Intervalo de score por proyecto a partir de las muestras.
+
+        Requiere haber conservado las muestras (conservar_muestras=True)
+        salvo para 0.90 y 0.50, que salen de los percentiles calculados.
+        """
+        inferior = 50 - confianza * 50
+        superior = 50 + confianza * 50
+        if inferior in self.percentiles and superior in self.percentiles:
+            return self.percentiles[inferior], self.percentiles[superior]
+        if self.scores is None:
+            raise ValueError("Intervalo no disponible: simular con conservar_muestras=True")
+        return tuple(np.percentile(self.scores, [inferior, superior], axis=0))
+
+    def a_diccionarios(self, k_top: int = 10) -> List[Dict[str, Any]]:
+        """Resumen por proyecto (media, percentiles, nivel más probable, P(top k))"""
+        nivel_probable = self.nivel_mas_probable()
+        prob_top = self.prob_top_k(k_top)
+        return [
+            {
+                'proyecto_id': proyecto_id,
+                'score_puntual': float(self.score_puntual[i]),
+                'score_medio': float(self.media[i]),
+                'desviacion': float(self.desviacion[i]),
+                **{f'p{q}': float(valores[i]) for q, valores in self.percentiles.items()},
+                'nivel_mas_probable': nivel_probable[i],
+                f'prob_top_{k_top}': float(prob_top[i]),
+            }
+            for i, proyecto_id in enumerate(self.proyecto_ids)
+        ]
+
+
+class SimuladorMonteCarlo:
+    """
+    Simulador vectorizado de incertidumbre del score Arquitectura C.
+
+    Muestrea en bloques de simulaciones: cada bloque es un arreglo
+    d × n (× 4 para riesgos) evaluado con las funciones vectorizadas de
+    los criterios, sin bucles por proyecto.
+    """
+
+    def __init__(
+        self,
+        motor: Optional[MotorScoringArquitecturaC] = None,
+        prob_ajuste_riesgo: float = 0.20,
+        semilla: Optional[int] = None
+    ):
+        """
+        Inicializa el simulador.
+
+        Args:
+            motor: Motor de scoring (por defecto uno nuevo)
+            prob_ajuste_riesgo: Probabilidad de desplazar cada calificación
+                de riesgo +1 (y, por separado, -1)
+            semilla: Semilla del generador aleatorio (reproducibilidad)
+        """
+        if not 0 <= prob_ajuste_riesgo <= 0.5:
+            raise ValueError("prob_ajuste_riesgo debe estar entre 0 y 0.5")
+
+        self.motor = motor or MotorScoringArquitecturaC()
+        self.prob_ajuste_riesgo = prob_ajuste_riesgo
+        self.rng = np.random.default_rng(semilla)
+
+    def simular(
+        self,
+        proyectos: List[ProyectoSocial],
+        num_simulaciones: int = 10_000,
+        tamano_bloque: int = 1_000,
+        conservar_muestras: bool = False
+    ) -> ResultadoMonteCarlo:
+        """
+        Simula la cartera completa.
+
+        Args:
+            proyectos: Cartera de proyectos
+            num_simulaciones: Número de muestras por proyecto
+            tamano_bloque: Simulaciones evaluadas por bloque (limita memoria)
+            conservar_muestras: Si True, guarda la matriz d × n de scores
+
+        Returns:
+            ResultadoMonteCarlo
+        """
+        lote = self.motor.calcular_scores_lote(proyectos)
+        dispersion = np.array([
+            DISPERSION_SROI.get(p.nivel_confianza_sroi, DISPERSION_SROI_DEFAULT)
+            for p in proyectos
+        ])
+        return self.simular_lote(
+            lote, dispersion, num_simulaciones, tamano_bloque, conservar_muestras
+        )
+
+    def simular_lote(
+        self,
+        lote: ResultadoScoringLote,
+        dispersion_sroi: Sequence[float],
+        num_simulaciones: int = 10_000,
+        tamano_bloque: int = 1_000,
+        conservar_muestras: bool = False
+    ) -> ResultadoMonteCarlo:
+        """
+        Simula a partir de un resultado por lotes ya calculado.
+
+        Args:
+            lote: Resultado de MotorScoringArquitecturaC.calcular_scores_lote
+            dispersion_sroi: Desviación de ln(SROI) por proyecto
+            num_simulaciones: Número de muestras por proyecto
+            tamano_bloque: Simulaciones evaluadas por bloque
+            conservar_muestras: Si True, guarda la matriz d × n de scores
+
+        Returns:
+            ResultadoMonteCarlo
+        """
+        if num_simulaciones < 1:
+            raise ValueError("num_simulaciones debe ser al menos 1")
+
+        n = len(lote)
+        dispersion_sroi = np.asarray(dispersion_sroi, dtype=float)
+
+        elegible = lote.elegible
+        sroi_valido = elegible & ~np.isnan(lote.sroi)
+        sroi_base = np.where(sroi_valido, lote.sroi, 1.0)
+        riesgos_valido = elegible & (lote.riesgos_probabilidad > 0).all(axis=1)
+
+        # Muestras para percentiles (float32 si no se devuelven)
+        muestras = np.empty((num_simulaciones, n), dtype=float if conservar_muestras else np.float32)
+        suma = np.zeros(n)
+        conteo_niveles = np.zeros(n * len(NIVELES_PRIORIDAD), dtype=np.int64)
+        conteo_posiciones = np.zeros(n * n, dtype=np.int64)
+
+        columnas = np.arange(n)
+
+        for inicio in range(0, num_simulaciones, tamano_bloque):
+            d = min(tamano_bloque, num_simulaciones - inicio)
+
+            # ========== SROI (lognormal, mediana = valor reportado) ==========
+            sroi = sroi_base * np.exp(dispersion_sroi * self.rng.standard_normal((d, n)))
+            score_sroi = np.where(
+                sroi_valido,
+                self.motor.criterio_sroi.convertir_sroi_a_score_vectorizado(sroi),
+                0.0
+            )
+
+            # ========== RIESGOS (calificaciones ±1) ==========
+            probabilidades = self._perturbar_calificaciones(lote.riesgos_probabilidad, d)
+            impactos = self._perturbar_calificaciones(lote.riesgos_impacto, d)
+            score_riesgos = self.motor.criterio_riesgos.evaluar_vectorizado(
+                probabilidades.reshape(-1, 4), impactos.reshape(-1, 4)
+            ).reshape(d, n)
+            score_riesgos = np.where(riesgos_valido, score_riesgos, 0.0)
+
+            # ========== SCORE TOTAL (Stakeholders y Probabilidad fijos) ==========
+            score_total = (
+                score_sroi * self.motor.PESO_SROI +
+                lote.contribucion_stakeholders +
+                lote.contribucion_probabilidad +
+                score_riesgos * self.motor.PESO_RIESGOS
+            )
+            score_total = np.where(elegible, np.minimum(np.maximum(score_total, 0), 100), 0.0)
+
+            muestras[inicio:inicio + d] = score_total
+
+            suma += score_total.sum(axis=0)
+
+            # ========== NIVELES ==========
+            codigos = codigos_niveles_prioridad(score_total, score_sroi, elegible)
+            conteo_niveles += np.bincount(
+                (columnas * len(NIVELES_PRIORIDAD) + codigos).ravel(),
+                minlength=conteo_niveles.size
+            )
+
+            # ========== POSICIONES EN EL RANKING ==========
+            # ranking[s, k] = proyecto en la posición k de la simulación s
+            ranking = np.argsort(-score_total, axis=1, kind='stable')
+            conteo_posiciones += np.bincount(
+                (ranking * n + columnas).ravel(),
+                minlength=conteo_posiciones.size
+            )
+
+        valores_percentiles = np.percentile(muestras, PERCENTILES, axis=0)
+
+        media = suma / num_simulaciones
+
+        return ResultadoMonteCarlo(
+            proyecto_ids=list(lote.proyecto_ids),
+            num_simulaciones=num_simulaciones,
+            score_puntual=lote.score_total,
+            media=media,
+            desviacion=muestras.std(axis=0, dtype=float),
+            percentiles={q: valores_percentiles[j].astype(float) for j, q in enumerate(PERCENTILES)},
+            prob_niveles=conteo_niveles.reshape(n, len(NIVELES_PRIORIDAD)) / num_simulaciones,
+            prob_posiciones=conteo_posiciones.reshape(n, n) / num_simulaciones,
+            scores=muestras if conservar_muestras else None,
+            fecha_calculo=datetime.now()
+        )
+
+    def _perturbar_calificaciones(self, calificaciones: np.ndarray, d: int) -> np.ndarray:
+        """
+        Desplaza calificaciones 1-5 en ±1 y las acota a la escala.
+
+        Args:
+            calificaciones: Matriz n × 4 de calificaciones base
+            d: Número de simulaciones del bloque
+
+        Returns:
+            Arreglo d × n × 4
+        """
+        u = self.rng.random((d,) + calificaciones.shape)
+        desplazamiento = (
+            (u < self.prob_ajuste_riesgo).astype(np.int8) -
+            (u > 1 - self.prob_ajuste_riesgo).astype(np.int8)
+        )
+        return np.clip(calificaciones + desplazamiento, 1, 5)
@@ -2,11 +2,12 @@
 Servicio de almacenamiento y gestión del historial de consultas IA.
 Usa SQLite para persistencia local.
 """
-import sqlite3
 from datetime import datetime
 from typing import List, Dict, Optional
 from pathlib import Path
 
+from database.conexiones import get_gestor_conexiones
+
 
 class HistorialIA:
     """Gestiona el almacenamiento persistente de consultas y respuestas del asistente IA."""
@@ -24,11 +25,16 @@ class HistorialIA:
             db_path = data_dir / 'historial_ia.db'
 
         self.db_path = str(db_path)
+        self.conexiones = get_gestor_conexiones(self.db_path)
         self._inicializar_db()
 
+    def close(self):
+        """Cierra las conexiones compartidas del archivo de historial."""
+        self.conexiones.close()
+
     def _inicializar_db(self):
         """Crea las tablas necesarias en SQLite si no existen."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.conexiones.conexion()
         cursor = conn.cursor()
 
         # Tabla principal de consultas
@@ -65,7 +71,6 @@ class HistorialIA:
         ''')
 
         conn.commit()
-        conn.close()
 
     def guardar_consulta(self,
                         pregunta: str,
@@ -94,7 +99,7 @@ class HistorialIA:
         Returns:
             ID de la consulta guardada
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self.conexiones.conexion()
         cursor = conn.cursor()
 
         timestamp = datetime.now().isoformat()
@@ -109,7 +114,6 @@ class HistorialIA:
 
         consulta_id = cursor.lastrowid
         conn.commit()
-        conn.close()
 
         return consulta_id
 
@@ -123,8 +127,7 @@ class HistorialIA:
         Returns:
             Diccionario con los datos de la consulta o None si no existe
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self.conexiones.conexion()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -132,7 +135,6 @@ class HistorialIA:
         ''', (consulta_id,))
 
         row = cursor.fetchone()
-        conn.close()
 
         if row:
             return dict(row)
@@ -150,8 +152,7 @@ class HistorialIA:
         Returns:
             Lista de consultas ordenadas por fecha (más reciente primero)
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self.conexiones.conexion()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -162,7 +163,6 @@ class HistorialIA:
         ''', (proyecto_id, limite))
 
         rows = cursor.fetchall()
-        conn.close()
 
         return [dict(row) for row in rows]
 
@@ -178,8 +178,7 @@ class HistorialIA:
         Returns:
             Lista de consultas ordenadas por fecha (más reciente primero)
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self.conexiones.conexion()
         cursor = conn.cursor()
 
         if tipo_analisis:
@@ -197,7 +196,6 @@ class HistorialIA:
             ''', (limite,))
 
         rows = cursor.fetchall()
-        conn.close()
 
         return [dict(row) for row in rows]
 
@@ -212,8 +210,7 @@ class HistorialIA:
         Returns:
             Lista de consultas que coinciden con la búsqueda
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self.conexiones.conexion()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -224,7 +221,6 @@ class HistorialIA:
         ''', (f'%{termino_busqueda}%', f'%{termino_busqueda}%', limite))
 
         rows = cursor.fetchall()
-        conn.close()
 
         return [dict(row) for row in rows]
 
@@ -235,7 +231,7 @@ class HistorialIA:
         Returns:
             Diccionario con estadísticas
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self.conexiones.conexion()
         cursor = conn.cursor()
 
         # Total de consultas
@@ -272,7 +268,6 @@ class HistorialIA:
         ''')
         por_llm = {row[0]: row[1] for row in cursor.fetchall()}
 
-        conn.close()
 
         return {
             'total_consultas': total_consultas,
@@ -291,14 +286,13 @@ class HistorialIA:
         Returns:
             True si se eliminó correctamente, False si no existía
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self.conexiones.conexion()
         cursor = conn.cursor()
 
         cursor.execute('DELETE FROM consultas_ia WHERE id = ?', (consulta_id,))
         eliminados = cursor.rowcount
 
         conn.commit()
-        conn.close()
 
         return eliminados > 0
 
@@ -312,7 +306,7 @@ class HistorialIA:
         Returns:
             Número de consultas eliminadas
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self.conexiones.conexion()
         cursor = conn.cursor()
 
         fecha_limite = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
@@ -325,6 +319,5 @@ class HistorialIA:
 
         eliminados = cursor.rowcount
         conn.commit()
-        conn.close()
 
         return eliminados
@@ -3,13 +3,54 @@ Sistema principal de priorización de proyectos.
 SRP: Orquesta evaluación, no implementa lógica de criterios.
 DIP: Depende de abstracciones (CriterioEvaluacion, EstrategiaEvaluacion).
 """
-from typing import List, Optional
-from models.proyecto import ProyectoSocial
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pickle import PicklingError
+from typing import Dict, Iterable, List, Optional, Tuple
+from models.proyecto import ProyectoSocial, CAMPOS_CALCULADOS
 from models.evaluacion import ResultadoEvaluacion
 from criterios.base import CriterioEvaluacion
 from estrategias.base import EstrategiaEvaluacion
 from servicios.gestor_historial import GestorHistorial
 from servicios.recomendador import RecomendadorProyectos
+from scoring.ranking_streaming import EstadisticasStreaming, RankingTopK
+
+
+logger = logging.getLogger(__name__)
+
+# Por debajo de este tamaño de cartera el costo de arrancar procesos
+# supera la ganancia y priorizar_cartera evalúa en serie.
+MIN_PROYECTOS_PARALELO = 20
+
+
+def _evaluar_bloque(
+    estrategia: EstrategiaEvaluacion,
+    criterios: List[CriterioEvaluacion],
+    proyectos: List[ProyectoSocial],
+    con_recomendaciones: List[bool]
+) -> List[Tuple[ResultadoEvaluacion, Optional[Dict[str, List[str]]], Dict]]:
+    """
+    Evalúa un bloque de proyectos dentro de un proceso trabajador.
+
+    Returns:
+        Por proyecto: (resultado, recomendaciones o None, campos calculados)
+    """
+    recomendador = RecomendadorProyectos()
+    salida = []
+
+    for proyecto, recomendar in zip(proyectos, con_recomendaciones):
+        resultado = estrategia.evaluar_proyecto(proyecto, criterios)
+        recomendaciones = (
+            recomendador.analizar_proyecto(proyecto, resultado.detalle_criterios)
+            if recomendar else None
+        )
+        calculados = {campo: getattr(proyecto, campo) for campo in CAMPOS_CALCULADOS}
+        salida.append((resultado, recomendaciones, calculados))
+
+    return salida
 
 
 class SistemaPriorizacionProyectos:
@@ -64,40 +105,57 @@ class SistemaPriorizacionProyectos:
         """
         resultado = self.estrategia.evaluar_proyecto(proyecto, self.criterios)
 
-        # Crear o actualizar historial si está habilitado
-        if crear_historial:
-            # Extraer scores por criterio
-            scores_criterios = {
-                criterio: info['score_base']
-                for criterio, info in resultado.detalle_criterios.items()
-            }
-
-            # Generar recomendaciones
+        # Crear historial si está habilitado y aún no existe
+        if crear_historial and self._requiere_historial(proyecto):
             recomendaciones = self.recomendador.analizar_proyecto(proyecto, resultado.detalle_criterios)
+            self._registrar_historial(proyecto, resultado, recomendaciones)
 
-            # Verificar si ya existe historial
-            historial_existente = self.gestor_historial.obtener_historial(proyecto.id)
+        return resultado
 
-            if historial_existente is None:
-                # Crear historial inicial
-                self.gestor_historial.crear_historial(
-                    proyecto=proyecto,
-                    score_inicial=resultado.score_final,
-                    scores_criterios=scores_criterios,
-                    recomendaciones=recomendaciones
-                )
+    def _requiere_historial(self, proyecto: ProyectoSocial) -> bool:
+        """Indica si el proyecto aún no tiene historial registrado."""
+        return self.gestor_historial.obtener_historial(proyecto.id) is None
 
-        return resultado
+    def _registrar_historial(
+        self,
+        proyecto: ProyectoSocial,
+        resultado: ResultadoEvaluacion,
+        recomendaciones: Dict[str, List[str]]
+    ):
+        """Crea el historial inicial del proyecto con su primera evaluación."""
+        scores_criterios = {
+            criterio: info['score_base']
+            for criterio, info in resultado.detalle_criterios.items()
+        }
+
+        self.gestor_historial.crear_historial(
+            proyecto=proyecto,
+            score_inicial=resultado.score_final,
+            scores_criterios=scores_criterios,
+            recomendaciones=recomendaciones
+        )
 
     def priorizar_cartera(
         self,
-        proyectos: List[ProyectoSocial]
+        proyectos: List[ProyectoSocial],
+        paralelo: bool = False,
+        max_workers: Optional[int] = None,
+        chunk_size: Optional[int] = None
     ) -> List[ResultadoEvaluacion]:
         """
         Evalúa y prioriza una cartera de proyectos.
 
+        En modo paralelo la cartera se reparte en bloques sobre un
+        ProcessPoolExecutor. Los resultados se combinan en el orden original
+        de la cartera antes de ordenar, por lo que el ranking (incluidos los
+        empates) es idéntico al de la evaluación en serie. El historial se
+        registra siempre en el proceso principal.
+
         Args:
             proyectos: Lista de proyectos a evaluar
+            paralelo: Si True, evalúa en varios procesos
+            max_workers: Número de procesos (default: núcleos disponibles)
+            chunk_size: Proyectos por bloque (default: ~4 bloques por proceso)
 
         Returns:
             Lista de ResultadoEvaluacion ordenada por score
@@ -106,30 +164,162 @@ class SistemaPriorizacionProyectos:
         if not proyectos:
             return []
 
-        resultados = [
-            self.evaluar_proyecto(proyecto)
-            for proyecto in proyectos
+        workers = max_workers or os.cpu_count() or 1
+
+        if paralelo and workers > 1 and len(proyectos) >= MIN_PROYECTOS_PARALELO:
+            try:
+                resultados = self._evaluar_en_paralelo(proyectos, workers, chunk_size)
+            except (OSError, BrokenProcessPool, PicklingError, TypeError) as e:
+                # TypeError: objetos que pickle rechaza (p.ej. locks o conexiones en un criterio);
+                # un error real de evaluación se repite en serie y se propaga desde ahí
+                logger.warning("Evaluación paralela no disponible (%s); evaluando en serie", e)
+                resultados = [self.evaluar_proyecto(proyecto) for proyecto in proyectos]
+        else:
+            resultados = [
+                self.evaluar_proyecto(proyecto)
+                for proyecto in proyectos
+            ]
+
+        # Ordenar por score final (descendente, estable ante empates)
+        resultados.sort(key=lambda r: r.score_final, reverse=True)
+
+        return resultados
+
+    def priorizar_top_k(
+        self,
+        proyectos: Iterable[ProyectoSocial],
+        k: int = 10,
+        crear_historial: bool = False
+    ) -> Tuple[List[ResultadoEvaluacion], EstadisticasStreaming]:
+        """
+        Prioriza un pool grande conservando solo los K mejores resultados.
+
+        Consume el iterable en una sola pasada (por ejemplo
+        DatabaseManager.iterar_proyectos) y mantiene un heap de tamaño K más
+        estadísticas acumuladas, sin materializar todos los resultados.
+        El top-K coincide con los primeros K de priorizar_cartera,
+        incluidos los empates.
+
+        Args:
+            proyectos: Iterable o generador de proyectos
+            k: Número de proyectos en el ranking
+            crear_historial: Si se registra historial (crece con el pool;
+                desactivado por defecto para pools históricos)
+
+        Returns:
+            (top-K ordenado por score descendente, estadísticas del pool)
+        """
+        ranking = RankingTopK(k)
+
+        for proyecto in proyectos:
+            resultado = self.evaluar_proyecto(proyecto, crear_historial=crear_historial)
+            ranking.agregar(resultado, resultado.score_final)
+
+        return ranking.resultados(), ranking.estadisticas
+
+    def generar_reporte_top_k(
+        self,
+        proyectos: Iterable[ProyectoSocial],
+        k: int = 10
+    ) -> dict:
+        """
+        Versión en streaming de generar_reporte: ranking limitado a K.
+
+        Returns:
+            Dict con el mismo formato que generar_reporte; 'total_proyectos'
+            y 'estadisticas' cubren el pool completo
+        """
+        resultados, estadisticas = self.priorizar_top_k(proyectos, k)
+        if not estadisticas.total:
+            return {
+                'total_proyectos': 0,
+                'ranking': [],
+                'estadisticas': {}
+            }
+
+        return {
+            'total_proyectos': estadisticas.total,
+            'estrategia': self.estrategia.get_nombre(),
+            'criterios': [c.get_nombre() for c in self.criterios],
+            'ranking': [
+                {
+                    'posicion': idx + 1,
+                    'proyecto_id': r.proyecto_id,
+                    'proyecto_nombre': r.proyecto_nombre,
+                    'score': r.score_final,
+                    'recomendacion': r.recomendacion
+                }
+                for idx, r in enumerate(resultados)
+            ],
+            'estadisticas': estadisticas.to_dict()
+        }
+
+    def _evaluar_en_paralelo(
+        self,
+        proyectos: List[ProyectoSocial],
+        workers: int,
+        chunk_size: Optional[int] = None
+    ) -> List[ResultadoEvaluacion]:
+        """
+        Evalúa la cartera en bloques sobre un pool de procesos.
+
+        Returns:
+            Resultados en el mismo orden que la cartera recibida
+        """
+        if not chunk_size:
+            chunk_size = max(1, math.ceil(len(proyectos) / (workers * 4)))
+
+        # El historial vive en este proceso: solo se piden recomendaciones
+        # para los proyectos que todavía no lo tienen.
+        requiere_historial = [self._requiere_historial(p) for p in proyectos]
+
+        bloques = [
+            (proyectos[i:i + chunk_size], requiere_historial[i:i + chunk_size])
+            for i in range(0, len(proyectos), chunk_size)
         ]
 
-        # Ordenar por score final (descendente)
-        resultados.sort(key=lambda r: r.score_final, reverse=True)
+        resultados = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(bloques))) as executor:
+            futuros = [
+                executor.submit(_evaluar_bloque, self.estrategia, self.criterios, bloque, recomendar)
+                for bloque, recomendar in bloques
+            ]
+
+            # Combinar en orden de envío (no de finalización) → determinista
+            for (bloque, _), futuro in zip(bloques, futuros):
+                for proyecto, (resultado, recomendaciones, calculados) in zip(bloque, futuro.result()):
+                    for campo, valor in calculados.items():
+                        setattr(proyecto, campo, valor)
+
+                    if recomendaciones is not None and self._requiere_historial(proyecto):
+                        self._registrar_historial(proyecto, resultado, recomendaciones)
+
+                    resultados.append(resultado)
 
         return resultados
 
     def generar_reporte(
         self,
-        proyectos: List[ProyectoSocial]
+        proyectos: List[ProyectoSocial],
+        paralelo: bool = False,
+        max_workers: Optional[int] = None
     ) -> dict:
         """
         Genera reporte completo de evaluación de cartera.
 
         Args:
             proyectos: Lista de proyectos a evaluar
+            paralelo: Si True, evalúa la cartera en varios procesos
+            max_workers: Número de procesos para el modo paralelo
 
         Returns:
             Dict con resumen estadístico y ranking
         """
-        resultados = self.priorizar_cartera(proyectos)
+        resultados = self.priorizar_cartera(
+            proyectos,
+            paralelo=paralelo,
+            max_workers=max_workers
+        )
 
         if not resultados:
             return {
@@ -212,7 +212,8 @@ class SelectorSectoresPDET:
         if sectores_seleccionados:
             self._render_estimacion(
                 sectores_seleccionados,
-                puntajes_seleccionados
+                puntajes_seleccionados,
+                registro.departamento
             )
 
         return sectores_seleccionados, puntajes_seleccionados, True
@@ -220,7 +221,8 @@ class SelectorSectoresPDET:
     def _render_estimacion(
         self,
         sectores: List[str],
-        puntajes: Dict[str, int]
+        puntajes: Dict[str, int],
+        departamento: Optional[str] = None
     ):
         """Renderiza panel de estimación de probabilidad"""
 
@@ -277,6 +279,9 @@ class SelectorSectoresPDET:
         for sector, puntaje in sectores_ordenados:
             estrellas = "⭐" * puntaje
             st.markdown(f"• **{sector}:** {puntaje}/10 {estrellas}")
+            contexto = self._contexto_sector(sector, departamento)
+            if contexto:
+                st.caption(contexto)
 
         st.markdown(f"**Puntaje máximo:** {puntaje_max}/10")
 
@@ -306,6 +311,22 @@ class SelectorSectoresPDET:
             )
 
 
+    def _contexto_sector(self, sector: str, departamento: Optional[str]) -> Optional[str]:
+        """Promedio y mediana del sector (estadísticas materializadas de la matriz)"""
+        try:
+            nacional = self.repo.get_estadisticas_sector(sector)
+            texto = (
+                f"Promedio PDET/ZOMAC: {nacional['promedio']}/10 "
+                f"(mediana {nacional['percentil_50']})"
+            )
+            if departamento:
+                depto = self.repo.get_estadisticas_sector(sector, departamento)
+                texto += f" · {departamento}: {depto['promedio']}/10"
+            return texto
+        except (ValueError, KeyError):
+            return None
+
+
 def render_indicador_pdet(departamento: str, municipio: str, db_path: str = "data/proyectos.db"):
     """
     Renderiza indicador simple de si municipio es PDET/ZOMAC.
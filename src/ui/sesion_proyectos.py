@@ -0,0 +1,44 @@
+"""
+Acceso a la cartera de proyectos desde la sesión de Streamlit.
+
+La sesión ya no carga todos los proyectos al abrirse:
+- Conteos y totales salen de obtener_estadisticas (una consulta agregada).
+- Los listados piden páginas de resúmenes con listar_proyectos.
+- Solo las páginas que trabajan sobre la cartera completa (evaluación,
+  asistente, historial) la cargan, la primera vez que la necesitan.
+"""
+import streamlit as st
+from typing import Any, Dict, List, Optional
+
+from database.db_manager import get_db_manager, ResumenProyecto
+from models.proyecto import ProyectoSocial
+
+
+def proyectos_sesion() -> List[ProyectoSocial]:
+    """Cartera completa; se lee de la base de datos en el primer uso de la sesión."""
+    if 'proyectos' not in st.session_state:
+        st.session_state.proyectos = get_db_manager().obtener_todos_proyectos()
+    return st.session_state.proyectos
+
+
+def invalidar_proyectos_sesion():
+    """Descarta la cartera cargada para que se relea tras crear, editar o eliminar."""
+    st.session_state.pop('proyectos', None)
+
+
+def resumen_cartera() -> Dict[str, Any]:
+    """Totales de la cartera (proyectos, presupuesto, beneficiarios) calculados en la BD."""
+    estadisticas = get_db_manager().obtener_estadisticas()
+    return {
+        'total_proyectos': estadisticas['total_proyectos'],
+        'presupuesto_total': estadisticas['presupuesto_total'],
+        'beneficiarios_totales': (
+            estadisticas['total_beneficiarios_directos'] + estadisticas['total_beneficiarios_indirectos']
+        ),
+    }
+
+
+def ultimo_proyecto() -> Optional[ResumenProyecto]:
+    """Resumen del proyecto modificado más recientemente."""
+    pagina = get_db_manager().listar_proyectos(limite=1)
+    return pagina.resumenes[0] if pagina.resumenes else None
@@ -0,0 +1,120 @@
+"""
+Tests para frontera de Pareto (skyline) multiobjetivo
+
+Valida:
+- Skyline igual a comparación por pares en 2, 3 y 4 objetivos
+- Actualizaciones incrementales iguales al cálculo por lotes
+- Extracción de objetivos desde ResultadoScoring
+"""
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scoring.analisis_pareto import (
+    FronteraPareto,
+    domina,
+    extraer_objetivos,
+    frontera_pareto,
+    skyline
+)
+from src.scoring.motor_arquitectura_c import ResultadoScoring
+from src.models.proyecto import ProyectoSocial, AreaGeografica
+
+
+def _frontera_por_pares(puntos):
+    """Referencia O(n²)"""
+    return [
+        i for i in range(len(puntos))
+        if not any(domina(puntos[j], puntos[i]) for j in range(len(puntos)) if j != i)
+    ]
+
+
+class TestAnalisisPareto(unittest.TestCase):
+    """Tests para skyline y FronteraPareto"""
+
+    def test_skyline_igual_a_comparacion_por_pares(self):
+        """Mismo resultado que la comparación por pares, con empates y duplicados"""
+        rng = np.random.default_rng(5)
+        for d in (1, 2, 3, 4, 5):
+            for caso in range(20):
+                n = int(rng.integers(1, 60))
+                puntos = rng.integers(0, 6, size=(n, d)).astype(float)
+                with self.subTest(d=d, caso=caso):
+                    self.assertEqual(list(skyline(puntos)), _frontera_por_pares(puntos))
+
+    def test_incremental_igual_a_lotes(self):
+        """Agregar, editar y eliminar mantienen la misma frontera que recalcular"""
+        rng = np.random.default_rng(9)
+        frontera = FronteraPareto()
+        vigentes = {}
+
+        for paso in range(300):
+            operacion = rng.choice(["agregar", "editar", "eliminar"], p=[0.5, 0.3, 0.2])
+            if operacion == "agregar" or not vigentes:
+                pid = f"P{paso}"
+                vigentes[pid] = rng.integers(0, 8, size=4).astype(float)
+                frontera.agregar(pid, vigentes[pid])
+            elif operacion == "editar":
+                pid = rng.choice(sorted(vigentes))
+                vigentes[pid] = rng.integers(0, 8, size=4).astype(float)
+                frontera.agregar(pid, vigentes[pid])
+            else:
+                pid = rng.choice(sorted(vigentes))
+                del vigentes[pid]
+                frontera.eliminar(pid)
+
+            ids = list(vigentes)
+            esperado = {ids[i] for i in skyline(np.vstack([vigentes[p] for p in ids]))} if ids else set()
+            self.assertEqual(set(frontera.frontera), esperado, f"paso {paso}")
+
+    def test_sincronizar(self):
+        """sincronizar aplica solo los cambios"""
+        frontera = FronteraPareto()
+        frontera.cargar({"A": [1, 1, 1, 1], "B": [2, 2, 2, 2], "C": [0, 4, 0, 0]})
+        self.assertEqual(set(frontera.frontera), {"B", "C"})
+
+        cambios = frontera.sincronizar({"A": [3, 3, 3, 3], "C": [0, 4, 0, 0], "D": [0, 0, 0, 9]})
+        self.assertEqual(cambios, {'agregados': ["D"], 'actualizados': ["A"], 'eliminados': ["B"]})
+        self.assertEqual(set(frontera.frontera), {"A", "C", "D"})
+        self.assertEqual(frontera.dominado_por("A"), [])
+
+    def test_objetivos_desde_resultado(self):
+        """Presupuesto se minimiza; beneficiarios son los totales"""
+        proyectos = [
+            ProyectoSocial(
+                id=pid, nombre=pid, organizacion="Org", descripcion="Test",
+                beneficiarios_directos=directos, beneficiarios_indirectos=0,
+                duracion_meses=12, presupuesto_total=presupuesto,
+                ods_vinculados=["ODS 6"], area_geografica=AreaGeografica.RURAL,
+                poblacion_objetivo="Comunidades", departamentos=["CAUCA"]
+            )
+            for pid, directos, presupuesto in [("BARATO", 100, 100), ("CARO", 100, 900), ("GRANDE", 5000, 900)]
+        ]
+        resultados = [
+            ResultadoScoring(
+                score_total=60, score_sroi=80, score_stakeholders=60,
+                score_probabilidad=60, score_riesgos=70,
+                contribucion_sroi=0, contribucion_stakeholders=0,
+                contribucion_probabilidad=0, contribucion_riesgos=0,
+                nivel_prioridad="MEDIA"
+            )
+            for _ in proyectos
+        ]
+
+        vector = extraer_objetivos(proyectos[1], resultados[1])
+        self.assertEqual(list(vector), [80, 70, -900, 100])
+
+        self.assertEqual(frontera_pareto(proyectos, resultados), ["BARATO", "GRANDE"])
+
+        frontera = FronteraPareto.desde_resultados(proyectos, resultados)
+        self.assertEqual(frontera.dominado_por("CARO"), ["BARATO", "GRANDE"])
+        self.assertEqual(list(frontera.vector("CARO")), [80, 70, 900, 100])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Tests para búsqueda aproximada de municipios por trigramas
+
+Valida:
+- Tolerancia a tildes y errores de digitación
+- Prefijos parciales (búsqueda mientras se escribe)
+- Filtro por departamento y duplicados normalizados
+- Catálogo completo de municipios_colombia
+- Índice inverso municipio → departamentos
+"""
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from models.busqueda_municipios import (
+    IndiceInversoMunicipios,
+    IndiceTrigramas,
+    normalizar_nombre,
+    trigramas
+)
+from models.municipios_colombia import (
+    MUNICIPIOS_POR_DEPARTAMENTO,
+    buscar_municipios,
+    obtener_departamentos_municipio,
+    ubicar_municipio
+)
+
+
+class TestBusquedaMunicipios(unittest.TestCase):
+    """Tests para IndiceTrigramas y buscar_municipios del catálogo"""
+
+    def setUp(self):
+        self.indice = IndiceTrigramas()
+        for departamento, municipio in [
+            ("CESAR", "AGUSTÍN CODAZZI"),
+            ("HUILA", "SAN AGUSTÍN"),
+            ("NARIÑO", "TUMACO"),
+            ("NARIÑO", "BARBACOAS"),
+            ("ANTIOQUIA", "TURBO"),
+        ]:
+            self.indice.agregar(departamento, municipio)
+
+    def test_trigramas(self):
+        """Relleno de pg_trgm: dos espacios al inicio, uno al final"""
+        self.assertEqual(trigramas("ABC"), frozenset({"  A", " AB", "ABC", "BC "}))
+        self.assertEqual(normalizar_nombre(" Agustín  Codazzi "), "AGUSTIN CODAZZI")
+
+    def test_tildes_y_errores(self):
+        """Variantes sin tilde y con letras faltantes encuentran el municipio"""
+        for consulta in ("Agustin Codazi", "agustín codazzi", "AGUSTN CODAZZI"):
+            with self.subTest(consulta=consulta):
+                primero = self.indice.buscar(consulta)[0]
+                self.assertEqual(primero.municipio, "AGUSTÍN CODAZZI")
+                self.assertGreater(primero.similitud, 0.6)
+
+        self.assertEqual(self.indice.buscar("zzzz"), [])
+        self.assertEqual(self.indice.buscar(""), [])
+
+    def test_prefijo_y_departamento(self):
+        """Un prefijo corto basta; el filtro de departamento restringe"""
+        self.assertEqual(self.indice.buscar("tum")[0].municipio, "TUMACO")
+        self.assertEqual(
+            [r.municipio for r in self.indice.buscar("agustin", departamento="Huila")],
+            ["SAN AGUSTÍN"]
+        )
+        self.assertEqual(
+            {r.municipio for r in self.indice.buscar("Narino")},
+            {"TUMACO", "BARBACOAS"}
+        )
+
+    def test_duplicados_normalizados(self):
+        """Misma clave normalizada se indexa una sola vez"""
+        self.assertFalse(self.indice.agregar("Nariño", "Tumaco"))
+        self.assertEqual(len(self.indice), 5)
+
+    def test_catalogo_completo(self):
+        """Todo municipio del catálogo se encuentra por su propio nombre"""
+        for departamento, municipios in MUNICIPIOS_POR_DEPARTAMENTO.items():
+            for municipio in municipios:
+                resultados = buscar_municipios(municipio, limite=50, departamento=departamento)
+                self.assertIn(municipio, [r.municipio for r in resultados], departamento)
+
+        self.assertEqual(buscar_municipios("Medelin")[0].municipio, "Medellín")
+
+    def test_indice_inverso(self):
+        """Municipio → departamentos, en el orden de los candidatos dados"""
+        inverso = IndiceInversoMunicipios()
+        inverso.agregar("NARIÑO", "BARBACOAS", True, fila_sector=3)
+        inverso.agregar("CAUCA", "Barbacoas")
+        self.assertFalse(inverso.agregar("Nariño", "Barbacoas"))
+
+        self.assertEqual(inverso.departamentos("barbacoas"), ["NARIÑO", "CAUCA"])
+        self.assertEqual(inverso.ubicar("Barbacoas", ["Cesar", "cauca", "Nariño"]).departamento, "CAUCA")
+        ubicacion = inverso.ubicar("Barbacoas", ["narino"])
+        self.assertTrue(ubicacion.es_pdet_zomac)
+        self.assertEqual(ubicacion.fila_sector, 3)
+        self.assertIsNone(inverso.ubicar("Barbacoas", ["Huila"]))
+        self.assertIsNone(inverso.ubicar("Inexistente", ["Nariño"]))
+
+    def test_catalogo_indice_inverso(self):
+        """Nombres repetidos en varios departamentos se distinguen"""
+        self.assertEqual(obtener_departamentos_municipio("narino"), ["Antioquia", "Cundinamarca", "Nariño"])
+        self.assertEqual(ubicar_municipio("Tumaco", ["Cesar", "nariño"]), "Nariño")
+        self.assertIsNone(ubicar_municipio("Tumaco", ["Cesar"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
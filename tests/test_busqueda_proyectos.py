@@ -0,0 +1,201 @@
+"""
+Tests para la búsqueda de proyectos sobre las tablas de relación
+
+Valida:
+- Igualdad exacta de ODS ("ODS 1" no coincide con "ODS 11")
+- Departamento, municipio y sector sin importar tildes ni mayúsculas
+- Sincronización al crear, actualizar, eliminar y cargar por lotes
+- Reconstrucción de relaciones en bases creadas antes de las tablas
+- Búsqueda de texto completo (FTS5): tildes, prefijos, BM25 y fragmentos
+"""
+import sqlite3
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from database.db_manager import DatabaseManager, RELACIONES_PROYECTO, normalizar_ods, consulta_fts
+from models.proyecto import ProyectoSocial, AreaGeografica
+
+
+class BaseBusqueda(unittest.TestCase):
+    """Base con una base de datos temporal y helpers"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "proyectos.db")
+        self.db = DatabaseManager(self.db_path)
+
+    def tearDown(self):
+        self.db.cerrar_conexion()
+        self.tmp.cleanup()
+
+    def _crear_proyecto(self, id, **kwargs):
+        """Helper para crear proyecto con valores por defecto."""
+        defaults = {
+            'id': id,
+            'nombre': f"Proyecto {id}",
+            'organizacion': "Test Org",
+            'descripcion': "Acueducto veredal",
+            'beneficiarios_directos': 1000,
+            'beneficiarios_indirectos': 3000,
+            'duracion_meses': 24,
+            'presupuesto_total': 300_000_000,
+            'ods_vinculados': ["ODS 6"],
+            'area_geografica': AreaGeografica.RURAL,
+            'poblacion_objetivo': "Comunidades rurales",
+            'departamentos': ["NARIÑO"],
+            'municipios': ["TUMACO"],
+            'sectores': ["Alcantarillado"],
+        }
+        defaults.update(kwargs)
+        return ProyectoSocial(**defaults)
+
+    def _ids(self, **filtros):
+        return sorted(p.id for p in self.db.buscar_proyectos(**filtros))
+
+
+class TestBusquedaProyectos(BaseBusqueda):
+    """Tests para buscar_proyectos con tablas de relación indexadas"""
+
+    def test_normalizar_ods(self):
+        """Variantes de escritura de un ODS comparten clave"""
+        self.assertEqual(normalizar_ods("ods6"), "ODS 6")
+        self.assertEqual(normalizar_ods("ODS 6: Agua limpia"), "ODS 6")
+        self.assertEqual(normalizar_ods("ODS 06"), "ODS 6")
+        self.assertNotEqual(normalizar_ods("ODS 1"), normalizar_ods("ODS 11"))
+
+    def test_ods_exacto(self):
+        """'ODS 1' no devuelve proyectos con solo 'ODS 11'"""
+        self.db.crear_proyecto(self._crear_proyecto("P-1", ods_vinculados=["ODS 1"]))
+        self.db.crear_proyecto(self._crear_proyecto("P-11", ods_vinculados=["ODS 11"]))
+        self.db.crear_proyecto(self._crear_proyecto("P-AMBOS", ods_vinculados=["ODS 1", "ODS 11"]))
+
+        self.assertEqual(self._ids(ods=["ODS 1"]), ["P-1", "P-AMBOS"])
+        self.assertEqual(self._ids(ods=["ODS 1", "ODS 11"]), ["P-AMBOS"])
+        self.assertEqual(self._ids(ods=["ODS 1", "ODS 11"], todos_los_ods=False), ["P-1", "P-11", "P-AMBOS"])
+
+    def test_filtros_normalizados(self):
+        """Departamento, municipio y sector ignoran tildes y mayúsculas"""
+        self.db.crear_proyecto(self._crear_proyecto("P-NAR"))
+        self.db.crear_proyecto(self._crear_proyecto(
+            "P-ANT", departamentos=["ANTIOQUIA"], municipios=["MEDELLÍN"], sectores=["Educación"]
+        ))
+
+        self.assertEqual(self._ids(departamento="Nariño"), ["P-NAR"])
+        self.assertEqual(self._ids(departamento="narino"), ["P-NAR"])
+        self.assertEqual(self._ids(municipio="Medellin"), ["P-ANT"])
+        self.assertEqual(self._ids(sector="educacion"), ["P-ANT"])
+        self.assertEqual(self._ids(departamento="NARIÑO", sector="Educación"), [])
+        # Un departamento no coincide por subcadena
+        self.assertEqual(self._ids(departamento="NARI"), [])
+
+    def test_sincronizacion(self):
+        """Actualizar y eliminar mantienen las tablas de relación al día"""
+        proyecto = self._crear_proyecto("P-1")
+        self.db.crear_proyecto(proyecto)
+
+        proyecto.departamentos = ["CAUCA"]
+        proyecto.ods_vinculados = ["ODS 4"]
+        self.db.actualizar_proyecto(proyecto)
+        self.assertEqual(self._ids(departamento="NARIÑO"), [])
+        self.assertEqual(self._ids(departamento="CAUCA", ods=["ODS 4"]), ["P-1"])
+
+        self.db.eliminar_proyecto("P-1")
+        with sqlite3.connect(self.db_path) as conn:
+            for tabla in RELACIONES_PROYECTO:
+                self.assertEqual(conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0], 0)
+
+    def test_lote(self):
+        """Las cargas por lotes (con índices diferidos) llenan las relaciones"""
+        lote = [self._crear_proyecto(f"P-{i:03d}", ods_vinculados=[f"ODS {i % 17 + 1}"]) for i in range(100)]
+        self.db.upsert_proyectos_lote(lote, diferir_indices=True)
+        self.assertEqual(len(self._ids(ods=["ODS 1"])), 6)
+
+        lote[0].ods_vinculados = ["ODS 17"]
+        self.db.upsert_proyectos_lote(lote[:1])
+        self.assertEqual(len(self._ids(ods=["ODS 1"])), 5)
+        self.assertEqual(self.db.buscar_ids_proyectos(departamento="Nariño", ods=["ODS 17"])[:1], ["P-000"])
+
+    def test_reconstruccion_base_anterior(self):
+        """Una base sin tablas de relación se completa al abrirla"""
+        self.db.crear_proyecto(self._crear_proyecto("P-1"))
+        self.db.cerrar_conexion()
+        with sqlite3.connect(self.db_path) as conn:
+            for tabla in RELACIONES_PROYECTO:
+                conn.execute(f"DROP TABLE {tabla}")
+
+        self.db = DatabaseManager(self.db_path)
+        self.assertEqual(self._ids(municipio="Tumaco", ods=["ODS 6"]), ["P-1"])
+
+
+class TestBusquedaTexto(BaseBusqueda):
+    """Tests para buscar_texto y el filtro de texto de buscar_proyectos"""
+
+    def setUp(self):
+        super().setUp()
+        self.db.crear_proyecto(self._crear_proyecto(
+            "P-AGUA", nombre="Acueducto veredal",
+            descripcion="Construcción de acueducto para niños de la vereda"
+        ))
+        self.db.crear_proyecto(self._crear_proyecto(
+            "P-EDU", nombre="Escuela rural", organizacion="Fundación Educación",
+            descripcion="Dotación escolar; el acueducto existente se mantiene",
+            poblacion_objetivo="Niñas y niños campesinos"
+        ))
+
+    def test_consulta_fts(self):
+        """La entrada del usuario se reduce a palabras entre comillas"""
+        self.assertEqual(consulta_fts('Educación "rural" OR -x'), '"EDUCACION"* "RURAL"* "OR"* "X"*')
+        self.assertIsNone(consulta_fts("  ¿? "))
+        self.assertEqual(self.db.buscar_texto("¿?"), [])
+
+    def test_sin_tildes_y_prefijos(self):
+        """Tildes, mayúsculas y palabras incompletas"""
+        self.assertEqual({r.proyecto_id for r in self.db.buscar_texto("NINOS")}, {"P-AGUA", "P-EDU"})
+        self.assertEqual({r.proyecto_id for r in self.db.buscar_texto("educacion")}, {"P-EDU"})
+        self.assertEqual({r.proyecto_id for r in self.db.buscar_texto("campes")}, {"P-EDU"})
+        self.assertEqual(self.db.buscar_texto("acueducto escuela")[0].proyecto_id, "P-EDU")
+
+    def test_ranking_y_fragmento(self):
+        """Coincidir en el nombre pesa más que en la descripción"""
+        resultados = self.db.buscar_texto("acueducto", marcas=("[", "]"))
+        self.assertEqual([r.proyecto_id for r in resultados], ["P-AGUA", "P-EDU"])
+        self.assertGreater(resultados[0].puntaje, resultados[1].puntaje)
+        self.assertIn("[acueducto]", resultados[1].fragmento)
+
+    def test_sincronizado_con_proyectos(self):
+        """Los triggers mantienen el índice en actualizaciones, lotes y bajas"""
+        proyecto = self._crear_proyecto("P-AGUA", nombre="Vivienda", descripcion="Mejoramiento de techos")
+        self.db.actualizar_proyecto(proyecto)
+        self.assertEqual({r.proyecto_id for r in self.db.buscar_texto("acueducto")}, {"P-EDU"})
+
+        self.db.upsert_proyectos_lote([self._crear_proyecto("P-LOTE", descripcion="Techos comunitarios")])
+        self.assertEqual({r.proyecto_id for r in self.db.buscar_texto("techos")}, {"P-AGUA", "P-LOTE"})
+
+        self.db.eliminar_proyecto("P-EDU")
+        self.assertEqual(self.db.buscar_texto("escuela"), [])
+
+    def test_filtro_texto_combinado(self):
+        """buscar_proyectos combina texto (o ID) con los demás filtros"""
+        self.assertEqual(self._ids(texto="vereda"), ["P-AGUA"])
+        self.assertEqual(self._ids(texto="P-ED"), ["P-EDU"])
+        self.assertEqual(self._ids(texto="acueducto", organizacion="Fundación Educación"), ["P-EDU"])
+
+    def test_reconstruccion_indice(self):
+        """Una base sin proyectos_fts lo reconstruye al abrirla"""
+        self.db.cerrar_conexion()
+        with sqlite3.connect(self.db_path) as conn:
+            for trigger in ("insert", "delete", "update"):
+                conn.execute(f"DROP TRIGGER proyectos_fts_{trigger}")
+            conn.execute("DROP TABLE proyectos_fts")
+
+        self.db = DatabaseManager(self.db_path)
+        self.assertEqual({r.proyecto_id for r in self.db.buscar_texto("dotacion")}, {"P-EDU"})
+
+
+if __name__ == '__main__':
+    unittest.main()
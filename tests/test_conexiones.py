@@ -0,0 +1,134 @@
+"""
+Tests para el gestor de conexiones SQLite compartidas
+
+Valida:
+- Una conexión por hilo, reutilizada entre llamadas
+- Modo WAL activo y filas accesibles por nombre
+- close() invalida las conexiones de todos los hilos
+- Las conexiones de hilos terminados se cierran (no se acumulan)
+- Registro compartido por archivo entre repositorios
+"""
+import gc
+import sqlite3
+import tempfile
+import threading
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from database.conexiones import GestorConexionesSQLite, get_gestor_conexiones
+from database.matriz_pdet_repository import MatrizPDETRepository
+
+
+class TestGestorConexiones(unittest.TestCase):
+    """Tests para GestorConexionesSQLite y get_gestor_conexiones"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "test.db")
+
+    def tearDown(self):
+        get_gestor_conexiones(self.db_path).close()
+        self.tmp.cleanup()
+
+    def test_una_conexion_por_hilo(self):
+        """Mismo hilo reutiliza la conexión; otro hilo obtiene la suya"""
+        gestor = GestorConexionesSQLite(self.db_path)
+        conn = gestor.conexion()
+        self.assertIs(gestor.conexion(), conn)
+
+        otras = []
+        hilo = threading.Thread(target=lambda: otras.append(gestor.conexion()))
+        hilo.start()
+        hilo.join()
+
+        self.assertIsNot(otras[0], conn)
+        gestor.close()
+
+    def test_wal_y_filas_por_nombre(self):
+        """journal_mode=WAL y row_factory sqlite3.Row"""
+        with GestorConexionesSQLite(self.db_path) as gestor:
+            conn = gestor.conexion()
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("SELECT 1 AS uno").fetchone()['uno'], 1)
+
+    def test_transaccion_commit_y_rollback(self):
+        """transaccion() confirma al salir y revierte ante excepción"""
+        with GestorConexionesSQLite(self.db_path) as gestor:
+            with gestor.transaccion() as conn:
+                conn.execute("CREATE TABLE t (x INTEGER)")
+                conn.execute("INSERT INTO t VALUES (1)")
+
+            with self.assertRaises(RuntimeError):
+                with gestor.transaccion() as conn:
+                    conn.execute("INSERT INTO t VALUES (2)")
+                    raise RuntimeError("falla")
+
+            externa = sqlite3.connect(self.db_path)
+            self.assertEqual(externa.execute("SELECT x FROM t").fetchall(), [(1,)])
+            externa.close()
+
+    def test_close_reabre(self):
+        """Tras close() la conexión anterior queda cerrada y se abre otra"""
+        gestor = GestorConexionesSQLite(self.db_path)
+        conn = gestor.conexion()
+        gestor.close()
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+        nueva = gestor.conexion()
+        self.assertIsNot(nueva, conn)
+        self.assertEqual(nueva.execute("SELECT 1").fetchone()[0], 1)
+        gestor.close()
+
+    def test_registro_compartido(self):
+        """Repositorios del mismo archivo comparten gestor y conexión"""
+        gestor = get_gestor_conexiones(self.db_path)
+        self.assertIs(get_gestor_conexiones(str(Path(self.tmp.name) / "." / "test.db")), gestor)
+
+        repo_a = MatrizPDETRepository(self.db_path)
+        repo_b = MatrizPDETRepository(self.db_path, indexado=False)
+        self.assertIs(repo_a.conexiones, gestor)
+        self.assertIs(repo_b.conexiones.conexion(), gestor.conexion())
+        self.assertEqual(repo_b.get_total_municipios(), 0)
+
+        # Cerrar un repositorio no cierra la conexión compartida
+        conn = gestor.conexion()
+        repo_a.close()
+        self.assertIs(repo_b.conexiones.conexion(), conn)
+        self.assertEqual(conn.execute("SELECT 1").fetchone()[0], 1)
+        self.assertEqual(repo_b.get_total_municipios(), 0)
+
+    def test_hilos_terminados_liberan_conexion(self):
+        """Muchos hilos de vida corta (un rerun de Streamlit cada uno) no acumulan conexiones"""
+        gestor = GestorConexionesSQLite(self.db_path)
+        principal = gestor.conexion()
+        usadas = []
+
+        def consulta():
+            conn = gestor.conexion()
+            conn.execute("SELECT 1").fetchone()
+            usadas.append(conn)
+
+        for _ in range(200):
+            hilo = threading.Thread(target=consulta)
+            hilo.start()
+            hilo.join()
+        gc.collect()
+
+        self.assertEqual(len(usadas), 200)
+        self.assertEqual(gestor.conexiones_abiertas, 1)
+        for conn in usadas:
+            with self.assertRaises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+        self.assertIs(gestor.conexion(), principal)
+        gestor.close()
+        self.assertEqual(gestor.conexiones_abiertas, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
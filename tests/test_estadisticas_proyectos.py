@@ -0,0 +1,156 @@
+"""
+Tests para las estadísticas agregadas de DatabaseManager
+
+Valida:
+- Totales, costo por beneficiario y SROI calculados en SQL
+- Agrupación por departamento, ODS, sector, área, estado y nivel de prioridad
+- Filtros de búsqueda aplicados a totales, grupos y métricas
+- Proyectos ordenados por métrica (ORDER BY ... LIMIT)
+- Scores guardados: alta, invalidación al actualizar y borrado en cascada
+"""
+import sqlite3
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from database.db_manager import DatabaseManager, GrupoEstadistico, NIVEL_SIN_EVALUAR
+from models.proyecto import ProyectoSocial, AreaGeografica, EstadoProyecto
+
+
+class TestEstadisticasProyectos(unittest.TestCase):
+    """Tests para obtener_estadisticas, agrupar_proyectos, metricas_proyectos y guardar_scores"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "proyectos.db")
+        self.db = DatabaseManager(self.db_path)
+        self.db.crear_proyectos_lote([
+            self._crear_proyecto("P-1", indicadores_impacto={'sroi': 3.5}),
+            self._crear_proyecto(
+                "P-2", departamentos=["Nariño", "CAUCA"], ods_vinculados=["ODS 6", "ODS 4"],
+                presupuesto_total=100_000_000, beneficiarios_directos=500, beneficiarios_indirectos=500,
+                indicadores_impacto={'sroi': "1.5"}
+            ),
+            self._crear_proyecto(
+                "P-3", departamentos=["ANTIOQUIA"], sectores=["Educación"], area_geografica=AreaGeografica.URBANA,
+                estado=EstadoProyecto.APROBADO, beneficiarios_directos=0, beneficiarios_indirectos=0,
+                indicadores_impacto={'sroi': "no calculado"}
+            ),
+        ])
+
+    def tearDown(self):
+        self.db.cerrar_conexion()
+        self.tmp.cleanup()
+
+    def _crear_proyecto(self, id, **kwargs):
+        """Helper para crear proyecto con valores por defecto."""
+        defaults = {
+            'id': id,
+            'nombre': f"Proyecto {id}",
+            'organizacion': "Test Org",
+            'descripcion': "Acueducto veredal",
+            'beneficiarios_directos': 1000,
+            'beneficiarios_indirectos': 3000,
+            'duracion_meses': 24,
+            'presupuesto_total': 300_000_000,
+            'ods_vinculados': ["ODS 6"],
+            'area_geografica': AreaGeografica.RURAL,
+            'poblacion_objetivo': "Comunidades rurales",
+            'departamentos': ["NARIÑO"],
+            'municipios': ["TUMACO"],
+            'sectores': ["Alcantarillado"],
+        }
+        defaults.update(kwargs)
+        return ProyectoSocial(**defaults)
+
+    def _conteos(self, dimension, **filtros):
+        return {g.valor: g.proyectos for g in self.db.agrupar_proyectos(dimension, **filtros)}
+
+    def test_totales(self):
+        """Totales, costo por beneficiario y SROI (ignora valores no numéricos)"""
+        estadisticas = self.db.obtener_estadisticas()
+        self.assertEqual(estadisticas['total_proyectos'], 3)
+        self.assertEqual(estadisticas['presupuesto_total'], 700_000_000)
+        self.assertEqual(estadisticas['costo_por_beneficiario'], 700_000_000 / 5000)
+        self.assertEqual(estadisticas['proyectos_con_sroi'], 2)
+        self.assertAlmostEqual(estadisticas['sroi_promedio'], 2.5)
+        self.assertEqual((estadisticas['sroi_minimo'], estadisticas['sroi_maximo']), (1.5, 3.5))
+
+        filtradas = self.db.obtener_estadisticas(texto="P-1")
+        self.assertEqual(filtradas['total_proyectos'], 1)
+        self.assertEqual(filtradas['sroi_promedio'], 3.5)
+
+    def test_agrupacion(self):
+        """Un proyecto cuenta en cada departamento y ODS que declara, una sola vez"""
+        self.assertEqual(self._conteos('departamento'), {'NARIÑO': 2, 'CAUCA': 1, 'ANTIOQUIA': 1})
+        self.assertEqual(self._conteos('ods'), {'ODS 6': 3, 'ODS 4': 1})
+        self.assertEqual(self._conteos('sector'), {'Alcantarillado': 2, 'Educación': 1})
+        self.assertEqual(self._conteos('area_geografica'), {'rural': 2, 'urbana': 1})
+        self.assertEqual(self._conteos('estado'), {'propuesta': 2, 'aprobado': 1})
+
+        grupos = self.db.agrupar_proyectos('departamento', limite=1)
+        self.assertEqual(grupos, [GrupoEstadistico('NARIÑO', 2, 400_000_000.0, 5000)])
+        self.assertEqual(grupos[0].costo_por_beneficiario, 80_000)
+
+        with self.assertRaises(ValueError):
+            self.db.agrupar_proyectos('organizacion')
+
+    def test_agrupacion_filtrada(self):
+        """Los grupos usan los mismos filtros que buscar_proyectos"""
+        # La etiqueta del grupo es la escritura guardada por los proyectos filtrados
+        self.assertEqual(self._conteos('departamento', ods=["ODS 4"]), {'Nariño': 1, 'CAUCA': 1})
+        estadisticas = self.db.obtener_estadisticas(agrupar_por=('ods',), departamento="Antioquia")
+        self.assertEqual(estadisticas['total_proyectos'], 1)
+        self.assertEqual([(g.valor, g.proyectos) for g in estadisticas['por_ods']], [('ODS 6', 1)])
+
+    def test_metricas_proyectos(self):
+        """Proyectos ordenados por métrica; se omiten los que no la tienen"""
+        sroi = self.db.metricas_proyectos('sroi')
+        self.assertEqual([(m.proyecto_id, m.valor) for m in sroi], [("P-1", 3.5), ("P-2", 1.5)])
+
+        costo = self.db.metricas_proyectos('costo_por_beneficiario', ascendente=True)
+        self.assertEqual([m.proyecto_id for m in costo], ["P-1", "P-2"])
+
+        presupuesto = self.db.metricas_proyectos('presupuesto_total', limite=1, departamento="Nariño")
+        self.assertEqual([m.proyecto_id for m in presupuesto], ["P-1"])
+
+        with self.assertRaises(ValueError):
+            self.db.metricas_proyectos('nombre')
+
+    def test_scores_por_nivel(self):
+        """Los scores guardados alimentan la agrupación por nivel de prioridad"""
+        self.assertEqual(self._conteos('nivel_prioridad'), {NIVEL_SIN_EVALUAR: 3})
+
+        guardados = self.db.guardar_scores([("P-1", 82.0, "ALTA"), ("P-2", 40.0, "BAJA"), ("NO-EXISTE", 1.0, "BAJA")])
+        self.assertEqual(guardados, 2)
+        self.assertEqual(self._conteos('nivel_prioridad'), {'ALTA': 1, 'BAJA': 1, NIVEL_SIN_EVALUAR: 1})
+        self.assertEqual(self.db.ids_sin_score(), ["P-3"])
+
+        # Volver a guardar reemplaza el score anterior
+        self.db.guardar_scores([("P-2", 85.0, "ALTA")])
+        self.assertEqual(self._conteos('nivel_prioridad'), {'ALTA': 2, NIVEL_SIN_EVALUAR: 1})
+
+        # Un ID repetido en el mismo lote se guarda una vez, con el último score
+        self.assertEqual(self.db.guardar_scores([("P-3", 10.0, "BAJA"), ("P-3", 60.0, "MEDIA")]), 1)
+        self.assertEqual(self._conteos('nivel_prioridad'), {'ALTA': 2, 'MEDIA': 1})
+
+    def test_scores_invalidados(self):
+        """Actualizar descarta el score; eliminar borra la fila"""
+        self.db.guardar_scores([("P-1", 82.0, "ALTA"), ("P-2", 40.0, "BAJA")])
+
+        self.db.actualizar_proyecto(self._crear_proyecto("P-1", presupuesto_total=1))
+        self.db.upsert_proyectos_lote([self._crear_proyecto("P-2")])
+        self.assertEqual(sorted(self.db.ids_sin_score()), ["P-1", "P-2", "P-3"])
+
+        self.db.guardar_scores([("P-3", 60.0, "MEDIA")])
+        self.db.eliminar_proyecto("P-3")
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM proyecto_scores").fetchone()[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
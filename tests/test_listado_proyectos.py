@@ -0,0 +1,156 @@
+"""
+Tests para el listado paginado de proyectos en DatabaseManager
+
+Valida:
+- Paginación por clave (fecha_modificacion, id) sin repetir ni omitir filas
+- Desempate por ID cuando varias filas comparten fecha de modificación
+- Órdenes por nombre, presupuesto y beneficiarios, ascendentes y descendentes
+- Filtros de búsqueda y conteo sobre el listado
+- Proyección de resumen y carga bajo demanda de proyectos completos
+"""
+import sqlite3
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from database.db_manager import DatabaseManager, ResumenProyecto
+from models.proyecto import ProyectoSocial, AreaGeografica
+
+
+class TestListadoProyectos(unittest.TestCase):
+    """Tests para listar_proyectos, obtener_resumenes y obtener_proyectos"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "proyectos.db")
+        self.db = DatabaseManager(self.db_path)
+
+    def tearDown(self):
+        self.db.cerrar_conexion()
+        self.tmp.cleanup()
+
+    def _crear_proyecto(self, id, **kwargs):
+        """Helper para crear proyecto con valores por defecto."""
+        defaults = {
+            'id': id,
+            'nombre': f"Proyecto {id}",
+            'organizacion': "Test Org",
+            'descripcion': "Acueducto veredal " * 30,
+            'beneficiarios_directos': 1000,
+            'beneficiarios_indirectos': 3000,
+            'duracion_meses': 24,
+            'presupuesto_total': 300_000_000,
+            'ods_vinculados': ["ODS 6"],
+            'area_geografica': AreaGeografica.RURAL,
+            'poblacion_objetivo': "Comunidades rurales",
+            'departamentos': ["NARIÑO"],
+            'municipios': ["TUMACO"],
+            'sectores': ["Alcantarillado"],
+        }
+        defaults.update(kwargs)
+        return ProyectoSocial(**defaults)
+
+    def _fijar_fechas(self, fechas):
+        """Asigna fecha_modificacion por ID directamente en la tabla"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "UPDATE proyectos SET fecha_modificacion = ? WHERE id = ?",
+                [(fecha, proyecto_id) for proyecto_id, fecha in fechas.items()]
+            )
+
+    def _recorrer(self, limite, **filtros):
+        """IDs de todas las páginas, en orden"""
+        ids, cursor, paginas = [], None, 0
+        while True:
+            pagina = self.db.listar_proyectos(limite=limite, despues_de=cursor, **filtros)
+            ids.extend(r.id for r in pagina.resumenes)
+            paginas += 1
+            if not pagina.hay_mas:
+                return ids, paginas
+            cursor = pagina.cursor_siguiente
+
+    def test_recorrido_completo(self):
+        """Las páginas cubren todos los proyectos una sola vez, del más reciente al más antiguo"""
+        self.db.crear_proyectos_lote(self._crear_proyecto(f"P-{i:02d}") for i in range(23))
+        # Fechas repetidas de a tres: el ID desempata
+        self._fijar_fechas({f"P-{i:02d}": f"2026-01-{i // 3 + 1:02d}T00:00:00" for i in range(23)})
+
+        ids, paginas = self._recorrer(limite=5)
+        esperado = sorted((f"P-{i:02d}" for i in range(23)), key=lambda i: (int(i[2:]) // 3, i), reverse=True)
+        self.assertEqual(ids, esperado)
+        self.assertEqual(paginas, 5)
+
+    def test_ordenes_por_columna(self):
+        """Cada orden recorre todas las filas con el ID como desempate"""
+        proyectos = [
+            self._crear_proyecto(
+                f"P-{i:02d}", nombre=f"Proyecto {'ABC'[i % 3]}",
+                presupuesto_total=float(i % 4 + 1) * 1_000_000, beneficiarios_directos=(i * 7) % 5 + 1
+            )
+            for i in range(17)
+        ]
+        self.db.crear_proyectos_lote(proyectos)
+
+        claves = {
+            'nombre': lambda p: p.nombre,
+            'presupuesto': lambda p: p.presupuesto_total,
+            'beneficiarios': lambda p: p.beneficiarios_totales,
+        }
+        for orden, clave in claves.items():
+            for descendente in (False, True):
+                with self.subTest(orden=orden, descendente=descendente):
+                    ids, paginas = self._recorrer(limite=4, orden=orden, descendente=descendente)
+                    esperado = [p.id for p in sorted(proyectos, key=lambda p: (clave(p), p.id), reverse=descendente)]
+                    self.assertEqual(ids, esperado)
+                    self.assertEqual(paginas, 5)
+
+        with self.assertRaises(ValueError):
+            self.db.listar_proyectos(orden='organizacion')
+
+    def test_pagina_exacta(self):
+        """Sin página vacía al final cuando el total es múltiplo del límite"""
+        self.db.crear_proyectos_lote(self._crear_proyecto(f"P-{i}") for i in range(4))
+        primera = self.db.listar_proyectos(limite=2)
+        segunda = self.db.listar_proyectos(limite=2, despues_de=primera.cursor_siguiente)
+        self.assertTrue(primera.hay_mas)
+        self.assertFalse(segunda.hay_mas)
+        self.assertEqual(len(segunda.resumenes), 2)
+
+    def test_filtros_y_conteo(self):
+        """El listado y el conteo aceptan los filtros de buscar_proyectos"""
+        self.db.crear_proyectos_lote([
+            self._crear_proyecto("P-A", departamentos=["CAUCA"], presupuesto_total=1_000_000),
+            self._crear_proyecto("P-B", presupuesto_total=5_000_000),
+            self._crear_proyecto("P-C", presupuesto_total=9_000_000),
+        ])
+        self.assertEqual(self.db.contar_proyectos(), 3)
+        self.assertEqual(self.db.contar_proyectos(departamento="Nariño"), 2)
+        ids, _ = self._recorrer(limite=1, departamento="Nariño", presupuesto_max=6_000_000)
+        self.assertEqual(ids, ["P-B"])
+        self.assertEqual(self.db.obtener_organizaciones(), ["Test Org"])
+
+    def test_resumen_y_carga_bajo_demanda(self):
+        """El resumen trae la descripción recortada; el proyecto completo se carga por ID"""
+        self.db.crear_proyecto(self._crear_proyecto("P-1"))
+        self.db.crear_proyecto(self._crear_proyecto("P-2", beneficiarios_directos=0, beneficiarios_indirectos=0))
+
+        resumen = self.db.obtener_resumenes(["P-1"])[0]
+        self.assertIsInstance(resumen, ResumenProyecto)
+        self.assertEqual(len(resumen.descripcion), 200)
+        self.assertEqual(resumen.beneficiarios_totales, 4000)
+        self.assertEqual(resumen.presupuesto_por_beneficiario, 75_000)
+        self.assertEqual(resumen.departamentos, ["NARIÑO"])
+        self.assertEqual(resumen.estado, "propuesta")
+        self.assertEqual(self.db.obtener_resumenes(["P-2"])[0].presupuesto_por_beneficiario, 0.0)
+
+        proyectos = self.db.obtener_proyectos(["P-2", "NO-EXISTE", "P-1"])
+        self.assertEqual([p.id for p in proyectos], ["P-2", "P-1"])
+        self.assertEqual(proyectos[1].sectores, ["Alcantarillado"])
+
+
+if __name__ == '__main__':
+    unittest.main()
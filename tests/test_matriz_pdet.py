@@ -109,6 +109,423 @@ class TestMatrizPDET:
         print(f"\n✅ {len(departamentos)} departamentos PDET encontrados")
 
 
+class TestIndiceMatrizPDET:
+    """Tests del índice en memoria del repositorio"""
+
+    FILAS = [
+        ("ANTIOQUIA", "ABEJORRAL", 5, 6, 10, 4, 3, 8, 2, 9, 1, 7),
+        ("CESAR", "AGUSTÍN CODAZZI", 7, 7, 7, 7, 7, 7, 7, 7, 7, 7),
+        ("NARIÑO", "TUMACO", 9, 8, 7, 6, 5, 4, 3, 2, 1, 10),
+        ("NARIÑO", "BARBACOAS", 1, 2, 3, 4, 5, 6, 7, 8, 9, 10),
+    ]
+
+    @staticmethod
+    def _insertar(db_path, filas):
+        import sqlite3
+        normalizar = MatrizPDETRepository.normalizar_texto
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany("""
+                INSERT INTO matriz_pdet_zomac (
+                    departamento, municipio, educacion, salud, alcantarillado, via,
+                    energia, banda_ancha, riesgo_ambiental, infraestructura_rural,
+                    cultura, deporte, departamento_norm, municipio_norm
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [fila + (normalizar(fila[0]), normalizar(fila[1])) for fila in filas])
+
+    @pytest.fixture
+    def repos(self, tmp_path):
+        """(indexado, SQL) sobre la misma base temporal"""
+        db_path = str(tmp_path / "matriz.db")
+        indexado = MatrizPDETRepository(db_path)
+        self._insertar(db_path, self.FILAS)
+        return indexado, MatrizPDETRepository(db_path, indexado=False)
+
+    def test_indexado_igual_a_sql(self, repos):
+        """Mismas respuestas con y sin índice, incluida la versión"""
+        indexado, sql = repos
+
+        assert indexado.get_version() == sql.get_version()
+        assert indexado.get_total_municipios() == sql.get_total_municipios() == 4
+        assert indexado.get_departamentos() == sql.get_departamentos()
+        assert indexado.get_municipios_por_departamento("Nariño") == ["BARBACOAS", "TUMACO"]
+
+        for departamento, municipio in [("cesar", "Agustin Codazzi"), ("NARINO", "tumaco"), ("CESAR", "TUMACO")]:
+            assert indexado.es_municipio_pdet(municipio, departamento) == sql.es_municipio_pdet(municipio, departamento)
+            assert indexado.get_puntajes_sectores(municipio, departamento) == sql.get_puntajes_sectores(municipio, departamento)
+
+        registro = indexado.get_municipio("Antioquia", "Abejorral")
+        assert registro.alcantarillado == 10
+        assert indexado.get_puntajes_sectores("Tumaco", "Nariño")['Deporte'] == 10
+
+    def test_consultas_indexadas_sin_leer_contador(self, repos):
+        """Con el índice vigente las consultas no leen matriz_pdet_cambios"""
+        indexado, sql = repos
+        indexado.get_municipio("NARIÑO", "TUMACO")
+        sentencias = []
+        conn = indexado.conexiones.conexion()
+        conn.set_trace_callback(sentencias.append)
+        try:
+            for _ in range(50):
+                assert indexado.get_municipio("Nariño", "Tumaco") is not None
+            assert not any("matriz_pdet_cambios" in sentencia for sentencia in sentencias)
+
+            # Una escritura por la misma conexión (otro repositorio) sí se detecta
+            sql.vaciar_tabla()
+            assert indexado.get_municipio("NARIÑO", "TUMACO") is None
+        finally:
+            conn.set_trace_callback(None)
+
+    def test_indice_se_refresca_con_cambios(self, repos):
+        """Escrituras en la tabla recargan el índice; en otras tablas no"""
+        import sqlite3
+        indexado, sql = repos
+        version = indexado.get_version()
+        indice = indexado._asegurar_indice()
+
+        # Escritura ajena a la matriz: no recarga
+        with sqlite3.connect(indexado.db_path) as conn:
+            conn.execute("CREATE TABLE otra (x INTEGER)")
+            conn.execute("INSERT INTO otra VALUES (1)")
+        assert indexado._asegurar_indice() is indice
+
+        with sqlite3.connect(indexado.db_path) as conn:
+            conn.execute("UPDATE matriz_pdet_zomac SET salud = 1 WHERE municipio = 'TUMACO'")
+        assert indexado.get_puntajes_sectores("TUMACO", "NARIÑO")['Salud'] == 1
+        assert indexado.get_version() != version
+        assert indexado.get_version() == sql.get_version()
+
+        sql.vaciar_tabla()
+        assert not indexado.es_municipio_pdet("TUMACO", "NARIÑO")
+        assert indexado.get_total_municipios() == 0
+
+    def test_migracion_columnas_normalizadas(self, tmp_path):
+        """Una tabla sin claves normalizadas se migra y las consultas usan el índice"""
+        import sqlite3
+        db_path = str(tmp_path / "antigua.db")
+        columnas = ", ".join(f"{c} INTEGER NOT NULL" for c in (
+            'educacion', 'salud', 'alcantarillado', 'via', 'energia', 'banda_ancha',
+            'riesgo_ambiental', 'infraestructura_rural', 'cultura', 'deporte'
+        ))
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(f"""
+                CREATE TABLE matriz_pdet_zomac (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    departamento TEXT NOT NULL,
+                    municipio TEXT NOT NULL,
+                    {columnas},
+                    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(departamento, municipio)
+                )
+            """)
+            conn.executemany(
+                "INSERT INTO matriz_pdet_zomac VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+                self.FILAS
+            )
+
+        repo = MatrizPDETRepository(db_path, indexado=False)
+
+        with sqlite3.connect(db_path) as conn:
+            claves = conn.execute(
+                "SELECT departamento_norm, municipio_norm FROM matriz_pdet_zomac ORDER BY id"
+            ).fetchall()
+            plan = " ".join(str(fila) for fila in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM matriz_pdet_zomac "
+                "WHERE departamento_norm = ? AND municipio_norm = ?", ("CESAR", "AGUSTIN CODAZZI")
+            ))
+
+        assert claves[1] == ("CESAR", "AGUSTIN CODAZZI")
+        assert claves[2] == ("NARINO", "TUMACO")
+        assert "idx_depto_mun_norm" in plan
+        assert repo.es_municipio_pdet("Agustín Codazzi", "Cesar")
+        assert repo.get_municipio("nariño", "tumaco").deporte == 10
+        assert repo.get_municipios_por_departamento("Narino") == ["BARBACOAS", "TUMACO"]
+
+    def test_municipios_lote(self, repos):
+        """get_municipios_lote coincide con get_municipio en ambos modos"""
+        pares = [("cesar", "Agustin Codazzi"), ("NARIÑO", "Tumaco"), ("CESAR", "TUMACO"),
+                 ("Nariño", "tumaco"), ("ANTIOQUIA", "ABEJORRAL")]
+
+        for repo in repos:
+            registros = repo.get_municipios_lote(pares)
+            assert set(registros) == {("CESAR", "AGUSTIN CODAZZI"), ("NARINO", "TUMACO"), ("ANTIOQUIA", "ABEJORRAL")}
+            for departamento, municipio in pares:
+                individual = repo.get_municipio(departamento, municipio)
+                en_lote = registros.get(repo.clave_normalizada(departamento, municipio))
+                assert (individual is None) == (en_lote is None)
+                if individual:
+                    assert en_lote.get_sectores_ordenados() == individual.get_sectores_ordenados()
+
+            assert repo.get_municipios_lote([]) == {}
+
+    def test_criterio_evaluar_lote(self, repos):
+        """El camino por lotes del criterio da lo mismo sin consultas por proyecto"""
+        indexado, _ = repos
+
+        def crear(id, departamentos, municipios):
+            return ProyectoSocial(
+                id=id, nombre=id, organizacion="Org", descripcion="Test",
+                beneficiarios_directos=100, beneficiarios_indirectos=0,
+                duracion_meses=12, presupuesto_total=100_000_000,
+                ods_vinculados=["ODS 4"], area_geografica=AreaGeografica.RURAL,
+                poblacion_objetivo="Comunidades", departamentos=departamentos,
+                municipios=municipios, sectores=["Deporte", "Salud"],
+                tiene_municipios_pdet=True
+            )
+
+        def cartera():
+            return [
+                crear("L-1", ["NARIÑO"], ["TUMACO"]),
+                # Municipio del segundo departamento: debe resolverse a NARIÑO
+                crear("L-2", ["CESAR", "NARIÑO"], ["Barbacoas"]),
+                crear("L-3", ["ANTIOQUIA"], ["NO-EXISTE"]),
+            ]
+
+        criterio = ProbabilidadAprobacionCriterio(db_path=indexado.db_path)
+        individuales = [criterio.evaluar(p) for p in cartera()]
+
+        proyectos = cartera()
+        criterio.matriz_repo.get_municipio = None  # el lote no debe usarlo
+        criterio.matriz_repo.es_municipio_pdet = None
+        en_lote = criterio.evaluar_lote(proyectos)
+
+        assert en_lote == individuales
+        assert [p.puntaje_sectorial_max for p in proyectos] == [10, 10, None]
+
+    def test_matriz_sectores_igual_a_sql(self, repos):
+        """Estadísticas, filtros y sectores prioritarios vectorizados = SQL/registro"""
+        indexado, sql = repos
+        matriz = indexado.get_matriz_sectores()
+
+        assert matriz.puntajes.shape == (4, 10)
+        assert matriz.fila_por_clave[("NARINO", "TUMACO")] == 2
+        for sector in ('educacion', 'salud', 'Banda Ancha', 'Energía', 'deporte'):
+            assert indexado.get_estadisticas_sector(sector) == sql.get_estadisticas_sector(sector)
+            for minimo in (1, 7, 10):
+                assert (
+                    [(r.departamento, r.municipio) for r in indexado.get_municipios_por_puntaje_sector(sector, minimo)]
+                    == [(r.departamento, r.municipio) for r in sql.get_municipios_por_puntaje_sector(sector, minimo)]
+                )
+
+        prioritarios = matriz.sectores_prioritarios_todos(umbral=7)
+        for (departamento, municipio, *_) in self.FILAS:
+            registro = indexado.get_municipio(departamento, municipio)
+            clave = indexado.clave_normalizada(departamento, municipio)
+            assert prioritarios[clave] == registro.get_sectores_prioritarios(7)
+            assert matriz.sectores_prioritarios(matriz.fila_por_clave[clave], 5) == registro.get_sectores_prioritarios(5)
+
+        with pytest.raises(ValueError):
+            indexado.get_municipios_por_puntaje_sector("minería")
+
+    def test_top_municipios_ponderado(self, repos):
+        """Ranking ponderado por sectores, con filtro de departamento"""
+        indexado, sql = repos
+
+        top = indexado.get_top_municipios_sectores({'educacion': 3, 'deporte': 1}, n=2)
+        # TUMACO: (9*3 + 10) / 4 = 9.25; CESAR: 7; ABEJORRAL: (15 + 7) / 4 = 5.5
+        assert top == [("NARIÑO", "TUMACO", 9.25), ("CESAR", "AGUSTÍN CODAZZI", 7.0)]
+        assert sql.get_top_municipios_sectores({'educacion': 3, 'deporte': 1}, n=2) == top
+
+        nariño = indexado.get_top_municipios_sectores({'Cultura': 1}, departamento="narino")
+        assert [m for _, m, _ in nariño] == ["BARBACOAS", "TUMACO"]
+
+        with pytest.raises(ValueError):
+            indexado.get_top_municipios_sectores({'salud': 0})
+
+    def test_matriz_sectores_en_cache(self, repos, tmp_path):
+        """La matriz guardada por versión se abre con memoria mapeada"""
+        import numpy as np
+        indexado, sql = repos
+        cache = tmp_path / "cache"
+
+        original = indexado.get_matriz_sectores(directorio_cache=str(cache))
+        assert len(list(cache.glob("*.npy"))) == 1
+
+        desde_cache = sql.get_matriz_sectores(directorio_cache=str(cache))
+        assert isinstance(desde_cache.puntajes, np.memmap)
+        assert np.array_equal(desde_cache.puntajes, original.puntajes)
+        assert desde_cache.claves == original.claves
+        assert desde_cache.estadisticas_sectores() == original.estadisticas_sectores()
+
+        indexado.conexiones.conexion().execute(
+            "UPDATE matriz_pdet_zomac SET salud = 1 WHERE municipio = 'TUMACO'"
+        )
+        indexado.conexiones.conexion().commit()
+        nueva = sql.get_matriz_sectores(directorio_cache=str(cache))
+        assert nueva.version != original.version
+        assert nueva.puntajes[2, 1] == 1
+        assert indexado.get_matriz_sectores().puntajes[2, 1] == 1
+
+    def test_buscar_municipios_aproximado(self, repos):
+        """Búsqueda por trigramas en ambos modos; el índice sigue a la tabla"""
+        indexado, sql = repos
+
+        for repo in repos:
+            assert repo.buscar_municipios_similares("Agustin Codazi")[0].municipio == "AGUSTÍN CODAZZI"
+            assert [m for _, m in repo.buscar_municipios("narino", limite=5)] == ["TUMACO", "BARBACOAS"]
+        assert indexado.buscar_municipios("tumaco") == [("NARIÑO", "TUMACO")]
+
+        self._insertar(indexado.db_path, [("NARIÑO", "TUMACOS", *([5] * 10))])
+        assert ("NARIÑO", "TUMACOS") in indexado.buscar_municipios("tumaco")
+
+    def test_indice_inverso_municipios(self, repos):
+        """ubicar_municipio respeta el orden de departamentos del proyecto"""
+        indexado, sql = repos
+        self._insertar(indexado.db_path, [("CAUCA", "BARBACOAS", *([5] * 10))])
+
+        for repo in repos:
+            assert repo.get_departamentos_municipio("Barbacoas") == ["NARIÑO", "CAUCA"]
+            assert repo.ubicar_municipio("barbacoas", ["Cauca", "Nariño"]).departamento == "CAUCA"
+            assert repo.ubicar_municipio("barbacoas", ["narino", "Cauca"]).departamento == "NARIÑO"
+            assert repo.ubicar_municipio("Barbacoas", ["Cesar"]) is None
+
+        ubicacion = indexado.ubicar_municipio("Agustin Codazzi", ["Cesar"])
+        matriz = indexado.get_matriz_sectores()
+        assert ubicacion.es_pdet_zomac
+        assert ubicacion.fila_sector == matriz.fila_por_clave[("CESAR", "AGUSTIN CODAZZI")]
+
+        criterio = ProbabilidadAprobacionCriterio(db_path=indexado.db_path)
+        criterio.matriz_repo.es_municipio_pdet = None  # debe resolverse por el índice inverso
+        assert criterio._get_departamento_municipio("Barbacoas", ["Cesar", "Cauca", "Nariño"]) == "CAUCA"
+        assert criterio._get_departamento_municipio("Otro", ["Cesar", "Cauca"]) == "Cesar"
+
+    def test_cargar_matriz_versiones(self, tmp_path):
+        """Carga atómica con versión por contenido y snapshots de versiones previas"""
+        import sqlite3
+        db_path = str(tmp_path / "carga.db")
+        repo = MatrizPDETRepository(db_path)
+        sql = MatrizPDETRepository(db_path, indexado=False)
+
+        primera = repo.cargar_matriz(self.FILAS + [self.FILAS[0]], origen="v1.xlsx")
+        assert primera.cambio and primera.filas == 4 and primera.duplicados == 1
+        assert repo.get_version() == sql.get_version() == primera.version
+        assert repo.get_municipio("Nariño", "Tumaco").deporte == 10
+
+        assert not repo.cargar_matriz(self.FILAS).cambio
+
+        modificadas = [("NARIÑO", "TUMACO", *([2] * 10))] + self.FILAS[:2]
+        segunda = repo.cargar_matriz(modificadas, origen="v2.xlsx")
+        assert segunda.version != primera.version
+        assert repo.get_total_municipios() == 3
+        assert repo.get_municipio("Nariño", "Tumaco").deporte == 2
+        assert [v['version'] for v in repo.get_versiones()] == [segunda.version, primera.version]
+        assert [v['vigente'] for v in repo.get_versiones()] == [True, False]
+        assert [r.municipio for r in repo.get_snapshot(primera.version)] == [f[1] for f in self.FILAS]
+
+        # Filas inválidas: error y la matriz vigente no cambia
+        with pytest.raises(ValueError, match="fuera de 1-10"):
+            repo.cargar_matriz(self.FILAS + [("CESAR", "X", *([11] * 10))])
+        with pytest.raises(ValueError):
+            repo.cargar_matriz([])
+        assert repo.get_version() == segunda.version
+
+        assert repo.restaurar_version(primera.version).version == primera.version
+        assert repo.get_total_municipios() == 4
+        with pytest.raises(ValueError):
+            repo.get_snapshot("no-existe")
+
+        # Edición fuera del cargador: la versión se recalcula por contenido
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE matriz_pdet_zomac SET salud = 1 WHERE municipio = 'TUMACO'")
+        assert sql.get_version() == repo.get_version() != primera.version
+
+    def test_comparar_versiones(self, tmp_path):
+        """Diferencia entre versiones: agregados, eliminados y columnas cambiadas"""
+        db_path = str(tmp_path / "diferencia.db")
+        repo = MatrizPDETRepository(db_path)
+        # Tabla cargada sin versiones: la carga siguiente guarda su snapshot
+        self._insertar(db_path, self.FILAS)
+        sql = MatrizPDETRepository(db_path, indexado=False)
+        inicial = repo.get_version()
+
+        nuevas = [
+            ("ANTIOQUIA", "ABEJORRAL", 5, 6, 10, 4, 3, 8, 2, 9, 1, 7),
+            ("CESAR", "AGUSTIN CODAZZI", 7, 2, 7, 7, 7, 7, 7, 7, 7, 3),
+            ("NARIÑO", "TUMACO", 9, 8, 7, 6, 5, 4, 3, 2, 1, 10),
+            ("CAUCA", "GUAPI", *([6] * 10)),
+        ]
+        carga = repo.cargar_matriz(nuevas)
+        assert carga.version_anterior == inicial
+        assert not repo.cargar_matriz(nuevas).version_anterior
+
+        for diferencia in (
+            repo.comparar_versiones(inicial),
+            sql.comparar_versiones(inicial),
+            repo.comparar_versiones(inicial, carga.version),
+        ):
+            assert diferencia.version_nueva == carga.version
+            assert diferencia.agregados == [("CAUCA", "GUAPI")]
+            assert diferencia.eliminados == [("NARINO", "BARBACOAS")]
+            assert diferencia.cambios == {("CESAR", "AGUSTIN CODAZZI"): ("salud", "deporte")}
+            assert len(diferencia) == 3
+
+        assert repo.comparar_versiones(carga.version).vacia
+        with pytest.raises(ValueError):
+            repo.comparar_versiones("no-existe")
+
+    def test_estadisticas_materializadas(self, repos):
+        """Estadísticas por versión: nacional, por departamento y percentiles"""
+        import sqlite3
+        indexado, sql = repos
+
+        salud = sql.get_estadisticas_sector("Salud")
+        assert salud == indexado.get_estadisticas_sector("Salud")
+        assert (salud['total'], salud['promedio'], salud['minimo'], salud['maximo']) == (4, 5.75, 2, 8)
+        assert (salud['percentil_25'], salud['percentil_50'], salud['percentil_90']) == (5.0, 6.5, 7.7)
+        assert salud['municipios_alta_prioridad'] == 2
+
+        narino = indexado.get_estadisticas_sector("deporte", departamento="narino")
+        assert (narino['total'], narino['promedio'], narino['minimo']) == (2, 10.0, 10)
+        assert narino['departamento'] == "NARIÑO"
+        por_departamento = sql.get_estadisticas_departamentos("Educación")
+        assert list(por_departamento) == ["ANTIOQUIA", "CESAR", "NARIÑO"]
+        assert por_departamento["NARIÑO"]['maximo'] == 9
+        with pytest.raises(ValueError):
+            sql.get_estadisticas_sector("salud", departamento="Huila")
+        with pytest.raises(ValueError):
+            sql.get_estadisticas_sector("minería")
+
+        # Una fila por (departamento o total, sector) para la versión vigente
+        with sqlite3.connect(sql.db_path) as conn:
+            versiones = conn.execute(
+                "SELECT version, COUNT(*) FROM matriz_pdet_estadisticas GROUP BY version"
+            ).fetchall()
+        assert versiones == [(sql.get_version(), 4 * 10)]
+
+        # Otra instancia lee la tabla materializada sin recalcular
+        otro = MatrizPDETRepository(sql.db_path, indexado=False)
+        otro.get_matriz_sectores = None
+        assert otro.get_estadisticas_sector("Salud") == salud
+
+        # Al cambiar la matriz se recalculan para la nueva versión
+        version_anterior = sql.get_version()
+        self._insertar(sql.db_path, [("CAUCA", "GUAPI", *([1] * 10))])
+        assert indexado.get_estadisticas_sector("salud")['total'] == 5
+        assert sql.get_estadisticas_sector("salud", "Cauca")['maximo'] == 1
+
+        # Las estadísticas de la versión anterior se conservan
+        with sqlite3.connect(sql.db_path) as conn:
+            versiones = dict(conn.execute(
+                "SELECT version, COUNT(*) FROM matriz_pdet_estadisticas GROUP BY version"
+            ).fetchall())
+        assert versiones == {version_anterior: 4 * 10, sql.get_version(): 5 * 10}
+
+    def test_estadisticas_matriz_vacia(self, tmp_path):
+        """Sin municipios: ValueError en lugar de KeyError"""
+        repo = MatrizPDETRepository(str(tmp_path / "vacia.db"))
+        assert repo.get_estadisticas_sectores() == {}
+        with pytest.raises(ValueError, match="no tiene municipios"):
+            repo.get_estadisticas_sector("Salud")
+
+    def test_repositorio_serializable(self, repos):
+        """El repositorio indexado se puede enviar a otros procesos"""
+        import pickle
+        indexado, _ = repos
+        indexado.get_version()
+
+        copia = pickle.loads(pickle.dumps(indexado))
+        assert copia.es_municipio_pdet("Barbacoas", "Nariño")
+
+
 class TestProbabilidadConPDET:
     """Tests del criterio de probabilidad con integración PDET"""
 
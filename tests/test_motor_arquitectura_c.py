@@ -8,6 +8,8 @@ Valida:
 - Cálculo correcto de scores
 - Gates de validación
 """
+import os
+import tempfile
 import unittest
 import sys
 from pathlib import Path
@@ -15,8 +17,12 @@ from pathlib import Path
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.scoring.motor_arquitectura_c import MotorScoringArquitecturaC, calcular_score_proyecto
+from src.scoring.motor_arquitectura_c import (
+    MotorScoringArquitecturaC, calcular_score_proyecto, criterios_afectados
+)
 from src.models.proyecto import ProyectoSocial, AreaGeografica
+from src.scoring.cache_scores import CacheScores
+from database.conexiones import get_gestor_conexiones
 
 
 class TestMotorScoringArquitecturaC(unittest.TestCase):
@@ -299,6 +305,242 @@ class TestMotorScoringArquitecturaC(unittest.TestCase):
         # Proyecto con territorial alto debe tener mejor score stakeholders
         self.assertGreater(resultado_alto.score_stakeholders, resultado_bajo.score_stakeholders)
 
+    # ========== SCORING POR LOTES ==========
+
+    def _crear_cartera_variada(self):
+        """Cartera con casos borde: no elegible, rechazo, datos faltantes"""
+        return [
+            self._crear_proyecto_base(id="LOTE-01"),
+            self._crear_proyecto_base(
+                id="LOTE-02", indicadores_impacto={'sroi': 4.5},
+                pertinencia_operacional=5, mejora_relacionamiento=5,
+                en_corredor_transmision=True, puntaje_territorial_confis=8.0,
+                stakeholders_involucrados=['autoridades_locales', 'academia'],
+                municipios=["A", "B", "C", "D"], departamentos=["X", "Y"],
+                es_patr_pdet=True, contribuyente_paga_estructuracion=True,
+            ),
+            self._crear_proyecto_base(id="LOTE-03", indicadores_impacto={'sroi': 0.8}),
+            self._crear_proyecto_base(
+                id="LOTE-04", tiene_municipios_pdet=False, tipo_municipio=None
+            ),
+            self._crear_proyecto_base(id="LOTE-05", indicadores_impacto={}),
+            self._crear_proyecto_base(id="LOTE-06", pertinencia_operacional=None),
+            self._crear_proyecto_base(id="LOTE-07", riesgo_social_impacto=None),
+            self._crear_proyecto_base(
+                id="LOTE-08", tipo_municipio="ZOMAC", puntaje_sectorial_max=3,
+                riesgo_tecnico_probabilidad=5, riesgo_tecnico_impacto=5,
+            ),
+        ]
+
+    def test_lote_igual_a_calculo_individual(self):
+        """calcular_scores_lote debe reproducir calcular_score(detallado=False)"""
+        lote = self.motor.calcular_scores_lote(self._crear_cartera_variada())
+
+        for i, proyecto in enumerate(self._crear_cartera_variada()):
+            individual = self.motor.calcular_score(proyecto, detallado=False)
+            with self.subTest(proyecto=proyecto.id):
+                self.assertEqual(lote.proyecto_ids[i], proyecto.id)
+                self.assertAlmostEqual(lote.score_total[i], individual.score_total, places=9)
+                self.assertAlmostEqual(lote.score_sroi[i], individual.score_sroi, places=9)
+                self.assertAlmostEqual(lote.score_stakeholders[i], individual.score_stakeholders, places=9)
+                self.assertAlmostEqual(lote.score_probabilidad[i], individual.score_probabilidad, places=9)
+                self.assertAlmostEqual(lote.score_riesgos[i], individual.score_riesgos, places=9)
+                self.assertAlmostEqual(lote.contribucion_riesgos[i], individual.contribucion_riesgos, places=9)
+                self.assertEqual(lote.nivel_prioridad[i], individual.nivel_prioridad)
+
+    def test_lote_vacio_y_ranking(self):
+        """Lote vacío y ranking estable por score total"""
+        self.assertEqual(len(self.motor.calcular_scores_lote([])), 0)
+
+        lote = self.motor.calcular_scores_lote(self._crear_cartera_variada())
+        ranking = lote.indices_ranking()
+        scores = lote.score_total[ranking]
+
+        self.assertTrue(all(scores[i] >= scores[i + 1] for i in range(len(scores) - 1)))
+        self.assertEqual(lote.matriz_scores().shape, (len(lote), 4))
+
+    # ========== RUTA RÁPIDA (SOLO NÚMEROS) ==========
+
+    def test_rapido_igual_a_calculo_sin_detalle(self):
+        """calcular_score_rapido da los mismos números; los textos se generan después"""
+        for proyecto in self._crear_cartera_variada():
+            rapido = self.motor.calcular_score_rapido(proyecto)
+            completo = self.motor.calcular_score(proyecto, detallado=False)
+            diferido = self.motor.completar_resultado(rapido)
+
+            with self.subTest(proyecto=proyecto.id):
+                self.assertFalse(hasattr(rapido, 'alertas'))
+                self.assertEqual(rapido.proyecto_id, proyecto.id)
+                self.assertEqual(rapido.score_total, completo.score_total)
+                self.assertEqual(rapido.contribucion_sroi, completo.contribucion_sroi)
+                self.assertEqual(rapido.nivel_prioridad, completo.nivel_prioridad)
+                self.assertEqual(diferido.alertas, completo.alertas)
+                self.assertEqual(diferido.recomendaciones, completo.recomendaciones)
+
+    def test_rapido_textos_diferidos(self):
+        """Errores de criterio y alertas del motor se reconstruyen desde los números"""
+        cartera = {p.id: p for p in self._crear_cartera_variada()}
+
+        rapido = self.motor.calcular_score_rapido(cartera["LOTE-06"])
+        self.assertEqual(list(rapido.errores), ['stakeholders'])
+        self.assertEqual(rapido.score_stakeholders, 0)
+        alertas = self.motor.completar_resultado(rapido).alertas
+        self.assertTrue(alertas[0].startswith("⚠️  Error Stakeholders: Datos stakeholders inválidos"))
+
+        rechazado = self.motor.completar_resultado(self.motor.calcular_score_rapido(cartera["LOTE-03"]))
+        self.assertEqual(rechazado.nivel_prioridad, "RECHAZADO")
+        self.assertIn("🚫 PROYECTO RECHAZADO - SROI < 1.0 destruye valor social", rechazado.alertas)
+
+        no_elegible = self.motor.calcular_score_rapido(cartera["LOTE-04"])
+        self.assertEqual(no_elegible.nivel_prioridad, "NO ELEGIBLE")
+        self.assertTrue(self.motor.completar_resultado(no_elegible).alertas[0].startswith("🚫 PROYECTO NO ELEGIBLE"))
+
+    def test_validacion_rapida_igual_a_validar(self):
+        """riesgos_validos/stakeholders_validos coinciden con validar_*()['valido']"""
+        valores = [None, 0, 1, 3, 5, 6]
+        for valor in valores:
+            for campo in ('riesgo_tecnico_impacto', 'riesgo_regulatorio_probabilidad'):
+                proyecto = self._crear_proyecto_base(**{campo: valor})
+                self.assertEqual(proyecto.riesgos_validos(), proyecto.validar_riesgos()['valido'])
+            for campo in ('pertinencia_operacional', 'mejora_relacionamiento'):
+                proyecto = self._crear_proyecto_base(**{campo: valor})
+                self.assertEqual(proyecto.stakeholders_validos(), proyecto.validar_stakeholders()['valido'])
+
+    # ========== CACHÉ DE SCORES ==========
+
+    def test_cache_reutiliza_resultado(self):
+        """Segundo cálculo del mismo proyecto sale de la caché"""
+        cache = CacheScores()
+        motor = MotorScoringArquitecturaC(cache=cache)
+
+        referencia = self._crear_proyecto_base()
+        sin_cache = self.motor.calcular_score(referencia)
+        primero = motor.calcular_score(self._crear_proyecto_base())
+        proyecto = self._crear_proyecto_base()
+        segundo = motor.calcular_score(proyecto)
+
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(segundo.score_total, sin_cache.score_total)
+        self.assertEqual(segundo.alertas, primero.alertas)
+        self.assertEqual(segundo.recomendaciones, primero.recomendaciones)
+
+        # Campos calculados por los criterios también se restauran
+        self.assertEqual(proyecto.grupo_priorizacion_confis, referencia.grupo_priorizacion_confis)
+        self.assertEqual(proyecto.puntaje_confis_total, referencia.puntaje_confis_total)
+        self.assertEqual(proyecto.puntaje_sectorial_max, referencia.puntaje_sectorial_max)
+
+        # Modificar el resultado devuelto no altera la caché
+        segundo.alertas.append("modificada")
+        tercero = motor.calcular_score(self._crear_proyecto_base())
+        self.assertNotIn("modificada", tercero.alertas)
+
+    def test_cache_invalida_por_datos_pesos_y_matriz(self):
+        """La clave cambia con los datos, los pesos y la versión de la matriz"""
+        motor = MotorScoringArquitecturaC(cache=CacheScores())
+        proyecto = self._crear_proyecto_base()
+        clave = motor.clave_cache(proyecto, version_matriz="v1")
+
+        self.assertEqual(clave, motor.clave_cache(self._crear_proyecto_base(), version_matriz="v1"))
+        self.assertNotEqual(
+            clave,
+            motor.clave_cache(self._crear_proyecto_base(indicadores_impacto={'sroi': 2.6}), version_matriz="v1")
+        )
+        self.assertNotEqual(clave, motor.clave_cache(proyecto, version_matriz="v2"))
+        self.assertNotEqual(clave, motor.clave_cache(proyecto, detallado=False, version_matriz="v1"))
+
+        motor.PESO_SROI = 0.50
+        self.assertNotEqual(clave, motor.clave_cache(proyecto, version_matriz="v1"))
+
+    def test_cache_lru_y_nivel_sqlite(self):
+        """Desalojo LRU en memoria y recuperación desde SQLite"""
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "cache.db")
+            cache = CacheScores(max_entradas=2, db_path=db_path)
+            cache.guardar("a", 1, "v1")
+            cache.guardar("b", 2, "v1")
+            cache.guardar("c", 3, "v2")
+            self.assertEqual(len(cache), 2)
+
+            # "a" fue desalojada de memoria pero sigue en SQLite
+            self.assertEqual(cache.obtener("a"), 1)
+            self.assertEqual(cache.hits_sqlite, 1)
+
+            # Nueva instancia (otra sesión) lee del nivel SQLite
+            otra = CacheScores(db_path=db_path)
+            self.assertEqual(otra.obtener("c"), 3)
+            self.assertIsNone(otra.obtener("zzz"))
+            self.assertEqual(otra.estadisticas()['misses'], 1)
+
+            # Purgar elimina versiones anteriores de la matriz
+            otra.purgar("v2")
+            self.assertIsNone(CacheScores(db_path=db_path).obtener("a"))
+            self.assertEqual(CacheScores(db_path=db_path).obtener("c"), 3)
+
+            # Todas las instancias usan la conexión compartida del hilo
+            gestor = get_gestor_conexiones(db_path)
+            self.assertEqual(gestor.conexiones_abiertas, 1)
+            gestor.close()
+
+    # ========== SCORING INCREMENTAL ==========
+
+    def test_incremental_recalcula_solo_criterios_afectados(self):
+        """Cambiar un riesgo solo recalcula Riesgos"""
+        resultado, estado = self.motor.calcular_score_incremental(self._crear_proyecto_base())
+        self.assertEqual(estado.recalculados, ('sroi', 'stakeholders', 'probabilidad', 'riesgos'))
+
+        # Proyecto nuevo con un solo campo distinto (como en el formulario)
+        editado = self._crear_proyecto_base(riesgo_tecnico_impacto=5)
+        resultado, estado = self.motor.calcular_score_incremental(editado, estado)
+        self.assertEqual(estado.recalculados, ('riesgos',))
+
+        # Campos escritos por Probabilidad se reaplican al proyecto reutilizado
+        desde_cero = self._crear_proyecto_base(riesgo_tecnico_impacto=5)
+        esperado = self.motor.calcular_score(desde_cero)
+        self.assertEqual(editado.grupo_priorizacion_confis, desde_cero.grupo_priorizacion_confis)
+        self.assertEqual(editado.puntaje_confis_total, desde_cero.puntaje_confis_total)
+
+        self.assertEqual(resultado.score_total, esperado.score_total)
+        self.assertEqual(resultado.score_riesgos, esperado.score_riesgos)
+        self.assertEqual(resultado.alertas, esperado.alertas)
+        self.assertEqual(resultado.recomendaciones, esperado.recomendaciones)
+
+        # Sin cambios: nada se recalcula
+        _, estado = self.motor.calcular_score_incremental(
+            self._crear_proyecto_base(riesgo_tecnico_impacto=5), estado
+        )
+        self.assertEqual(estado.recalculados, ())
+
+    def test_incremental_igual_a_calculo_completo(self):
+        """Secuencia de ediciones produce los mismos resultados que calcular_score"""
+        ediciones = [
+            {},
+            {'indicadores_impacto': {'sroi': 0.5}},
+            {'indicadores_impacto': {'sroi': 4.0}, 'pertinencia_operacional': 2},
+            {'municipios': ["A", "B", "C"], 'departamentos': ["X", "Y"]},
+            {'tipo_municipio': None, 'tiene_municipios_pdet': False},
+            {'pertinencia_operacional': None},
+            {'es_patr_pdet': True},
+        ]
+        estado = None
+        for cambios in ediciones:
+            resultado, estado = self.motor.calcular_score_incremental(
+                self._crear_proyecto_base(**cambios), estado
+            )
+            esperado = self.motor.calcular_score(self._crear_proyecto_base(**cambios))
+            with self.subTest(cambios=cambios):
+                self.assertEqual(resultado.score_total, esperado.score_total)
+                self.assertEqual(resultado.nivel_prioridad, esperado.nivel_prioridad)
+                self.assertEqual(resultado.alertas, esperado.alertas)
+                self.assertEqual(resultado.recomendaciones, esperado.recomendaciones)
+
+    def test_criterios_afectados(self):
+        """Grafo de dependencias campo → criterio"""
+        self.assertEqual(criterios_afectados(['riesgo_social_impacto']), ['riesgos'])
+        self.assertEqual(criterios_afectados(['indicadores_impacto']), ['sroi'])
+        self.assertEqual(criterios_afectados(['municipios']), ['stakeholders', 'probabilidad'])
+        self.assertEqual(criterios_afectados(['nombre', 'presupuesto_total']), [])
+
 
 if __name__ == '__main__':
     unittest.main()
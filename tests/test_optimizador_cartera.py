@@ -0,0 +1,178 @@
+"""
+Tests para optimizador de cartera con restricción presupuestal
+
+Valida:
+- Método exacto igual a búsqueda exhaustiva
+- Greedy factible y límite de tiempo
+- Topes por departamento, obligatorios y exclusiones
+"""
+import itertools
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scoring.motor_arquitectura_c import ResultadoScoring
+from src.scoring.optimizador_cartera import OptimizadorCartera, RestriccionesCartera
+from src.models.proyecto import ProyectoSocial, AreaGeografica
+
+
+def _crear_proyecto(id, presupuesto, departamentos=("ANTIOQUIA",)):
+    return ProyectoSocial(
+        id=id,
+        nombre=f"Proyecto {id}",
+        organizacion="Test Org",
+        descripcion="Test",
+        beneficiarios_directos=1000,
+        beneficiarios_indirectos=3000,
+        duracion_meses=24,
+        presupuesto_total=presupuesto,
+        ods_vinculados=["ODS 6"],
+        area_geografica=AreaGeografica.RURAL,
+        poblacion_objetivo="Comunidades rurales",
+        departamentos=list(departamentos),
+    )
+
+
+def _crear_resultado(score, nivel="MEDIA"):
+    return ResultadoScoring(
+        score_total=score, score_sroi=score, score_stakeholders=score,
+        score_probabilidad=score, score_riesgos=score,
+        contribucion_sroi=0, contribucion_stakeholders=0,
+        contribucion_probabilidad=0, contribucion_riesgos=0,
+        nivel_prioridad=nivel
+    )
+
+
+class TestOptimizadorCartera(unittest.TestCase):
+    """Tests para OptimizadorCartera"""
+
+    def setUp(self):
+        self.optimizador = OptimizadorCartera()
+
+    def _fuerza_bruta(self, proyectos, resultados, restricciones):
+        """Mejor suma de scores por enumeración de subconjuntos"""
+        topes = restricciones.topes_normalizados()
+        mejor = 0.0
+        for r in range(len(proyectos) + 1):
+            for combinacion in itertools.combinations(range(len(proyectos)), r):
+                costo = sum(proyectos[i].presupuesto_total for i in combinacion)
+                if costo > restricciones.presupuesto_disponible:
+                    continue
+                factible = all(
+                    sum(proyectos[i].presupuesto_total for i in combinacion
+                        if depto in proyectos[i].departamentos) <= tope
+                    for depto, tope in topes.items()
+                )
+                if factible:
+                    mejor = max(mejor, sum(resultados[i].score_total for i in combinacion))
+        return mejor
+
+    def test_exacto_igual_a_fuerza_bruta(self):
+        """Branch-and-bound encuentra el óptimo en instancias aleatorias"""
+        rng = random.Random(42)
+        for caso in range(15):
+            n = rng.randint(4, 11)
+            proyectos = [
+                _crear_proyecto(
+                    f"P{i}",
+                    rng.randint(1, 20) * 50_000_000,
+                    rng.sample(["ANTIOQUIA", "CAUCA", "NARIÑO"], rng.randint(1, 2))
+                )
+                for i in range(n)
+            ]
+            resultados = [_crear_resultado(rng.uniform(20, 95)) for _ in range(n)]
+            restricciones = RestriccionesCartera(
+                presupuesto_disponible=rng.randint(5, 40) * 50_000_000,
+                topes_departamento={"CAUCA": rng.randint(2, 15) * 50_000_000}
+            )
+
+            resultado = self.optimizador.optimizar(proyectos, resultados, restricciones, metodo="exacto")
+            with self.subTest(caso=caso):
+                self.assertTrue(resultado.optimo)
+                self.assertAlmostEqual(
+                    resultado.score_cartera,
+                    self._fuerza_bruta(proyectos, resultados, restricciones),
+                    places=6
+                )
+                self.assertLessEqual(resultado.presupuesto_usado, restricciones.presupuesto_disponible)
+                self.assertLessEqual(resultado.uso_departamentos.get("CAUCA", 0),
+                                     restricciones.topes_departamento["CAUCA"])
+
+    def test_exacto_supera_greedy(self):
+        """Caso donde la densidad engaña: el exacto llena mejor el cupo"""
+        proyectos = [
+            _crear_proyecto("A", 600),
+            _crear_proyecto("B", 500),
+            _crear_proyecto("C", 500),
+        ]
+        resultados = [_crear_resultado(70), _crear_resultado(55), _crear_resultado(55)]
+        restricciones = RestriccionesCartera(presupuesto_disponible=1000)
+
+        exacto = self.optimizador.optimizar(proyectos, resultados, restricciones, metodo="exacto")
+        greedy = self.optimizador.optimizar(proyectos, resultados, restricciones, metodo="greedy")
+
+        self.assertEqual(sorted(exacto.seleccionados), ["B", "C"])
+        self.assertEqual(exacto.metodo, "exacto")
+        self.assertEqual(greedy.seleccionados, ["A"])
+        self.assertEqual(greedy.metodo, "greedy")
+
+    def test_obligatorios_y_exclusiones(self):
+        """Obligatorios siempre entran; rechazados y no elegibles no"""
+        proyectos = [
+            _crear_proyecto("OBL", 400),
+            _crear_proyecto("BUENO", 300),
+            _crear_proyecto("RECH", 100),
+            _crear_proyecto("NOEL", 100),
+            _crear_proyecto("CARO", 5_000),
+        ]
+        resultados = [
+            _crear_resultado(40, "BAJA"),
+            _crear_resultado(90, "MUY ALTA"),
+            _crear_resultado(0, "RECHAZADO"),
+            _crear_resultado(0, "NO ELEGIBLE"),
+            _crear_resultado(95, "MUY ALTA"),
+        ]
+        restricciones = RestriccionesCartera(presupuesto_disponible=1_000, obligatorios=["OBL"])
+
+        resultado = self.optimizador.optimizar(proyectos, resultados, restricciones)
+
+        self.assertEqual(resultado.seleccionados, ["BUENO", "OBL"])
+        self.assertEqual(resultado.presupuesto_restante, 300)
+        self.assertEqual(resultado.excluidos["RECH"], "RECHAZADO")
+        self.assertEqual(resultado.excluidos["NOEL"], "NO ELEGIBLE")
+        self.assertIn("CARO", resultado.excluidos)
+
+        with self.assertRaises(ValueError):
+            self.optimizador.optimizar(
+                proyectos, resultados,
+                RestriccionesCartera(presupuesto_disponible=300, obligatorios=["OBL"])
+            )
+        with self.assertRaises(ValueError):
+            self.optimizador.optimizar(
+                proyectos, resultados,
+                RestriccionesCartera(presupuesto_disponible=300, obligatorios=["NO-EXISTE"])
+            )
+
+    def test_cartera_grande_usa_greedy_y_respeta_tiempo(self):
+        """Por encima del umbral usa greedy; el exacto corta por tiempo"""
+        rng = random.Random(7)
+        proyectos = [_crear_proyecto(f"G{i}", rng.randint(1, 100) * 10_000_000) for i in range(400)]
+        resultados = [_crear_resultado(rng.uniform(10, 99)) for _ in range(400)]
+        restricciones = RestriccionesCartera(presupuesto_disponible=5_000_000_000)
+
+        resultado = self.optimizador.optimizar(proyectos, resultados, restricciones)
+        self.assertEqual(resultado.metodo, "greedy")
+        self.assertLessEqual(resultado.presupuesto_usado, restricciones.presupuesto_disponible)
+
+        rapido = OptimizadorCartera(limite_tiempo=0.05)
+        resultado_exacto = rapido.optimizar(proyectos, resultados, restricciones, metodo="exacto")
+        self.assertLess(resultado_exacto.tiempo_segundos, 1.0)
+        self.assertGreaterEqual(resultado_exacto.score_cartera, resultado.score_cartera - 1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
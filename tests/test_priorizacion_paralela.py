@@ -0,0 +1,108 @@
+"""
+Tests para la evaluación paralela de SistemaPriorizacionProyectos
+
+Valida:
+- priorizar_cartera(paralelo=True) da los mismos resultados y el mismo
+  orden (incluidos empates) que la evaluación en serie
+- El historial se registra en el proceso principal
+- Criterios que no se pueden enviar a otros procesos vuelven a la
+  evaluación en serie y lo reportan en el log del módulo
+"""
+import dataclasses
+import threading
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from criterios import SROICriterio, StakeholdersCriterio, RiesgosCriterio
+from estrategias import ScoringPonderado
+from models.proyecto import ProyectoSocial, AreaGeografica
+from servicios.sistema_priorizacion import SistemaPriorizacionProyectos, MIN_PROYECTOS_PARALELO
+
+
+class SROIConLock(SROICriterio):
+    """Criterio con un lock: pickle lo rechaza con TypeError"""
+
+    def __init__(self, peso: float = 0.40):
+        super().__init__(peso)
+        self._lock = threading.Lock()
+
+
+class TestPriorizacionParalela(unittest.TestCase):
+    """Tests para priorizar_cartera con paralelo=True"""
+
+    def setUp(self):
+        # SROI repetidos cada 4 proyectos: hay empates de score
+        self.cartera = [
+            self._crear_proyecto(f"P-{i:03d}", indicadores_impacto={'sroi': 1.5 + (i % 4)})
+            for i in range(MIN_PROYECTOS_PARALELO + 7)
+        ]
+
+    def _crear_proyecto(self, id, **kwargs):
+        """Helper para crear proyecto con valores por defecto."""
+        defaults = {
+            'id': id,
+            'nombre': f"Proyecto {id}",
+            'organizacion': "Test Org",
+            'descripcion': "Acueducto veredal",
+            'beneficiarios_directos': 1000,
+            'beneficiarios_indirectos': 3000,
+            'duracion_meses': 24,
+            'presupuesto_total': 300_000_000,
+            'ods_vinculados': ["ODS 6"],
+            'area_geografica': AreaGeografica.RURAL,
+            'poblacion_objetivo': "Comunidades rurales",
+            'departamentos': ["NARIÑO"],
+            'municipios': ["TUMACO"],
+            'sectores': ["Alcantarillado"],
+            'pertinencia_operacional': 4,
+            'mejora_relacionamiento': 3,
+            **{f'riesgo_{tipo}_{eje}': 2 for tipo in ('tecnico', 'social', 'financiero', 'regulatorio')
+               for eje in ('probabilidad', 'impacto')},
+        }
+        defaults.update(kwargs)
+        return ProyectoSocial(**defaults)
+
+    def _sistema(self, sroi=None):
+        return SistemaPriorizacionProyectos(
+            criterios=[sroi or SROICriterio(peso=0.5), StakeholdersCriterio(peso=0.3), RiesgosCriterio(peso=0.2)],
+            estrategia=ScoringPonderado()
+        )
+
+    def _copia_cartera(self):
+        return [dataclasses.replace(p) for p in self.cartera]
+
+    @staticmethod
+    def _resumen(resultados):
+        return [(r.proyecto_id, r.score_final, r.detalle_criterios, r.recomendacion) for r in resultados]
+
+    def test_paralelo_igual_a_serie(self):
+        """Mismos scores, detalle y orden de empates que la evaluación en serie"""
+        serie = self._sistema().priorizar_cartera(self._copia_cartera())
+
+        sistema = self._sistema()
+        paralelo = sistema.priorizar_cartera(self._copia_cartera(), paralelo=True, max_workers=2, chunk_size=5)
+
+        self.assertEqual(len(paralelo), len(self.cartera))
+        self.assertEqual(self._resumen(paralelo), self._resumen(serie))
+        self.assertLess(len({r.score_final for r in serie}), len(serie))  # hay empates
+        for proyecto in self.cartera:
+            self.assertIsNotNone(sistema.gestor_historial.obtener_historial(proyecto.id))
+
+    def test_criterio_no_serializable_evalua_en_serie(self):
+        """Un TypeError al serializar cae a la evaluación en serie con un aviso en el log"""
+        serie = self._sistema().priorizar_cartera(self._copia_cartera())
+
+        sistema = self._sistema(sroi=SROIConLock(peso=0.5))
+        with self.assertLogs('servicios.sistema_priorizacion', level='WARNING') as log:
+            resultados = sistema.priorizar_cartera(self._copia_cartera(), paralelo=True, max_workers=2)
+
+        self.assertIn("evaluando en serie", log.output[0])
+        self.assertEqual(self._resumen(resultados), self._resumen(serie))
+
+
+if __name__ == '__main__':
+    unittest.main()
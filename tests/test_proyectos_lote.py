@@ -0,0 +1,182 @@
+"""
+Tests para la carga de proyectos por lotes en DatabaseManager
+
+Valida:
+- Migración de columnas de Arquitectura C en bases nuevas
+- Inserción en una transacción con errores por fila
+- Upsert: inserta nuevos, actualiza existentes y conserva fecha de creación
+- Reconstrucción de índices diferidos
+- Eliminación de todos los proyectos en una sola transacción
+"""
+import dataclasses
+import sqlite3
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from database.db_manager import DatabaseManager, RELACIONES_PROYECTO
+from models.proyecto import ProyectoSocial, AreaGeografica
+
+
+class TestProyectosLote(unittest.TestCase):
+    """Tests para crear_proyectos_lote y upsert_proyectos_lote"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "proyectos.db")
+        self.db = DatabaseManager(self.db_path)
+
+    def tearDown(self):
+        self.db.cerrar_conexion()
+        self.tmp.cleanup()
+
+    def _crear_proyecto(self, id, **kwargs):
+        """Helper para crear proyecto con valores por defecto."""
+        defaults = {
+            'id': id,
+            'nombre': f"Proyecto {id}",
+            'organizacion': "Test Org",
+            'descripcion': "Acueducto veredal",
+            'beneficiarios_directos': 1000,
+            'beneficiarios_indirectos': 3000,
+            'duracion_meses': 24,
+            'presupuesto_total': 300_000_000,
+            'ods_vinculados': ["ODS 6"],
+            'area_geografica': AreaGeografica.RURAL,
+            'poblacion_objetivo': "Comunidades rurales",
+            'departamentos': ["NARIÑO"],
+            'municipios': ["TUMACO"],
+            'sectores': ["Alcantarillado"],
+            'pertinencia_operacional': 4,
+            'mejora_relacionamiento': 3,
+        }
+        defaults.update(kwargs)
+        return ProyectoSocial(**defaults)
+
+    def _contar(self, tabla):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+
+    def test_base_nueva_con_columnas_arquitectura_c(self):
+        """crear_proyecto funciona sobre una base recién creada"""
+        self.assertTrue(self.db.crear_proyecto(self._crear_proyecto("P-1")))
+        self.assertFalse(self.db.crear_proyecto(self._crear_proyecto("P-1")))
+        self.assertEqual(self.db.obtener_proyecto("P-1").sectores, ["Alcantarillado"])
+
+    def test_crear_lote_con_errores_por_fila(self):
+        """Filas inválidas se reportan; el resto se guarda en una transacción"""
+        self.db.crear_proyecto(self._crear_proyecto("P-0"))
+
+        invalido = self._crear_proyecto("P-3")
+        invalido.area_geografica = "rural"
+        invalido.riesgo_social_impacto = 9
+        lote = [
+            self._crear_proyecto("P-0"),
+            self._crear_proyecto("P-1"),
+            self._crear_proyecto("P-2", nombre=" "),
+            invalido,
+            self._crear_proyecto("P-1"),
+            {'id': "P-5"},
+            self._crear_proyecto("P-4"),
+        ]
+
+        resultado = self.db.crear_proyectos_lote(lote)
+
+        self.assertEqual(resultado.insertados, ["P-1", "P-4"])
+        self.assertEqual(resultado.existentes, ["P-0"])
+        self.assertEqual([e.indice for e in resultado.errores], [2, 3, 4, 5])
+        self.assertIn("nombre", resultado.errores[0].mensaje)
+        self.assertIn("area_geografica", resultado.errores[1].mensaje)
+        self.assertIn("riesgo_social_impacto", resultado.errores[1].mensaje)
+        self.assertIn("repetido", resultado.errores[2].mensaje)
+        self.assertIsNone(resultado.errores[3].proyecto_id)
+        self.assertFalse(resultado.exitoso)
+
+        self.assertEqual(self._contar("proyectos"), 3)
+        self.assertEqual(self._contar("historial_cambios"), 3)
+        self.assertEqual(self.db.obtener_proyecto("P-4").municipios, ["TUMACO"])
+
+    def test_upsert_lote(self):
+        """Inserta nuevos, actualiza existentes y conserva fecha_creacion"""
+        self.db.crear_proyectos_lote([self._crear_proyecto("P-1"), self._crear_proyecto("P-2")])
+        with sqlite3.connect(self.db_path) as conn:
+            creacion = conn.execute("SELECT fecha_creacion FROM proyectos WHERE id = 'P-1'").fetchone()[0]
+
+        resultado = self.db.upsert_proyectos_lote([
+            self._crear_proyecto("P-1", presupuesto_total=500_000_000, sectores=["Salud"]),
+            self._crear_proyecto("P-3"),
+        ])
+
+        self.assertEqual(resultado.actualizados, ["P-1"])
+        self.assertEqual(resultado.insertados, ["P-3"])
+        self.assertEqual(resultado.total_guardados, 2)
+        actualizado = self.db.obtener_proyecto("P-1")
+        self.assertEqual(actualizado.presupuesto_total, 500_000_000)
+        self.assertEqual(actualizado.sectores, ["Salud"])
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(
+                conn.execute("SELECT fecha_creacion FROM proyectos WHERE id = 'P-1'").fetchone()[0],
+                creacion
+            )
+        self.assertEqual(self._contar("proyectos"), 3)
+
+    def test_diferir_indices(self):
+        """Los índices secundarios se reconstruyen tras la carga"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE INDEX idx_prueba_org ON proyectos(organizacion)")
+
+        lote = [self._crear_proyecto(f"P-{i:03d}") for i in range(1200)]
+        resultado = self.db.upsert_proyectos_lote(lote, diferir_indices=True)
+
+        self.assertEqual(len(resultado.insertados), 1200)
+        with sqlite3.connect(self.db_path) as conn:
+            nombres = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+            self.assertIn("idx_prueba_org", nombres)
+            self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+
+        # Segunda pasada: todos existentes (consulta de IDs en varios bloques)
+        repetido = self.db.crear_proyectos_lote(dataclasses.replace(p) for p in lote)
+        self.assertEqual(len(repetido.existentes), 1200)
+        self.assertEqual(self._contar("proyectos"), 1200)
+
+    def test_eliminar_todos(self):
+        """Borra proyectos, relaciones, scores e índice de texto y registra el historial"""
+        self.db.crear_proyectos_lote(self._crear_proyecto(f"P-{i}") for i in range(5))
+        self.db.guardar_scores([("P-0", 80.0, "ALTA")])
+
+        self.assertEqual(self.db.eliminar_todos_proyectos(), 5)
+        for tabla in ("proyectos", "proyecto_scores", *RELACIONES_PROYECTO):
+            self.assertEqual(self._contar(tabla), 0, tabla)
+        self.assertEqual(self.db.buscar_texto("acueducto"), [])
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(
+                conn.execute("SELECT COUNT(*) FROM historial_cambios WHERE accion = 'DELETE'").fetchone()[0], 5
+            )
+        self.assertEqual(self.db.eliminar_todos_proyectos(), 0)
+
+    def test_eliminar_todos_atomico(self):
+        """Si falla un paso no se elimina ningún proyecto"""
+        self.db.crear_proyectos_lote(self._crear_proyecto(f"P-{i}") for i in range(5))
+        self.db.guardar_scores([("P-0", 80.0, "ALTA")])
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TRIGGER falla_scores BEFORE DELETE ON proyecto_scores
+                BEGIN SELECT RAISE(ABORT, 'falla'); END
+            """)
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.eliminar_todos_proyectos()
+        self.assertEqual(self._contar("proyectos"), 5)
+        self.assertEqual(self._contar("proyecto_departamento"), 5)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(
+                conn.execute("SELECT COUNT(*) FROM historial_cambios WHERE accion = 'DELETE'").fetchone()[0], 0
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Tests para ranking top-K en streaming
+
+Valida:
+- Top-K igual a los primeros K de un sort estable (incluidos empates)
+- Estadísticas acumuladas iguales a las calculadas sobre la lista completa
+- Motor: calcular_top_k sobre un generador igual al ranking completo
+- Motor: el resultado de los ganadores tiene el score usado en el ranking
+  aunque los criterios completen campos del proyecto
+"""
+import random
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scoring.motor_arquitectura_c import MotorScoringArquitecturaC
+from src.scoring.ranking_streaming import RankingTopK, top_k_streaming
+from src.models.proyecto import ProyectoSocial, AreaGeografica
+from database.conexiones import get_gestor_conexiones
+from database.matriz_pdet_repository import MatrizPDETRepository
+
+
+class TestRankingStreaming(unittest.TestCase):
+    """Tests para RankingTopK y MotorScoringArquitecturaC.calcular_top_k"""
+
+    def _crear_proyecto(self, id, **kwargs):
+        """Helper para crear proyecto con valores por defecto."""
+        defaults = {
+            'id': id,
+            'nombre': f"Proyecto {id}",
+            'organizacion': "Test Org",
+            'descripcion': "Test",
+            'indicadores_impacto': {'sroi': 2.5},
+            'presupuesto_total': 300_000_000,
+            'beneficiarios_directos': 1000,
+            'beneficiarios_indirectos': 3000,
+            'duracion_meses': 24,
+            'ods_vinculados': ["ODS 6"],
+            'area_geografica': AreaGeografica.RURAL,
+            'poblacion_objetivo': "Comunidades rurales",
+            'departamentos': ["ANTIOQUIA"],
+            'municipios': ["ABEJORRAL"],
+            'tiene_municipios_pdet': True,
+            'puntaje_sectorial_max': 5,
+            'pertinencia_operacional': 3,
+            'mejora_relacionamiento': 3,
+        }
+        defaults.update(kwargs)
+        return ProyectoSocial(**defaults)
+
+    def test_top_k_igual_a_sort_estable(self):
+        """Mismos elementos y mismo orden que sorted(...)[:k], con empates"""
+        rng = random.Random(3)
+        for caso in range(30):
+            n = rng.randint(0, 200)
+            k = rng.randint(1, 60)
+            scores = [rng.randint(0, 20) for _ in range(n)]
+
+            ranking = RankingTopK(k)
+            for i, score in enumerate(scores):
+                ranking.agregar(i, score)
+
+            esperado = sorted(range(n), key=lambda i: scores[i], reverse=True)[:k]
+            with self.subTest(caso=caso):
+                self.assertEqual(ranking.resultados(), esperado)
+                self.assertLessEqual(len(ranking), k)
+
+        with self.assertRaises(ValueError):
+            RankingTopK(0)
+
+    def test_estadisticas_acumuladas(self):
+        """Welford y bandas coinciden con el cálculo sobre la lista completa"""
+        rng = np.random.default_rng(1)
+        scores = rng.uniform(0, 100, size=5_000)
+
+        mejores, estadisticas = top_k_streaming(iter(scores.tolist()), 5, puntuar=lambda s: s)
+        resumen = estadisticas.to_dict()
+
+        self.assertEqual(mejores, sorted(scores.tolist(), reverse=True)[:5])
+        self.assertEqual(estadisticas.total, 5_000)
+        self.assertAlmostEqual(resumen['score_promedio'], scores.mean(), places=9)
+        self.assertAlmostEqual(resumen['desviacion_estandar'], scores.std(), places=9)
+        self.assertEqual(resumen['score_maximo'], scores.max())
+        self.assertEqual(resumen['score_minimo'], scores.min())
+        self.assertEqual(resumen['proyectos_alta_prioridad'], int((scores >= 80).sum()))
+        self.assertEqual(resumen['proyectos_media_prioridad'], int(((scores >= 60) & (scores < 80)).sum()))
+        self.assertEqual(resumen['proyectos_baja_prioridad'], int((scores < 60).sum()))
+
+        self.assertEqual(top_k_streaming([], 3, puntuar=lambda s: s)[1].to_dict(), {})
+
+    def test_motor_top_k_desde_generador(self):
+        """calcular_top_k sobre un generador = primeros K del ranking completo"""
+        motor = MotorScoringArquitecturaC()
+        rng = random.Random(11)
+
+        def generar():
+            for i in range(120):
+                yield self._crear_proyecto(
+                    f"TK-{i:03d}",
+                    indicadores_impacto={'sroi': rng.choice([0.5, 1.5, 2.5, 3.5, 5.0])},
+                    pertinencia_operacional=rng.randint(1, 5),
+                    mejora_relacionamiento=rng.randint(1, 5),
+                )
+
+        proyectos = list(generar())
+        lote = motor.calcular_scores_lote(proyectos)
+        orden = sorted(range(len(proyectos)), key=lambda i: lote.score_total[i], reverse=True)
+
+        rng.seed(11)
+        mejores, estadisticas = motor.calcular_top_k(generar(), k=15, tamano_bloque=32)
+
+        self.assertEqual([p.id for p, _ in mejores], [proyectos[i].id for i in orden[:15]])
+        self.assertEqual(estadisticas.total, 120)
+        self.assertAlmostEqual(estadisticas.media, float(lote.score_total.mean()), places=9)
+        for proyecto, resultado in mejores:
+            self.assertAlmostEqual(
+                resultado.score_total,
+                lote.score_total[lote.proyecto_ids.index(proyecto.id)],
+                places=9
+            )
+
+    def test_motor_top_k_campos_calculados(self):
+        """Los campos que completa Probabilidad no cambian el score de los ganadores"""
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(Path(tmp) / "matriz.db")
+            MatrizPDETRepository(db_path).cargar_matriz([
+                ("NARIÑO", "TUMACO", 9, 8, 7, 6, 5, 4, 3, 2, 1, 10),
+            ])
+            motor = MotorScoringArquitecturaC(db_path=db_path)
+
+            def generar():
+                rng = random.Random(5)
+                for i in range(30):
+                    yield self._crear_proyecto(
+                        f"PDET-{i:02d}",
+                        departamentos=["NARIÑO"],
+                        municipios=["TUMACO"],
+                        sectores=[rng.choice(["Deporte", "Salud", "Vías"])],
+                        tipo_municipio="PDET",
+                        tiene_municipios_pdet=False,
+                        puntaje_sectorial_max=None,
+                        indicadores_impacto={'sroi': rng.choice([1.5, 2.5, 3.5])},
+                        pertinencia_operacional=rng.randint(1, 5),
+                        mejora_relacionamiento=rng.randint(1, 5),
+                    )
+
+            proyectos = list(generar())
+            lote = motor.calcular_scores_lote(proyectos)
+            orden = sorted(range(len(proyectos)), key=lambda i: lote.score_total[i], reverse=True)
+
+            mejores, _ = motor.calcular_top_k(generar(), k=5, tamano_bloque=8)
+            get_gestor_conexiones(db_path).close()
+
+        self.assertEqual([p.id for p, _ in mejores], [proyectos[i].id for i in orden[:5]])
+        self.assertEqual(
+            [resultado.score_total for _, resultado in mejores],
+            [lote.score_total[i] for i in orden[:5]]
+        )
+        self.assertTrue(all(proyecto.tiene_municipios_pdet for proyecto, _ in mejores))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Tests para la re-evaluación dirigida al cambiar la matriz PDET/ZOMAC
+
+Valida:
+- Índice municipio → proyectos filtra por departamento y sector
+- Solo se recalculan los proyectos afectados
+- Los scores coinciden con recalcular la cartera completa
+- Reporte de movimientos del ranking
+"""
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scoring.motor_arquitectura_c import MotorScoringArquitecturaC
+from src.scoring.reevaluacion_matriz import IndiceProyectosMunicipio, reevaluar_por_cambio_matriz
+from src.models.proyecto import ProyectoSocial, AreaGeografica
+from database.conexiones import get_gestor_conexiones
+from database.matriz_pdet_repository import MatrizPDETRepository
+
+
+FILAS = [
+    ("ANTIOQUIA", "ABEJORRAL", 5, 6, 10, 4, 3, 8, 2, 9, 1, 7),
+    ("CESAR", "AGUSTÍN CODAZZI", 7, 7, 7, 7, 7, 7, 7, 7, 7, 7),
+    ("NARIÑO", "TUMACO", 9, 8, 7, 6, 5, 4, 3, 2, 1, 10),
+    ("NARIÑO", "BARBACOAS", 1, 2, 3, 4, 5, 6, 7, 8, 9, 10),
+]
+
+
+class TestReevaluacionMatriz(unittest.TestCase):
+    """Tests para IndiceProyectosMunicipio y reevaluar_por_cambio_matriz"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "matriz.db")
+        self.repo = MatrizPDETRepository(self.db_path)
+        self.version_inicial = self.repo.cargar_matriz(FILAS).version
+        self.motor = MotorScoringArquitecturaC(db_path=self.db_path)
+
+    def tearDown(self):
+        get_gestor_conexiones(self.db_path).close()
+        self.tmp.cleanup()
+
+    def _crear_proyecto(self, id, departamentos, municipios, sectores):
+        """Helper para crear proyecto elegible con sector y ubicación dados."""
+        return ProyectoSocial(
+            id=id,
+            nombre=f"Proyecto {id}",
+            organizacion="Test Org",
+            descripcion="Test",
+            indicadores_impacto={'sroi': 2.5},
+            presupuesto_total=300_000_000,
+            beneficiarios_directos=1000,
+            beneficiarios_indirectos=3000,
+            duracion_meses=24,
+            ods_vinculados=["ODS 6"],
+            area_geografica=AreaGeografica.RURAL,
+            poblacion_objetivo="Comunidades rurales",
+            departamentos=departamentos,
+            municipios=municipios,
+            sectores=sectores,
+            tiene_municipios_pdet=True,
+            pertinencia_operacional=3,
+            mejora_relacionamiento=3
+        )
+
+    def _cartera(self):
+        return [
+            self._crear_proyecto("P-1", ["Nariño"], ["Tumaco"], ["Deporte"]),
+            self._crear_proyecto("P-2", ["Nariño"], ["Tumaco"], ["Salud"]),
+            self._crear_proyecto("P-3", ["Antioquia"], ["Abejorral"], ["Alcantarillado"]),
+            self._crear_proyecto("P-4", ["Cauca", "Nariño"], ["Barbacoas"], ["Vías"]),
+            self._crear_proyecto("P-5", ["Cesar"], ["Tumaco"], ["Deporte"]),
+            self._crear_proyecto("P-6", ["Cesar"], ["Agustin Codazzi"], ["Sector nuevo"]),
+        ]
+
+    def _scores(self, proyectos):
+        lote = self.motor.calcular_scores_lote(proyectos)
+        return dict(zip(lote.proyecto_ids, lote.score_total.tolist()))
+
+    def test_indice_afectados(self):
+        """Filtra por municipio, departamento del proyecto y sector"""
+        cartera = self._cartera()
+        filas = [
+            ("NARIÑO", "TUMACO", 9, 8, 7, 6, 5, 4, 3, 2, 1, 2),
+            FILAS[0],
+            ("CESAR", "AGUSTÍN CODAZZI", *([7] * 9), 6),
+        ]
+        self.repo.cargar_matriz(filas)
+        diferencia = self.repo.comparar_versiones(self.version_inicial)
+
+        indice = IndiceProyectosMunicipio(cartera)
+        afectados = [cartera[p].id for p in indice.afectados(diferencia)]
+        # P-2 es de otro sector, P-3 no cambió, P-5 está en otro departamento;
+        # P-4 sale de la matriz y P-6 tiene un sector no reconocido
+        self.assertEqual(afectados, ["P-1", "P-4", "P-6"])
+        self.assertEqual(len(indice.proyectos_municipio("tumaco")), 3)
+
+    def test_reevaluacion_igual_a_recalculo_completo(self):
+        """Solo recalcula afectados y obtiene los mismos scores que desde cero"""
+        cartera = self._cartera()
+        anteriores = self._scores(cartera)
+
+        filas = [
+            ("NARIÑO", "TUMACO", 9, 8, 7, 6, 5, 4, 3, 2, 1, 1),
+            FILAS[0], FILAS[1], FILAS[3],
+        ]
+        self.repo.cargar_matriz(filas)
+        diferencia = self.repo.comparar_versiones(self.version_inicial)
+        reporte = reevaluar_por_cambio_matriz(self.motor, cartera, anteriores, diferencia)
+
+        self.assertEqual(reporte.reevaluados, ["P-1"])
+        self.assertAlmostEqual(reporte.fraccion_reevaluada, 1 / 6)
+
+        completos = self._scores(self._cartera())
+        for proyecto_id, score in completos.items():
+            self.assertAlmostEqual(reporte.scores[proyecto_id], score)
+
+        self.assertLess(reporte.scores["P-1"], anteriores["P-1"])
+        self.assertEqual(reporte.ranking, sorted(completos, key=lambda i: -completos[i]))
+
+        cambio = next(c for c in reporte.cambios if c.proyecto_id == "P-1")
+        self.assertLess(cambio.delta_score, 0)
+        self.assertEqual(cambio.posicion_anterior, 1)
+        self.assertLessEqual(cambio.delta_posicion, 0)
+        self.assertEqual(
+            [c.posicion_nueva for c in reporte.cambios],
+            sorted(c.posicion_nueva for c in reporte.cambios)
+        )
+
+    def test_sin_cambios_y_proyectos_nuevos(self):
+        """Matriz igual: solo se calculan los proyectos sin score previo"""
+        cartera = self._cartera()
+        anteriores = self._scores(cartera[:-1])
+        diferencia = self.repo.comparar_versiones(self.version_inicial)
+
+        reporte = reevaluar_por_cambio_matriz(self.motor, cartera, anteriores, diferencia)
+        self.assertTrue(diferencia.vacia)
+        self.assertEqual(reporte.reevaluados, ["P-6"])
+        self.assertIsNone(next(c for c in reporte.cambios if c.proyecto_id == "P-6").posicion_anterior)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Tests para análisis de sensibilidad de pesos (Arquitectura C)
+
+Valida:
+- Barrido matricial igual al motor con pesos modificados
+- Rankings, cambios de posición y de nivel
+- Generación de vectores de pesos
+"""
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scoring.motor_arquitectura_c import MotorScoringArquitecturaC
+from src.scoring.sensibilidad_pesos import (
+    AnalizadorSensibilidadPesos,
+    PESOS_ARQUITECTURA_C,
+    generar_pesos_variacion,
+    generar_rejilla_pesos
+)
+from src.models.proyecto import ProyectoSocial, AreaGeografica
+
+
+class TestSensibilidadPesos(unittest.TestCase):
+    """Tests para AnalizadorSensibilidadPesos"""
+
+    def _crear_proyecto(self, id, **kwargs):
+        """Helper para crear proyecto con valores por defecto."""
+        defaults = {
+            'id': id,
+            'nombre': f"Proyecto {id}",
+            'organizacion': "Test Org",
+            'descripcion': "Test",
+            'indicadores_impacto': {'sroi': 2.5},
+            'presupuesto_total': 300_000_000,
+            'beneficiarios_directos': 1000,
+            'beneficiarios_indirectos': 3000,
+            'duracion_meses': 24,
+            'ods_vinculados': ["ODS 6"],
+            'area_geografica': AreaGeografica.RURAL,
+            'poblacion_objetivo': "Comunidades rurales",
+            'departamentos': ["ANTIOQUIA"],
+            'municipios': ["ABEJORRAL"],
+            'tiene_municipios_pdet': True,
+            'tipo_municipio': "PDET",
+            'puntaje_sectorial_max': 5,
+            'pertinencia_operacional': 3,
+            'mejora_relacionamiento': 3,
+            'riesgo_tecnico_probabilidad': 2,
+            'riesgo_tecnico_impacto': 2,
+            'riesgo_social_probabilidad': 2,
+            'riesgo_social_impacto': 2,
+            'riesgo_financiero_probabilidad': 2,
+            'riesgo_financiero_impacto': 2,
+            'riesgo_regulatorio_probabilidad': 2,
+            'riesgo_regulatorio_impacto': 2,
+        }
+        defaults.update(kwargs)
+        return ProyectoSocial(**defaults)
+
+    def _crear_cartera(self):
+        return [
+            self._crear_proyecto("S-01", indicadores_impacto={'sroi': 4.5}),
+            self._crear_proyecto("S-02", indicadores_impacto={'sroi': 1.05},
+                                 pertinencia_operacional=5, mejora_relacionamiento=5,
+                                 puntaje_sectorial_max=10, puntaje_territorial_confis=9.0),
+            self._crear_proyecto("S-03", riesgo_tecnico_probabilidad=5, riesgo_tecnico_impacto=5),
+            self._crear_proyecto("S-04", indicadores_impacto={'sroi': 0.7}),
+            self._crear_proyecto("S-05", tipo_municipio=None, tiene_municipios_pdet=False),
+        ]
+
+    def setUp(self):
+        self.motor = MotorScoringArquitecturaC()
+        self.analizador = AnalizadorSensibilidadPesos.desde_proyectos(self._crear_cartera(), self.motor)
+
+    def test_pesos_base_sin_cambios(self):
+        """Con los pesos de Arquitectura C no hay cambios de posición ni de nivel"""
+        resultado = self.analizador.evaluar(PESOS_ARQUITECTURA_C)
+
+        self.assertEqual(len(resultado), 1)
+        self.assertFalse(resultado.cambios_posicion.any())
+        self.assertFalse(resultado.cambios_nivel.any())
+
+        lote = self.motor.calcular_scores_lote(self._crear_cartera())
+        np.testing.assert_allclose(resultado.scores[0], lote.score_total, atol=1e-9)
+        self.assertEqual(list(resultado.niveles[0]), list(lote.nivel_prioridad))
+
+    def test_barrido_igual_a_motor_con_pesos_modificados(self):
+        """Cada escenario coincide con calcular_score usando esos pesos"""
+        pesos = generar_pesos_variacion('sroi', [0.10, 0.35, 0.70])
+        resultado = self.analizador.evaluar(pesos)
+
+        for m, vector in enumerate(pesos):
+            motor = MotorScoringArquitecturaC()
+            (motor.PESO_SROI, motor.PESO_STAKEHOLDERS,
+             motor.PESO_PROBABILIDAD, motor.PESO_RIESGOS) = vector
+            for i, proyecto in enumerate(self._crear_cartera()):
+                esperado = motor.calcular_score(proyecto, detallado=False)
+                with self.subTest(escenario=m, proyecto=proyecto.id):
+                    self.assertAlmostEqual(resultado.scores[m, i], esperado.score_total, places=9)
+                    self.assertEqual(resultado.niveles[m, i], esperado.nivel_prioridad)
+
+    def test_cambios_de_ranking(self):
+        """Bajar SROI favorece al proyecto fuerte en stakeholders y probabilidad"""
+        resultado = self.analizador.variar_peso('sroi', [0.0])
+        ids = resultado.proyecto_ids
+
+        self.assertEqual(resultado.top_ids(0, 1), ["S-02"])
+        self.assertGreater(resultado.cambios_posicion[0, ids.index("S-02")], 0)
+        self.assertGreater(resultado.max_cambio_posicion()[0], 0)
+
+        # Cada ranking es una permutación coherente con las posiciones
+        for m in range(len(resultado)):
+            self.assertEqual(sorted(resultado.rankings[m]), list(range(len(ids))))
+            self.assertTrue((resultado.posiciones[m, resultado.rankings[m]] == np.arange(1, len(ids) + 1)).all())
+
+        resumen = resultado.resumen_escenario(0)
+        self.assertEqual(resumen['pesos']['sroi'], 0.0)
+        self.assertTrue(any(c['proyecto_id'] == "S-02" for c in resumen['cambios']))
+
+        # Rechazados y no elegibles conservan su nivel en todos los escenarios
+        niveles = self.analizador.barrido_rejilla(paso=0.1).niveles
+        self.assertTrue((niveles[:, ids.index("S-04")] == "RECHAZADO").all())
+        self.assertTrue((niveles[:, ids.index("S-05")] == "NO ELEGIBLE").all())
+
+    def test_generacion_de_pesos(self):
+        """Vectores generados suman 1 y respetan el criterio fijado"""
+        pesos = generar_pesos_variacion('riesgos', [0.0, 0.15, 0.5])
+        np.testing.assert_allclose(pesos.sum(axis=1), 1.0)
+        np.testing.assert_allclose(pesos[:, 3], [0.0, 0.15, 0.5])
+        np.testing.assert_allclose(pesos[1], PESOS_ARQUITECTURA_C)
+
+        rejilla = generar_rejilla_pesos(paso=0.05)
+        self.assertEqual(len(rejilla), 1771)
+        np.testing.assert_allclose(rejilla.sum(axis=1), 1.0)
+        self.assertTrue((generar_rejilla_pesos(paso=0.1, minimo=0.1) >= 0.1 - 1e-12).all())
+
+        with self.assertRaises(ValueError):
+            generar_pesos_variacion('costo', [0.2])
+        with self.assertRaises(ValueError):
+            self.analizador.evaluar([[0.5, 0.5, 0.5]])
+
+
+if __name__ == '__main__':
+    unittest.main()
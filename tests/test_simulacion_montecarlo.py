@@ -0,0 +1,128 @@
+"""
+Tests para simulación Monte Carlo (Arquitectura C)
+
+Valida:
+- Sin incertidumbre la simulación reproduce el score del motor
+- Distribuciones de nivel y de posición bien formadas
+- Reproducibilidad con semilla
+"""
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scoring.motor_arquitectura_c import MotorScoringArquitecturaC
+from src.scoring.simulacion_montecarlo import SimuladorMonteCarlo
+from src.models.proyecto import ProyectoSocial, AreaGeografica
+
+
+class TestSimulacionMonteCarlo(unittest.TestCase):
+    """Tests para SimuladorMonteCarlo"""
+
+    def _crear_proyecto(self, id, **kwargs):
+        """Helper para crear proyecto con valores por defecto."""
+        defaults = {
+            'id': id,
+            'nombre': f"Proyecto {id}",
+            'organizacion': "Test Org",
+            'descripcion': "Test",
+            'indicadores_impacto': {'sroi': 2.5},
+            'presupuesto_total': 300_000_000,
+            'beneficiarios_directos': 1000,
+            'beneficiarios_indirectos': 3000,
+            'duracion_meses': 24,
+            'ods_vinculados': ["ODS 6"],
+            'area_geografica': AreaGeografica.RURAL,
+            'poblacion_objetivo': "Comunidades rurales",
+            'departamentos': ["ANTIOQUIA"],
+            'municipios': ["ABEJORRAL"],
+            'tiene_municipios_pdet': True,
+            'tipo_municipio': "PDET",
+            'puntaje_sectorial_max': 5,
+            'pertinencia_operacional': 3,
+            'mejora_relacionamiento': 3,
+            'riesgo_tecnico_probabilidad': 2,
+            'riesgo_tecnico_impacto': 2,
+            'riesgo_social_probabilidad': 2,
+            'riesgo_social_impacto': 2,
+            'riesgo_financiero_probabilidad': 2,
+            'riesgo_financiero_impacto': 2,
+            'riesgo_regulatorio_probabilidad': 2,
+            'riesgo_regulatorio_impacto': 2,
+        }
+        defaults.update(kwargs)
+        return ProyectoSocial(**defaults)
+
+    def _crear_cartera(self):
+        return [
+            self._crear_proyecto("MC-01", indicadores_impacto={'sroi': 4.0}, nivel_confianza_sroi="Alta"),
+            self._crear_proyecto("MC-02", indicadores_impacto={'sroi': 1.1}, nivel_confianza_sroi="Baja"),
+            self._crear_proyecto("MC-03", riesgo_social_probabilidad=4, riesgo_social_impacto=5),
+            self._crear_proyecto("MC-04", tipo_municipio=None, tiene_municipios_pdet=False),
+            self._crear_proyecto("MC-05", riesgo_tecnico_impacto=None),
+        ]
+
+    def setUp(self):
+        self.motor = MotorScoringArquitecturaC()
+
+    def test_sin_incertidumbre_reproduce_motor(self):
+        """Dispersión 0 y sin ajuste de riesgos → score puntual del motor"""
+        proyectos = self._crear_cartera()
+        lote = self.motor.calcular_scores_lote(proyectos)
+
+        simulador = SimuladorMonteCarlo(self.motor, prob_ajuste_riesgo=0.0, semilla=7)
+        resultado = simulador.simular_lote(lote, np.zeros(len(proyectos)), num_simulaciones=50)
+
+        for i, proyecto in enumerate(proyectos):
+            esperado = self.motor.calcular_score(proyecto, detallado=False)
+            with self.subTest(proyecto=proyecto.id):
+                self.assertAlmostEqual(resultado.media[i], esperado.score_total, places=9)
+                self.assertAlmostEqual(resultado.desviacion[i], 0.0, places=6)
+                self.assertEqual(resultado.prob_nivel(esperado.nivel_prioridad)[i], 1.0)
+
+    def test_distribuciones(self):
+        """Probabilidades de nivel y posición suman 1; no elegible fijo en 0"""
+        simulador = SimuladorMonteCarlo(self.motor, semilla=3)
+        resultado = simulador.simular(self._crear_cartera(), num_simulaciones=2_000, tamano_bloque=300)
+        n = len(resultado)
+
+        np.testing.assert_allclose(resultado.prob_niveles.sum(axis=1), 1.0)
+        np.testing.assert_allclose(resultado.prob_posiciones.sum(axis=0), 1.0)
+        np.testing.assert_allclose(resultado.prob_posiciones.sum(axis=1), 1.0)
+        np.testing.assert_allclose(resultado.prob_top_k(n), 1.0)
+
+        self.assertEqual(resultado.prob_nivel("NO ELEGIBLE")[3], 1.0)
+        self.assertEqual(resultado.percentiles[95][3], 0.0)
+
+        # SROI 1.1 con confianza baja cae bajo 1.0 en una fracción de las simulaciones
+        self.assertGreater(resultado.prob_nivel("RECHAZADO")[1], 0.2)
+        self.assertLess(resultado.prob_nivel("RECHAZADO")[1], 0.5)
+
+        # Percentiles ordenados
+        self.assertTrue((resultado.percentiles[5] <= resultado.percentiles[50]).all())
+        self.assertTrue((resultado.percentiles[50] <= resultado.percentiles[95]).all())
+
+        registro = resultado.a_diccionarios(k_top=2)[0]
+        self.assertEqual(registro['proyecto_id'], "MC-01")
+        self.assertIn('prob_top_2', registro)
+
+    def test_semilla_reproducible(self):
+        """Misma semilla, mismos resultados"""
+        primero = SimuladorMonteCarlo(self.motor, semilla=11).simular(
+            self._crear_cartera(), num_simulaciones=500, conservar_muestras=True
+        )
+        segundo = SimuladorMonteCarlo(self.motor, semilla=11).simular(
+            self._crear_cartera(), num_simulaciones=500, conservar_muestras=True
+        )
+        np.testing.assert_array_equal(primero.scores, segundo.scores)
+
+        inferior, superior = primero.intervalo(0.80)
+        self.assertTrue((inferior <= superior).all())
+
+
+if __name__ == '__main__':
+    unittest.main()